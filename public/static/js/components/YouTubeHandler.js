@@ -134,6 +134,11 @@ export class YouTubeHandler {
 
             if (response.data && response.data.title) {
                 this.currentMetadata = response.data;
+                // 视频时长随表单提交，用于预估处理时间
+                const durationInput = document.getElementById('youtube-video-duration');
+                if (durationInput) {
+                    durationInput.value = response.data.duration || '';
+                }
                 this.displaySuggestions(response.data);
                 this.hideLoading();
 
@@ -134,6 +134,10 @@ def run_monitor_and_web_server(container: DependencyContainer, dev_mode: bool =
             return
         print("✅ 文件监控已启动")
 
+        # 后台预热spaCy/pyannote/Whisper模型（Web服务器同时开始接受请求）
+        if container.start_warmup():
+            print("🔥 模型后台预热中，就绪状态: /api/health/ready")
+
     # 配置Flask应用
     print(f"🚀 启动Web服务器: http://{host}:{port}")
     print(f"🔒 私有内容: http://{host}:{port}/private/")
@@ -7,16 +7,21 @@ AI内容生成模块
 import os
 import requests
 import logging
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, Iterable, Sequence
 import time
+from concurrent.futures import ThreadPoolExecutor
 try:
     from ..utils.rate_limiter import create_rate_limited_client
+    from ..utils.disk_cache import DiskCache
 except ImportError:
     # 兼容性处理：当作为顶级模块运行时
     import sys
     import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
     from utils.rate_limiter import create_rate_limited_client
+    from utils.disk_cache import DiskCache
+from .transcript_chunker import estimate_tokens, chunk_transcript
 
 
 class AIContentGenerator:
@@ -31,6 +36,24 @@ class AIContentGenerator:
         """
         self.config = api_config
         self.logger = logging.getLogger('project_bach.ai_generation')
+
+        # 重型资源并发限制（可选，由依赖容器注入）
+        self.resource_limiter = None
+
+        # 长转录map-reduce摘要配置
+        self.map_reduce_config = api_config.get('openrouter', {}).get('map_reduce', {}) or {}
+
+        # LLM结果缓存（按模型、prompt和生成参数的哈希寻址）
+        self.result_cache: Optional[DiskCache] = None
+        cache_config = api_config.get('openrouter', {}).get('cache', {}) or {}
+        if cache_config.get('enabled', False):
+            self.result_cache = DiskCache(
+                cache_config.get('directory', './data/cache/llm'),
+                max_size_mb=cache_config.get('max_size_mb', 100),
+                max_age_days=cache_config.get('max_age_days', 30),
+                name='llm'
+            )
+            self.logger.info(f"LLM结果缓存已启用: {self.result_cache.cache_dir}")
         
         # 创建原始客户端
         raw_client = OpenRouterClient(api_config.get('openrouter', {}))
@@ -52,6 +75,48 @@ class AIContentGenerator:
         else:
             self.client = raw_client
             self.rate_limiter = None
+
+    def set_resource_limiter(self, limiter):
+        """设置资源并发限制器，限制同时进行的LLM请求数
+
+        Args:
+            limiter: ResourceLimiter实例
+        """
+        self.resource_limiter = limiter
+
+    def _get_model_name(self, model_type: str, default: str = 'unknown') -> str:
+        """获取模型类型对应的模型名称（考虑限流包装器）"""
+        if hasattr(self.client, 'models'):
+            return self.client.models.get(model_type, default)
+        elif hasattr(self.client, 'api_client') and hasattr(self.client.api_client, 'models'):
+            return self.client.api_client.models.get(model_type, default)
+        return default
+
+    def _generate(self, model_type: str, prompt: str, **kwargs) -> str:
+        """调用API客户端生成内容（先查结果缓存，未命中时占用'llm'资源槽位请求API）"""
+        cache_key = None
+        if self.result_cache is not None:
+            # max_tokens/temperature缺省值与OpenRouterClient.generate_content保持一致
+            params = dict(kwargs)
+            params.setdefault('max_tokens', 500)
+            params.setdefault('temperature', 0.7)
+            cache_key = DiskCache.make_key(self._get_model_name(model_type, ''), prompt, params)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"LLM结果缓存命中: {model_type}")
+                return cached
+
+        slot = self.resource_limiter.slot('llm') if self.resource_limiter else nullcontext()
+        with slot:
+            result = self.client.generate_content(
+                model_type=model_type,
+                prompt=prompt,
+                **kwargs
+            )
+
+        if cache_key is not None and isinstance(result, str) and result:
+            self.result_cache.set(cache_key, result)
+        return result
         
     def generate_summary(self, text: str) -> str:
         """生成内容摘要
@@ -60,32 +125,10 @@ class AIContentGenerator:
             text: 待总结的文本
             
         Returns:
-            生成的摘要
+            生成的摘要（失败时为错误信息）
         """
-        # 获取模型名称（考虑限流包装器）
-        if hasattr(self.client, 'models'):
-            model_name = self.client.models.get('summary', 'unknown')
-        elif hasattr(self.client, 'api_client') and hasattr(self.client.api_client, 'models'):
-            model_name = self.client.api_client.models.get('summary', 'unknown')
-        else:
-            model_name = 'unknown'
-        self.logger.info(f"开始生成内容摘要，使用模型: {model_name}")
-        
         try:
-            prompt = f"Please generate a concise summary (within 300 words) for the following content:\n\n{text}"
-            
-            result = self.client.generate_content(
-                model_type='summary',
-                prompt=prompt,
-                max_tokens=500,
-                temperature=0.7
-            )
-            
-            # 记录结果预览
-            preview = result.strip().replace('\n', ' ')[:50] + "..." if len(result) > 50 else result.strip().replace('\n', ' ')
-            self.logger.info(f"摘要生成成功，长度: {len(result)} 字符，内容预览: {preview}")
-            return result
-            
+            return self._summarize(text)
         except Exception as e:
             error_msg = f"摘要生成失败: {str(e)}"
             self.logger.error(error_msg)
@@ -98,40 +141,156 @@ class AIContentGenerator:
             text: 待处理的文本
             
         Returns:
-            生成的思维导图（Markdown格式）
+            生成的思维导图（Markdown格式，失败时为错误信息）
         """
-        # 获取模型名称（考虑限流包装器）
-        if hasattr(self.client, 'models'):
-            model_name = self.client.models.get('mindmap', 'unknown')
-        elif hasattr(self.client, 'api_client') and hasattr(self.client.api_client, 'models'):
-            model_name = self.client.api_client.models.get('mindmap', 'unknown')
-        else:
-            model_name = 'unknown'
-        self.logger.info(f"开始生成思维导图，使用模型: {model_name}")
-        
         try:
-            prompt = (
-                f"Please organize the following content into a mind map structure in Markdown format, "
-                f"using #, ##, ### heading levels and - list items:\n\n{text}"
-            )
-            
-            result = self.client.generate_content(
-                model_type='mindmap',
-                prompt=prompt,
-                max_tokens=800,
-                temperature=0.5
-            )
-            
-            # 记录结果预览
-            preview = result.strip().replace('\n', ' ')[:50] + "..." if len(result) > 50 else result.strip().replace('\n', ' ')
-            self.logger.info(f"思维导图生成成功，长度: {len(result)} 字符，内容预览: {preview}")
-            return result
-            
+            return self._build_mindmap(text)
         except Exception as e:
             error_msg = f"思维导图生成失败: {str(e)}"
             self.logger.error(error_msg)
             return error_msg
+
+    def _summarize(self, text: str) -> str:
+        """生成内容摘要，失败或结果为空时抛出异常
+
+        Raises:
+            APIException: API调用失败或返回空内容
+        """
+        model_name = self._get_model_name('summary')
+        self.logger.info(f"开始生成内容摘要，使用模型: {model_name}")
+
+        prompt = f"Please generate a concise summary (within 300 words) for the following content:\n\n{text}"
+        result = self._generate(
+            model_type='summary',
+            prompt=prompt,
+            max_tokens=500,
+            temperature=0.7
+        )
+        if not result or not result.strip():
+            raise APIException("摘要生成结果为空")
+
+        # 记录结果预览
+        preview = result.strip().replace('\n', ' ')[:50] + "..." if len(result) > 50 else result.strip().replace('\n', ' ')
+        self.logger.info(f"摘要生成成功，长度: {len(result)} 字符，内容预览: {preview}")
+        return result
+
+    def _build_mindmap(self, text: str) -> str:
+        """生成思维导图，失败或结果为空时抛出异常
+
+        Raises:
+            APIException: API调用失败或返回空内容
+        """
+        model_name = self._get_model_name('mindmap')
+        self.logger.info(f"开始生成思维导图，使用模型: {model_name}")
+
+        prompt = (
+            f"Please organize the following content into a mind map structure in Markdown format, "
+            f"using #, ##, ### heading levels and - list items:\n\n{text}"
+        )
+        result = self._generate(
+            model_type='mindmap',
+            prompt=prompt,
+            max_tokens=800,
+            temperature=0.5
+        )
+        if not result or not result.strip():
+            raise APIException("思维导图生成结果为空")
+
+        # 记录结果预览
+        preview = result.strip().replace('\n', ' ')[:50] + "..." if len(result) > 50 else result.strip().replace('\n', ' ')
+        self.logger.info(f"思维导图生成成功，长度: {len(result)} 字符，内容预览: {preview}")
+        return result
     
+    def generate_batch(self, text: str, tasks: Iterable[str] = ('summary', 'mindmap'),
+                       segments: Optional[Sequence[str]] = None) -> Dict[str, str]:
+        """并发执行同一文本的多个生成任务
+
+        各任务是相互独立的API调用，同时发出后在最慢的调用结束时返回；
+        每个调用仍经过限流器和'llm'资源槽位。长转录在启用map-reduce时
+        先分块并行摘要（map），各任务再基于分块摘要生成（reduce）。
+
+        Args:
+            text: 输入文本
+            tasks: 任务名称列表 ('summary', 'mindmap')
+            segments: 可选的转录段落文本（用于按段落边界分块）
+
+        Returns:
+            任务名称到生成内容的映射
+
+        Raises:
+            APIException: 任一任务失败（保留原始异常，便于按错误类别重试）
+        """
+        task_funcs = {
+            'summary': self._summarize,
+            'mindmap': self._build_mindmap,
+        }
+
+        tasks = list(dict.fromkeys(tasks))
+        unknown = [task for task in tasks if task not in task_funcs]
+        if unknown:
+            raise ValueError(f"未知的生成任务: {', '.join(unknown)}")
+
+        if tasks and self._should_map_reduce(text):
+            try:
+                text = self._map_chunks(text, segments)
+            except Exception as e:
+                self.logger.warning(f"分块摘要失败，回退到整篇生成: {str(e)}")
+
+        if len(tasks) <= 1:
+            return {task: task_funcs[task](text) for task in tasks}
+
+        self.logger.info(f"并发生成AI内容: {', '.join(tasks)}")
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='AIGeneration') as executor:
+            futures = {task: executor.submit(task_funcs[task], text) for task in tasks}
+            return {task: future.result() for task, future in futures.items()}
+
+    def _should_map_reduce(self, text: str) -> bool:
+        """判断文本是否需要分块map-reduce处理"""
+        if not self.map_reduce_config.get('enabled', False):
+            return False
+        threshold = self.map_reduce_config.get('threshold_tokens', 12000)
+        return estimate_tokens(text) > threshold
+
+    def _map_chunks(self, text: str, segments: Optional[Sequence[str]] = None) -> str:
+        """map阶段：分块并行生成摘要，返回拼接后的分块摘要
+
+        Args:
+            text: 完整转录文本
+            segments: 可选的转录段落文本
+
+        Returns:
+            按原顺序拼接的分块摘要文本（作为reduce阶段的输入）
+        """
+        chunk_tokens = self.map_reduce_config.get('chunk_tokens', 6000)
+        max_parallel = max(int(self.map_reduce_config.get('max_parallel', 4)), 1)
+        map_max_tokens = self.map_reduce_config.get('map_max_tokens', 400)
+
+        chunks = chunk_transcript(text, chunk_tokens, segments)
+        total = len(chunks)
+        self.logger.info(f"长转录分块摘要: {estimate_tokens(text)} tokens -> {total} 块 (并行度: {max_parallel})")
+
+        def summarize_chunk(index: int, chunk: str) -> str:
+            prompt = (
+                f"The following is part {index}/{total} of a long transcript. "
+                f"Summarize its key points, facts and conclusions as concise bullet points, "
+                f"keeping names and terminology unchanged:\n\n{chunk}"
+            )
+            return self._generate(
+                model_type='summary',
+                prompt=prompt,
+                max_tokens=map_max_tokens,
+                temperature=0.3
+            )
+
+        with ThreadPoolExecutor(max_workers=min(max_parallel, total), thread_name_prefix='AIMap') as executor:
+            futures = [executor.submit(summarize_chunk, index, chunk) for index, chunk in enumerate(chunks, 1)]
+            partial_summaries = [future.result() for future in futures]
+
+        return "\n\n".join(
+            f"[Part {index}/{total}]\n{summary.strip()}"
+            for index, summary in enumerate(partial_summaries, 1)
+        )
+
     def generate_custom_content(self, text: str, task_description: str, 
                               model_type: str = 'summary', **kwargs) -> str:
         """生成自定义内容
@@ -145,19 +304,13 @@ class AIContentGenerator:
         Returns:
             生成的内容
         """
-        # 获取模型名称（考虑限流包装器）
-        if hasattr(self.client, 'models'):
-            model_name = self.client.models.get(model_type, 'unknown')
-        elif hasattr(self.client, 'api_client') and hasattr(self.client.api_client, 'models'):
-            model_name = self.client.api_client.models.get(model_type, 'unknown')
-        else:
-            model_name = 'unknown'
+        model_name = self._get_model_name(model_type)
         self.logger.info(f"开始生成自定义内容: {task_description}，使用模型: {model_name}")
         
         try:
             prompt = f"{task_description}\n\n{text}"
             
-            result = self.client.generate_content(
+            result = self._generate(
                 model_type=model_type,
                 prompt=prompt,
                 **kwargs
@@ -177,12 +330,16 @@ class AIContentGenerator:
         """获取限流状态信息
         
         Returns:
-            限流状态字典
+            限流状态字典（启用结果缓存时包含cache命中统计）
         """
         if self.rate_limiter:
-            return self.rate_limiter.get_rate_limit_info()
+            status = self.rate_limiter.get_rate_limit_info()
         else:
-            return {"rate_limiting": "disabled"}
+            status = {"rate_limiting": "disabled"}
+
+        if self.result_cache is not None:
+            status = {**status, 'cache': self.result_cache.get_stats()}
+        return status
 
 
 class OpenRouterClient:
@@ -265,6 +422,8 @@ class OpenRouterClient:
             APIException: API调用失败
         """
         url = f"{self.base_url}/chat/completions"
+        last_error: Optional[Exception] = None
+        last_status: Optional[int] = None
         
         for attempt in range(self.max_retries):
             try:
@@ -289,19 +448,23 @@ class OpenRouterClient:
                     # 对于4xx错误，不重试
                     if 400 <= response.status_code < 500:
                         raise APIException(
-                            f"API调用失败，状态码: {response.status_code}，{error_info}"
+                            f"API调用失败，状态码: {response.status_code}，{error_info}",
+                            status_code=response.status_code
                         )
                     
                     # 对于5xx错误，记录并准备重试
+                    last_status = response.status_code
                     self.logger.warning(
                         f"API请求失败 (尝试 {attempt + 1}/{self.max_retries}): "
                         f"状态码 {response.status_code}, {error_info}"
                     )
                 
-            except requests.exceptions.Timeout:
+            except requests.exceptions.Timeout as e:
+                last_error = e
                 self.logger.warning(f"API请求超时 (尝试 {attempt + 1}/{self.max_retries})")
                 
             except requests.exceptions.RequestException as e:
+                last_error = e
                 self.logger.warning(
                     f"网络请求异常 (尝试 {attempt + 1}/{self.max_retries}): {str(e)}"
                 )
@@ -310,8 +473,9 @@ class OpenRouterClient:
             if attempt < self.max_retries - 1:
                 time.sleep(self.retry_delay * (attempt + 1))  # 指数退避
         
-        # 所有重试都失败
-        raise APIException(f"API调用失败，已重试 {self.max_retries} 次")
+        # 所有重试都失败（保留最后的状态码/网络异常，供重试策略判断错误类别）
+        raise APIException(f"API调用失败，已重试 {self.max_retries} 次",
+                           status_code=last_status) from last_error
     
     def _extract_error_info(self, response: requests.Response) -> str:
         """提取错误信息
@@ -6,39 +6,190 @@
 
 import spacy
 import logging
-from typing import Dict, Tuple, Set, Any
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, Tuple, Set, Any, List, Optional, TYPE_CHECKING
 from faker import Faker
 
+if TYPE_CHECKING:
+    from ..storage.name_mapping_store import NameMappingStore
+
+
+# NER依赖的组件；tagger/parser/lemmatizer等其余组件在推理时禁用
+_NER_COMPONENTS = ('tok2vec', 'transformer', 'ner')
+# 未配置时使用的默认模型（spacy.model为中文模型，spacy.en_model为英文模型）
+_DEFAULT_NER_MODELS = {'zh': 'zh_core_web_sm', 'en': 'en_core_web_sm'}
+# 在句末标点之后切分（保留标点和空白）
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[。！？!?；;.\n])')
+
+
+def split_for_ner(text: str, max_chars: int = 2000) -> List[str]:
+    """将长文本按句子切分为不超过max_chars的片段，供nlp.pipe批量处理
+
+    无标点的超长句子（如部分中文转录）在空白处或按长度硬切。
+
+    Args:
+        text: 待切分文本
+        max_chars: 单个片段的最大字符数
+
+    Returns:
+        片段列表（拼接后与原文相同）
+    """
+    chunks: List[str] = []
+    current = ''
+    for piece in _SENTENCE_BOUNDARY.split(text):
+        while len(piece) > max_chars:
+            cut = piece.rfind(' ', 0, max_chars)
+            cut = cut if cut > max_chars // 2 else max_chars
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(piece[:cut])
+            piece = piece[cut:]
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ''
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+@lru_cache(maxsize=64)
+def _compile_name_pattern(names: Tuple[str, ...]) -> 're.Pattern':
+    """将人名编译为一个交替正则（按长度降序，长名优先匹配）
+
+    纯ASCII人名两侧要求不是字母数字，避免"Li"匹配到"Lisa"中；中文人名没有词边界，按子串匹配。
+    """
+    alternatives = []
+    for name in sorted(names, key=lambda name: (-len(name), name)):
+        escaped = re.escape(name)
+        if name.isascii():
+            escaped = rf'(?<![A-Za-z0-9]){escaped}(?![A-Za-z0-9])'
+        alternatives.append(escaped)
+    return re.compile('|'.join(alternatives))
+
+
+def replace_names(text: str, mapping: Dict[str, str]) -> str:
+    """一次扫描完成所有人名替换
+
+    长名优先（"Li Ming"先于"Li"），已替换的虚拟人名不会被再次替换，结果与映射顺序无关。
+
+    Args:
+        text: 待替换文本
+        mapping: 原始人名到替换人名的映射
+
+    Returns:
+        替换后的文本
+    """
+    names = tuple(sorted(name for name in mapping if name))
+    if not text or not names:
+        return text
+    return _compile_name_pattern(names).sub(lambda match: mapping[match.group(0)], text)
+
+
+def _unused_pipes(nlp) -> List[str]:
+    return [name for name in getattr(nlp, 'pipe_names', []) if name not in _NER_COMPONENTS]
+
+
+# 进程池worker内的spaCy模型（每个worker进程只加载一次）
+_worker_models: Dict[str, Any] = {}
+# 进程池worker使用的模型名称（由_init_ner_worker设置为配置的模型）
+_worker_model_names: Dict[str, str] = dict(_DEFAULT_NER_MODELS)
+
+
+def _init_ner_worker(model_names: Dict[str, str]):
+    """进程池initializer：记录配置的模型名称（模型在首次使用时加载）"""
+    _worker_model_names.update(model_names)
+
+
+def _ner_worker(language: str, texts: List[str], batch_size: int) -> List[Tuple[str, str]]:
+    """进程池worker：对一组片段做NER，返回(实体文本, 标签)列表"""
+    nlp = _worker_models.get(language)
+    if nlp is None:
+        nlp = _worker_models[language] = spacy.load(_worker_model_names[language])
+    return [(ent.text, ent.label_)
+            for doc in nlp.pipe(texts, batch_size=batch_size, disable=_unused_pipes(nlp))
+            for ent in doc.ents]
+
 
 class NameAnonymizer:
     """人名匿名化服务"""
     
-    def __init__(self, spacy_config: Dict[str, Any]):
+    def __init__(self, spacy_config: Dict[str, Any], lazy_load: bool = False):
         """初始化人名匿名化服务
         
         Args:
             spacy_config: spaCy配置字典
+            lazy_load: 是否延迟加载spaCy模型（由启动预热或首次匿名化时加载）
         """
         self.config = spacy_config
         self.logger = logging.getLogger('project_bach.anonymization')
-        self.setup_spacy_models()
+        self._models_lock = threading.Lock()
+
+        # 批量NER参数：长文本切片后用nlp.pipe处理
+        self.batch_size = spacy_config.get('batch_size', 64)
+        self.n_process = spacy_config.get('n_process', 1)
+        self.chunk_chars = spacy_config.get('chunk_chars', 2000)
+        # 共享NER进程池（>0时启用，积压的多个文件复用同一组已加载模型的worker）
+        self.workers = spacy_config.get('workers', 0)
+        # 中英文NER模型名称（进程池worker使用相同的模型）
+        self.model_names = {
+            'zh': spacy_config.get('model', _DEFAULT_NER_MODELS['zh']),
+            'en': spacy_config.get('en_model', _DEFAULT_NER_MODELS['en']),
+        }
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.nlp_zh = None
+        self.nlp_en = None
+        self.nlp = None
+        if not lazy_load:
+            self.setup_spacy_models()
         
         # 初始化虚拟人名生成器
         self.name_generator = VirtualNameGenerator()
         
-        # 全局人名映射（跨文档持久化）
+        # 全局人名映射（跨文档；设置mapping_store后改为持久化存储）
         self.name_mapping: Dict[str, str] = {}
+        self._mapping_lock = threading.Lock()
+        self.mapping_store: Optional['NameMappingStore'] = None
+
+    def set_mapping_store(self, store: 'NameMappingStore'):
+        """设置持久化人名映射存储（映射跨重启保留，内存中只保留有界缓存）
+
+        Args:
+            store: 人名映射存储
+        """
+        self.mapping_store = store
+
+    def _fake_name_for(self, original_name: str, text: str, language: str) -> str:
+        """获取真实人名对应的虚拟人名，首次出现时生成"""
+        def generate() -> str:
+            fake_name = self.name_generator.generate_name(original_name, text, language)
+            self.logger.debug(f"NLP检测到新人名，动态映射: {original_name} -> {fake_name} (语言: {language})")
+            return fake_name
+
+        if self.mapping_store is not None:
+            return self.mapping_store.get_or_create(original_name, generate)
+
+        with self._mapping_lock:
+            if original_name not in self.name_mapping:
+                self.name_mapping[original_name] = generate()
+            return self.name_mapping[original_name]
         
     def setup_spacy_models(self):
         """设置spaCy双语模型"""
         try:
             # 加载中文模型
-            self.logger.info("加载spaCy中文模型: zh_core_web_sm")
-            self.nlp_zh = spacy.load("zh_core_web_sm")
+            self.logger.info(f"加载spaCy中文模型: {self.model_names['zh']}")
+            self.nlp_zh = spacy.load(self.model_names['zh'])
             
             # 加载英文模型
-            self.logger.info("加载spaCy英文模型: en_core_web_sm")
-            self.nlp_en = spacy.load("en_core_web_sm")
+            self.logger.info(f"加载spaCy英文模型: {self.model_names['en']}")
+            self.nlp_en = spacy.load(self.model_names['en'])
             
             # 默认使用中文模型（向后兼容）
             self.nlp = self.nlp_zh
@@ -46,62 +197,73 @@ class NameAnonymizer:
             self.logger.info("spaCy双语模型加载成功")
         except OSError as e:
             self.logger.error(f"spaCy模型加载失败: {str(e)}")
-            self.logger.error("请运行: python -m spacy download zh_core_web_sm")
-            self.logger.error("请运行: python -m spacy download en_core_web_sm")
+            self.logger.error(f"请运行: python -m spacy download {self.model_names['zh']}")
+            self.logger.error(f"请运行: python -m spacy download {self.model_names['en']}")
             raise
+
+    def ensure_models_loaded(self):
+        """确保spaCy模型已加载（延迟加载模式下由预热线程或首次匿名化调用）
+
+        Raises:
+            OSError: spaCy模型加载失败
+        """
+        with self._models_lock:
+            if self.nlp_zh is None or self.nlp_en is None:
+                self.setup_spacy_models()
+
+    def is_ready(self) -> bool:
+        """spaCy模型是否已加载"""
+        return self.nlp_zh is not None and self.nlp_en is not None
     
-    def anonymize_names(self, text: str, language: str = 'auto') -> Tuple[str, Dict[str, str]]:
+    def anonymize_names(self, text: str, language: str = 'auto',
+                        document_id: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
         """使用spaCy进行基于NLP的完全动态人名匿名化（支持双语）
         
         Args:
             text: 待匿名化的文本
             language: 指定语言 ('auto', 'zh', 'en')
+            document_id: 文档标识（设置了mapping_store时保存该文档的映射，用于还原）
             
         Returns:
             (匿名化后的文本, 本次处理的人名映射)
         """
         self.logger.info("开始基于NLP的动态人名匿名化处理")
+
+        # 模型加载失败时直接抛出，避免未匿名化的文本被当作结果继续处理
+        self.ensure_models_loaded()
         
         try:
             # 智能选择spaCy模型
             nlp_model = self._select_nlp_model(text, language)
             
-            doc = nlp_model(text)
             result = text
             current_mapping = {}
             
             # 使用spaCy识别所有人名实体
-            person_entities = [ent for ent in doc.ents if ent.label_ == "PERSON"]
+            person_entities = self._extract_person_entities(nlp_model, text)
             
             if not person_entities:
                 self.logger.info("NLP检测：未发现人名实体")
                 return result, current_mapping
             
             # 基于NLP检测结果进行动态处理
-            for ent in person_entities:
-                original_name = ent.text.strip()
+            for entity_text in person_entities:
+                original_name = entity_text.strip()
                 
                 # 过滤无效检测结果
                 if len(original_name) < 2 or self._is_invalid_name(original_name):
                     continue
                 
-                # 为每个新检测到的人名动态生成虚拟人名
-                if original_name not in self.name_mapping:
-                    # 基于检测到的语言生成虚拟人名
+                # 为每个新检测到的人名动态生成虚拟人名（基于检测到的语言）
+                if original_name not in current_mapping:
                     detected_lang = 'zh' if nlp_model == self.nlp_zh else 'en'
-                    fake_name = self.name_generator.generate_name(
-                        original_name, text, detected_lang
-                    )
-                    self.name_mapping[original_name] = fake_name
-                    self.logger.debug(
-                        f"NLP检测到新人名，动态映射: {original_name} -> {fake_name} "
-                        f"(语言: {detected_lang})"
-                    )
-                
-                current_mapping[original_name] = self.name_mapping[original_name]
-                
-                # 执行全文替换
-                result = result.replace(original_name, self.name_mapping[original_name])
+                    current_mapping[original_name] = self._fake_name_for(original_name, text, detected_lang)
+            
+            # 所有人名一次扫描替换
+            result = replace_names(text, current_mapping)
+
+            if document_id and self.mapping_store is not None:
+                self.mapping_store.store_document(document_id, current_mapping)
             
             self.logger.info(f"NLP动态匿名化完成，处理了 {len(current_mapping)} 个人名")
             return result, current_mapping
@@ -110,6 +272,62 @@ class NameAnonymizer:
             self.logger.error(f"NLP人名匿名化失败: {str(e)}")
             return text, {}
     
+    def _extract_person_entities(self, nlp_model, text: str) -> List[str]:
+        """按句切片后批量识别人名实体（只运行NER所需组件）
+
+        Args:
+            nlp_model: 选定的spaCy模型
+            text: 待识别文本
+
+        Returns:
+            人名实体文本列表（按出现顺序）
+        """
+        chunks = split_for_ner(text, self.chunk_chars)
+        language = 'zh' if nlp_model is self.nlp_zh else 'en'
+
+        if self.workers > 0 and len(chunks) > 1:
+            entities = self._pipe_in_pool(language, chunks)
+        else:
+            docs = nlp_model.pipe(chunks, batch_size=self.batch_size, n_process=self.n_process,
+                                  disable=_unused_pipes(nlp_model))
+            entities = [(ent.text, ent.label_) for doc in docs for ent in doc.ents]
+
+        self.logger.debug(f"NER完成: {len(chunks)} 个片段, {len(entities)} 个实体")
+        return [entity_text for entity_text, label in entities if label == "PERSON"]
+
+    def _pipe_in_pool(self, language: str, chunks: List[str]) -> List[Tuple[str, str]]:
+        """在共享进程池中并行NER，按片段顺序返回实体"""
+        with self._pool_lock:
+            if self._pool is None:
+                self.logger.info(f"启动NER进程池: {self.workers} 个worker")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_ner_worker,
+                                                 initargs=(self.model_names,))
+            pool = self._pool
+
+        group_size = max(-(-len(chunks) // (self.workers * 4)), 1)
+        groups = [chunks[i:i + group_size] for i in range(0, len(chunks), group_size)]
+        results = pool.map(_ner_worker, repeat(language), groups, repeat(self.batch_size))
+        return [entity for group_entities in results for entity in group_entities]
+
+    def shutdown(self):
+        """关闭NER进程池"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def apply_mapping(self, text: str, mapping: Dict[str, str]) -> str:
+        """将已有的人名映射应用到文本（不重新做NER）
+
+        Args:
+            text: 待替换的文本
+            mapping: 原始人名到虚拟人名的映射
+
+        Returns:
+            替换后的文本
+        """
+        return replace_names(text, mapping)
+
     def _select_nlp_model(self, text: str, language: str):
         """智能选择spaCy模型
         
@@ -185,11 +403,30 @@ class NameAnonymizer:
         Returns:
             人名映射字典
         """
-        return self.name_mapping.copy()
+        if self.mapping_store is not None:
+            return self.mapping_store.global_mapping()
+        with self._mapping_lock:
+            return self.name_mapping.copy()
     
+    def get_document_mapping(self, document_id: str) -> Optional[Dict[str, str]]:
+        """获取文档保存的人名映射
+
+        Args:
+            document_id: 文档标识（anonymize_names的document_id）
+
+        Returns:
+            该文档的人名映射；未设置mapping_store时返回None
+        """
+        if self.mapping_store is None:
+            return None
+        return self.mapping_store.get_document(document_id)
+
     def clear_name_mapping(self):
         """清除人名映射（用于测试或重置）"""
-        self.name_mapping.clear()
+        if self.mapping_store is not None:
+            self.mapping_store.clear_global()
+        with self._mapping_lock:
+            self.name_mapping.clear()
         self.name_generator.clear_used_names()
         self.logger.info("人名映射已清除")
 
@@ -282,9 +519,14 @@ class VirtualNameGenerator:
 class NameMappingManager:
     """人名映射管理器"""
     
-    def __init__(self):
-        """初始化人名映射管理器"""
-        self.mappings: Dict[str, Dict[str, str]] = {}  # 按文档存储映射
+    def __init__(self, store: Optional['NameMappingStore'] = None):
+        """初始化人名映射管理器
+
+        Args:
+            store: 持久化人名映射存储（可选，未提供时只保存在内存中）
+        """
+        self.store = store
+        self.mappings: Dict[str, Dict[str, str]] = {}  # 按文档存储映射（无持久化存储时）
         
     def store_mapping(self, document_id: str, mapping: Dict[str, str]):
         """存储文档的人名映射
@@ -293,6 +535,9 @@ class NameMappingManager:
             document_id: 文档标识
             mapping: 人名映射字典
         """
+        if self.store is not None:
+            self.store.store_document(document_id, mapping)
+            return
         self.mappings[document_id] = mapping.copy()
     
     def get_mapping(self, document_id: str) -> Dict[str, str]:
@@ -304,6 +549,8 @@ class NameMappingManager:
         Returns:
             人名映射字典
         """
+        if self.store is not None:
+            return self.store.get_document(document_id)
         return self.mappings.get(document_id, {})
     
     def get_all_mappings(self) -> Dict[str, Dict[str, str]]:
@@ -312,6 +559,8 @@ class NameMappingManager:
         Returns:
             所有映射字典
         """
+        if self.store is not None:
+            return {document_id: self.store.get_document(document_id) for document_id in self.store.list_documents()}
         return self.mappings.copy()
     
     def reverse_mapping(self, document_id: str, anonymized_text: str) -> str:
@@ -324,14 +573,14 @@ class NameMappingManager:
         Returns:
             还原后的文本
         """
-        mapping = self.get_mapping(document_id)
-        result = anonymized_text
+        if self.store is not None:
+            # 直接按(document_id, fake)索引取反向映射
+            reverse = self.store.reverse_document(document_id)
+        else:
+            reverse = {virtual: original for original, virtual in self.get_mapping(document_id).items()}
         
         # 反向替换
-        for original, virtual in mapping.items():
-            result = result.replace(virtual, original)
-        
-        return result
+        return replace_names(anonymized_text, reverse)
     
     def clear_mapping(self, document_id: str):
         """清除指定文档的映射
@@ -339,11 +588,15 @@ class NameMappingManager:
         Args:
             document_id: 文档标识
         """
+        if self.store is not None:
+            self.store.delete_document(document_id)
         if document_id in self.mappings:
             del self.mappings[document_id]
     
     def clear_all_mappings(self):
         """清除所有映射"""
+        if self.store is not None:
+            self.store.clear_documents()
         self.mappings.clear()
 
 
@@ -376,8 +629,7 @@ def extract_person_names(text: str, language: str = 'auto') -> list:
         anonymizer = NameAnonymizer({'model': 'zh_core_web_sm'})
         nlp_model = anonymizer._select_nlp_model(text, language)
         
-        doc = nlp_model(text)
-        person_entities = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
+        person_entities = [name.strip() for name in anonymizer._extract_person_entities(nlp_model, text)]
         
         # 过滤无效结果
         valid_names = []
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3.11
+"""
+共享音频解码
+每个上传只用ffmpeg解码一次为16kHz单声道float32 PCM并以内存映射文件缓存，
+供Whisper转录与pyannote说话人分离共同使用
+"""
+
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    from ..utils.audio_probe import probe_duration
+    from .chunked_transcription import SAMPLE_RATE
+except ImportError:
+    # 兼容性处理：当作为顶级模块运行时
+    from utils.audio_probe import probe_duration
+    from core.chunked_transcription import SAMPLE_RATE
+
+
+# 无法探测时长时按压缩音频约1MB/分钟估算
+_ESTIMATED_SECONDS_PER_MB = 60
+
+
+def decode_timeout(duration: Optional[float], base_seconds: float = 60,
+                   seconds_per_audio_minute: float = 6) -> float:
+    """按音频时长计算ffmpeg解码超时时间
+
+    Args:
+        duration: 音频时长（秒），未知时只使用基础超时
+        base_seconds: 基础超时（秒）
+        seconds_per_audio_minute: 每分钟音频额外允许的秒数
+
+    Returns:
+        超时时间（秒）
+    """
+    return base_seconds + (duration or 0) / 60 * seconds_per_audio_minute
+
+
+def estimate_duration(audio_path: Path) -> float:
+    """获取音频时长，ffprobe不可用时按文件大小估算"""
+    duration = probe_duration(audio_path)
+    if duration is not None:
+        return duration
+    return audio_path.stat().st_size / (1024 * 1024) * _ESTIMATED_SECONDS_PER_MB
+
+
+@dataclass
+class DecodedAudio:
+    """已解码的音频（float32内存映射，只读）"""
+    source: Path
+    path: Path
+    samples: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+class AudioDecoder:
+    """将上传音频解码为16kHz单声道PCM缓存文件"""
+
+    def __init__(self, cache_dir: str = './data/cache/pcm', timeout_base_seconds: float = 60,
+                 timeout_per_audio_minute: float = 6):
+        """初始化解码器
+
+        Args:
+            cache_dir: PCM缓存目录
+            timeout_base_seconds: 解码基础超时（秒）
+            timeout_per_audio_minute: 每分钟音频额外允许的解码秒数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.timeout_base_seconds = timeout_base_seconds
+        self.timeout_per_audio_minute = timeout_per_audio_minute
+        self.logger = logging.getLogger('project_bach.audio_decoder')
+
+    def _cache_path(self, audio_path: Path) -> Path:
+        stat = audio_path.stat()
+        identity = f"{audio_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{audio_path.stem}-{digest}.f32"
+
+    def decode(self, audio_path: Path) -> DecodedAudio:
+        """解码音频（同一文件已解码时直接映射缓存）
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            DecodedAudio实例
+
+        Raises:
+            FileNotFoundError: ffmpeg未安装
+            Exception: 解码失败或超时
+        """
+        cache_path = self._cache_path(audio_path)
+        if not cache_path.exists():
+            self._run_ffmpeg(audio_path, cache_path)
+
+        samples = np.memmap(cache_path, dtype=np.float32, mode='r') if cache_path.stat().st_size else \
+            np.zeros(0, dtype=np.float32)
+        decoded = DecodedAudio(source=audio_path, path=cache_path, samples=samples)
+        self.logger.info(f"音频已解码: {audio_path.name} ({decoded.duration / 60:.1f}分钟)")
+        return decoded
+
+    def _run_ffmpeg(self, audio_path: Path, cache_path: Path):
+        timeout = decode_timeout(estimate_duration(audio_path), self.timeout_base_seconds,
+                                 self.timeout_per_audio_minute)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+
+        cmd = [
+            'ffmpeg', '-nostdin', '-loglevel', 'error', '-y',
+            '-i', str(audio_path),
+            '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE),
+            tmp_path
+        ]
+        self.logger.info(f"解码音频为16kHz PCM: {audio_path.name} (超时 {timeout:.0f}秒)")
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            if result.returncode != 0:
+                raise Exception(f"ffmpeg解码失败: {result.stderr.strip()}")
+            os.replace(tmp_path, cache_path)
+        except subprocess.TimeoutExpired:
+            raise Exception(f"音频解码超时 ({timeout:.0f}秒)")
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def release(self, decoded: Optional[DecodedAudio]):
+        """删除解码缓存文件（已打开的内存映射在进程内仍然有效）"""
+        if decoded is None:
+            return
+        try:
+            decoded.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"删除解码缓存失败: {decoded.path.name} - {e}")
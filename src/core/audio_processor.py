@@ -6,20 +6,80 @@
 
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from .mlx_transcription import MLXTranscriptionService as TranscriptionService
 from .anonymization import NameAnonymizer
 from .ai_generation import AIContentGenerator
 from .speaker_diarization import SpeakerDiarization
+from .audio_decoder import AudioDecoder, DecodedAudio
+from .eta_estimator import EtaEstimator
+from .voice_activity import SpeechTimeline, VoiceActivityDetector
+from .speaker_identity import speaker_series_key
 from ..storage.transcript_storage import TranscriptStorage
 from ..storage.result_storage import ResultStorage
+from ..storage.checkpoint_store import CheckpointStore, compute_hash
 from ..publishing.git_publisher import GitPublisher
 from ..monitoring.file_monitor import FileMonitor
+from ..monitoring.retry_policy import classify_exception
 from ..utils.config import ConfigManager
+from ..utils.resource_limiter import ResourceLimiter
+from ..utils.audio_probe import probe_duration
 from .processing_service import ProcessingService, ProcessingStage, get_processing_service
+from .stage_pipeline import StagePipeline, PipelineJob
+
+
+# 处理阶段（按执行顺序）及各阶段写入context的输出
+STAGE_ORDER = ('transcription', 'anonymization', 'ai_generation', 'publishing')
+STAGE_OUTPUTS = {
+    'transcription': ('transcription_result', 'transcript', 'diarization_result'),
+    'anonymization': ('anonymized_text', 'mapping', 'ai_segments'),
+    'ai_generation': ('summary', 'mindmap'),
+    'publishing': ('result_url',),
+}
+
+# 内存中最多保留的失败断点数（超出时丢弃最早的）
+MAX_FAILURE_CHECKPOINTS = 32
+
+# 各阶段对应的执行方法
+STAGE_METHODS = {
+    'transcription': '_stage_transcribe',
+    'anonymization': '_stage_anonymize',
+    'ai_generation': '_stage_generate_ai_content',
+    'publishing': '_stage_publish',
+}
+
+# 持久化断点的阶段（发布阶段的输出即结果文件本身）
+CHECKPOINT_STAGES = ('transcription', 'anonymization', 'ai_generation')
+
+# 各阶段的输入（context键）；转录阶段的输入为音频文件本身
+STAGE_INPUTS = {
+    'anonymization': ('transcript', 'transcription_result'),
+    'ai_generation': ('anonymized_text', 'ai_segments'),
+}
+
+# 影响各阶段输出的处理参数（metadata键）与config.yaml配置节，用于计算配置指纹
+STAGE_CONFIG_KEYS = {
+    'transcription': (
+        ('description', 'audio_language', 'whisper_model', 'enable_diarization', 'enable_vad',
+         'content_type', 'subcategory'),
+        ('mlx_whisper', 'diarization'),
+    ),
+    'anonymization': (('enable_anonymization',), ('spacy',)),
+    'ai_generation': (('enable_summary', 'enable_mindmap'), ('openrouter',)),
+}
+
+# TranscriptStorage已写入的文本文件直接作为断点复用：output key -> 文件后缀
+TRANSCRIPT_CHECKPOINT_FILES = {'transcript': 'raw', 'anonymized_text': 'anonymized'}
+
+# 不写入断点的输出：真实人名到虚拟人名的映射只保存在人名映射存储中，断点只记录其哈希
+CHECKPOINT_EXCLUDED_OUTPUTS = ('mapping',)
 
 
 class AudioProcessor:
@@ -51,6 +111,28 @@ class AudioProcessor:
         # Git发布服务（可选）
         self.git_publisher: Optional[GitPublisher] = None
 
+        # 重型资源并发限制（可选，多worker并行时使用）
+        self.resource_limiter: Optional[ResourceLimiter] = None
+
+        # 阶段流水线（可选，通过enable_stage_pipeline启用）
+        self.stage_pipeline: Optional[StagePipeline] = None
+
+        # 共享音频解码（可选，说话人分离时转录与分离共用一次解码）
+        self.audio_decoder: Optional[AudioDecoder] = None
+
+        # 处理时间预估（可选，按阶段学习实时率）
+        self.eta_estimator: Optional[EtaEstimator] = None
+
+        # 语音活动检测（可选，需要共享音频解码；按metadata中的enable_vad决定是否启用）
+        self.voice_activity_detector: Optional[VoiceActivityDetector] = None
+
+        # 阶段断点持久化（可选，进程重启后重新处理时跳过输入和配置未变的已完成阶段）
+        self.checkpoint_store: Optional[CheckpointStore] = None
+
+        # 失败断点：文件路径 -> 失败阶段、错误和已完成阶段的输出，重试时从失败阶段继续
+        self._failures: Dict[str, Dict[str, Any]] = {}
+        self._failures_lock = threading.Lock()
+
     @staticmethod
     def build_result_url(config_manager: Optional[ConfigManager], file_stem: str, privacy_level: str) -> str:
         """根据配置与隐私级别生成结果URL"""
@@ -143,6 +225,52 @@ class AudioProcessor:
         """
         self.git_publisher = publisher
 
+    def set_resource_limiter(self, limiter: ResourceLimiter):
+        """设置重型资源并发限制器
+
+        Args:
+            limiter: 资源限制器实例
+        """
+        self.resource_limiter = limiter
+
+    def set_audio_decoder(self, decoder: AudioDecoder):
+        """设置共享音频解码器
+
+        Args:
+            decoder: 音频解码器实例
+        """
+        self.audio_decoder = decoder
+
+    def set_eta_estimator(self, estimator: EtaEstimator):
+        """设置处理时间预估器
+
+        Args:
+            estimator: 预估器实例
+        """
+        self.eta_estimator = estimator
+
+    def set_voice_activity_detector(self, detector: VoiceActivityDetector):
+        """设置语音活动检测器
+
+        Args:
+            detector: 检测器实例
+        """
+        self.voice_activity_detector = detector
+
+    def set_checkpoint_store(self, store: CheckpointStore):
+        """设置阶段断点存储
+
+        Args:
+            store: 断点存储实例
+        """
+        self.checkpoint_store = store
+
+    def _resource_slot(self, resource: str):
+        """获取资源槽位上下文，未设置限制器时不做限制"""
+        if self.resource_limiter is None:
+            return nullcontext()
+        return self.resource_limiter.slot(resource)
+
     def _clean_transcription_for_output(self, transcription_result):
         """清理转录结果，只保留输出需要的字段"""
         if not isinstance(transcription_result, dict):
@@ -167,6 +295,225 @@ class AudioProcessor:
 
         return cleaned
 
+    # 流水线阶段顺序：转录(含说话人分离) → 匿名化 → AI生成 → 保存与发布
+    PIPELINE_STAGES = ('transcription', 'anonymization', 'ai_generation', 'publishing')
+
+    def enable_stage_pipeline(self, pipeline_config: Dict[str, Any] = None):
+        """启用阶段流水线执行模式
+
+        启用后process_audio_file将任务提交到流水线并等待结果，
+        多个调用方（FileMonitor工作线程）并发提交时，不同文件可同时处于不同阶段。
+
+        Args:
+            pipeline_config: 流水线配置 (queue_size, stage_workers)
+        """
+        pipeline_config = pipeline_config or {}
+        stage_workers = pipeline_config.get('stage_workers', {}) or {}
+
+        self.stage_pipeline = StagePipeline(
+            [(name, partial(self._run_stage, name), stage_workers.get(name, 1)) for name in self.PIPELINE_STAGES],
+            queue_size=pipeline_config.get('queue_size', 2),
+            on_stage_complete=self._on_pipeline_stage_complete,
+        )
+        self.logger.info("阶段流水线模式已启用")
+
+    def _on_pipeline_stage_complete(self, job: PipelineJob, stage_name: str, elapsed: float):
+        """流水线阶段完成回调：将阶段耗时写入处理状态"""
+        self._record_stage_timing(job.context, stage_name, elapsed)
+
+    def _record_stage_timing(self, context: Dict[str, Any], stage_name: str, elapsed: float):
+        """记录阶段耗时到处理状态，并更新处理时间预估"""
+        processing_id = context.get('processing_id')
+        if processing_id:
+            self.processing_service.record_stage_timing(processing_id, stage_name, elapsed)
+        if self.eta_estimator is not None:
+            self.eta_estimator.record(stage_name, elapsed, context.get('audio_duration'), context.get('whisper_model'))
+
+    def _whisper_model_name(self, metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+        """本次处理使用的Whisper模型名（用于按模型区分转录实时率）"""
+        custom_model = metadata.get('whisper_model') if metadata else None
+        return custom_model or getattr(self.transcription_service, 'default_model', None)
+
+    def get_failure(self, audio_path: str) -> Optional[Dict[str, Any]]:
+        """获取文件最近一次处理失败的阶段与错误
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            {'stage': 失败阶段, 'error': 错误消息, 'error_class': 按异常类型判断的错误类别}，
+            没有失败记录时返回None
+        """
+        with self._failures_lock:
+            failure = self._failures.get(str(Path(audio_path)))
+        if failure is None:
+            return None
+        return {'stage': failure['stage'], 'error': failure['error'], 'error_class': failure['error_class']}
+
+    def discard_failure(self, audio_path: str):
+        """丢弃文件的失败断点（不再重试时调用，释放已完成阶段的输出）"""
+        with self._failures_lock:
+            self._failures.pop(str(Path(audio_path)), None)
+
+    def _remember_failure(self, context: Dict[str, Any], failed_stage: Optional[str], error: BaseException):
+        """记录失败断点，保留失败阶段之前各阶段的输出"""
+        if failed_stage not in STAGE_ORDER:
+            return
+        completed = STAGE_ORDER[:STAGE_ORDER.index(failed_stage)]
+        outputs = {key: context[key] for stage in completed for key in STAGE_OUTPUTS[stage] if key in context}
+        with self._failures_lock:
+            self._failures[str(context['audio_path'])] = {
+                'stage': failed_stage,
+                'error': str(error),
+                'error_class': classify_exception(error),
+                'metadata': context['metadata'],
+                'privacy_level': context['privacy_level'],
+                'outputs': outputs,
+            }
+            while len(self._failures) > MAX_FAILURE_CHECKPOINTS:
+                self._failures.pop(next(iter(self._failures)))
+
+    def _resume_from_failure(self, context: Dict[str, Any]) -> Optional[str]:
+        """若文件上次在后续阶段失败且处理参数未变，恢复已完成阶段的输出
+
+        Returns:
+            继续执行的阶段名称，不能恢复时返回None（从头处理）
+        """
+        with self._failures_lock:
+            failure = self._failures.pop(str(context['audio_path']), None)
+        if failure is None or failure['stage'] == STAGE_ORDER[0]:
+            return None
+        if failure['metadata'] != context['metadata'] or failure['privacy_level'] != context['privacy_level']:
+            self.logger.info("处理参数已变化，从头重新处理")
+            return None
+
+        context.update(failure['outputs'])
+        self.logger.info(f"从失败阶段继续处理: {failure['stage']}（跳过已完成的阶段）")
+        return failure['stage']
+
+    def _stage_fingerprint(self, context: Dict[str, Any], stage_name: str) -> Tuple[str, str]:
+        """计算阶段的输入指纹与配置指纹
+
+        Returns:
+            (input_hash, config_hash)
+        """
+        if stage_name == 'transcription':
+            audio_path = context['audio_path']
+            stat = audio_path.stat()
+            inputs = {'path': str(audio_path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        else:
+            inputs = {key: context.get(key) for key in STAGE_INPUTS[stage_name]}
+
+        metadata_keys, config_sections = STAGE_CONFIG_KEYS[stage_name]
+        metadata = context['metadata'] or {}
+        config = getattr(self.config_manager, 'config', None)
+        config = config if isinstance(config, dict) else {}
+        stage_config = {
+            'metadata': {key: metadata.get(key) for key in metadata_keys},
+            'config': {section: config.get(section) for section in config_sections},
+        }
+        if stage_name in ('transcription', 'anonymization'):
+            # 转录文本按隐私级别存放在不同目录
+            stage_config['privacy_level'] = context['privacy_level']
+        if stage_name == 'transcription':
+            stage_config['services'] = {
+                'diarization': self.speaker_diarization_service is not None,
+                'vad': self.voice_activity_detector is not None,
+            }
+        return compute_hash(inputs), compute_hash(stage_config)
+
+    def _restore_checkpoints(self, context: Dict[str, Any]) -> Optional[str]:
+        """从持久化断点恢复已完成阶段的输出（按阶段顺序，遇到第一个无效断点停止）
+
+        Returns:
+            继续执行的阶段名称，没有可用断点时返回None（从头处理）
+        """
+        if self.checkpoint_store is None:
+            return None
+
+        job_key = CheckpointStore.job_key(context['audio_path'])
+        restored = []
+        try:
+            for stage_name in CHECKPOINT_STAGES:
+                input_hash, config_hash = self._stage_fingerprint(context, stage_name)
+                outputs = self.checkpoint_store.load_stage(job_key, stage_name, input_hash, config_hash)
+                if outputs is None:
+                    break
+                if stage_name == 'anonymization':
+                    mapping = self._checkpoint_mapping(context, outputs.pop('mapping_hash', None))
+                    if mapping is None:
+                        break
+                    outputs['mapping'] = mapping
+                context.update(outputs)
+                restored.append(stage_name)
+        except Exception as e:
+            self.logger.warning(f"读取阶段断点失败，从头处理: {e}")
+            return None
+
+        if not restored:
+            return None
+
+        self.logger.info(f"使用阶段断点，跳过已完成的阶段: {', '.join(restored)}")
+        if context.get('processing_id'):
+            self.processing_service.add_log(
+                context['processing_id'], f"Reusing checkpointed stages: {', '.join(restored)}"
+            )
+        return STAGE_ORDER[len(restored)]
+
+    def _checkpoint_mapping(self, context: Dict[str, Any], mapping_hash: Optional[str]) -> Optional[Dict[str, str]]:
+        """恢复匿名化阶段时从人名映射存储读取该文件的映射
+
+        Returns:
+            人名映射；没有映射存储或映射与断点记录的哈希不一致时返回None（重新匿名化）
+        """
+        metadata = context['metadata'] or {}
+        if metadata.get('enable_anonymization', True):
+            mapping = self.anonymization_service.get_document_mapping(context['audio_path'].stem)
+        else:
+            mapping = {}
+        if mapping is None or compute_hash(mapping) != mapping_hash:
+            self.logger.info("人名映射不可用或已变化，重新执行匿名化")
+            return None
+        return mapping
+
+    def _save_checkpoint(self, context: Dict[str, Any], stage_name: str):
+        """持久化阶段输出（失败只记录警告，不影响处理）"""
+        if self.checkpoint_store is None or stage_name not in CHECKPOINT_STAGES:
+            return
+
+        try:
+            input_hash, config_hash = self._stage_fingerprint(context, stage_name)
+            outputs = {
+                key: context.get(key) for key in STAGE_OUTPUTS[stage_name] if key not in CHECKPOINT_EXCLUDED_OUTPUTS
+            }
+            if stage_name == 'anonymization':
+                outputs['mapping_hash'] = compute_hash(context.get('mapping') or {})
+            files = {
+                key: self.transcript_storage.get_transcript_path(
+                    context['audio_path'].stem, suffix, context['privacy_level']
+                )
+                for key, suffix in TRANSCRIPT_CHECKPOINT_FILES.items() if key in outputs
+            }
+            self.checkpoint_store.save_stage(
+                CheckpointStore.job_key(context['audio_path']), stage_name,
+                input_hash, config_hash, outputs, files
+            )
+        except Exception as e:
+            self.logger.warning(f"保存阶段断点失败 [{stage_name}]: {e}")
+
+    def _run_stage(self, stage_name: str, context: Dict[str, Any]):
+        """执行单个阶段并保存断点；发布完成后删除该任务的全部断点"""
+        getattr(self, STAGE_METHODS[stage_name])(context)
+        self._save_checkpoint(context, stage_name)
+        if stage_name == STAGE_ORDER[-1] and self.checkpoint_store is not None:
+            self.checkpoint_store.delete(CheckpointStore.job_key(context['audio_path']))
+
+    def get_pipeline_status(self) -> Optional[Dict[str, Any]]:
+        """获取阶段流水线状态（未启用时返回None）"""
+        if self.stage_pipeline is None:
+            return None
+        return self.stage_pipeline.get_status()
+
     def process_audio_file(self, audio_path: str, privacy_level: str = 'private', metadata: Dict[str, Any] = None, processing_id: str = None) -> bool:
         """处理单个音频文件的完整流程
 
@@ -183,220 +530,426 @@ class AudioProcessor:
         if not self._validate_dependencies():
             return False
 
-        start_time = time.time()
         audio_path = Path(audio_path)
+        context = {
+            'audio_path': audio_path,
+            'privacy_level': privacy_level,
+            'metadata': metadata,
+            'processing_id': processing_id,
+            'start_time': time.time(),
+        }
 
         self.logger.info(f"开始处理音频文件: {audio_path.name}")
 
-        try:
-            # 获取metadata信息
-            prompt = metadata.get('description', '') if metadata else ''
-            audio_language = metadata.get('audio_language', 'english') if metadata else 'english'
-
-            # 步骤1: 音频转录（使用description作为Whisper prompt）
-            self.logger.info("步骤1: 开始音频转录")
-            if processing_id:
-                self.processing_service.update_status(processing_id, ProcessingStage.TRANSCRIBING, 20, "Transcribing audio...")
+        start_stage = self._resume_from_failure(context) or self._restore_checkpoints(context)
+        failed_stage: Optional[str] = None
 
-            # 提取模型选择参数
-            custom_model = metadata.get('whisper_model') if metadata else None
+        eta_job_id = processing_id or str(audio_path)
+        if self.eta_estimator is not None:
+            context['audio_duration'] = probe_duration(audio_path)
+            context['whisper_model'] = self._whisper_model_name(metadata)
+            self.eta_estimator.start_job(eta_job_id, context['audio_duration'], context['whisper_model'])
 
-            # 步骤0: 判断是否需要说话人分离（决定word_timestamps参数）
-            should_diarize = False
-            if self.speaker_diarization_service:
-                content_type = metadata.get('content_type') if metadata else None
-                subcategory = metadata.get('subcategory') if metadata else None
-                enable_diarization = metadata.get('enable_diarization', None) if metadata else None
+        try:
+            if self.stage_pipeline is not None:
+                job = self.stage_pipeline.submit(processing_id or str(audio_path), context, start_stage=start_stage)
+                job.wait()
+                if not job.success:
+                    failed_stage = job.failed_stage
+                    raise job.error or Exception(f"流水线阶段失败: {job.failed_stage}")
+            else:
+                first = STAGE_ORDER.index(start_stage) if start_stage else 0
+                for stage_name in STAGE_ORDER[first:]:
+                    failed_stage = stage_name
+                    stage_start = time.time()
+                    self._run_stage(stage_name, context)
+                    self._record_stage_timing(context, stage_name, time.time() - stage_start)
+
+            elapsed = time.time() - context['start_time']
+            self.logger.info(f"处理完成: {audio_path.name} (耗时: {elapsed:.2f}秒, 隐私级别: {privacy_level})")
+            return True
 
-                # 简化的diarization决策：直接使用前端传来的选择（已包含默认值处理）
-                should_diarize = enable_diarization if enable_diarization is not None else False
-                self.logger.info(f"🔍 Diarization设置: {should_diarize} (来自前端选择，content_type='{content_type}')")
+        except Exception as e:
+            self.logger.error(f"处理失败: {audio_path.name} - {str(e)}")
+            self._remember_failure(context, failed_stage, e)
+            if processing_id:
+                self.processing_service.update_status(processing_id, ProcessingStage.FAILED, 0, f"Processing failed: {str(e)}")
+            return False
 
-                if should_diarize:
-                    self.logger.info("检测到需要说话人分离，启用词级时间戳")
-                else:
-                    self.logger.info("无需说话人分离，关闭词级时间戳以优化性能")
-
-            transcription_result = self.transcription_service.transcribe_audio(
-                audio_path,
-                prompt=prompt,
-                language_preference=audio_language,
-                custom_model=custom_model,
-                word_timestamps=should_diarize
+        finally:
+            if self.eta_estimator is not None:
+                self.eta_estimator.finish_job(eta_job_id)
+
+    def _stage_transcribe(self, context: Dict[str, Any]):
+        """阶段1: 音频转录与说话人分离（可选）"""
+        audio_path = context['audio_path']
+        metadata = context['metadata']
+        processing_id = context['processing_id']
+        privacy_level = context['privacy_level']
+
+        # 获取metadata信息
+        prompt = metadata.get('description', '') if metadata else ''
+        audio_language = metadata.get('audio_language', 'english') if metadata else 'english'
+
+        # 步骤1: 音频转录（使用description作为Whisper prompt）
+        self.logger.info("步骤1: 开始音频转录")
+        if processing_id:
+            self.processing_service.update_status(processing_id, ProcessingStage.TRANSCRIBING, 20, "Transcribing audio...")
+
+        # 提取模型选择参数
+        custom_model = metadata.get('whisper_model') if metadata else None
+
+        # 步骤0: 判断是否需要说话人分离（决定word_timestamps参数）
+        should_diarize = False
+        if self.speaker_diarization_service:
+            content_type = metadata.get('content_type') if metadata else None
+            enable_diarization = metadata.get('enable_diarization', None) if metadata else None
+
+            # 简化的diarization决策：直接使用前端传来的选择（已包含默认值处理）
+            should_diarize = enable_diarization if enable_diarization is not None else False
+            self.logger.info(f"🔍 Diarization设置: {should_diarize} (来自前端选择，content_type='{content_type}')")
+
+            if should_diarize:
+                self.logger.info("检测到需要说话人分离，启用词级时间戳")
+            else:
+                self.logger.info("无需说话人分离，关闭词级时间戳以优化性能")
+
+        # 语音活动检测：只转录语音区间（由内容类型偏好中的enable_vad决定）
+        use_vad = self.voice_activity_detector is not None and bool(metadata.get('enable_vad', False) if metadata else False)
+        if use_vad and self.audio_decoder is None:
+            self.logger.warning("未启用共享音频解码，跳过语音活动检测")
+            use_vad = False
+
+        # 先查询转录缓存：缓存键只依赖音频内容与转录/VAD参数，命中时无需为转录解码音频
+        vad_signature = self.voice_activity_detector.cache_signature() if use_vad else None
+        cached_transcription = self.transcription_service.get_cached_transcription(
+            audio_path,
+            prompt=prompt,
+            language_preference=audio_language,
+            custom_model=custom_model,
+            word_timestamps=should_diarize,
+            vad_signature=vad_signature
+        )
+        diarize_needs_audio = bool(self.speaker_diarization_service and should_diarize)
+        diarize_needs_vad = diarize_needs_audio and use_vad and self.voice_activity_detector.apply_to_diarization
+        transcribe_needs_vad = use_vad and not cached_transcription
+
+        # 转录与说话人分离共用一次解码结果（解码失败时各自读取原始文件）
+        decoded_audio = None
+        if self.audio_decoder is not None and (diarize_needs_audio or transcribe_needs_vad):
+            try:
+                decoded_audio = self.audio_decoder.decode(audio_path)
+            except Exception as e:
+                self.logger.warning(f"共享音频解码失败，转录与说话人分离将分别读取原始文件: {e}")
+
+        speech_timeline = None
+        vad_applied = False
+        if (transcribe_needs_vad or diarize_needs_vad) and decoded_audio is not None:
+            try:
+                speech_timeline = self.voice_activity_detector.detect(decoded_audio.samples, decoded_audio.sample_rate)
+                vad_applied = True
+            except Exception as e:
+                self.logger.warning(f"语音活动检测失败，转录整段音频: {e}")
+        diarization_timeline = speech_timeline if self.voice_activity_detector is not None \
+            and self.voice_activity_detector.apply_to_diarization else None
+
+        # 说话人分离只读取音频，与转录并行执行，合并前再等待结果
+        diarization_future = None
+        diarization_executor = None
+        diarization_cancelled = threading.Event()
+        if self.speaker_diarization_service and should_diarize:
+            self.logger.info("步骤1.5: 开始说话人分离（与转录并行）")
+            diarization_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Diarization')
+            speaker_series = speaker_series_key(
+                metadata.get('content_type') if metadata else None,
+                metadata.get('subcategory') if metadata else None,
             )
-            if not transcription_result:
-                raise Exception("转录失败或结果为空")
-
-            # 从转录结果中提取文本
-            transcript = transcription_result.get('text', '') if isinstance(transcription_result, dict) else transcription_result
-
-            # 保存原始转录
-            self.transcript_storage.save_raw_transcript(audio_path.stem, transcript, privacy_level)
-
-            # 步骤1.5: 说话人分离（可选）
-            diarization_result = None
-            if self.speaker_diarization_service and should_diarize:
-                self.logger.info("步骤1.5: 开始说话人分离")
-                if processing_id:
-                    self.processing_service.update_status(processing_id, ProcessingStage.TRANSCRIBING, 30, "Analyzing speakers...")
-
-                try:
-                    speaker_segments = self.speaker_diarization_service.diarize_audio(audio_path)
-
-                    if speaker_segments:
-                        content_type = metadata.get('content_type') if metadata else None
-                        subcategory = metadata.get('subcategory') if metadata else None
-
-                        # 合并转录结果与说话人信息
-                        self.logger.info("步骤1.6: 合并转录与说话人信息")
-                        try:
-                            merged_transcription = self.speaker_diarization_service.merge_with_transcription(
-                                transcription_result,  # 包含chunks的完整转录结果
-                                speaker_segments,
-                                group_by_speaker=True  # 按说话人分组模式
-                            )
-                        except Exception as merge_error:
-                            self.logger.error(f"转录合并失败: {merge_error}")
-                            merged_transcription = None
-
-                        diarization_result = {
-                            'has_diarization': True,
-                            'speaker_segments': speaker_segments,
-                            'merged_transcription': merged_transcription,  # 添加合并结果
-                            'speaker_statistics': self.speaker_diarization_service.get_speaker_statistics(speaker_segments),
-                            'content_type': content_type,
-                            'subcategory': subcategory
-                        }
-                        self.logger.info(f"说话人分离完成: {len(merged_transcription)} 个发言段落")
-                    else:
-                        self.logger.warning("说话人分离未检测到多个说话人")
-
-                except Exception as e:
-                    self.logger.error(f"说话人分离处理失败: {e}")
-                    # 继续处理，不影响主流程
-
-            # 获取Post-Processing配置
-            enable_anonymization = metadata.get('enable_anonymization', True) if metadata else True
-            enable_summary = metadata.get('enable_summary', True) if metadata else True
-            enable_mindmap = metadata.get('enable_mindmap', True) if metadata else True
+            diarization_future = diarization_executor.submit(self._run_diarization, audio_path, decoded_audio,
+                                                             diarization_timeline, speaker_series,
+                                                             diarization_cancelled)
+
+        # 分块转录时按已转录时长推进进度（20% → 45%）
+        progress_callback = None
+        if processing_id:
+            def progress_callback(fraction: float, message: str):
+                self.processing_service.update_status(
+                    processing_id, ProcessingStage.TRANSCRIBING,
+                    20 + int(25 * fraction), f"Transcribing audio... ({message})"
+                )
 
-            # 步骤2: 人名匿名化（可选）
-            anonymized_text = transcript
-            mapping = {}
-            
-            if enable_anonymization:
-                self.logger.info("步骤2: 开始人名匿名化")
-                if processing_id:
-                    self.processing_service.update_status(processing_id, ProcessingStage.ANONYMIZING, 50, "Anonymizing personal names...")
-                anonymized_text, mapping = self.anonymization_service.anonymize_names(transcript)
-                self.transcript_storage.save_anonymized_transcript(audio_path.stem, anonymized_text, privacy_level)
-
-                # 记录匿名化映射
-                if mapping:
-                    self.logger.info(f"人名匿名化映射: {mapping}")
+        transcription_result = None
+        try:
+            if cached_transcription:
+                transcription_result = cached_transcription
             else:
-                self.logger.info("步骤2: 跳过人名匿名化（用户未启用）")
-
-            # 步骤3: AI内容生成（可选）
-            summary = ""
-            mindmap = ""
-            
-            if enable_summary or enable_mindmap:
-                self.logger.info("步骤3: 开始AI内容生成")
-                if processing_id:
-                    self.processing_service.update_status(processing_id, ProcessingStage.AI_GENERATING, 70, "Generating AI content...")
-                
-                if enable_summary:
-                    summary = self.ai_generation_service.generate_summary(anonymized_text)
-                    self.logger.info("摘要生成完成")
+                transcribe_kwargs = {'speech_timeline': speech_timeline} if speech_timeline is not None else {}
+                if vad_applied:
+                    # VAD成功执行（含语音占比过高而转录整段的情况）时按VAD参数缓存
+                    transcribe_kwargs['vad_signature'] = vad_signature
+                with self._resource_slot('transcription'):
+                    transcription_result = self.transcription_service.transcribe_audio(
+                        audio_path,
+                        prompt=prompt,
+                        language_preference=audio_language,
+                        custom_model=custom_model,
+                        word_timestamps=should_diarize,
+                        progress_callback=progress_callback,
+                        decoded_audio=decoded_audio,
+                        **transcribe_kwargs
+                    )
+        finally:
+            if diarization_executor is not None:
+                if transcription_result:
+                    # 分离结果稍后在合并前等待
+                    diarization_executor.shutdown(wait=False)
                 else:
-                    self.logger.info("跳过摘要生成（用户未启用）")
-                
-                if enable_mindmap:
-                    mindmap = self.ai_generation_service.generate_mindmap(anonymized_text)
-                    self.logger.info("思维导图生成完成")
+                    # 转录失败：取消尚未开始的分离，并等待已在运行的分离结束后再返回，
+                    # 避免其在任务失败后继续占用分离槽位、阻塞重试和其他任务
+                    diarization_cancelled.set()
+                    diarization_future.cancel()
+                    diarization_executor.shutdown(wait=True)
+            if decoded_audio is not None:
+                # 删除缓存文件；分离线程已打开的内存映射不受影响
+                self.audio_decoder.release(decoded_audio)
+
+        if not transcription_result:
+            raise Exception("转录失败或结果为空")
+
+        # 从转录结果中提取文本
+        transcript = transcription_result.get('text', '') if isinstance(transcription_result, dict) else transcription_result
+
+        # 保存原始转录
+        self.transcript_storage.save_raw_transcript(audio_path.stem, transcript, privacy_level)
+
+        # 步骤1.5: 等待说话人分离结果（可选）
+        diarization_result = None
+        if diarization_future is not None:
+            if processing_id:
+                self.processing_service.update_status(processing_id, ProcessingStage.TRANSCRIBING, 30, "Analyzing speakers...")
+
+            try:
+                speaker_segments = diarization_future.result()
+
+                if speaker_segments:
+                    content_type = metadata.get('content_type') if metadata else None
+                    subcategory = metadata.get('subcategory') if metadata else None
+
+                    # 合并转录结果与说话人信息
+                    self.logger.info("步骤1.6: 合并转录与说话人信息")
+                    try:
+                        merged_transcription = self.speaker_diarization_service.merge_with_transcription(
+                            transcription_result,  # 包含chunks的完整转录结果
+                            speaker_segments,
+                            group_by_speaker=True  # 按说话人分组模式
+                        )
+                    except Exception as merge_error:
+                        self.logger.error(f"转录合并失败: {merge_error}")
+                        merged_transcription = None
+
+                    diarization_result = {
+                        'has_diarization': True,
+                        'speaker_segments': speaker_segments,
+                        'merged_transcription': merged_transcription,  # 添加合并结果
+                        'speaker_statistics': self.speaker_diarization_service.get_speaker_statistics(speaker_segments),
+                        'content_type': content_type,
+                        'subcategory': subcategory
+                    }
+                    self.logger.info(f"说话人分离完成: {len(merged_transcription)} 个发言段落")
                 else:
-                    self.logger.info("跳过思维导图生成（用户未启用）")
-            else:
-                self.logger.info("步骤3: 跳过AI内容生成（用户未启用）")
-
-            # 步骤4: 保存结果
-            self.logger.info("步骤4: 保存处理结果")
-            
-            # 构建统一的元数据结构
-            metadata_dict = {
-                'filename': audio_path.stem,
-                'original_file': str(audio_path),
-                'processed_time': datetime.now().isoformat(),
-                'format_version': '2.0',
-                'privacy_level': privacy_level,
-                'content_type': (metadata or {}).get('content_type', 'others'),
-                'subcategory': (metadata or {}).get('subcategory', ''),
-                'audio_language': (metadata or {}).get('audio_language', ''),
-                'whisper_model': (metadata or {}).get('whisper_model', ''),
-                'description': (metadata or {}).get('description', ''),
-                'file_size': (metadata or {}).get('file_size')
-                    or (audio_path.stat().st_size if audio_path.exists() else 0)
-            }
-            
-            # 根级别的核心数据（新结构）
-            results = {
-                'summary': summary,
-                'mindmap': mindmap,
-                'transcription': self._clean_transcription_for_output(transcription_result),
-                'anonymized_transcript': anonymized_text,
-                'anonymization_mapping': mapping,
-                'metadata': metadata_dict
-            }
-
-            # 添加说话人分离结果（如果存在）
-            if 'diarization_result' in locals():
-                results['diarization_result'] = diarization_result
-                self.logger.info("已添加说话人分离结果到输出")
-
-                # 重要：如果有diarization，使用合并后的转录结果作为主要输出
-                if (diarization_result and
-                    'merged_transcription' in diarization_result and
-                    diarization_result['merged_transcription'] is not None):
-                    results['transcription_with_speakers'] = diarization_result['merged_transcription']
-                    self.logger.info("已添加按说话人分组的转录结果")
+                    self.logger.warning("说话人分离未检测到多个说话人")
+
+            except Exception as e:
+                self.logger.error(f"说话人分离处理失败: {e}")
+                # 继续处理，不影响主流程
+
+        context['transcription_result'] = transcription_result
+        context['transcript'] = transcript
+        context['diarization_result'] = diarization_result
+
+    def _run_diarization(self, audio_path: Path, decoded_audio: Optional[DecodedAudio] = None,
+                         speech_timeline: Optional[SpeechTimeline] = None,
+                         speaker_series: Optional[str] = None,
+                         cancelled: Optional[threading.Event] = None):
+        """在独立线程中执行说话人分离（占用diarization资源槽位；等待槽位期间被取消时不再执行）"""
+        # 只传入已提供的可选参数
+        optional_kwargs = {
+            'decoded_audio': decoded_audio,
+            'speech_timeline': speech_timeline if decoded_audio is not None else None,
+            'speaker_series': speaker_series,
+        }
+        kwargs = {key: value for key, value in optional_kwargs.items() if value is not None}
+        with self._resource_slot('diarization'):
+            if cancelled is not None and cancelled.is_set():
+                return []
+            return self.speaker_diarization_service.diarize_audio(audio_path, **kwargs)
+
+    def _stage_anonymize(self, context: Dict[str, Any]):
+        """阶段2: 人名匿名化（可选）"""
+        metadata = context['metadata']
+        processing_id = context['processing_id']
+        transcript = context['transcript']
+
+        enable_anonymization = metadata.get('enable_anonymization', True) if metadata else True
+
+        anonymized_text = transcript
+        mapping = {}
+
+        if enable_anonymization:
+            self.logger.info("步骤2: 开始人名匿名化")
+            if processing_id:
+                self.processing_service.update_status(processing_id, ProcessingStage.ANONYMIZING, 50, "Anonymizing personal names...")
+            anonymized_text, mapping = self.anonymization_service.anonymize_names(
+                transcript, document_id=context['audio_path'].stem
+            )
+            self.transcript_storage.save_anonymized_transcript(
+                context['audio_path'].stem, anonymized_text, context['privacy_level']
+            )
 
-            # 按隐私级别保存结果
-            self.result_storage.save_json_result(audio_path.stem, results, privacy_level=privacy_level)
-            self.result_storage.save_html_result(audio_path.stem, results, privacy_level=privacy_level)
+            # 记录匿名化映射
+            if mapping:
+                self.logger.info(f"人名匿名化映射: {mapping}")
+        else:
+            self.logger.info("步骤2: 跳过人名匿名化（用户未启用）")
 
-            # 计算结果访问链接
-            file_stem = audio_path.stem
-            result_url = self.build_result_url(self.config_manager, file_stem, privacy_level)
+        # 带时间戳的转录段落用于长文本分块摘要，需应用同一人名映射
+        segments = self._extract_segment_texts(context['transcription_result'])
+        if segments and mapping:
+            segments = [self.anonymization_service.apply_mapping(segment, mapping) for segment in segments]
 
-            # 自动发布到GitHub Pages（仅公开内容）
-            if self.git_publisher and privacy_level == 'public':
-                result_filename = f"{file_stem}_result.html"
-                publish_success = self.git_publisher.publish_result(result_filename, privacy_level)
-                if publish_success:
-                    self.logger.info(f"音频处理结果已自动发布到GitHub Pages: {result_filename}")
-                else:
-                    self.logger.warning(f"GitHub Pages自动发布失败: {result_filename}")
+        context['anonymized_text'] = anonymized_text
+        context['mapping'] = mapping
+        context['ai_segments'] = segments
 
-            # 完成处理
+    @staticmethod
+    def _extract_segment_texts(transcription_result: Any) -> Optional[list]:
+        """从转录结果中提取段落文本列表（纯文本结果返回None）"""
+        if not isinstance(transcription_result, dict):
+            return None
+        chunks = transcription_result.get('chunks')
+        if not isinstance(chunks, list):
+            return None
+        texts = [chunk.get('text', '') for chunk in chunks if isinstance(chunk, dict)]
+        return texts or None
+
+    def _stage_generate_ai_content(self, context: Dict[str, Any]):
+        """阶段3: AI内容生成（可选）"""
+        metadata = context['metadata']
+        processing_id = context['processing_id']
+        anonymized_text = context['anonymized_text']
+
+        enable_summary = metadata.get('enable_summary', True) if metadata else True
+        enable_mindmap = metadata.get('enable_mindmap', True) if metadata else True
+
+        summary = ""
+        mindmap = ""
+
+        if enable_summary or enable_mindmap:
+            self.logger.info("步骤3: 开始AI内容生成")
             if processing_id:
-                self.processing_service.add_log(
-                    processing_id,
-                    f"Audio processing completed, result: {result_url}",
-                    'success'
-                )
-                self.processing_service.set_completed(processing_id, result_url)
+                self.processing_service.update_status(processing_id, ProcessingStage.AI_GENERATING, 70, "Generating AI content...")
 
-            elapsed = time.time() - start_time
-            self.logger.info(f"处理完成: {audio_path.name} (耗时: {elapsed:.2f}秒, 隐私级别: {privacy_level})")
-            return True
+            tasks = [task for task, enabled in (('summary', enable_summary), ('mindmap', enable_mindmap)) if enabled]
+            generated = self.ai_generation_service.generate_batch(
+                anonymized_text, tasks, segments=context.get('ai_segments')
+            )
+            # 生成失败时阶段失败，不把空结果当作完成的阶段输出（也不会写入断点）
+            missing = [task for task in tasks if not (generated.get(task) or '').strip()]
+            if missing:
+                raise Exception(f"AI内容生成失败: {', '.join(missing)} 结果为空")
+
+            if enable_summary:
+                summary = generated['summary']
+                self.logger.info("摘要生成完成")
+            else:
+                self.logger.info("跳过摘要生成（用户未启用）")
 
-        except Exception as e:
-            self.logger.error(f"处理失败: {audio_path.name} - {str(e)}")
-            if processing_id:
-                self.processing_service.update_status(processing_id, ProcessingStage.FAILED, 0, f"Processing failed: {str(e)}")
-            return False
+            if enable_mindmap:
+                mindmap = generated['mindmap']
+                self.logger.info("思维导图生成完成")
+            else:
+                self.logger.info("跳过思维导图生成（用户未启用）")
+        else:
+            self.logger.info("步骤3: 跳过AI内容生成（用户未启用）")
+
+        context['summary'] = summary
+        context['mindmap'] = mindmap
+
+    def _stage_publish(self, context: Dict[str, Any]):
+        """阶段4: 保存结果并发布"""
+        audio_path = context['audio_path']
+        metadata = context['metadata']
+        processing_id = context['processing_id']
+        privacy_level = context['privacy_level']
+        diarization_result = context.get('diarization_result')
+
+        self.logger.info("步骤4: 保存处理结果")
+
+        # 构建统一的元数据结构
+        metadata_dict = {
+            'filename': audio_path.stem,
+            'original_file': str(audio_path),
+            'processed_time': datetime.now().isoformat(),
+            'format_version': '2.0',
+            'privacy_level': privacy_level,
+            'content_type': (metadata or {}).get('content_type', 'others'),
+            'subcategory': (metadata or {}).get('subcategory', ''),
+            'audio_language': (metadata or {}).get('audio_language', ''),
+            'whisper_model': (metadata or {}).get('whisper_model', ''),
+            'description': (metadata or {}).get('description', ''),
+            'file_size': (metadata or {}).get('file_size')
+                or (audio_path.stat().st_size if audio_path.exists() else 0)
+        }
+
+        # 根级别的核心数据（新结构）
+        results = {
+            'summary': context['summary'],
+            'mindmap': context['mindmap'],
+            'transcription': self._clean_transcription_for_output(context['transcription_result']),
+            'anonymized_transcript': context['anonymized_text'],
+            'anonymization_mapping': context['mapping'],
+            'metadata': metadata_dict
+        }
+
+        # 添加说话人分离结果
+        results['diarization_result'] = diarization_result
+        self.logger.info("已添加说话人分离结果到输出")
+
+        # 重要：如果有diarization，使用合并后的转录结果作为主要输出
+        if (diarization_result and
+            'merged_transcription' in diarization_result and
+            diarization_result['merged_transcription'] is not None):
+            results['transcription_with_speakers'] = diarization_result['merged_transcription']
+            self.logger.info("已添加按说话人分组的转录结果")
+
+        # 按隐私级别保存结果
+        self.result_storage.save_json_result(audio_path.stem, results, privacy_level=privacy_level)
+        self.result_storage.save_html_result(audio_path.stem, results, privacy_level=privacy_level)
+
+        # 计算结果访问链接
+        file_stem = audio_path.stem
+        result_url = self.build_result_url(self.config_manager, file_stem, privacy_level)
+
+        # 自动发布到GitHub Pages（仅公开内容）
+        if self.git_publisher and privacy_level == 'public':
+            result_filename = f"{file_stem}_result.html"
+            publish_success = self.git_publisher.publish_result(result_filename, privacy_level)
+            if not publish_success:
+                # 发布失败时阶段失败，由重试策略按失败原因（git超时/推送失败等）安排重试
+                cause = getattr(self.git_publisher, 'last_error', None)
+                raise Exception(f"GitHub Pages自动发布失败: {result_filename}") \
+                    from (cause if isinstance(cause, BaseException) else None)
+            self.logger.info(f"音频处理结果已自动发布到GitHub Pages: {result_filename}")
+
+        # 完成处理
+        if processing_id:
+            self.processing_service.add_log(
+                processing_id,
+                f"Audio processing completed, result: {result_url}",
+                'success'
+            )
+            self.processing_service.set_completed(processing_id, result_url)
 
+        context['result_url'] = result_url
 
     def _validate_dependencies(self) -> bool:
         """验证所有必要的依赖是否已设置
@@ -443,6 +996,13 @@ class AudioProcessor:
             self.file_monitor.stop_monitoring()
             self.logger.info("自动文件监控已停止")
 
+        if self.stage_pipeline is not None:
+            self.stage_pipeline.stop()
+
+        if self.anonymization_service is not None:
+            # 关闭NER进程池，避免退出时遗留worker进程
+            self.anonymization_service.shutdown()
+
     def get_queue_status(self) -> Dict[str, Any]:
         """获取处理队列状态
 
@@ -512,10 +1072,11 @@ class AudioProcessor:
 
                     self.logger.info("使用Whisper转录音频")
                     # YouTube处理默认不启用word_timestamps（无diarization需求）
-                    transcript_text = self.transcription_service.transcribe_audio(
-                        Path(audio_file_path),
-                        word_timestamps=False
-                    )
+                    with self._resource_slot('transcription'):
+                        transcript_text = self.transcription_service.transcribe_audio(
+                            Path(audio_file_path),
+                            word_timestamps=False
+                        )
 
                     if transcript_text and transcript_text.strip():
                         self.logger.info(f"Whisper转录完成: {len(transcript_text)}字符")
@@ -544,8 +1105,9 @@ class AudioProcessor:
                 return False
 
             self.logger.info("开始AI内容生成")
-            summary = self.ai_generation_service.generate_summary(anonymized_text)
-            mindmap = self.ai_generation_service.generate_mindmap(anonymized_text)
+            generated = self.ai_generation_service.generate_batch(anonymized_text, ('summary', 'mindmap'))
+            summary = generated['summary']
+            mindmap = generated['mindmap']
 
             if not summary or not mindmap:
                 self.logger.error("AI内容生成失败")
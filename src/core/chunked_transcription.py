@@ -0,0 +1,184 @@
+#!/usr/bin/env python3.11
+"""
+分块流式转录辅助模块
+通过ffmpeg管道流式解码音频，在静音处切分为带重叠的块，
+并将各块的转录段落拼接回全局时间轴
+"""
+
+import logging
+import subprocess
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+SAMPLE_RATE = 16000  # Whisper要求的采样率
+_BYTES_PER_SAMPLE = 4  # float32
+_FRAME_SECONDS = 0.03  # 静音检测的能量帧长度
+
+logger = logging.getLogger('project_bach.chunked_transcription')
+
+
+def open_pcm_stream(audio_path: Path) -> subprocess.Popen:
+    """启动ffmpeg将音频解码为16kHz单声道float32 PCM流
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        ffmpeg进程（从stdout读取PCM数据）
+
+    Raises:
+        FileNotFoundError: ffmpeg未安装
+    """
+    cmd = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error',
+        '-i', str(audio_path),
+        '-f', 'f32le', '-ac', '1', '-ar', str(SAMPLE_RATE),
+        '-'
+    ]
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def _read_samples(stream: BinaryIO, count: int, pending: bytearray) -> Tuple[np.ndarray, bool]:
+    """从PCM流读取最多count个采样
+
+    Returns:
+        (采样数组, 流是否已结束)
+    """
+    wanted = count * _BYTES_PER_SAMPLE
+    eof = False
+    while len(pending) < wanted:
+        data = stream.read(wanted - len(pending))
+        if not data:
+            eof = True
+            break
+        pending.extend(data)
+
+    usable = len(pending) - len(pending) % _BYTES_PER_SAMPLE
+    samples = np.frombuffer(bytes(pending[:usable]), dtype=np.float32).copy()
+    del pending[:usable]
+    return samples, eof
+
+
+def find_quietest_cut(samples: np.ndarray, search_start: int, search_end: int,
+                      sample_rate: int = SAMPLE_RATE) -> int:
+    """在[search_start, search_end)范围内寻找能量最低的帧作为切分点
+
+    Args:
+        samples: 音频采样
+        search_start: 搜索起点（采样下标）
+        search_end: 搜索终点（采样下标）
+        sample_rate: 采样率
+
+    Returns:
+        切分点采样下标（最安静帧的中心）
+    """
+    frame = max(int(sample_rate * _FRAME_SECONDS), 1)
+    search_start = max(search_start, 0)
+    search_end = min(search_end, len(samples))
+    frame_count = (search_end - search_start) // frame
+    if frame_count <= 0:
+        return min(max(search_end, 1), len(samples))
+
+    window = samples[search_start:search_start + frame_count * frame].reshape(frame_count, frame)
+    energy = np.mean(window.astype(np.float64) ** 2, axis=1)
+    quietest = int(np.argmin(energy))
+    return search_start + quietest * frame + frame // 2
+
+
+def iter_audio_chunks(stream: BinaryIO, chunk_seconds: float, overlap_seconds: float,
+                      search_seconds: float, sample_rate: int = SAMPLE_RATE) -> Iterator[Tuple[float, np.ndarray]]:
+    """将PCM流切分为在静音处断开、相邻块带重叠的音频块
+
+    内存占用上限约为 chunk_seconds + search_seconds 的音频，与录音总时长无关。
+
+    Args:
+        stream: float32 PCM字节流
+        chunk_seconds: 目标块长度（秒）
+        overlap_seconds: 相邻块重叠长度（秒）
+        search_seconds: 在目标切分点前后搜索静音的范围（秒）
+        sample_rate: 采样率
+
+    Yields:
+        (块起始时间秒, 块采样数组)
+    """
+    target = max(int(chunk_seconds * sample_rate), 1)
+    search = max(int(search_seconds * sample_rate), 0)
+    overlap = max(int(overlap_seconds * sample_rate), 0)
+
+    buffer = np.empty(0, dtype=np.float32)
+    buffer_start = 0
+    pending = bytearray()
+    eof = False
+
+    while True:
+        if not eof:
+            needed = target + search - len(buffer)
+            if needed > 0:
+                samples, eof = _read_samples(stream, needed, pending)
+                if len(samples):
+                    buffer = np.concatenate([buffer, samples])
+
+        if len(buffer) == 0:
+            return
+
+        if eof and len(buffer) <= target + search:
+            yield buffer_start / sample_rate, buffer
+            return
+
+        cut = find_quietest_cut(buffer, target - search, target + search, sample_rate)
+        yield buffer_start / sample_rate, buffer[:cut]
+
+        # 下一块从切分点前overlap处开始，保证至少前进一帧
+        next_start = max(cut - overlap, 1)
+        buffer = buffer[next_start:]
+        buffer_start += next_start
+
+
+def offset_segment(segment: Dict[str, Any], offset: float) -> Dict[str, Any]:
+    """将块内时间戳平移到全局时间轴"""
+    shifted = dict(segment)
+    for key in ('start', 'end'):
+        if key in shifted and shifted[key] is not None:
+            shifted[key] = float(shifted[key]) + offset
+    if isinstance(shifted.get('words'), list):
+        words = []
+        for word in shifted['words']:
+            word = dict(word)
+            for key in ('start', 'end'):
+                if key in word and word[key] is not None:
+                    word[key] = float(word[key]) + offset
+            words.append(word)
+        shifted['words'] = words
+    return shifted
+
+
+def stitch_segments(segments: List[Dict[str, Any]], offset: float, covered_until: float) -> Tuple[List[Dict[str, Any]], float]:
+    """拼接一个块的转录段落，去除与上一块重叠区域内的重复段落
+
+    段落中点落在已覆盖区间内的视为重复并丢弃；保留段落的起点裁剪到已覆盖终点之后。
+
+    Args:
+        segments: 块内转录段落（块内时间）
+        offset: 块起始时间（秒）
+        covered_until: 此前已输出段落覆盖到的时间（秒）
+
+    Returns:
+        (去重后的全局时间段落列表, 新的已覆盖终点)
+    """
+    kept = []
+    for segment in segments:
+        shifted = offset_segment(segment, offset)
+        start = shifted.get('start', offset)
+        end = shifted.get('end', start)
+        if (start + end) / 2 <= covered_until:
+            continue
+        if start < covered_until:
+            shifted['start'] = covered_until
+            if isinstance(shifted.get('words'), list):
+                shifted['words'] = [w for w in shifted['words'] if w.get('end', covered_until) > covered_until]
+        kept.append(shifted)
+        covered_until = max(covered_until, end)
+    return kept, covered_until
@@ -10,14 +10,24 @@ from typing import Dict, Any, Optional
 
 from ..utils.config import ConfigManager, LoggingSetup, DirectoryManager
 from ..utils.content_type_service import ContentTypeService
+from ..utils.resource_limiter import ResourceLimiter, get_resource_limiter
 from .mlx_transcription import MLXTranscriptionService
 from .speaker_diarization import SpeakerDiarization
 from .anonymization import NameAnonymizer
 from .ai_generation import AIContentGenerator
 from .audio_processor import AudioProcessor
+from .model_warmup import ModelWarmup
+from .audio_decoder import AudioDecoder
+from .eta_estimator import EtaEstimator, get_eta_estimator
+from .voice_activity import VoiceActivityDetector
 from ..storage.transcript_storage import TranscriptStorage
 from ..storage.result_storage import ResultStorage
+from ..storage.name_mapping_store import NameMappingStore
+from ..storage.queue_store import QueueStore
+from ..storage.checkpoint_store import CheckpointStore
 from ..monitoring.file_monitor import FileMonitor
+from ..monitoring.job_scheduler import JobScheduler
+from ..monitoring.retry_policy import RetryPolicy
 from ..publishing.git_publisher import GitPublisher
 
 
@@ -100,7 +110,20 @@ class DependencyContainer:
         """
         if 'anonymization_service' not in self._services:
             spacy_config = self.config_manager.config.get("spacy", {})
-            self._services['anonymization_service'] = NameAnonymizer(spacy_config)
+            # 启用预热时延迟加载spaCy模型，由预热线程加载，避免阻塞启动
+            lazy_load = self._get_warmup_config().get('enabled', False)
+            anonymizer = NameAnonymizer(spacy_config, lazy_load=lazy_load)
+
+            # 人名映射持久化：跨重启、跨进程保持同一真实人名对应同一虚拟人名
+            store_config = spacy_config.get('mapping_store', {})
+            if store_config.get('enabled', False):
+                anonymizer.set_mapping_store(NameMappingStore(
+                    db_path=store_config.get('db_path', './data/name_mappings.db'),
+                    cache_size=store_config.get('cache_size', 10000)
+                ))
+                self.logger.debug("匿名化服务已启用人名映射持久化存储")
+
+            self._services['anonymization_service'] = anonymizer
             self.logger.debug("创建匿名化服务实例")
 
         return self._services['anonymization_service']
@@ -117,7 +140,9 @@ class DependencyContainer:
                 'openrouter': self.config_manager.config.get("openrouter", {}),
                 'huggingface': self.config_manager.config.get("huggingface", {})
             }
-            self._services['ai_generation_service'] = AIContentGenerator(api_config)
+            ai_service = AIContentGenerator(api_config)
+            ai_service.set_resource_limiter(self.get_resource_limiter())
+            self._services['ai_generation_service'] = ai_service
             self.logger.debug("创建AI生成服务实例")
 
         return self._services['ai_generation_service']
@@ -168,11 +193,17 @@ class DependencyContainer:
             supported_formats = set(upload_settings.supported_formats)
 
             # 创建文件监控器，传入处理回调和支持的格式
+            queue_config = self._get_processing_config().get('queue', {})
             self._services['file_monitor'] = FileMonitor(
                 watch_folder=watch_folder,
                 file_processor_callback=audio_processor.process_audio_file,
                 supported_formats=supported_formats,
                 audio_processor=audio_processor,
+                max_workers=self._get_processing_config().get('max_workers', 1),
+                queue_max_size=queue_config.get('max_size', 100),
+                queue_store=self._create_queue_store(queue_config),
+                queue_scheduler=self._create_queue_scheduler(queue_config),
+                retry_policy=self._create_retry_policy(queue_config),
             )
             self.logger.debug("创建文件监控器实例")
 
@@ -198,6 +229,36 @@ class DependencyContainer:
                 self.get_transcript_storage(),
                 self.get_result_storage()
             )
+            processor.set_resource_limiter(self.get_resource_limiter())
+
+            processor.set_eta_estimator(self.get_eta_estimator())
+
+            # 阶段断点（可选，重新处理时跳过已完成的阶段）
+            checkpoint_config = self._get_processing_config().get('checkpoints', {})
+            if isinstance(checkpoint_config, dict) and checkpoint_config.get('enabled', False):
+                processor.set_checkpoint_store(CheckpointStore(
+                    checkpoint_dir=checkpoint_config.get('dir', './data/output/private/checkpoints'),
+                    retention_days=checkpoint_config.get('retention_days', 7),
+                ))
+
+            # 共享音频解码（可选）
+            decode_config = self._get_processing_config().get('audio_decode', {})
+            if isinstance(decode_config, dict) and decode_config.get('enabled', False):
+                processor.set_audio_decoder(AudioDecoder(
+                    cache_dir=decode_config.get('cache_dir', './data/cache/pcm'),
+                    timeout_base_seconds=decode_config.get('timeout_base_seconds', 60),
+                    timeout_per_audio_minute=decode_config.get('timeout_per_audio_minute', 6),
+                ))
+
+            # 语音活动检测（可选，逐个上传按enable_vad偏好启用）
+            vad_config = self._get_processing_config().get('vad', {})
+            if isinstance(vad_config, dict) and vad_config.get('enabled', False):
+                processor.set_voice_activity_detector(VoiceActivityDetector(vad_config))
+
+            # 阶段流水线（可选）
+            pipeline_config = self._get_processing_config().get('pipeline', {})
+            if isinstance(pipeline_config, dict) and pipeline_config.get('enabled', False):
+                processor.enable_stage_pipeline(pipeline_config)
 
             self._services['audio_processor'] = processor
             self.logger.debug("创建并装配音频处理器实例")
@@ -221,12 +282,18 @@ class DependencyContainer:
             # 从配置获取支持的音频格式
             upload_settings = self.config_manager.get_upload_settings()
             supported_formats = set(upload_settings.supported_formats)
+            queue_config = self._get_processing_config().get('queue', {})
 
             file_monitor = FileMonitor(
                 watch_folder=watch_folder,
                 file_processor_callback=processor.process_audio_file,
                 supported_formats=supported_formats,
                 audio_processor=processor,
+                max_workers=self._get_processing_config().get('max_workers', 1),
+                queue_max_size=queue_config.get('max_size', 100),
+                queue_store=self._create_queue_store(queue_config),
+                queue_scheduler=self._create_queue_scheduler(queue_config),
+                retry_policy=self._create_retry_policy(queue_config),
             )
             self._services['file_monitor'] = file_monitor
 
@@ -327,6 +394,113 @@ class DependencyContainer:
             self.logger.debug("创建Git发布服务实例")
 
         return self._services['git_publisher']
+
+    def _get_processing_config(self) -> Dict[str, Any]:
+        """获取并发处理配置"""
+        processing_config = (self.config_manager.config or {}).get('processing', {})
+        return processing_config if isinstance(processing_config, dict) else {}
+
+    def _create_queue_store(self, queue_config: Dict[str, Any]) -> Optional[QueueStore]:
+        """按配置创建处理队列持久化存储（未启用时返回None，使用内存队列）"""
+        if not isinstance(queue_config, dict) or not queue_config.get('persistent', False):
+            return None
+        return QueueStore(
+            db_path=queue_config.get('db_path', './data/processing_queue.db'),
+            retention_days=queue_config.get('retention_days', 7)
+        )
+
+    def _create_queue_scheduler(self, queue_config: Dict[str, Any]) -> JobScheduler:
+        """按配置创建处理队列调度器"""
+        scheduling = queue_config.get('scheduling', {}) if isinstance(queue_config, dict) else {}
+        return JobScheduler(
+            priority_offsets=scheduling.get('priority_offsets'),
+            aging_rate=scheduling.get('aging_rate', 1.0),
+            fair_share_seconds=scheduling.get('fair_share_seconds', 600),
+            fair_share_window=scheduling.get('fair_share_window', 8),
+        )
+
+    def _create_retry_policy(self, queue_config: Dict[str, Any]) -> RetryPolicy:
+        """按配置创建失败重试策略"""
+        retry_config = queue_config.get('retry', {}) if isinstance(queue_config, dict) else {}
+        return RetryPolicy(
+            policies=retry_config.get('policies'),
+            jitter=retry_config.get('jitter', 0.1),
+        )
+
+    def get_resource_limiter(self) -> ResourceLimiter:
+        """获取重型资源并发限制器（进程内共享）
+
+        Returns:
+            资源限制器实例
+        """
+        if 'resource_limiter' not in self._services:
+            limits = self._get_processing_config().get('resource_limits', {})
+            self._services['resource_limiter'] = get_resource_limiter(limits)
+            self.logger.debug("获取资源并发限制器实例")
+
+        return self._services['resource_limiter']
+
+    def get_eta_estimator(self) -> EtaEstimator:
+        """获取处理时间预估器（进程内共享）
+
+        Returns:
+            预估器实例
+        """
+        if 'eta_estimator' not in self._services:
+            eta_config = self._get_processing_config().get('eta', {}) or {}
+            self._services['eta_estimator'] = get_eta_estimator(
+                eta_config.get('stats_file', './data/eta_stats.json'),
+                eta_config.get('smoothing', 0.3),
+            )
+            self.logger.debug("获取处理时间预估器实例")
+
+        return self._services['eta_estimator']
+
+    def _get_warmup_config(self) -> Dict[str, Any]:
+        """获取启动预热配置"""
+        warmup_config = (self.config_manager.config or {}).get('warmup', {})
+        return warmup_config if isinstance(warmup_config, dict) else {}
+
+    def get_model_warmup(self) -> ModelWarmup:
+        """获取模型预热器实例（按配置注册需要预热的模型）
+
+        Returns:
+            模型预热器实例
+        """
+        if 'model_warmup' not in self._services:
+            models = self._get_warmup_config().get('models', {}) or {}
+            warmup = ModelWarmup()
+            if models.get('spacy', True):
+                warmup.register('spacy', lambda: self.get_anonymization_service().ensure_models_loaded())
+            if models.get('pyannote', True):
+                warmup.register('pyannote', lambda: self.get_speaker_diarization_service().warm_up())
+            if models.get('whisper', True):
+                warmup.register('whisper', lambda: self.get_transcription_service().preload_default_model())
+            self._services['model_warmup'] = warmup
+            self.logger.debug("创建模型预热器实例")
+
+        return self._services['model_warmup']
+
+    def start_warmup(self) -> bool:
+        """在后台线程中预热模型（不阻塞Web服务器启动）
+
+        Returns:
+            是否启动了预热
+        """
+        if not self._get_warmup_config().get('enabled', False):
+            return False
+        self.get_model_warmup().start()
+        return True
+
+    def get_warmup_status(self) -> Dict[str, Any]:
+        """获取模型预热状态
+
+        Returns:
+            包含ready、warm与各模型状态的字典；未启用预热时ready为True
+        """
+        if not self._get_warmup_config().get('enabled', False):
+            return {'enabled': False, 'ready': True, 'warm': [], 'models': {}}
+        return {'enabled': True, **self.get_model_warmup().get_status()}
 
     def get_content_type_service(self) -> ContentTypeService:
         """获取内容类型服务实例"""
@@ -339,6 +513,9 @@ class DependencyContainer:
     def clear_cache(self):
         """清除服务缓存（用于测试或重置）"""
         old_count = len(self._services)
+        anonymizer = self._services.get('anonymization_service')
+        if anonymizer is not None:
+            anonymizer.shutdown()
         self._services.clear()
         self.logger.info(f"清除了 {old_count} 个缓存的服务实例")
 
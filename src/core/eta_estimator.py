@@ -0,0 +1,212 @@
+#!/usr/bin/env python3.11
+"""
+处理时间预估
+按阶段（转录阶段再按Whisper模型区分）学习实时率RTF（阶段耗时 / 音频时长），
+用于预估单个文件的处理时间以及排队文件的整体完成时间
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+PIPELINE_STAGES = ('transcription', 'anonymization', 'ai_generation', 'publishing')
+
+# 无历史数据时使用的初始RTF
+DEFAULT_RTF = {
+    'transcription': 0.15,
+    'anonymization': 0.005,
+    'ai_generation': 0.03,
+    'publishing': 0.01,
+}
+
+# 时长未知时按10分钟音频估算
+_FALLBACK_AUDIO_SECONDS = 600
+
+
+class EtaEstimator:
+    """基于指数加权移动平均（EWMA）实时率的处理时间预估器"""
+
+    def __init__(self, stats_file: Optional[str] = None, smoothing: float = 0.3,
+                 default_rtf: Optional[Dict[str, float]] = None):
+        """初始化预估器
+
+        Args:
+            stats_file: RTF统计持久化文件（None表示只保存在内存中）
+            smoothing: EWMA平滑系数（新样本权重，0-1）
+            default_rtf: 各阶段初始RTF
+        """
+        self.logger = logging.getLogger('project_bach.eta_estimator')
+        self.stats_file = Path(stats_file) if stats_file else None
+        self.smoothing = smoothing
+        self.default_rtf = {**DEFAULT_RTF, **(default_rtf or {})}
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        # 已排队/处理中的任务（按加入顺序）：job_id -> {audio_seconds, model, started}
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        self._load()
+
+    @staticmethod
+    def _key(stage: str, model: Optional[str]) -> str:
+        return f"{stage}:{model}" if stage == 'transcription' and model else stage
+
+    def record(self, stage: str, seconds: float, audio_seconds: Optional[float], model: Optional[str] = None):
+        """记录一次阶段耗时并更新RTF
+
+        Args:
+            stage: 阶段名称
+            seconds: 阶段耗时（秒）
+            audio_seconds: 音频时长（秒），未知时不更新
+            model: Whisper模型名（仅转录阶段区分）
+        """
+        if not audio_seconds or audio_seconds <= 0 or seconds < 0:
+            return
+        rtf = seconds / audio_seconds
+        # 转录阶段同时更新该模型和阶段整体的RTF（新模型无数据时使用整体RTF）
+        keys = {self._key(stage, model), stage}
+        with self._lock:
+            for key in keys:
+                entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = {'rtf': rtf, 'samples': 0}
+                else:
+                    entry['rtf'] = (1 - self.smoothing) * entry['rtf'] + self.smoothing * rtf
+                entry['samples'] += 1
+        self._save()
+
+    def get_rtf(self, stage: str, model: Optional[str] = None) -> float:
+        """获取阶段RTF（转录阶段优先使用该模型的数据，其次使用阶段整体数据，最后使用默认值）"""
+        with self._lock:
+            for key in (self._key(stage, model), stage):
+                if key in self._stats:
+                    return self._stats[key]['rtf']
+        return self.default_rtf.get(stage, 0.0)
+
+    def estimate(self, audio_seconds: Optional[float], model: Optional[str] = None,
+                 stages: Iterable[str] = PIPELINE_STAGES) -> float:
+        """预估处理时间
+
+        Args:
+            audio_seconds: 音频时长（秒），未知时按10分钟估算
+            model: Whisper模型名
+            stages: 参与预估的阶段
+
+        Returns:
+            预估耗时（秒）
+        """
+        duration = audio_seconds if audio_seconds and audio_seconds > 0 else _FALLBACK_AUDIO_SECONDS
+        return sum(self.get_rtf(stage, model) * duration for stage in stages)
+
+    def track_job(self, job_id: str, audio_seconds: Optional[float], model: Optional[str] = None):
+        """登记排队中的任务（用于队列整体预估）"""
+        with self._lock:
+            job = self._jobs.setdefault(job_id, {'audio_seconds': None, 'model': None, 'started': None})
+            if audio_seconds:
+                job['audio_seconds'] = audio_seconds
+            if model:
+                job['model'] = model
+
+    def start_job(self, job_id: str, audio_seconds: Optional[float], model: Optional[str] = None):
+        """标记任务开始处理（未登记时自动登记）"""
+        self.track_job(job_id, audio_seconds, model)
+        with self._lock:
+            self._jobs[job_id]['started'] = time.time()
+
+    def finish_job(self, job_id: str):
+        """移除已结束的任务"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _remaining(self, job: Dict[str, Any], stages: Iterable[str]) -> float:
+        remaining = self.estimate(job['audio_seconds'], job['model'], stages)
+        if job['started']:
+            remaining = max(remaining - (time.time() - job['started']), 0.0)
+        return remaining
+
+    def queue_eta(self, job_id: Optional[str] = None) -> float:
+        """预估排队任务完成时间
+
+        转录阶段独占Whisper模型，是队列的瓶颈：目标任务之前的任务只计转录耗时，
+        目标任务计完整处理耗时。
+
+        Args:
+            job_id: 目标任务（None表示队列中最后一个任务）
+
+        Returns:
+            预估剩余秒数（队列为空时为0）
+        """
+        with self._lock:
+            jobs = list(self._jobs.items())
+        if not jobs:
+            return 0.0
+
+        total = 0.0
+        for current_id, job in jobs:
+            if current_id == job_id or (job_id is None and current_id == jobs[-1][0]):
+                return total + self._remaining(job, PIPELINE_STAGES)
+            total += self._remaining(job, ('transcription',))
+        return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取RTF统计与队列状态"""
+        with self._lock:
+            stats = {key: dict(entry) for key, entry in self._stats.items()}
+            queued = len(self._jobs)
+        return {'rtf': stats, 'tracked_jobs': queued, 'queue_eta_seconds': round(self.queue_eta(), 1)}
+
+    def _load(self):
+        if self.stats_file is None or not self.stats_file.exists():
+            return
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._stats = {key: {'rtf': float(entry['rtf']), 'samples': int(entry.get('samples', 0))}
+                           for key, entry in data.get('rtf', {}).items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"读取处理时间统计失败，使用默认值: {e}")
+
+    def _save(self):
+        if self.stats_file is None:
+            return
+        with self._lock:
+            data = json.dumps({'rtf': self._stats}, ensure_ascii=False, indent=2)
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.stats_file.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, self.stats_file)
+        except OSError as e:
+            self.logger.warning(f"保存处理时间统计失败: {e}")
+
+
+# 全局单例（上传处理与音频处理器共享同一份统计和队列）
+_eta_estimator: Optional[EtaEstimator] = None
+_estimator_lock = threading.Lock()
+
+
+def get_eta_estimator(stats_file: Optional[str] = None, smoothing: float = 0.3) -> EtaEstimator:
+    """获取处理时间预估器的全局单例
+
+    Args:
+        stats_file: 首次创建时使用的统计文件
+        smoothing: 首次创建时使用的EWMA平滑系数
+
+    Returns:
+        EtaEstimator实例
+    """
+    global _eta_estimator
+
+    with _estimator_lock:
+        if _eta_estimator is None:
+            _eta_estimator = EtaEstimator(stats_file, smoothing)
+
+    return _eta_estimator
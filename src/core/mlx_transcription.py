@@ -8,9 +8,33 @@ MLX Whisper转录服务
 import logging
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Callable, Iterator, BinaryIO
 import os
 import gc
+import hashlib
+import io
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+
+try:
+    from ..utils.disk_cache import DiskCache
+    from ..utils.audio_probe import probe_duration
+    from .chunked_transcription import SAMPLE_RATE, open_pcm_stream, iter_audio_chunks, stitch_segments
+    from .whisper_model_pool import WhisperModelPool, get_whisper_model_pool, ModelHolder
+    from .audio_decoder import DecodedAudio
+    from .voice_activity import SpeechTimeline
+    from .transcription_backends import TranscriptionBackend, FasterWhisperBackend
+except ImportError:
+    # 兼容性处理：当作为顶级模块运行时
+    from utils.disk_cache import DiskCache
+    from utils.audio_probe import probe_duration
+    from core.chunked_transcription import SAMPLE_RATE, open_pcm_stream, iter_audio_chunks, stitch_segments
+    from core.whisper_model_pool import WhisperModelPool, get_whisper_model_pool, ModelHolder
+    from core.audio_decoder import DecodedAudio
+    from core.voice_activity import SpeechTimeline
+    from core.transcription_backends import TranscriptionBackend, FasterWhisperBackend
 
 try:
     import mlx_whisper
@@ -18,8 +42,58 @@ except ImportError:
     mlx_whisper = None
 
 
+# 空转录结果的占位文本（不写入转录缓存）
+EMPTY_TRANSCRIPTION_TEXT = "转录结果为空。"
+
+# 转录进度回调: (完成比例0-1, 进度描述)
+ProgressCallback = Callable[[float, str], None]
+
+
+class MLXWhisperBackend(TranscriptionBackend):
+    """mlx-whisper后端（Apple Silicon），可选使用常驻模型池"""
+
+    name = 'mlx'
+    install_hint = "mlx-whisper未安装。请运行: pip install mlx-whisper"
+
+    def __init__(self, model_pool: Optional[WhisperModelPool] = None):
+        self.model_pool = model_pool
+
+    def is_available(self) -> bool:
+        return mlx_whisper is not None
+
+    def _use_model(self, model_repo: str):
+        """转录期间使用常驻池中的模型（未启用模型池时由mlx_whisper自行加载）"""
+        if self.model_pool is None:
+            return nullcontext()
+        return self.model_pool.use(model_repo)
+
+    def transcribe(self, audio, transcribe_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        with self._use_model(transcribe_kwargs['path_or_hf_repo']):
+            return mlx_whisper.transcribe(audio, **transcribe_kwargs)
+
+    def preload(self, model_repo: str) -> bool:
+        if self.model_pool is None:
+            return False
+        return self.model_pool.preload(model_repo)
+
+    def clear(self):
+        if self.model_pool is not None:
+            self.model_pool.clear()
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'available': self.is_available(),
+            'model_pool': self.model_pool.get_stats() if self.model_pool is not None else None,
+        }
+
+
 class MLXTranscriptionService:
-    """MLX Whisper音频转录服务"""
+    """MLX Whisper音频转录服务
+
+    实际转录由可插拔的后端执行：Apple Silicon上使用mlx-whisper，
+    其他主机可在配置中选择faster-whisper int8 CPU后端。
+    """
     
     def __init__(self, mlx_config: Dict[str, Any]):
         """初始化MLX转录服务
@@ -31,7 +105,6 @@ class MLXTranscriptionService:
             
         self.config = mlx_config
         self.logger = logging.getLogger('project_bach.mlx_transcription')
-        self._model_cache = {}  # 模型缓存，避免重复加载
         
         # 从配置中获取基本参数（支持新的配置结构）
         # 如果配置为空，提供最小化默认值
@@ -44,6 +117,35 @@ class MLXTranscriptionService:
         
         # 构建默认模型仓库路径
         self.model_repo = self._get_model_repo_by_name(self.default_model)
+
+        # 转录结果缓存（按音频内容哈希+模型+语言+prompt+word_timestamps寻址）
+        self.transcription_cache: Optional[DiskCache] = None
+        self._fingerprints: Dict[tuple, str] = {}
+        self._fingerprint_lock = threading.Lock()
+        cache_config = mlx_config.get('cache', {}) or {}
+        if cache_config.get('enabled', False):
+            self.transcription_cache = DiskCache(
+                cache_config.get('directory', './data/cache/transcription'),
+                max_size_mb=cache_config.get('max_size_mb', 500),
+                max_age_days=cache_config.get('max_age_days', 90),
+                name='transcription'
+            )
+
+        # 长录音分块流式转录配置
+        self.chunked_config = mlx_config.get('chunked', {}) or {}
+
+        # 常驻模型池（进程内共享，mlx不可用时不启用）
+        self.model_pool: Optional[WhisperModelPool] = None
+        pool_config = mlx_config.get('model_pool', {}) or {}
+        if pool_config.get('enabled', False) and ModelHolder is not None:
+            self.model_pool = get_whisper_model_pool(pool_config.get('max_memory_mb', 4096))
+        self.preload_default = pool_config.get('preload_default', True)
+
+        # 转录后端：auto在首次使用时选择（mlx可用时用mlx，否则faster_whisper）
+        self.backend_name = mlx_config.get('backend', 'auto')
+        self.faster_whisper_config = mlx_config.get('faster_whisper', {}) or {}
+        self._backend: Optional[TranscriptionBackend] = None
+        self._backend_lock = threading.Lock()
         
         self.logger.info("MLX Whisper服务初始化完成")
         self.logger.debug(f"默认模型: {self.default_model}")
@@ -104,7 +206,11 @@ class MLXTranscriptionService:
     def transcribe_audio(self, audio_path: Path, prompt: str = None, 
                         language_preference: str = 'english', 
                         custom_model: str = None,
-                        word_timestamps: bool = False) -> Union[str, Dict[str, Any]]:
+                        word_timestamps: bool = False,
+                        progress_callback: Optional[ProgressCallback] = None,
+                        decoded_audio: Optional[DecodedAudio] = None,
+                        speech_timeline: Optional[SpeechTimeline] = None,
+                        vad_signature: Optional[Dict[str, Any]] = None) -> Union[str, Dict[str, Any]]:
         """转录音频文件
         
         Args:
@@ -113,6 +219,10 @@ class MLXTranscriptionService:
             language_preference: 语言偏好 ('english' 或 'multilingual')
             custom_model: 自定义模型名称 (如'large-v3', 'medium') 或完整仓库地址
             word_timestamps: 是否启用词级时间戳（diarization需要时为True）
+            progress_callback: 可选的进度回调 (完成比例, 描述)，分块转录时每块完成后调用
+            decoded_audio: 已解码的16kHz PCM（可选，提供时不再重复解码音频文件）
+            speech_timeline: 语音活动检测结果（可选，需同时提供decoded_audio），只转录语音区间
+            vad_signature: 语音活动检测参数（VAD已执行时提供），作为缓存键的一部分
             
         Returns:
             str: 转录文本 (当word_timestamps=False时)
@@ -124,7 +234,33 @@ class MLXTranscriptionService:
         # 验证音频文件存在
         if not audio_path.exists():
             raise Exception(f"音频文件不存在: {audio_path}")
-        
+
+        cache_key = None
+        # 只转录了语音区间却不知道VAD参数时，结果无法与整段转录区分，不使用缓存
+        if speech_timeline is None or decoded_audio is None or vad_signature is not None:
+            cache_key = self._safe_cache_key(audio_path, prompt, language_preference, custom_model,
+                                             word_timestamps, vad_signature)
+        if cache_key is not None:
+            cached = self.transcription_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"转录缓存命中，跳过转录: {audio_path.name}")
+                return cached
+
+        result = self._transcribe_uncached(audio_path, prompt, language_preference, custom_model,
+                                           word_timestamps, progress_callback, decoded_audio, speech_timeline)
+
+        if cache_key is not None and result and result != EMPTY_TRANSCRIPTION_TEXT:
+            self.transcription_cache.set(cache_key, result)
+        return result
+
+    def _transcribe_uncached(self, audio_path: Path, prompt: str = None,
+                             language_preference: str = 'english',
+                             custom_model: str = None,
+                             word_timestamps: bool = False,
+                             progress_callback: Optional[ProgressCallback] = None,
+                             decoded_audio: Optional[DecodedAudio] = None,
+                             speech_timeline: Optional[SpeechTimeline] = None) -> Union[str, Dict[str, Any]]:
+        """执行MLX Whisper转录（不经过缓存），参数与transcribe_audio相同"""
         # 获取音频文件信息
         file_size_mb = audio_path.stat().st_size / (1024 * 1024)
         
@@ -138,36 +274,23 @@ class MLXTranscriptionService:
             self.logger.warning(f"检测到大音频文件 ({file_size_mb:.1f}MB)，转录可能需要较长时间")
         
         try:
-            # 确定使用的模型
-            model_path_or_repo = self._get_model_path(custom_model)
-            
-            # 准备转录参数
-            transcribe_kwargs = {
-                'path_or_hf_repo': model_path_or_repo,
-                'word_timestamps': word_timestamps
-            }
-            
-            # 设置语言参数
-            if language_preference == 'english':
-                transcribe_kwargs['language'] = 'en'
-            # multilingual模式让MLX Whisper自动检测，不设置language参数
+            transcribe_kwargs = self._build_transcribe_kwargs(prompt, language_preference, custom_model, word_timestamps)
             
-            # 添加提示词
-            if prompt:
-                transcribe_kwargs['initial_prompt'] = prompt
-                
-            self.logger.info(f"使用模型: {model_path_or_repo}")
+            self.logger.info(f"使用模型: {transcribe_kwargs['path_or_hf_repo']}")
             self.logger.info(f"语言偏好: {language_preference}")
             
-            # 检查mlx_whisper是否可用
-            if mlx_whisper is None:
-                raise ImportError("mlx-whisper未安装。请运行: pip install mlx-whisper")
+            # 检查转录后端是否可用
+            backend = self.get_backend()
+            if not backend.is_available():
+                raise ImportError(backend.install_hint)
+            self.logger.info(f"转录后端: {backend.name}")
             
             # 记录开始时间
             start_time = time.time()
             
-            # 执行转录
-            result = mlx_whisper.transcribe(str(audio_path), **transcribe_kwargs)
+            # 执行转录（长录音走分块流式转录）
+            result = self._run_transcription(audio_path, transcribe_kwargs, progress_callback, decoded_audio,
+                                             speech_timeline)
             
             # 记录转录时间
             transcribe_time = time.time() - start_time
@@ -190,7 +313,7 @@ class MLXTranscriptionService:
             transcribed_text = result.get('text', '')
             if not transcribed_text.strip():
                 self.logger.warning("转录结果为空，可能是静音音频或转录失败")
-                return "转录结果为空。"
+                return EMPTY_TRANSCRIPTION_TEXT
             
             # 记录性能信息
             if 'segments' in result:
@@ -227,6 +350,284 @@ class MLXTranscriptionService:
             self.logger.error(error_msg)
             raise Exception(error_msg)
     
+    def _build_transcribe_kwargs(self, prompt: str, language_preference: str,
+                                 custom_model: str, word_timestamps: bool) -> Dict[str, Any]:
+        """构建mlx_whisper.transcribe的参数"""
+        # 确定使用的模型
+        transcribe_kwargs = {
+            'path_or_hf_repo': self._get_model_path(custom_model),
+            'word_timestamps': word_timestamps
+        }
+        
+        # 设置语言参数
+        if language_preference == 'english':
+            transcribe_kwargs['language'] = 'en'
+        # multilingual模式让MLX Whisper自动检测，不设置language参数
+        
+        # 添加提示词
+        if prompt:
+            transcribe_kwargs['initial_prompt'] = prompt
+        return transcribe_kwargs
+
+    def _run_transcription(self, audio_path: Path, transcribe_kwargs: Dict[str, Any],
+                           progress_callback: Optional[ProgressCallback] = None,
+                           decoded_audio: Optional[DecodedAudio] = None,
+                           speech_timeline: Optional[SpeechTimeline] = None) -> Dict[str, Any]:
+        """执行转录：超过时长阈值的录音使用分块流式转录，否则整体转录"""
+        if speech_timeline is not None and decoded_audio is not None:
+            return self._run_speech_only_transcription(decoded_audio, speech_timeline, transcribe_kwargs,
+                                                       progress_callback)
+
+        duration = None
+        if self.chunked_config.get('enabled', False):
+            duration = decoded_audio.duration if decoded_audio is not None else probe_duration(audio_path)
+
+        min_duration = self.chunked_config.get('min_duration_seconds', 1200)
+        if duration is not None and duration >= min_duration:
+            try:
+                segments = list(self._iter_chunked_segments(audio_path, transcribe_kwargs, duration,
+                                                            progress_callback, decoded_audio))
+                return {
+                    'text': ''.join(segment.get('text', '') for segment in segments),
+                    'segments': segments
+                }
+            except FileNotFoundError:
+                self.logger.warning("ffmpeg未安装，回退到整体转录")
+
+        # 已解码时直接传入PCM数组，避免转录引擎再次调用ffmpeg解码
+        audio_input = np.asarray(decoded_audio.samples) if decoded_audio is not None else str(audio_path)
+        return self.get_backend().transcribe(audio_input, transcribe_kwargs)
+
+    def _run_speech_only_transcription(self, decoded_audio: DecodedAudio, speech_timeline: SpeechTimeline,
+                                       transcribe_kwargs: Dict[str, Any],
+                                       progress_callback: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """只转录语音区间：拼接为紧凑音频转录后，将时间戳映射回原始时间轴"""
+        if speech_timeline.is_empty():
+            self.logger.warning("未检测到语音，跳过转录")
+            return {'text': '', 'segments': []}
+
+        samples = speech_timeline.compact(decoded_audio.samples)
+        duration = len(samples) / SAMPLE_RATE
+        self.logger.info(
+            f"只转录语音区间: {duration / 60:.1f}分钟（原始 {speech_timeline.total_duration / 60:.1f}分钟）"
+        )
+
+        if self.chunked_config.get('enabled', False) and duration >= self.chunked_config.get('min_duration_seconds', 1200):
+            segments = list(self._iter_chunked_segments(
+                decoded_audio.source, transcribe_kwargs, duration, progress_callback,
+                pcm_stream=io.BytesIO(samples.tobytes())
+            ))
+            result = {'text': ''.join(segment.get('text', '') for segment in segments), 'segments': segments}
+        else:
+            result = self.get_backend().transcribe(samples, transcribe_kwargs)
+
+        result['segments'] = [speech_timeline.remap_segment(segment) for segment in result.get('segments', [])]
+        return result
+
+    def get_backend(self) -> TranscriptionBackend:
+        """获取转录后端（auto模式在首次调用时按mlx-whisper是否可用选择）
+
+        Returns:
+            转录后端实例
+        """
+        with self._backend_lock:
+            if self._backend is None:
+                name = self.backend_name
+                if name == 'auto':
+                    name = 'mlx' if mlx_whisper is not None else 'faster_whisper'
+                if name == 'mlx':
+                    self._backend = MLXWhisperBackend(self.model_pool)
+                elif name == 'faster_whisper':
+                    self._backend = FasterWhisperBackend(self.faster_whisper_config)
+                else:
+                    raise ValueError(f"未知的转录后端: {name}")
+                self.logger.info(f"使用转录后端: {self._backend.name}")
+            return self._backend
+
+    def preload_default_model(self) -> bool:
+        """预加载配置的默认模型
+
+        Returns:
+            是否已加载（后端不支持预加载或未启用模型池时返回False）
+        """
+        if not self.preload_default:
+            return False
+        self.logger.info(f"预加载默认Whisper模型: {self.model_repo}")
+        return self.get_backend().preload(self.model_repo)
+
+    def transcribe_stream(self, audio_path: Path, prompt: str = None,
+                          language_preference: str = 'english',
+                          custom_model: str = None,
+                          word_timestamps: bool = False,
+                          progress_callback: Optional[ProgressCallback] = None) -> Iterator[Dict[str, Any]]:
+        """分块流式转录，每块完成后逐个产出全局时间轴上的段落
+
+        Args:
+            audio_path: 音频文件路径
+            prompt: Whisper系统提示词
+            language_preference: 语言偏好 ('english' 或 'multilingual')
+            custom_model: 自定义模型名称或完整仓库地址
+            word_timestamps: 是否启用词级时间戳
+            progress_callback: 可选的进度回调 (完成比例, 描述)
+
+        Yields:
+            转录段落字典（start/end/text，可能包含words）
+        """
+        backend = self.get_backend()
+        if not backend.is_available():
+            raise ImportError(backend.install_hint)
+        transcribe_kwargs = self._build_transcribe_kwargs(prompt, language_preference, custom_model, word_timestamps)
+        yield from self._iter_chunked_segments(audio_path, transcribe_kwargs, probe_duration(audio_path), progress_callback)
+
+    def _iter_chunked_segments(self, audio_path: Path, transcribe_kwargs: Dict[str, Any],
+                               duration: Optional[float],
+                               progress_callback: Optional[ProgressCallback] = None,
+                               decoded_audio: Optional[DecodedAudio] = None,
+                               pcm_stream: Optional[BinaryIO] = None) -> Iterator[Dict[str, Any]]:
+        """通过ffmpeg管道流式解码（或读取已解码的PCM缓存/给定的PCM流），按静音切块逐块转录
+
+        内存占用与块长度相关，与录音时长无关
+        """
+        chunk_seconds = self.chunked_config.get('chunk_seconds', 300)
+        overlap_seconds = self.chunked_config.get('overlap_seconds', 2)
+        search_seconds = self.chunked_config.get('silence_search_seconds', 5)
+
+        self.logger.info(
+            f"分块流式转录: 块长 {chunk_seconds}s, 重叠 {overlap_seconds}s"
+            + (f", 总时长 {duration / 60:.1f}分钟" if duration else "")
+        )
+
+        if pcm_stream is not None:
+            process = None
+            stream = pcm_stream
+        elif decoded_audio is not None:
+            process = None
+            stream = open(decoded_audio.path, 'rb')
+        else:
+            process = open_pcm_stream(audio_path)
+            stream = process.stdout
+        covered_until = 0.0
+        segment_id = 0
+        chunk_count = 0
+        finished = False
+        try:
+            for offset, samples in iter_audio_chunks(stream, chunk_seconds, overlap_seconds, search_seconds):
+                chunk_count += 1
+                result = self.get_backend().transcribe(samples, transcribe_kwargs)
+                segments, covered_until = stitch_segments(result.get('segments', []), offset, covered_until)
+
+                for segment in segments:
+                    segment['id'] = segment_id
+                    segment_id += 1
+                    yield segment
+
+                chunk_end = offset + len(samples) / SAMPLE_RATE
+                self.logger.info(f"分块 {chunk_count} 转录完成: {offset:.0f}s - {chunk_end:.0f}s")
+                if progress_callback:
+                    fraction = min(chunk_end / duration, 1.0) if duration else 0.0
+                    try:
+                        progress_callback(fraction, f"Transcribed {chunk_end / 60:.1f} min")
+                    except Exception as callback_error:
+                        self.logger.debug(f"进度回调异常: {callback_error}")
+            finished = True
+        finally:
+            if stream:
+                stream.close()
+            if process is not None:
+                # 正常读完时等待ffmpeg自行退出以获取退出码；中途终止时直接结束进程
+                if not finished and process.poll() is None:
+                    process.kill()
+                process.wait()
+
+        error_output = ''
+        if process is not None and process.stderr:
+            error_output = process.stderr.read().decode('utf-8', 'ignore').strip()
+        if process is not None and process.returncode != 0:
+            # 中途解码失败时已转录的部分不完整，不能作为结果（也不会写入缓存）
+            raise Exception(f"ffmpeg解码失败（退出码 {process.returncode}）: {error_output or '未知错误'}")
+        if chunk_count == 0:
+            raise Exception(f"ffmpeg解码失败: {error_output or '无音频数据'}")
+
+    def _fingerprint_audio(self, audio_path: Path) -> str:
+        """计算音频文件内容的sha256（按路径+大小+修改时间在内存中复用）"""
+        stat = audio_path.stat()
+        identity = (str(audio_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        with self._fingerprint_lock:
+            cached = self._fingerprints.get(identity)
+        if cached:
+            return cached
+
+        digest = hashlib.sha256()
+        with open(audio_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        fingerprint = digest.hexdigest()
+
+        with self._fingerprint_lock:
+            self._fingerprints[identity] = fingerprint
+        return fingerprint
+
+    def get_cached_transcription(self, audio_path: Path, prompt: str = None,
+                                 language_preference: str = 'english',
+                                 custom_model: str = None,
+                                 word_timestamps: bool = False,
+                                 vad_signature: Optional[Dict[str, Any]] = None) -> Optional[Union[str, Dict[str, Any]]]:
+        """在解码音频之前查询转录缓存
+
+        Args:
+            audio_path: 音频文件路径
+            prompt / language_preference / custom_model / word_timestamps: 与transcribe_audio相同
+            vad_signature: 将要使用的语音活动检测参数（不启用VAD时为None）
+
+        Returns:
+            缓存的转录结果；未启用缓存或未命中时返回None
+        """
+        cache_key = self._safe_cache_key(audio_path, prompt, language_preference, custom_model,
+                                         word_timestamps, vad_signature)
+        if cache_key is None:
+            return None
+        cached = self.transcription_cache.get(cache_key)
+        if cached is not None:
+            self.logger.info(f"转录缓存命中，跳过解码与转录: {audio_path.name}")
+        return cached
+
+    def _safe_cache_key(self, audio_path: Path, prompt: str, language_preference: str,
+                        custom_model: str, word_timestamps: bool,
+                        vad_signature: Optional[Dict[str, Any]]) -> Optional[str]:
+        """构建缓存键；未启用缓存或无法读取音频时返回None"""
+        if self.transcription_cache is None:
+            return None
+        try:
+            return self._build_cache_key(audio_path, prompt, language_preference, custom_model,
+                                         word_timestamps, vad_signature=vad_signature)
+        except OSError as e:
+            self.logger.warning(f"计算音频指纹失败，跳过转录缓存: {e}")
+            return None
+
+    def _build_cache_key(self, audio_path: Path, prompt: str, language_preference: str,
+                         custom_model: str, word_timestamps: bool,
+                         vad_signature: Optional[Dict[str, Any]] = None) -> str:
+        """构建转录缓存键：音频内容哈希 + 模型仓库 + 语言 + prompt + word_timestamps（+ VAD参数）"""
+        language = 'en' if language_preference == 'english' else None
+        parts = [
+            self._fingerprint_audio(audio_path),
+            self._get_model_path(custom_model),
+            language,
+            prompt or '',
+            bool(word_timestamps)
+        ]
+        if vad_signature is not None:
+            # 只在启用VAD时追加，已有缓存键保持不变；
+            # 同一音频的语音区间完全由VAD参数决定，因此无需先检测即可查询缓存
+            parts.append(['vad', sorted(vad_signature.items())])
+        return DiskCache.make_key(*parts)
+
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """获取转录缓存统计（未启用时返回None）"""
+        if self.transcription_cache is None:
+            return None
+        return self.transcription_cache.get_stats()
+
     def _get_model_path(self, custom_model: str = None) -> str:
         """获取模型仓库地址 (统一使用HuggingFace仓库)
         
@@ -261,8 +662,11 @@ class MLXTranscriptionService:
         Returns:
             估算的音频时长（分钟）
         """
+        duration = probe_duration(audio_path)
+        if duration is not None:
+            return duration / 60
         try:
-            # 简单的文件大小估算（1MB ≈ 1分钟，这是一个粗略估算）
+            # 无法探测时按文件大小粗略估算（1MB ≈ 0.8分钟）
             file_size_mb = audio_path.stat().st_size / (1024 * 1024)
             estimated_duration = file_size_mb * 0.8  # 保守估算
             return max(estimated_duration, 1.0)  # 至少1分钟
@@ -271,9 +675,12 @@ class MLXTranscriptionService:
     
     def cleanup_model_cache(self):
         """清理模型缓存，释放内存"""
-        if self._model_cache:
+        if self._backend is not None:
+            self.logger.info("清理Whisper模型缓存")
+            self._backend.clear()
+        elif self.model_pool is not None:
             self.logger.info("清理MLX模型缓存")
-            self._model_cache.clear()
+            self.model_pool.clear()
             
         # 强制垃圾回收
         gc.collect()
@@ -289,7 +696,9 @@ class MLXTranscriptionService:
         return {
             'model_repo': self.model_repo,
             'current_model': model_repo,
-            'mlx_whisper_available': mlx_whisper is not None
+            'mlx_whisper_available': mlx_whisper is not None,
+            'model_pool': self.model_pool.get_stats() if self.model_pool is not None else None,
+            'backend': self._backend.get_info() if self._backend is not None else {'name': self.backend_name}
         }
 
 
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3.11
+"""
+模型启动预热
+在Web服务器开始接受请求的同时于后台线程中加载重型模型，并记录各模型的就绪状态
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# 预热状态
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+
+_FINISHED_STATES = (READY, SKIPPED, FAILED)
+
+
+class ModelWarmup:
+    """按注册顺序在单个后台线程中依次加载模型
+
+    加载函数返回False表示该模型按配置无需预热（记为skipped），抛出异常记为failed；
+    预热失败不影响服务运行，对应模型会在首次使用时再次尝试加载。
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger('project_bach.model_warmup')
+        self._tasks: List[Tuple[str, Callable[[], Any]]] = []
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """注册需要预热的模型
+
+        Args:
+            name: 模型名称（用于状态报告）
+            loader: 加载函数，返回False表示跳过
+        """
+        with self._lock:
+            self._tasks.append((name, loader))
+            self._status[name] = {'state': PENDING, 'seconds': None, 'error': None}
+
+    def start(self) -> threading.Thread:
+        """启动后台预热线程（重复调用返回同一线程）
+
+        Returns:
+            预热线程
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ModelWarmup', daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待预热结束
+
+        Returns:
+            预热是否已结束
+        """
+        thread = self._thread
+        if thread is None:
+            return False
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self):
+        for name, loader in list(self._tasks):
+            self._set(name, state=LOADING)
+            self.logger.info(f"预热模型: {name}")
+            start_time = time.time()
+            try:
+                loaded = loader()
+            except Exception as e:
+                self._set(name, state=FAILED, seconds=round(time.time() - start_time, 2), error=str(e))
+                self.logger.warning(f"模型预热失败: {name} - {e}")
+                continue
+
+            elapsed = round(time.time() - start_time, 2)
+            if loaded is False:
+                self._set(name, state=SKIPPED, seconds=elapsed)
+                self.logger.info(f"跳过模型预热: {name}")
+            else:
+                self._set(name, state=READY, seconds=elapsed)
+                self.logger.info(f"模型预热完成: {name} ({elapsed}秒)")
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取预热状态
+
+        Returns:
+            包含ready（预热是否全部结束）与各模型状态的字典
+        """
+        with self._lock:
+            models = {name: dict(status) for name, status in self._status.items()}
+        return {
+            'ready': all(status['state'] in _FINISHED_STATES for status in models.values()),
+            'warm': [name for name, status in models.items() if status['state'] == READY],
+            'models': models,
+        }
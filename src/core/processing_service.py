@@ -40,6 +40,7 @@ class ProcessingStatus:
         self.error_message = None
         self.result_url = None
         self.processing_logs = []  # 新增：处理日志列表
+        self.stage_timings: Dict[str, float] = {}  # 各流水线阶段耗时（秒）
 
     def add_log(self, message: str, level: str = 'info'):
         """添加处理日志"""
@@ -94,7 +95,8 @@ class ProcessingStatus:
             'metadata': self.metadata,
             'error_message': self.error_message,
             'result_url': self.result_url,
-            'processing_logs': self.processing_logs
+            'processing_logs': self.processing_logs,
+            'stage_timings': self.stage_timings
         }
 
 
@@ -174,6 +176,27 @@ class ProcessingService:
 
         return True
 
+    def record_stage_timing(self, processing_id: str, stage_name: str, seconds: float) -> bool:
+        """记录流水线阶段耗时
+
+        Args:
+            processing_id: 处理ID
+            stage_name: 阶段名称 ('transcription', 'ai_generation'等)
+            seconds: 阶段耗时（秒）
+
+        Returns:
+            是否记录成功
+        """
+        with self._lock:
+            if processing_id not in self._statuses:
+                return False
+
+            status = self._statuses[processing_id]
+            status.stage_timings[stage_name] = round(seconds, 2)
+            status.updated_time = datetime.now()
+
+        return True
+
     def set_error(self, processing_id: str, error_message: str) -> bool:
         """设置错误状态"""
         with self._lock:
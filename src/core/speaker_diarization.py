@@ -5,16 +5,29 @@ Speaker Diarization服务
 与转录服务解耦，提供独立的说话人识别功能
 """
 
+import bisect
+import heapq
 import logging
 import os
+import threading
 import warnings
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..utils.content_type_service import ContentTypeService
+    from .audio_decoder import DecodedAudio
+    from .voice_activity import SpeechTimeline
 import numpy as np
 
+try:
+    from .audio_decoder import decode_timeout, estimate_duration
+    from .speaker_identity import SpeakerIdentityIndex, UNKNOWN_SPEAKER_PREFIX
+except ImportError:
+    # 兼容性处理：当作为顶级模块运行时
+    from core.audio_decoder import decode_timeout, estimate_duration
+    from core.speaker_identity import SpeakerIdentityIndex, UNKNOWN_SPEAKER_PREFIX
+
 # 抑制torchaudio兼容性警告
 warnings.filterwarnings("ignore", category=UserWarning, module="torchaudio")
 warnings.filterwarnings("ignore", category=UserWarning, module="torchaudio.*")
@@ -30,6 +43,115 @@ except ImportError:
     torch = None
 
 
+class SpeakerSegmentIndex:
+    """说话人段落的时间索引
+
+    将段落按起点和中点排序，用扫描线一次性找出每个时间区间的重叠段落，
+    用二分查找定位中点最近的段落，使对齐的开销接近线性。
+    候选段落按原始顺序返回，保证与逐一遍历时的并列取舍一致。
+    """
+
+    def __init__(self, speaker_segments: List[Dict[str, Any]]):
+        self.segments = speaker_segments
+        count = len(speaker_segments)
+        self._by_start = sorted(range(count), key=lambda i: (speaker_segments[i]['start'], i))
+
+        centers = [(seg['start'] + seg['end']) / 2 for seg in speaker_segments]
+        self._by_center = sorted(range(count), key=lambda i: (centers[i], i))
+        self._centers = [centers[i] for i in self._by_center]
+
+    def overlapping(self, intervals: List[Tuple[float, float]]) -> List[List[int]]:
+        """找出每个区间可能重叠的段落
+
+        Args:
+            intervals: (开始, 结束) 区间列表
+
+        Returns:
+            与intervals一一对应的段落下标列表（按原始顺序，包含所有重叠段落）
+        """
+        segments = self.segments
+        result: List[List[int]] = [[] for _ in intervals]
+        active = set()
+        expiry: List[Tuple[float, int]] = []  # (段落结束时间, 下标) 小顶堆
+        next_segment = 0
+
+        for k in sorted(range(len(intervals)), key=lambda k: intervals[k][0]):
+            start, end = intervals[k]
+
+            # 加入起点早于区间终点的段落
+            while next_segment < len(self._by_start) and segments[self._by_start[next_segment]]['start'] < end:
+                i = self._by_start[next_segment]
+                active.add(i)
+                heapq.heappush(expiry, (segments[i]['end'], i))
+                next_segment += 1
+
+            # 移除在区间起点前已结束的段落（区间按起点递增处理，之后不会再重叠）
+            while expiry and expiry[0][0] <= start:
+                active.discard(heapq.heappop(expiry)[1])
+
+            result[k] = sorted(i for i in active if segments[i]['start'] < end)
+
+        return result
+
+    def nearest(self, start: float, end: float) -> str:
+        """找到中点距离区间中点最近的段落的说话人（距离相同时取原始顺序靠前者）"""
+        if not self._centers:
+            return "Unknown"
+
+        center = (start + end) / 2
+        position = bisect.bisect_left(self._centers, center)
+        neighbours = [self._centers[j] for j in (position - 1, position) if 0 <= j < len(self._centers)]
+        min_distance = min(abs(center - value) for value in neighbours)
+
+        best = None
+        for value in neighbours:
+            if abs(center - value) == min_distance:
+                # 同一中点值的段落按原始下标排序，取第一个
+                i = self._by_center[bisect.bisect_left(self._centers, value)]
+                best = i if best is None else min(best, i)
+        return self.segments[best]['speaker']
+
+
+def speaker_overlap_matrix(starts: np.ndarray, ends: np.ndarray,
+                           speaker_segments: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+    """一次性计算所有区间与每个说话人的重叠时长
+
+    对每个说话人合并其发言段落为不相交区间并构造累计发言时长函数C(t)，
+    区间[a, b]与该说话人的重叠即C(b) - C(a)，可用np.interp对全部区间向量化求值。
+
+    Args:
+        starts: 区间开始时间数组
+        ends: 区间结束时间数组
+        speaker_segments: 说话人段落列表
+
+    Returns:
+        (说话人列表（按首次出现顺序）, 形状为(区间数, 说话人数)的重叠时长矩阵)
+    """
+    speakers = list(dict.fromkeys(seg['speaker'] for seg in speaker_segments))
+    overlap = np.zeros((len(starts), len(speakers)))
+
+    for column, speaker in enumerate(speakers):
+        turns = sorted((seg['start'], seg['end']) for seg in speaker_segments
+                       if seg['speaker'] == speaker and seg['end'] > seg['start'])
+        merged: List[List[float]] = []
+        for turn_start, turn_end in turns:
+            if merged and turn_start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], turn_end)
+            else:
+                merged.append([turn_start, turn_end])
+        if not merged:
+            continue
+
+        bounds = np.asarray(merged, dtype=np.float64)
+        breakpoints = bounds.ravel()
+        cumulative = np.concatenate([[0.0], np.cumsum(bounds[:, 1] - bounds[:, 0])])
+        # 每个段落开始处的累计值为此前段落总时长，结束处再加上本段时长
+        values = np.column_stack([cumulative[:-1], cumulative[1:]]).ravel()
+        overlap[:, column] = np.interp(ends, breakpoints, values) - np.interp(starts, breakpoints, values)
+
+    return speakers, np.clip(overlap, 0.0, None)
+
+
 class SpeakerDiarization:
     """说话人分离服务"""
     
@@ -53,11 +175,14 @@ class SpeakerDiarization:
         self.content_type_service = content_type_service
         self.logger = logging.getLogger('project_bach.speaker_diarization')
         self._pipeline = None  # 延迟加载
+        self._pipeline_lock = threading.Lock()  # 预热线程与首个任务可能同时初始化
         
         # 从配置中获取基本参数
         self.provider = diarization_config.get('provider', 'pyannote')
         self.max_speakers = diarization_config.get('max_speakers', 6)
         self.min_segment_duration = diarization_config.get('min_segment_duration', 1.0)
+        # 对齐粒度：segment按转录段落分配说话人，word按词级时间戳在说话人切换处拆分段落
+        self.alignment_mode = diarization_config.get('alignment_mode', 'segment')
 
         # 输出格式配置
         self.output_format = diarization_config.get('output_format', {
@@ -65,17 +190,32 @@ class SpeakerDiarization:
             'timestamp_precision': 1,
             'include_confidence': False
         })
+
+        # 跨录音说话人身份索引（可选，同一系列中的说话人名称保持稳定）
+        self.identity_index: Optional[SpeakerIdentityIndex] = None
+        identity_config = diarization_config.get('identity', {}) or {}
+        if identity_config.get('enabled', False):
+            self.identity_index = SpeakerIdentityIndex(
+                identity_config.get('index_dir', './data/speaker_index'),
+                similarity_threshold=identity_config.get('similarity_threshold', 0.7)
+            )
         
         self.logger.info(f"Speaker Diarization服务初始化完成 (HuggingFace缓存)")
         self.logger.info(f"提供商: {self.provider}")
         self.logger.info(f"最大说话人数: {self.max_speakers}")
         self.logger.info(f"最小段落时长: {self.min_segment_duration}秒")
         
-    def diarize_audio(self, audio_path: Path, **kwargs) -> List[Dict[str, Any]]:
+    def diarize_audio(self, audio_path: Path, decoded_audio: Optional['DecodedAudio'] = None,
+                      speech_timeline: Optional['SpeechTimeline'] = None,
+                      speaker_series: Optional[str] = None,
+                      **kwargs) -> List[Dict[str, Any]]:
         """执行说话人分离
         
         Args:
             audio_path: 音频文件路径
+            decoded_audio: 已解码的16kHz PCM（可选，提供时直接传入内存波形，不再转换临时WAV）
+            speech_timeline: 语音活动检测结果（可选，需同时提供decoded_audio），只分析语音区间
+            speaker_series: 录音所属系列（可选，启用身份索引时将说话人标签替换为系列内的稳定名称）
             **kwargs: 额外参数
             
         Returns:
@@ -99,21 +239,55 @@ class SpeakerDiarization:
             # 获取或初始化pipeline
             pipeline = self._get_pipeline()
             
-            # 检查并转换音频格式（pyannote只支持WAV等格式）
-            audio_for_diarization = self._prepare_audio_for_diarization(audio_path)
+            if decoded_audio is None or torch is None:
+                speech_timeline = None
+            if decoded_audio is not None and torch is not None:
+                # 复用共享解码结果，以内存波形输入pipeline（有语音区间时只输入拼接后的语音部分）
+                samples = speech_timeline.compact(decoded_audio.samples) if speech_timeline is not None \
+                    else np.array(decoded_audio.samples)
+                audio_input = {
+                    'waveform': torch.from_numpy(samples).unsqueeze(0),
+                    'sample_rate': decoded_audio.sample_rate,
+                }
+            else:
+                # 检查并转换音频格式（pyannote只支持WAV等格式）
+                audio_for_diarization = self._prepare_audio_for_diarization(audio_path)
+                audio_input = str(audio_for_diarization)
             
             # 执行diarization
             self.logger.info("正在执行说话人分离...")
-            diarization_result = pipeline(str(audio_for_diarization))
+            identify = self.identity_index is not None and speaker_series is not None
+            speaker_names: Dict[str, str] = {}
+            if identify:
+                # 同一次推理中返回各说话人的嵌入质心，无需再单独提取
+                diarization_result, embeddings = self._run_pipeline_with_embeddings(pipeline, audio_input)
+                if embeddings is not None:
+                    try:
+                        speaker_names = self.identity_index.identify(
+                            speaker_series, diarization_result.labels(), embeddings
+                        )
+                    except Exception as identity_error:
+                        self.logger.warning(f"说话人身份匹配失败，使用本次录音的标签: {identity_error}")
+                # 未匹配的说话人使用独立前缀，避免本次录音的SPEAKER_NN与系列中的已知说话人重名
+                unmatched = [label for label in diarization_result.labels() if label not in speaker_names]
+                for index, label in enumerate(unmatched):
+                    speaker_names[label] = f"{UNKNOWN_SPEAKER_PREFIX}{index:02d}"
+            else:
+                diarization_result = pipeline(audio_input)
             
             # 转换结果格式
+            precision = self.output_format.get('timestamp_precision', 1)
             speaker_segments = []
             for segment, _, speaker in diarization_result.itertracks(yield_label=True):
-                speaker_segments.append({
-                    'speaker': speaker,
-                    'start': round(segment.start, self.output_format.get('timestamp_precision', 1)),
-                    'end': round(segment.end, self.output_format.get('timestamp_precision', 1))
-                })
+                # 紧凑音频上的段落映射回原始时间轴，跨越被剔除的静音时拆分
+                spans = speech_timeline.remap_span(segment.start, segment.end) if speech_timeline is not None \
+                    else [(segment.start, segment.end)]
+                for start, end in spans:
+                    speaker_segments.append({
+                        'speaker': speaker_names.get(speaker, speaker),
+                        'start': round(start, precision),
+                        'end': round(end, precision)
+                    })
             
             self.logger.info(f"识别出 {len(speaker_segments)} 个说话人段落")
             
@@ -137,6 +311,19 @@ class SpeakerDiarization:
                 except Exception as cleanup_error:
                     self.logger.warning(f"清理临时文件失败: {cleanup_error}")
     
+    def _run_pipeline_with_embeddings(self, pipeline: Any, audio_input: Any) -> Tuple[Any, Optional[np.ndarray]]:
+        """执行pipeline并返回(分离结果, 说话人嵌入矩阵)，嵌入行顺序与diarization.labels()一致"""
+        try:
+            output = pipeline(audio_input, return_embeddings=True)
+        except TypeError:
+            self.logger.warning("当前pyannote pipeline不支持return_embeddings，跳过说话人身份匹配")
+            return pipeline(audio_input), None
+
+        if isinstance(output, tuple):
+            return output[0], output[1]
+        # pyannote 4.x 返回带speaker_diarization/speaker_embeddings属性的对象
+        return output.speaker_diarization, getattr(output, 'speaker_embeddings', None)
+
     def merge_with_transcription(self, transcription: Dict[str, Any], 
                                 speaker_segments: List[Dict[str, Any]], 
                                 group_by_speaker: bool = True) -> List[Dict[str, Any]]:
@@ -157,8 +344,11 @@ class SpeakerDiarization:
         chunks = transcription['chunks']
         self.logger.info(f"开始合并转录与说话人信息: {len(chunks)} chunks, {len(speaker_segments)} speaker segments")
         
-        # 第一步：对齐时间戳，为每个chunk分配说话人
-        aligned_chunks = self._align_timestamps_with_speakers(chunks, speaker_segments)
+        # 第一步：对齐时间戳，为每个chunk分配说话人（词级模式下在说话人切换处拆分chunk）
+        if self.alignment_mode == 'word':
+            aligned_chunks = self._align_words_with_speakers(chunks, speaker_segments)
+        else:
+            aligned_chunks = self._align_timestamps_with_speakers(chunks, speaker_segments)
         
         # 第二步：根据group_by_speaker选择输出模式
         if group_by_speaker:
@@ -174,8 +364,8 @@ class SpeakerDiarization:
         """时间戳对齐算法 - 为ASR chunks分配说话人标签
         
         使用IoU (Intersection over Union) 算法进行精确匹配：
-        1. 遍历每个ASR chunk
-        2. 计算chunk与所有speaker segments的IoU值
+        1. 通过SpeakerSegmentIndex找出与每个chunk重叠的speaker segments
+        2. 计算chunk与重叠segments的IoU值
         3. 选择IoU值最高的speaker (IoU > threshold)
         4. 如果无满足阈值的匹配，使用最大重叠作为fallback
         5. 正确处理短插话场景，避免长segment过度抢夺chunks
@@ -192,16 +382,20 @@ class SpeakerDiarization:
         
         aligned_chunks = []
         iou_threshold = 0.4  # IoU阈值，可以根据需要调整
+
+        index = SpeakerSegmentIndex(speaker_segments)
+        candidates = index.overlapping([tuple(chunk["timestamp"]) for chunk in chunks])
         
-        for chunk in chunks:
+        for chunk, segment_ids in zip(chunks, candidates):
             chunk_start, chunk_end = chunk["timestamp"]
             chunk_duration = chunk_end - chunk_start
+            overlapping = [speaker_segments[i] for i in segment_ids]
             
             best_speaker = None
             best_iou = iou_threshold
             
-            # 计算与所有speaker segments的IoU
-            for segment in speaker_segments:
+            # 计算与重叠speaker segments的IoU
+            for segment in overlapping:
                 segment_start, segment_end = segment["start"], segment["end"]
                 segment_duration = segment_end - segment_start
                 
@@ -222,7 +416,7 @@ class SpeakerDiarization:
             
             # 如果没有满足阈值的匹配，使用最大重叠作为fallback
             if best_speaker is None:
-                best_speaker = self._find_max_overlap_speaker(chunk_start, chunk_end, speaker_segments)
+                best_speaker = self._find_max_overlap_speaker(chunk_start, chunk_end, overlapping, index)
                 self.logger.debug(f"Chunk ({chunk_start:.1f}-{chunk_end:.1f}s) IoU<{iou_threshold}, 使用最大重叠: {best_speaker}")
             else:
                 self.logger.debug(f"Chunk ({chunk_start:.1f}-{chunk_end:.1f}s) 最佳IoU: {best_iou:.3f}, 选择: {best_speaker}")
@@ -236,13 +430,15 @@ class SpeakerDiarization:
         return aligned_chunks
     
     def _find_max_overlap_speaker(self, chunk_start: float, chunk_end: float, 
-                                 speaker_segments: List[Dict[str, Any]]) -> str:
+                                 speaker_segments: List[Dict[str, Any]],
+                                 index: SpeakerSegmentIndex) -> str:
         """找到与chunk重叠最多的speaker (IoU算法的fallback)
         
         Args:
             chunk_start: chunk开始时间
             chunk_end: chunk结束时间
-            speaker_segments: 说话人段落列表
+            speaker_segments: 与chunk重叠的说话人段落（按原始顺序）
+            index: 全部说话人段落的索引（无重叠时查找最近的speaker）
             
         Returns:
             重叠最多的speaker标识
@@ -265,37 +461,96 @@ class SpeakerDiarization:
         
         # 如果仍然没有重叠，使用最近的speaker
         if best_speaker == "Unknown":
-            best_speaker = self._find_nearest_speaker(chunk_start, chunk_end, speaker_segments)
+            best_speaker = index.nearest(chunk_start, chunk_end)
         
         return best_speaker
     
-    def _find_nearest_speaker(self, chunk_start: float, chunk_end: float, 
-                            speaker_segments: List[Dict[str, Any]]) -> str:
-        """找到最近的speaker segment
-        
+    def _align_words_with_speakers(self, chunks: List[Dict[str, Any]],
+                                   speaker_segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """词级对齐 - 按Whisper词级时间戳为每个词分配说话人，并在说话人切换处拆分chunk
+
+        所有词与说话人的重叠时长一次性向量化计算；与任何说话人都不重叠的词使用中点最近的
+        speaker segment。没有words信息的chunk退回段落级IoU对齐。
+
         Args:
-            chunk_start: chunk开始时间
-            chunk_end: chunk结束时间
-            speaker_segments: 说话人段落列表
-            
+            chunks: ASR转录chunks（segments[].words包含词级时间戳）
+            speaker_segments: 说话人段落
+
         Returns:
-            最近的speaker标识
+            对齐后的chunks，每个chunk只包含一个说话人的连续词语
         """
-        chunk_center = (chunk_start + chunk_end) / 2
-        
-        min_distance = float('inf')
-        nearest_speaker = "Unknown"
-        
-        for segment in speaker_segments:
-            segment_center = (segment['start'] + segment['end']) / 2
-            distance = abs(chunk_center - segment_center)
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_speaker = segment['speaker']
-        
-        return nearest_speaker
-    
+        if not chunks or not speaker_segments:
+            return chunks
+
+        word_owner = []  # (chunk下标, 词) 按顺序展开的所有词
+        for chunk_id, chunk in enumerate(chunks):
+            for word in chunk.get('words') or []:
+                word_owner.append((chunk_id, word))
+
+        if not word_owner:
+            self.logger.warning("转录结果中缺少词级时间戳，使用段落级对齐")
+            return self._align_timestamps_with_speakers(chunks, speaker_segments)
+
+        starts = np.array([float(word.get('start', chunks[cid]['timestamp'][0])) for cid, word in word_owner])
+        ends = np.array([float(word.get('end', chunks[cid]['timestamp'][1])) for cid, word in word_owner])
+
+        speakers, overlap = speaker_overlap_matrix(starts, ends, speaker_segments)
+        best = np.argmax(overlap, axis=1)
+        labels = np.array(speakers, dtype=object)[best]
+
+        # 无重叠的词：取中点最近的speaker segment
+        unmatched = overlap[np.arange(len(best)), best] <= 0
+        if unmatched.any():
+            seg_centers = np.array([(seg['start'] + seg['end']) / 2 for seg in speaker_segments])
+            order = np.argsort(seg_centers, kind='stable')
+            sorted_centers = seg_centers[order]
+            centers = (starts[unmatched] + ends[unmatched]) / 2
+            right = np.clip(np.searchsorted(sorted_centers, centers), 0, len(order) - 1)
+            left = np.clip(right - 1, 0, len(order) - 1)
+            use_left = np.abs(centers - sorted_centers[left]) <= np.abs(centers - sorted_centers[right])
+            nearest = order[np.where(use_left, left, right)]
+            labels[unmatched] = [speaker_segments[i]['speaker'] for i in nearest]
+
+        words_by_chunk: Dict[int, List[Tuple[str, Dict[str, Any]]]] = {}
+        for (chunk_id, word), speaker in zip(word_owner, labels):
+            words_by_chunk.setdefault(chunk_id, []).append((speaker, word))
+
+        aligned_chunks = []
+        split_count = 0
+        for chunk_id, chunk in enumerate(chunks):
+            if chunk_id not in words_by_chunk:
+                aligned_chunks.extend(self._align_timestamps_with_speakers([chunk], speaker_segments))
+                continue
+
+            runs: List[Tuple[str, List[Dict[str, Any]]]] = []
+            for speaker, word in words_by_chunk[chunk_id]:
+                if runs and runs[-1][0] == speaker:
+                    runs[-1][1].append(word)
+                else:
+                    runs.append((speaker, [word]))
+            split_count += len(runs) - 1
+
+            for speaker, words in runs:
+                aligned_chunk = chunk.copy()
+                if len(runs) > 1:
+                    run_start = float(words[0].get('start', chunk['timestamp'][0]))
+                    run_end = float(words[-1].get('end', chunk['timestamp'][1]))
+                    aligned_chunk.update({
+                        'text': ''.join(word.get('word', '') for word in words).strip(),
+                        'timestamp': [run_start, run_end],
+                        'start': run_start,
+                        'end': run_end,
+                        'words': words,
+                    })
+                aligned_chunk['speaker'] = speaker
+                aligned_chunks.append(aligned_chunk)
+
+        self.logger.debug(
+            f"词级时间戳对齐完成: {len(word_owner)} 个词, {len(chunks)} chunks -> "
+            f"{len(aligned_chunks)} aligned chunks (拆分 {split_count} 处)"
+        )
+        return aligned_chunks
+
     def _group_by_speaker_mode(self, aligned_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """按说话人分组模式 - 合并同一说话人的连续chunks
         
@@ -361,65 +616,80 @@ class SpeakerDiarization:
         Returns:
             pyannote Pipeline实例
         """
-        if self._pipeline is None:
-            # 检查Pipeline是否可用
-            if Pipeline is None:
-                raise ImportError("pyannote.audio未安装。请运行: pip install pyannote-audio")
-                
-            self.logger.info("初始化pyannote.audio pipeline...")
-            
-            try:
-                # 使用预训练的speaker diarization pipeline  
-                auth_token = os.environ.get('HUGGINGFACE_TOKEN')
-                self._pipeline = Pipeline.from_pretrained(
-                    "pyannote/speaker-diarization-3.1",
-                    use_auth_token=auth_token
-                )
-                
-                # 设置最大说话人数
-                self._pipeline.max_speakers = self.max_speakers
-                
-                # 配置pipeline参数以减少误检
-                # 根据debug结果，参数应该嵌套在segmentation和clustering下
-                pipeline_params = self.config.get('pipeline_params', {
-                    "segmentation": {
-                        "min_duration_off": 0.5,        # 最小静音时长(秒)
-                    },
-                    "clustering": {
-                        "method": "centroid",            # 聚类方法
-                        "min_cluster_size": 15,          # 最小聚类大小 - 减少虚假说话人
-                        "threshold": 0.8,                # 聚类阈值 - 降低敏感度
-                    }
-                })
-                
-                # 应用配置参数
-                self._pipeline.instantiate(pipeline_params)
-                self.logger.info(f"Pipeline参数配置: {pipeline_params}")
-                
-                # 设置计算设备 (MPS优先用于Apple Silicon，然后CUDA，最后CPU)
-                if torch is not None:
-                    if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
-                        device = torch.device("mps")  # Apple Silicon GPU
-                        self._pipeline.to(device)
-                        self.logger.info("pyannote pipeline已转移到MPS (Apple Silicon GPU)")
-                    elif torch.cuda.is_available():
-                        device = torch.device("cuda")
-                        self._pipeline.to(device)
-                        self.logger.info("pyannote pipeline已转移到CUDA GPU")
-                    else:
-                        device = torch.device("cpu")
-                        self.logger.info("pyannote pipeline使用CPU")
-                else:
-                    self.logger.warning("PyTorch未安装，pipeline可能无法正常工作")
-                
-                self.logger.info("pyannote.audio pipeline初始化成功")
-                
-            except Exception as e:
-                error_msg = f"初始化pyannote pipeline失败: {str(e)}"
-                self.logger.error(error_msg)
-                raise Exception(error_msg)
-        
+        with self._pipeline_lock:
+            if self._pipeline is None:
+                self._load_pipeline()
         return self._pipeline
+
+    def _load_pipeline(self):
+        """加载pyannote pipeline并配置参数与计算设备"""
+        # 检查Pipeline是否可用
+        if Pipeline is None:
+            raise ImportError("pyannote.audio未安装。请运行: pip install pyannote-audio")
+            
+        self.logger.info("初始化pyannote.audio pipeline...")
+        
+        try:
+            # 使用预训练的speaker diarization pipeline  
+            auth_token = os.environ.get('HUGGINGFACE_TOKEN')
+            pipeline = Pipeline.from_pretrained(
+                "pyannote/speaker-diarization-3.1",
+                use_auth_token=auth_token
+            )
+            
+            # 设置最大说话人数
+            pipeline.max_speakers = self.max_speakers
+            
+            # 配置pipeline参数以减少误检
+            # 根据debug结果，参数应该嵌套在segmentation和clustering下
+            pipeline_params = self.config.get('pipeline_params', {
+                "segmentation": {
+                    "min_duration_off": 0.5,        # 最小静音时长(秒)
+                },
+                "clustering": {
+                    "method": "centroid",            # 聚类方法
+                    "min_cluster_size": 15,          # 最小聚类大小 - 减少虚假说话人
+                    "threshold": 0.8,                # 聚类阈值 - 降低敏感度
+                }
+            })
+            
+            # 应用配置参数
+            pipeline.instantiate(pipeline_params)
+            self.logger.info(f"Pipeline参数配置: {pipeline_params}")
+            
+            # 设置计算设备 (MPS优先用于Apple Silicon，然后CUDA，最后CPU)
+            if torch is not None:
+                if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+                    device = torch.device("mps")  # Apple Silicon GPU
+                    pipeline.to(device)
+                    self.logger.info("pyannote pipeline已转移到MPS (Apple Silicon GPU)")
+                elif torch.cuda.is_available():
+                    device = torch.device("cuda")
+                    pipeline.to(device)
+                    self.logger.info("pyannote pipeline已转移到CUDA GPU")
+                else:
+                    device = torch.device("cpu")
+                    self.logger.info("pyannote pipeline使用CPU")
+            else:
+                self.logger.warning("PyTorch未安装，pipeline可能无法正常工作")
+            
+            # 配置完成后才对外可见，避免其他线程拿到未配置完成的pipeline
+            self._pipeline = pipeline
+            self.logger.info("pyannote.audio pipeline初始化成功")
+            
+        except Exception as e:
+            error_msg = f"初始化pyannote pipeline失败: {str(e)}"
+            self.logger.error(error_msg)
+            raise Exception(error_msg)
+
+    def warm_up(self):
+        """预加载pyannote pipeline（启动预热时调用）"""
+        self._setup_huggingface_token()
+        self._get_pipeline()
+
+    def is_ready(self) -> bool:
+        """pyannote pipeline是否已加载"""
+        return self._pipeline is not None
     
     def _setup_huggingface_token(self):
         """设置HuggingFace认证token"""
@@ -509,7 +779,7 @@ class SpeakerDiarization:
                 cmd, 
                 capture_output=True, 
                 text=True, 
-                timeout=60
+                timeout=decode_timeout(estimate_duration(audio_path))  # 按音频时长放宽超时
             )
             
             if result.returncode != 0:
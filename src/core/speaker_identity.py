@@ -0,0 +1,182 @@
+#!/usr/bin/env python3.11
+"""
+跨录音说话人身份索引
+按系列（content_type/subcategory，如同一例会）在磁盘上保存已知说话人的声纹质心，
+新录音的说话人嵌入通过批量余弦相似度匹配已知说话人，使同一系列中的说话人名称保持稳定
+"""
+
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# 未能匹配到系列索引的说话人名称前缀（与索引中的SPEAKER_NN区分）
+UNKNOWN_SPEAKER_PREFIX = 'UNKNOWN_'
+
+
+def speaker_series_key(content_type: Optional[str], subcategory: Optional[str]) -> Optional[str]:
+    """根据内容类型和子分类生成系列键（没有具体子分类时返回None，不做跨录音匹配）"""
+    if not content_type or not subcategory or subcategory == 'other':
+        return None
+    return f"{content_type}/{subcategory}"
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class SpeakerIdentityIndex:
+    """按系列存储说话人声纹质心的向量索引
+
+    每个系列一个npz文件：names（说话人名称）、centroids（L2归一化float32质心矩阵）、
+    counts（参与平均的录音数）。
+    """
+
+    def __init__(self, index_dir: str = './data/speaker_index', similarity_threshold: float = 0.7):
+        """初始化索引
+
+        Args:
+            index_dir: 索引目录
+            similarity_threshold: 判定为同一说话人的最低余弦相似度
+        """
+        self.index_dir = Path(index_dir)
+        self.similarity_threshold = similarity_threshold
+        self.logger = logging.getLogger('project_bach.speaker_identity')
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def _series_path(self, series: str) -> Path:
+        safe_name = re.sub(r'[^\w.-]+', '_', series).strip('_') or 'default'
+        return self.index_dir / f"{safe_name}.npz"
+
+    def _load(self, series: str) -> Dict[str, np.ndarray]:
+        entry = self._series.get(series)
+        if entry is not None:
+            return entry
+
+        entry = {'names': np.zeros(0, dtype=str), 'centroids': None, 'counts': np.zeros(0, dtype=np.int64)}
+        path = self._series_path(series)
+        if path.exists():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    entry = {
+                        'names': data['names'],
+                        'centroids': data['centroids'].astype(np.float32),
+                        'counts': data['counts'],
+                    }
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"读取说话人索引失败，重新建立: {path.name} - {e}")
+        self._series[series] = entry
+        return entry
+
+    def _save(self, series: str, entry: Dict[str, np.ndarray]):
+        path = self._series_path(series)
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix='.npz')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, names=entry['names'], centroids=entry['centroids'], counts=entry['counts'])
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"保存说话人索引失败: {path.name} - {e}")
+
+    def identify(self, series: str, labels: Sequence[str], embeddings: np.ndarray) -> Dict[str, str]:
+        """将本次录音的说话人匹配到系列中的已知说话人，并更新索引
+
+        相似度矩阵一次批量计算，按相似度从高到低一对一分配；
+        低于阈值的说话人作为新说话人加入索引。
+
+        Args:
+            series: 系列键
+            labels: 本次录音的说话人标签（与embeddings行对应）
+            embeddings: 说话人嵌入矩阵 (说话人数, 维度)，含NaN的行不参与匹配
+
+        Returns:
+            标签到稳定名称的映射（未参与匹配的标签不在结果中）
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        valid = [i for i in range(min(len(labels), len(embeddings))) if np.all(np.isfinite(embeddings[i]))]
+        if not valid:
+            return {}
+        queries = _normalize_rows(embeddings[valid])
+
+        with self._lock:
+            entry = self._load(series)
+            names: List[str] = [str(name) for name in entry['names']]
+            centroids = entry['centroids']
+            counts = entry['counts'].astype(np.int64)
+            if centroids is not None and centroids.shape[1] != queries.shape[1]:
+                self.logger.warning(f"说话人嵌入维度变化，重建系列索引: {series}")
+                names, centroids, counts = [], None, np.zeros(0, dtype=np.int64)
+
+            assigned: Dict[int, int] = {}  # valid中的位置 -> 已知说话人下标
+            if centroids is not None and len(names):
+                similarity = queries @ centroids.T
+                used_queries, used_known = set(), set()
+                for flat in np.argsort(-similarity, axis=None, kind='stable'):
+                    query, known = divmod(int(flat), similarity.shape[1])
+                    if similarity[query, known] < self.similarity_threshold:
+                        break
+                    if query in used_queries or known in used_known:
+                        continue
+                    assigned[query] = known
+                    used_queries.add(query)
+                    used_known.add(known)
+
+            new_rows = []
+            for position in range(len(valid)):
+                if position in assigned:
+                    # 更新质心：按录音数加权平均后重新归一化
+                    known = assigned[position]
+                    merged = centroids[known] * counts[known] + queries[position]
+                    centroids[known] = merged / max(np.linalg.norm(merged), 1e-12)
+                    counts[known] += 1
+                else:
+                    assigned[position] = len(names)
+                    names.append(f"SPEAKER_{len(names):02d}")
+                    new_rows.append(queries[position])
+                    counts = np.append(counts, 1)
+
+            if new_rows:
+                stacked = np.vstack(new_rows).astype(np.float32)
+                centroids = stacked if centroids is None or not len(centroids) else np.vstack([centroids, stacked])
+
+            entry = {'names': np.array(names), 'centroids': centroids, 'counts': counts}
+            self._series[series] = entry
+            self._save(series, entry)
+
+        mapping = {labels[valid[position]]: names[known] for position, known in assigned.items()}
+        self.logger.info(
+            f"说话人身份匹配 ({series}): "
+            + ", ".join(f"{label}→{name}" for label, name in sorted(mapping.items()))
+        )
+        return mapping
+
+    def rename_speaker(self, series: str, old_name: str, new_name: str) -> bool:
+        """重命名系列中的已知说话人（如将SPEAKER_01改为真实姓名）
+
+        Returns:
+            是否找到并重命名
+        """
+        with self._lock:
+            entry = self._load(series)
+            names = [str(name) for name in entry['names']]
+            if old_name not in names or new_name in names:
+                return False
+            names[names.index(old_name)] = new_name
+            entry['names'] = np.array(names)
+            self._save(series, entry)
+        return True
+
+    def get_speakers(self, series: str) -> Dict[str, int]:
+        """获取系列中的已知说话人及其出现的录音数"""
+        with self._lock:
+            entry = self._load(series)
+            return {str(name): int(count) for name, count in zip(entry['names'], entry['counts'])}
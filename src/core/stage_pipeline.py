@@ -0,0 +1,269 @@
+#!/usr/bin/env python3.11
+"""
+阶段流水线执行器
+将处理流程拆分为多个阶段，阶段之间通过有界队列连接，
+使不同文件可以同时处于不同阶段（文件N+1转录时文件N进行AI生成/发布）
+"""
+
+import queue
+import threading
+import time
+import logging
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+
+StageFunc = Callable[[Dict[str, Any]], None]
+
+
+class PipelineJob:
+    """流水线中的单个任务"""
+
+    def __init__(self, job_id: str, context: Dict[str, Any]):
+        """初始化任务
+
+        Args:
+            job_id: 任务标识
+            context: 在各阶段之间传递的上下文字典（阶段函数直接修改）
+        """
+        self.job_id = job_id
+        self.context = context
+        self.success = False
+        self.error: Optional[BaseException] = None
+        self.failed_stage: Optional[str] = None
+        self.stage_timings: Dict[str, float] = {}
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务完成
+
+        Args:
+            timeout: 超时时间（秒），None表示一直等待
+
+        Returns:
+            任务是否已结束
+        """
+        return self._done.wait(timeout)
+
+    @property
+    def done(self) -> bool:
+        """任务是否已结束"""
+        return self._done.is_set()
+
+    def _finish(self, success: bool, error: BaseException = None, failed_stage: str = None):
+        self.success = success
+        self.error = error
+        self.failed_stage = failed_stage
+        self._done.set()
+
+
+class StagePipeline:
+    """有界队列连接的多阶段流水线
+
+    每个阶段拥有独立的工作线程，阶段之间的有界队列提供背压：
+    下游阶段积压时上游阶段会阻塞，积压量不会无限增长。
+    """
+
+    _STOP = object()
+
+    def __init__(self,
+                 stages: List[Tuple[str, StageFunc, int]],
+                 queue_size: int = 2,
+                 on_stage_complete: Optional[Callable[[PipelineJob, str, float], None]] = None):
+        """初始化流水线
+
+        Args:
+            stages: (阶段名称, 阶段函数, 工作线程数) 列表，按执行顺序排列
+            queue_size: 每个阶段输入队列的最大长度
+            on_stage_complete: 阶段完成回调 (job, stage_name, elapsed_seconds)
+        """
+        if not stages:
+            raise ValueError("stages 参数不能为空")
+
+        self.logger = logging.getLogger('project_bach.stage_pipeline')
+        self.stages = [(name, func, max(int(workers), 1)) for name, func, workers in stages]
+        self.queue_size = max(int(queue_size), 1)
+        self.on_stage_complete = on_stage_complete
+
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+        # 统计信息
+        self._busy: Dict[str, int] = {name: 0 for name, _, _ in self.stages}
+        self._processed: Dict[str, int] = {name: 0 for name, _, _ in self.stages}
+        self._total_time: Dict[str, float] = {name: 0.0 for name, _, _ in self.stages}
+        self._in_flight: Dict[str, PipelineJob] = {}
+
+    def start(self):
+        """启动所有阶段的工作线程（重复调用无副作用）"""
+        with self._lock:
+            if self._started:
+                return
+
+            for index, (name, _, workers) in enumerate(self.stages):
+                for worker_index in range(workers):
+                    thread = threading.Thread(
+                        target=self._stage_worker,
+                        args=(index,),
+                        name=f"Pipeline-{name}-{worker_index}",
+                        daemon=True
+                    )
+                    thread.start()
+                    self._threads.append(thread)
+
+            self._started = True
+            self.logger.info(
+                "阶段流水线已启动: " + ", ".join(f"{name}×{workers}" for name, _, workers in self.stages)
+            )
+
+    def stop(self, timeout: float = 5.0):
+        """停止流水线（等待各阶段当前任务结束）
+
+        尚未完成的任务（包括仍在阶段队列中等待的任务）立即以失败结束，
+        等待这些任务的调用方不会一直阻塞。
+        """
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            threads = list(self._threads)
+            self._threads.clear()
+            unfinished = list(self._in_flight.values())
+            self._in_flight.clear()
+
+        stop_error = RuntimeError("流水线已停止，任务未完成")
+        for job in unfinished:
+            job._finish(False, stop_error, job.failed_stage)
+        if unfinished:
+            self.logger.warning(f"流水线停止时有 {len(unfinished)} 个任务未完成，已标记为失败")
+
+        for index, (_, _, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                self._put_stop(self._queues[index])
+
+        for thread in threads:
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                self.logger.warning(f"流水线线程未能及时停止: {thread.name}")
+
+        self.logger.info("阶段流水线已停止")
+
+    def _put_stop(self, stage_queue: queue.Queue):
+        """放入停止信号；队列已满时丢弃排队中的任务（均已标记为失败）腾出位置"""
+        while True:
+            try:
+                stage_queue.put_nowait(self._STOP)
+                return
+            except queue.Full:
+                try:
+                    stage_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def submit(self, job_id: str, context: Dict[str, Any], start_stage: Optional[str] = None) -> PipelineJob:
+        """提交任务到第一个阶段（队列满时阻塞，形成背压）
+
+        Args:
+            job_id: 任务标识
+            context: 阶段上下文
+            start_stage: 从指定阶段开始（之前阶段的输出已在context中），None表示从第一个阶段开始
+
+        Returns:
+            PipelineJob，可调用wait()等待结果
+        """
+        self.start()
+
+        stage_names = [name for name, _, _ in self.stages]
+        start_index = stage_names.index(start_stage) if start_stage else 0
+
+        job = PipelineJob(job_id, context)
+        with self._lock:
+            self._in_flight[job_id] = job
+        self._queues[start_index].put(job)
+        return job
+
+    def _stage_worker(self, stage_index: int):
+        """阶段工作线程"""
+        name, func, _ = self.stages[stage_index]
+        input_queue = self._queues[stage_index]
+
+        while True:
+            job = input_queue.get()
+            if job is self._STOP:
+                break
+            if job.done:
+                # 流水线停止时已标记为失败的残留任务
+                continue
+
+            with self._lock:
+                self._busy[name] += 1
+
+            stage_start = time.time()
+            try:
+                func(job.context)
+            except BaseException as error:
+                elapsed = time.time() - stage_start
+                self._record(job, name, elapsed)
+                self.logger.error(f"流水线阶段失败 [{name}] {job.job_id}: {error}")
+                self._complete(job, False, error, name)
+                continue
+            finally:
+                with self._lock:
+                    self._busy[name] -= 1
+
+            elapsed = time.time() - stage_start
+            self._record(job, name, elapsed)
+
+            if job.done:
+                continue
+            if stage_index + 1 < len(self.stages):
+                self._queues[stage_index + 1].put(job)
+            else:
+                self._complete(job, True)
+
+    def _record(self, job: PipelineJob, stage_name: str, elapsed: float):
+        """记录阶段耗时"""
+        job.stage_timings[stage_name] = elapsed
+        with self._lock:
+            self._processed[stage_name] += 1
+            self._total_time[stage_name] += elapsed
+
+        if self.on_stage_complete:
+            try:
+                self.on_stage_complete(job, stage_name, elapsed)
+            except Exception as callback_error:  # pragma: no cover - 防御性日志
+                self.logger.warning(f"阶段完成回调异常: {callback_error}")
+
+    def _complete(self, job: PipelineJob, success: bool,
+                  error: BaseException = None, failed_stage: str = None):
+        with self._lock:
+            self._in_flight.pop(job.job_id, None)
+        if job.done:
+            return
+        job._finish(success, error, failed_stage)
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取流水线状态
+
+        Returns:
+            各阶段的队列长度、忙碌线程数和平均耗时
+        """
+        with self._lock:
+            stages = {}
+            for index, (name, _, workers) in enumerate(self.stages):
+                processed = self._processed[name]
+                stages[name] = {
+                    'workers': workers,
+                    'busy': self._busy[name],
+                    'queued': self._queues[index].qsize(),
+                    'processed': processed,
+                    'avg_seconds': round(self._total_time[name] / processed, 2) if processed else None,
+                }
+
+            return {
+                'running': self._started,
+                'queue_size': self.queue_size,
+                'in_flight': len(self._in_flight),
+                'stages': stages,
+            }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3.11
+"""
+转录文本分块模块
+按估算token数将长转录切分为若干块，供map-reduce摘要使用
+"""
+
+import math
+import re
+from typing import List, Optional, Sequence
+
+
+# 中日韩字符（含全角标点），每个字符大约对应一个token
+_CJK_PATTERN = re.compile(r'[　-〿぀-ヿ㐀-䶿一-鿿가-힯＀-￯]')
+
+# 句子边界：中英文句末标点或换行
+_SENTENCE_PATTERN = re.compile(r'[^.!?。！？\n]+(?:[.!?。！？]+|\n+|$)')
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的token数
+
+    不依赖具体tokenizer的粗略估算：CJK字符按1个token计，
+    其余字符按约4个字符1个token计。
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + math.ceil(other_count / 4)
+
+
+def split_sentences(text: str) -> List[str]:
+    """按句子边界切分文本
+
+    Args:
+        text: 输入文本
+
+    Returns:
+        去除首尾空白后的非空句子列表
+    """
+    return [match.group(0).strip() for match in _SENTENCE_PATTERN.finditer(text or '') if match.group(0).strip()]
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    """对超长且无句子边界的文本按字符数硬切分
+
+    单次遍历，逐字符累计CJK/非CJK字符数计算当前片段的估算token数（与estimate_tokens一致）。
+    """
+    pieces = []
+    start = 0
+    cjk_count = 0
+    other_count = 0
+    for index, char in enumerate(text):
+        is_cjk = _CJK_PATTERN.match(char) is not None
+        next_cjk = cjk_count + is_cjk
+        next_other = other_count + (not is_cjk)
+        if index > start and next_cjk + math.ceil(next_other / 4) > max_tokens:
+            pieces.append(text[start:index])
+            start = index
+            next_cjk, next_other = int(is_cjk), int(not is_cjk)
+        cjk_count, other_count = next_cjk, next_other
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _join(left: str, right: str) -> str:
+    """拼接两段文本，CJK文本之间不插入空格"""
+    if not left:
+        return right
+    if _CJK_PATTERN.match(left[-1]) or _CJK_PATTERN.match(right[0]):
+        return left + right
+    return f"{left} {right}"
+
+
+def chunk_segments(segments: Sequence[str], max_tokens: int) -> List[str]:
+    """将转录段落贪心地打包为不超过max_tokens的块
+
+    优先在段落边界切分；单个段落超长时退化为按句子切分，
+    单个句子仍超长时按字符硬切分。
+
+    Args:
+        segments: 转录段落文本列表（按时间顺序）
+        max_tokens: 每块的最大估算token数
+
+    Returns:
+        文本块列表
+    """
+    max_tokens = max(int(max_tokens), 1)
+
+    pieces: List[str] = []
+    for segment in segments:
+        segment = (segment or '').strip()
+        if not segment:
+            continue
+        if estimate_tokens(segment) <= max_tokens:
+            pieces.append(segment)
+            continue
+        for sentence in split_sentences(segment):
+            if estimate_tokens(sentence) <= max_tokens:
+                pieces.append(sentence)
+            else:
+                pieces.extend(_hard_split(sentence, max_tokens))
+
+    chunks: List[str] = []
+    current = ''
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append(current)
+            current = ''
+            current_tokens = 0
+        current = _join(current, piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def chunk_transcript(text: str, max_tokens: int, segments: Optional[Sequence[str]] = None) -> List[str]:
+    """切分转录文本
+
+    有时间戳段落时按段落边界切分，否则按句子边界切分。
+
+    Args:
+        text: 完整转录文本
+        max_tokens: 每块的最大估算token数
+        segments: 可选的转录段落文本列表
+
+    Returns:
+        文本块列表
+    """
+    if segments:
+        return chunk_segments(segments, max_tokens)
+    return chunk_segments(split_sentences(text), max_tokens)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3.11
+"""
+转录后端
+定义转录引擎接口，并提供基于faster-whisper (CTranslate2) 的int8 CPU后端，
+使没有Apple Silicon的Linux主机也能转录
+"""
+
+import gc
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    from faster_whisper import WhisperModel
+    try:
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        # faster-whisper < 1.1 没有批量推理
+        BatchedInferencePipeline = None
+except ImportError:
+    WhisperModel = None
+    BatchedInferencePipeline = None
+
+
+# mlx-community仓库名中与模型规格无关的后缀
+_MLX_SUFFIXES = ('-mlx', '-4bit', '-8bit', '-q4', '-fp16', '-fp32')
+
+AudioInput = Union[str, np.ndarray]
+
+
+class TranscriptionBackend(ABC):
+    """转录引擎接口
+
+    transcribe接收音频路径或16kHz float32采样，以及mlx_whisper.transcribe格式的参数
+    （path_or_hf_repo / language / initial_prompt / word_timestamps），
+    返回与mlx_whisper相同结构的结果：{'text': str, 'segments': [{start, end, text, words?}]}
+    """
+
+    name = 'base'
+    install_hint = ''
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """引擎依赖是否已安装"""
+
+    @abstractmethod
+    def transcribe(self, audio: AudioInput, transcribe_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """执行转录"""
+
+    def preload(self, model_repo: str) -> bool:
+        """预加载模型，返回是否已加载"""
+        return False
+
+    def clear(self):
+        """释放已加载的模型"""
+
+    def get_info(self) -> Dict[str, Any]:
+        """后端信息"""
+        return {'name': self.name, 'available': self.is_available()}
+
+
+def faster_whisper_model_name(model_repo: str, model_map: Optional[Dict[str, str]] = None) -> str:
+    """将MLX模型仓库名转换为faster-whisper模型名
+
+    Args:
+        model_repo: 仓库名（如 mlx-community/whisper-large-v3-mlx）
+        model_map: 显式映射（仓库名或模型名 -> faster-whisper模型名/路径），优先使用
+
+    Returns:
+        faster-whisper模型名（如 large-v3）
+    """
+    model_map = model_map or {}
+    short_name = model_repo.split('/')[-1]
+    for key in (model_repo, short_name):
+        if key in model_map:
+            return model_map[key]
+
+    name = short_name.lower()
+    if name.startswith('whisper-'):
+        name = name[len('whisper-'):]
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in _MLX_SUFFIXES:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                stripped = True
+    return name
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2) 后端，默认int8量化在CPU上运行"""
+
+    name = 'faster_whisper'
+    install_hint = "faster-whisper未安装。请运行: pip install faster-whisper"
+
+    def __init__(self, config: Dict[str, Any]):
+        """初始化后端
+
+        Args:
+            config: faster_whisper配置（device / compute_type / cpu_threads / num_workers /
+                    beam_size / batch_size / download_root / model_map）
+        """
+        self.logger = logging.getLogger('project_bach.transcription_backends')
+        self.device = config.get('device', 'cpu')
+        self.compute_type = config.get('compute_type', 'int8')
+        self.cpu_threads = config.get('cpu_threads', 0) or os.cpu_count() or 4
+        self.num_workers = config.get('num_workers', 1)
+        self.beam_size = config.get('beam_size', 5)
+        self.batch_size = config.get('batch_size', 8)
+        self.download_root = config.get('download_root')
+        self.model_map = config.get('model_map', {}) or {}
+
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        return WhisperModel is not None
+
+    def _get_model(self, model_repo: str) -> Any:
+        model_name = faster_whisper_model_name(model_repo, self.model_map)
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                self.logger.info(
+                    f"加载faster-whisper模型: {model_name} "
+                    f"({self.device}/{self.compute_type}, {self.cpu_threads}线程)"
+                )
+                model = WhisperModel(
+                    model_name,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.num_workers,
+                    download_root=self.download_root,
+                )
+                self._models[model_name] = model
+            return model
+
+    def transcribe(self, audio: AudioInput, transcribe_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if WhisperModel is None:
+            raise ImportError(self.install_hint)
+
+        model = self._get_model(transcribe_kwargs['path_or_hf_repo'])
+        options = {
+            'language': transcribe_kwargs.get('language'),
+            'initial_prompt': transcribe_kwargs.get('initial_prompt'),
+            'word_timestamps': transcribe_kwargs.get('word_timestamps', False),
+            'beam_size': self.beam_size,
+        }
+
+        if self.batch_size > 1 and BatchedInferencePipeline is not None:
+            segments, info = BatchedInferencePipeline(model=model).transcribe(
+                audio, batch_size=self.batch_size, **options
+            )
+        else:
+            segments, info = model.transcribe(audio, **options)
+
+        # segments是惰性生成器，遍历时才真正解码
+        result_segments = [self._segment_to_dict(index, segment) for index, segment in enumerate(segments)]
+        return {
+            'text': ''.join(segment['text'] for segment in result_segments),
+            'segments': result_segments,
+            'language': getattr(info, 'language', None),
+        }
+
+    @staticmethod
+    def _segment_to_dict(index: int, segment: Any) -> Dict[str, Any]:
+        result = {
+            'id': index,
+            'start': float(segment.start),
+            'end': float(segment.end),
+            'text': segment.text,
+        }
+        words = getattr(segment, 'words', None)
+        if words:
+            result['words'] = [
+                {'word': word.word, 'start': float(word.start), 'end': float(word.end),
+                 'probability': float(word.probability)}
+                for word in words
+            ]
+        return result
+
+    def preload(self, model_repo: str) -> bool:
+        if WhisperModel is None:
+            return False
+        try:
+            self._get_model(model_repo)
+            return True
+        except Exception as e:
+            self.logger.warning(f"预加载faster-whisper模型失败: {model_repo} - {e}")
+            return False
+
+    def clear(self):
+        with self._lock:
+            count = len(self._models)
+            self._models.clear()
+        if count:
+            self.logger.info(f"已释放 {count} 个faster-whisper模型")
+        gc.collect()
+
+    def get_info(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded: List[str] = list(self._models)
+        return {
+            'name': self.name,
+            'available': self.is_available(),
+            'device': self.device,
+            'compute_type': self.compute_type,
+            'cpu_threads': self.cpu_threads,
+            'batch_size': self.batch_size,
+            'loaded_models': loaded,
+        }
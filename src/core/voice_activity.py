@@ -0,0 +1,273 @@
+#!/usr/bin/env python3.11
+"""
+语音活动检测（VAD）
+按帧能量找出语音区间，将静音部分剔除后拼接为紧凑音频供Whisper/pyannote处理，
+并将紧凑音频上的时间戳映射回原始时间轴
+"""
+
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .chunked_transcription import SAMPLE_RATE
+except ImportError:
+    # 兼容性处理：当作为顶级模块运行时
+    from core.chunked_transcription import SAMPLE_RATE
+
+
+_ENERGY_BLOCK_FRAMES = 8192  # 分批计算帧能量，避免长录音一次性转换为float64
+
+
+def frame_energy_db(samples: np.ndarray, frame: int) -> np.ndarray:
+    """计算每帧的平均能量（dBFS）
+
+    Args:
+        samples: float32采样（可以是内存映射）
+        frame: 帧长（采样数）
+
+    Returns:
+        每帧能量数组，末尾不足一帧的采样忽略
+    """
+    frame_count = len(samples) // frame
+    energy = np.empty(frame_count, dtype=np.float64)
+    for first in range(0, frame_count, _ENERGY_BLOCK_FRAMES):
+        last = min(first + _ENERGY_BLOCK_FRAMES, frame_count)
+        block = np.asarray(samples[first * frame:last * frame], dtype=np.float64).reshape(last - first, frame)
+        energy[first:last] = np.mean(block ** 2, axis=1)
+    return 10 * np.log10(energy + 1e-12)
+
+
+def detect_speech_regions(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                          frame_seconds: float = 0.03, threshold_db: Optional[float] = None,
+                          margin_db: float = 12.0, min_threshold_db: float = -60.0,
+                          min_speech_seconds: float = 0.25, min_silence_seconds: float = 1.0,
+                          padding_seconds: float = 0.3) -> List[Tuple[float, float]]:
+    """按帧能量检测语音区间
+
+    阈值默认取本底噪声（能量第10百分位）加margin_db；录音几乎全是语音时第10百分位已落在语音上，
+    因此阈值不超过语音电平（第90百分位）减margin_db，且不低于min_threshold_db。
+    短于min_silence_seconds的停顿并入前后语音，短于min_speech_seconds的语音丢弃，
+    保留区间前后各扩展padding_seconds，避免截断词首词尾。
+
+    Args:
+        samples: 16kHz单声道float32采样
+        sample_rate: 采样率
+        frame_seconds: 能量帧长度（秒）
+        threshold_db: 固定能量阈值（dBFS），None表示自适应
+        margin_db: 自适应阈值高出本底噪声的分贝数
+        min_threshold_db: 自适应阈值下限（dBFS）
+        min_speech_seconds: 最短语音区间（秒）
+        min_silence_seconds: 最短静音间隔（秒）
+        padding_seconds: 语音区间前后扩展（秒）
+
+    Returns:
+        按时间排序、互不重叠的语音区间列表 [(start, end), ...]（秒）
+    """
+    total = len(samples) / sample_rate
+    frame = max(int(sample_rate * frame_seconds), 1)
+    energy = frame_energy_db(samples, frame)
+    if len(energy) == 0:
+        return []
+
+    if threshold_db is None:
+        noise_floor, speech_level = np.percentile(energy, [10, 90])
+        threshold_db = max(min(noise_floor + margin_db, speech_level - margin_db), min_threshold_db)
+    voiced = np.concatenate(([0], (energy > threshold_db).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(voiced))
+    frame_duration = frame / sample_rate
+
+    regions: List[List[float]] = []
+    for start_frame, end_frame in zip(edges[0::2], edges[1::2]):
+        start, end = start_frame * frame_duration, end_frame * frame_duration
+        if regions and start - regions[-1][1] < min_silence_seconds:
+            regions[-1][1] = end
+        else:
+            regions.append([start, end])
+
+    padded: List[Tuple[float, float]] = []
+    for start, end in regions:
+        if end - start < min_speech_seconds:
+            continue
+        start, end = max(start - padding_seconds, 0.0), min(end + padding_seconds, total)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+
+class SpeechTimeline:
+    """语音区间与紧凑时间轴（只含语音部分）之间的映射"""
+
+    def __init__(self, regions: Sequence[Tuple[float, float]], total_duration: float,
+                 sample_rate: int = SAMPLE_RATE):
+        """初始化时间轴映射
+
+        Args:
+            regions: 按时间排序、互不重叠的语音区间（秒）
+            total_duration: 原始音频时长（秒）
+            sample_rate: 采样率
+        """
+        self.sample_rate = sample_rate
+        self.total_duration = total_duration
+        # 以采样下标为准，保证紧凑音频长度与映射完全一致
+        self._bounds = [(int(round(start * sample_rate)), int(round(end * sample_rate))) for start, end in regions]
+        self._bounds = [(start, end) for start, end in self._bounds if end > start]
+
+        self._original_starts: List[float] = []
+        self._original_ends: List[float] = []
+        self._compact_starts: List[float] = []
+        offset = 0
+        for start, end in self._bounds:
+            self._original_starts.append(start / sample_rate)
+            self._original_ends.append(end / sample_rate)
+            self._compact_starts.append(offset / sample_rate)
+            offset += end - start
+        self.speech_seconds = offset / sample_rate
+
+    @property
+    def regions(self) -> List[Tuple[float, float]]:
+        return list(zip(self._original_starts, self._original_ends))
+
+    @property
+    def speech_ratio(self) -> float:
+        return self.speech_seconds / self.total_duration if self.total_duration > 0 else 0.0
+
+    def is_empty(self) -> bool:
+        return not self._bounds
+
+    def compact(self, samples: np.ndarray) -> np.ndarray:
+        """拼接语音区间的采样（紧凑音频）"""
+        if not self._bounds:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate([np.asarray(samples[start:end], dtype=np.float32) for start, end in self._bounds])
+
+    def _region_index(self, compact_time: float, is_end: bool) -> int:
+        # 恰好落在两个区间交界处时：起点归后一个区间，终点归前一个区间
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        return min(max(search(self._compact_starts, compact_time) - 1, 0), len(self._compact_starts) - 1)
+
+    def to_original(self, compact_time: float, is_end: bool = False) -> float:
+        """将紧凑时间轴上的时间映射回原始时间轴
+
+        Args:
+            compact_time: 紧凑音频上的时间（秒）
+            is_end: 是否为区间终点
+
+        Returns:
+            原始音频上的时间（秒）
+        """
+        if not self._bounds:
+            return compact_time
+        index = self._region_index(compact_time, is_end)
+        original = self._original_starts[index] + max(compact_time - self._compact_starts[index], 0.0)
+        return min(original, self._original_ends[index])
+
+    def remap_segment(self, segment: Dict[str, Any]) -> Dict[str, Any]:
+        """将转录段落（含词级时间戳）映射回原始时间轴"""
+        remapped = dict(segment)
+        for key, is_end in (('start', False), ('end', True)):
+            if remapped.get(key) is not None:
+                remapped[key] = self.to_original(float(remapped[key]), is_end)
+        if isinstance(remapped.get('words'), list):
+            words = []
+            for word in remapped['words']:
+                word = dict(word)
+                for key, is_end in (('start', False), ('end', True)):
+                    if word.get(key) is not None:
+                        word[key] = self.to_original(float(word[key]), is_end)
+                words.append(word)
+            remapped['words'] = words
+        return remapped
+
+    def remap_span(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """将紧凑时间轴上的区间映射回原始时间轴，跨越被剔除的静音时按语音区间拆分"""
+        if not self._bounds:
+            return [(start, end)]
+        if end <= start:
+            return []
+        first = self._region_index(start, False)
+        last = self._region_index(end, True)
+        spans = []
+        for index in range(first, last + 1):
+            span_start = self.to_original(start, False) if index == first else self._original_starts[index]
+            span_end = self.to_original(end, True) if index == last else self._original_ends[index]
+            if span_end > span_start:
+                spans.append((span_start, span_end))
+        return spans
+
+
+class VoiceActivityDetector:
+    """可配置的能量VAD，生成SpeechTimeline"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """初始化检测器
+
+        Args:
+            config: VAD配置（frame_seconds / threshold_db / margin_db / min_threshold_db /
+                    min_speech_seconds / min_silence_seconds / padding_seconds /
+                    max_speech_ratio / diarization）
+        """
+        config = config or {}
+        self.logger = logging.getLogger('project_bach.voice_activity')
+        self.frame_seconds = config.get('frame_seconds', 0.03)
+        self.threshold_db = config.get('threshold_db')
+        self.margin_db = config.get('margin_db', 12.0)
+        self.min_threshold_db = config.get('min_threshold_db', -60.0)
+        self.min_speech_seconds = config.get('min_speech_seconds', 0.25)
+        self.min_silence_seconds = config.get('min_silence_seconds', 1.0)
+        self.padding_seconds = config.get('padding_seconds', 0.3)
+        # 语音占比高于该值时剔除静音收益太小，直接处理整段音频
+        self.max_speech_ratio = config.get('max_speech_ratio', 0.9)
+        # 是否同时将语音区间提供给说话人分离
+        self.apply_to_diarization = config.get('diarization', True)
+
+    def cache_signature(self) -> Dict[str, Any]:
+        """返回决定检测结果的参数，用作转录缓存键的一部分
+
+        同一音频在相同参数下检测出的语音区间相同，因此无需先解码、检测即可查询缓存。
+        """
+        return {
+            'frame_seconds': self.frame_seconds,
+            'threshold_db': self.threshold_db,
+            'margin_db': self.margin_db,
+            'min_threshold_db': self.min_threshold_db,
+            'min_speech_seconds': self.min_speech_seconds,
+            'min_silence_seconds': self.min_silence_seconds,
+            'padding_seconds': self.padding_seconds,
+            'max_speech_ratio': self.max_speech_ratio,
+        }
+
+    def detect(self, samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[SpeechTimeline]:
+        """检测语音区间
+
+        Args:
+            samples: 16kHz单声道float32采样
+            sample_rate: 采样率
+
+        Returns:
+            SpeechTimeline；语音占比超过max_speech_ratio时返回None（不值得剔除静音）
+        """
+        regions = detect_speech_regions(
+            samples, sample_rate,
+            frame_seconds=self.frame_seconds,
+            threshold_db=self.threshold_db,
+            margin_db=self.margin_db,
+            min_threshold_db=self.min_threshold_db,
+            min_speech_seconds=self.min_speech_seconds,
+            min_silence_seconds=self.min_silence_seconds,
+            padding_seconds=self.padding_seconds,
+        )
+        timeline = SpeechTimeline(regions, len(samples) / sample_rate, sample_rate)
+        self.logger.info(
+            f"语音活动检测: {len(regions)} 个语音区间, "
+            f"语音 {timeline.speech_seconds / 60:.1f}/{timeline.total_duration / 60:.1f}分钟 "
+            f"({timeline.speech_ratio:.0%})"
+        )
+        if timeline.speech_ratio > self.max_speech_ratio:
+            self.logger.info("静音占比较低，跳过静音剔除")
+            return None
+        return timeline
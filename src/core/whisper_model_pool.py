@@ -0,0 +1,254 @@
+#!/usr/bin/env python3.11
+"""
+Whisper模型常驻池
+在内存预算内保持已加载的MLX Whisper模型，按LRU淘汰，避免不同上传选择不同模型时反复加载
+"""
+
+import gc
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import mlx.core as mx
+    from mlx.utils import tree_flatten
+    from mlx_whisper import load_models
+    from mlx_whisper.transcribe import ModelHolder
+except ImportError:
+    mx = None
+    tree_flatten = None
+    load_models = None
+    ModelHolder = None
+
+
+# 无法从参数计算大小时使用的估算值（MB，float16权重）
+_ESTIMATED_MODEL_MB = {
+    'tiny': 75,
+    'base': 145,
+    'small': 480,
+    'medium': 1500,
+    'large-v3-turbo': 1600,
+    'turbo': 1600,
+    'large': 3100,
+}
+
+
+def estimate_model_mb(model_repo: str) -> float:
+    """根据仓库名称估算模型内存占用（MB）"""
+    name = model_repo.split('/')[-1].lower()
+    for key, size in _ESTIMATED_MODEL_MB.items():
+        if key in name:
+            return size
+    return _ESTIMATED_MODEL_MB['large']
+
+
+class WhisperModelPool:
+    """已加载Whisper模型的LRU池
+
+    mlx_whisper.transcribe内部通过全局的ModelHolder获取模型，并在仓库名变化时重新加载。
+    池在调用transcribe前将所需模型放入ModelHolder，使切换模型只是指针交换；
+    由于ModelHolder是进程级全局状态，use()在转录期间持有独立的转录锁，
+    池锁只保护内部记录，转录期间仍可查询统计、预加载或移除模型。
+    """
+
+    def __init__(self, max_memory_mb: float = 4096,
+                 loader: Optional[Callable[[str], Any]] = None,
+                 holder: Any = None):
+        """初始化模型池
+
+        Args:
+            max_memory_mb: 常驻模型总内存预算（MB），至少保留一个模型
+            loader: 模型加载函数 (仓库名 -> 模型)，默认使用mlx_whisper.load_models
+            holder: 模型持有者（默认mlx_whisper的ModelHolder）
+        """
+        self.logger = logging.getLogger('project_bach.whisper_model_pool')
+        self.max_memory_mb = max_memory_mb
+        self._loader = loader or self._default_loader
+        self._holder = holder if holder is not None else ModelHolder
+
+        self._lock = threading.RLock()
+        # 串行化ModelHolder的使用（转录期间持有）
+        self._transcription_lock = threading.Lock()
+        self._active_repo: Optional[str] = None
+        self._models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._hits = 0
+        self._loads = 0
+        self._evictions = 0
+        self._load_seconds = 0.0
+
+    @staticmethod
+    def _default_loader(model_repo: str) -> Any:
+        if load_models is None:
+            raise ImportError("mlx-whisper未安装。请运行: pip install mlx-whisper")
+        return load_models.load_model(model_repo, dtype=mx.float16)
+
+    @staticmethod
+    def _model_size_mb(model: Any, model_repo: str) -> float:
+        """计算模型参数占用的内存（MB），失败时按名称估算"""
+        if tree_flatten is not None:
+            try:
+                total = sum(value.nbytes for _, value in tree_flatten(model.parameters()))
+                if total:
+                    return total / (1024 * 1024)
+            except Exception:
+                pass
+        return estimate_model_mb(model_repo)
+
+    def get(self, model_repo: str) -> Any:
+        """获取模型（未加载时加载并按需淘汰最久未使用的模型）
+
+        Args:
+            model_repo: 模型仓库名
+
+        Returns:
+            已加载的模型
+        """
+        with self._lock:
+            entry = self._models.get(model_repo)
+            if entry is not None:
+                self._models.move_to_end(model_repo)
+                self._hits += 1
+                return entry['model']
+
+            self.logger.info(f"加载Whisper模型到常驻池: {model_repo}")
+            start_time = time.time()
+            model = self._loader(model_repo)
+            elapsed = time.time() - start_time
+            size_mb = self._model_size_mb(model, model_repo)
+
+            self._loads += 1
+            self._load_seconds += elapsed
+            self._models[model_repo] = {'model': model, 'size_mb': size_mb}
+            self.logger.info(f"模型加载完成: {model_repo} ({size_mb:.0f}MB, {elapsed:.1f}秒)")
+
+            self._evict_over_budget(keep=model_repo)
+            return model
+
+    @contextmanager
+    def use(self, model_repo: str) -> Iterator[Any]:
+        """在转录期间将模型放入ModelHolder并持有转录锁
+
+        Args:
+            model_repo: 模型仓库名（与传给mlx_whisper.transcribe的path_or_hf_repo一致）
+        """
+        with self._transcription_lock:
+            with self._lock:
+                model = self.get(model_repo)
+                if self._holder is not None:
+                    self._holder.model = model
+                    self._holder.model_path = model_repo
+                self._active_repo = model_repo
+            try:
+                yield model
+            finally:
+                with self._lock:
+                    self._active_repo = None
+
+    def preload(self, model_repo: str) -> bool:
+        """预加载模型
+
+        Returns:
+            是否加载成功
+        """
+        try:
+            self.get(model_repo)
+            return True
+        except Exception as e:
+            self.logger.warning(f"预加载Whisper模型失败: {model_repo} - {e}")
+            return False
+
+    def is_loaded(self, model_repo: str) -> bool:
+        """模型是否已在池中"""
+        with self._lock:
+            return model_repo in self._models
+
+    def evict(self, model_repo: str) -> bool:
+        """从池中移除指定模型"""
+        with self._lock:
+            if model_repo not in self._models:
+                return False
+            self._remove(model_repo)
+        gc.collect()
+        return True
+
+    def clear(self) -> int:
+        """清空模型池，释放所有模型
+
+        Returns:
+            释放的模型数
+        """
+        with self._lock:
+            repos = list(self._models)
+            for model_repo in repos:
+                self._remove(model_repo)
+        gc.collect()
+        if repos:
+            self.logger.info(f"已释放 {len(repos)} 个常驻Whisper模型")
+        return len(repos)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取模型池统计
+
+        Returns:
+            已加载模型、内存占用、命中/加载/淘汰次数
+        """
+        with self._lock:
+            used_mb = sum(entry['size_mb'] for entry in self._models.values())
+            return {
+                'models': {repo: round(entry['size_mb'], 1) for repo, entry in self._models.items()},
+                'used_mb': round(used_mb, 1),
+                'max_memory_mb': self.max_memory_mb,
+                'hits': self._hits,
+                'loads': self._loads,
+                'evictions': self._evictions,
+                'avg_load_seconds': round(self._load_seconds / self._loads, 2) if self._loads else None,
+            }
+
+    def _evict_over_budget(self, keep: str):
+        """超出内存预算时按LRU淘汰（保留刚使用的模型）"""
+        used_mb = sum(entry['size_mb'] for entry in self._models.values())
+        evicted = False
+        for model_repo in list(self._models):
+            if used_mb <= self.max_memory_mb:
+                break
+            if model_repo in (keep, self._active_repo):
+                continue
+            used_mb -= self._models[model_repo]['size_mb']
+            self._remove(model_repo)
+            self._evictions += 1
+            evicted = True
+            self.logger.info(f"内存预算不足，淘汰Whisper模型: {model_repo}")
+        if evicted:
+            gc.collect()
+
+    def _remove(self, model_repo: str):
+        self._models.pop(model_repo, None)
+        if self._holder is not None and getattr(self._holder, 'model_path', None) == model_repo:
+            self._holder.model = None
+            self._holder.model_path = None
+
+
+# 全局单例（mlx_whisper的ModelHolder是进程级状态，模型池也应进程内共享）
+_model_pool: Optional[WhisperModelPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_whisper_model_pool(max_memory_mb: float = 4096) -> WhisperModelPool:
+    """获取Whisper模型池的全局单例
+
+    Args:
+        max_memory_mb: 首次创建时使用的内存预算
+
+    Returns:
+        WhisperModelPool实例
+    """
+    global _model_pool
+
+    with _pool_lock:
+        if _model_pool is None:
+            _model_pool = WhisperModelPool(max_memory_mb)
+
+    return _model_pool
@@ -6,22 +6,25 @@
 
 import logging
 from pathlib import Path
-from typing import Set, Callable
+from typing import Set, Callable, Optional
 from watchdog.events import FileSystemEventHandler, FileCreatedEvent, FileMovedEvent
 
 
 class AudioFileHandler(FileSystemEventHandler):
     """音频文件事件处理器"""
     
-    def __init__(self, file_callback: Callable[[str], None], supported_formats: Set[str]):
+    def __init__(self, file_callback: Callable[[str], None], supported_formats: Set[str],
+                 change_callback: Optional[Callable[[str, bool], None]] = None):
         """初始化音频文件事件处理器
 
         Args:
             file_callback: 处理新文件的回调函数
             supported_formats: 支持的音频格式集合（必需参数）
+            change_callback: 文件修改/写入关闭的回调函数 (file_path, closed)，可选
         """
         super().__init__()
         self.file_callback = file_callback
+        self.change_callback = change_callback
         self.logger = logging.getLogger('project_bach.audio_handler')
 
         # 支持的音频格式 - 必须从外部传入
@@ -52,6 +55,43 @@ class AudioFileHandler(FileSystemEventHandler):
         if not event.is_directory:
             self._handle_new_file(event.dest_path)
     
+    def on_modified(self, event):
+        """文件修改事件（写入过程中持续触发）
+        
+        Args:
+            event: 文件系统事件对象
+        """
+        if not event.is_directory:
+            self._handle_file_change(event.src_path, closed=False)
+    
+    def on_closed(self, event):
+        """文件写入关闭事件（仅部分平台支持，如Linux inotify）
+        
+        Args:
+            event: 文件系统事件对象
+        """
+        if not event.is_directory:
+            self._handle_file_change(event.src_path, closed=True)
+    
+    def _handle_file_change(self, file_path: str, closed: bool):
+        """转发音频文件的修改/写入关闭事件（高频事件，不记录info日志）
+        
+        Args:
+            file_path: 文件路径
+            closed: 是否为写入关闭事件
+        """
+        if self.change_callback is None:
+            return
+        
+        path = Path(file_path)
+        if not self._is_supported_audio_file(path) or self._is_temporary_file(path):
+            return
+        
+        try:
+            self.change_callback(file_path, closed)
+        except Exception as e:
+            self.logger.error(f"处理文件修改回调时出错: {path.name}, 错误: {str(e)}")
+    
     def _handle_new_file(self, file_path: str):
         """处理新文件
         
@@ -10,11 +10,17 @@ import threading
 import signal
 import logging
 from pathlib import Path
-from typing import Callable, Optional, Dict, Any, Set, Tuple
+from typing import Callable, Optional, Dict, Any, Set, Tuple, List, TYPE_CHECKING
 from watchdog.observers import Observer
 
 from .event_handler import AudioFileHandler
 from .processing_queue import ProcessingQueue, ProcessingStatus
+from .job_scheduler import JobScheduler
+from .retry_policy import RetryPolicy, classify_exception
+from .stability_debouncer import FileStabilityDebouncer
+
+if TYPE_CHECKING:
+    from ..storage.queue_store import QueueStore
 
 
 class FileMonitor:
@@ -25,7 +31,11 @@ class FileMonitor:
                  file_processor_callback: Callable[[str], bool],
                  queue_max_size: int = 100,
                  supported_formats: Set[str] = None,
-                 audio_processor=None):
+                 audio_processor=None,
+                 max_workers: int = 1,
+                 queue_store: Optional['QueueStore'] = None,
+                 queue_scheduler: Optional[JobScheduler] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         """初始化文件监控器
         
         Args:
@@ -33,6 +43,11 @@ class FileMonitor:
             file_processor_callback: 文件处理回调函数，返回bool表示是否成功
             queue_max_size: 处理队列最大大小
             supported_formats: 支持的音频格式集合
+            audio_processor: 音频处理器（可选，优先于回调使用）
+            max_workers: 并行处理文件的工作线程数
+            queue_store: 队列持久化存储（可选，提供时重启后继续处理未完成的任务）
+            queue_scheduler: 队列任务调度器（可选，默认配置的优先级/公平分配调度）
+            retry_policy: 失败重试策略（可选，默认按错误类别指数退避）
         """
         self.watch_folder = Path(watch_folder)
         self.file_processor_callback = file_processor_callback
@@ -43,18 +58,40 @@ class FileMonitor:
         self.watch_folder.mkdir(parents=True, exist_ok=True)
         
         # 初始化组件
-        self.processing_queue = ProcessingQueue(queue_max_size)
+        self.processing_queue = ProcessingQueue(
+            queue_max_size, store=queue_store, scheduler=queue_scheduler, retry_policy=retry_policy
+        )
         self.observer = Observer()
-        self.event_handler = AudioFileHandler(self._on_new_file, supported_formats)
+        self.event_handler = AudioFileHandler(self._on_new_file, supported_formats, self._on_file_changed)
         
         # 状态管理
         self.is_running = False
-        self.processing_thread: Optional[threading.Thread] = None
+        self.max_workers = max(int(max_workers or 1), 1)
+        self.processing_threads: List[threading.Thread] = []
+        self._active_workers = 0
+        self._active_lock = threading.Lock()
         self._shutdown_event = threading.Event()
         
-        # 文件稳定性检查
-        self.stability_check_delay = 2.0  # 秒
-        self.stability_check_interval = 1.0  # 秒
+        # 文件稳定性检查（独立线程，不阻塞watchdog观察者线程）
+        self.stability_debouncer = FileStabilityDebouncer(self._on_file_stable, quiet_seconds=2.0, check_interval=1.0)
+
+    @property
+    def stability_check_delay(self) -> float:
+        """最后一次修改事件后等待的静默时间（秒）"""
+        return self.stability_debouncer.quiet_seconds
+
+    @stability_check_delay.setter
+    def stability_check_delay(self, seconds: float):
+        self.stability_debouncer.quiet_seconds = seconds
+
+    @property
+    def stability_check_interval(self) -> float:
+        """两次文件大小检查之间的间隔（秒）"""
+        return self.stability_debouncer.check_interval
+
+    @stability_check_interval.setter
+    def stability_check_interval(self, seconds: float):
+        self.stability_debouncer.check_interval = seconds
 
     # ------------------------------------------------------------------
     # Metadata registration API
@@ -77,20 +114,24 @@ class FileMonitor:
                 recursive=False
             )
             
-            # 启动观察者
+            # 启动稳定性检测线程和观察者
+            self.stability_debouncer.start()
             self.observer.start()
             
-            # 启动处理线程
+            # 启动处理线程池
             self._shutdown_event.clear()
-            self.processing_thread = threading.Thread(
-                target=self._processing_worker,
-                name="FileProcessingWorker"
-            )
-            self.processing_thread.daemon = True
-            self.processing_thread.start()
+            self.processing_threads = []
+            for index in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._processing_worker,
+                    name=f"FileProcessingWorker-{index}"
+                )
+                worker.daemon = True
+                worker.start()
+                self.processing_threads.append(worker)
             
             self.is_running = True
-            self.logger.info(f"开始监控文件夹: {self.watch_folder}")
+            self.logger.info(f"开始监控文件夹: {self.watch_folder} (工作线程: {self.max_workers})")
             
         except Exception as e:
             self.logger.error(f"启动文件监控失败: {str(e)}")
@@ -116,16 +157,30 @@ class FileMonitor:
                 if self.observer.is_alive():
                     self.logger.warning("观察者线程未能及时停止")
             
+            unstable_count = self.stability_debouncer.pending_count()
+            self.stability_debouncer.stop()
+            if unstable_count > 0:
+                self.logger.info(f"放弃了 {unstable_count} 个尚未写入完成的文件")
+            
             # 停止处理线程
-            if self.processing_thread and self.processing_thread.is_alive():
-                self.processing_thread.join(timeout=5.0)
-                if self.processing_thread.is_alive():
-                    self.logger.warning("处理线程未能及时停止")
+            for worker in self.processing_threads:
+                if worker.is_alive():
+                    worker.join(timeout=5.0)
+                    if worker.is_alive():
+                        self.logger.warning(f"处理线程未能及时停止: {worker.name}")
             
-            # 取消待处理的文件
-            cancelled_count = self.processing_queue.cancel_pending_files()
-            if cancelled_count > 0:
-                self.logger.info(f"取消了 {cancelled_count} 个待处理文件")
+            if self.processing_queue.is_persistent:
+                # 持久化队列保留待处理任务，下次启动时继续处理
+                pending_count = self.processing_queue.get_processing_stats()['pending']
+                if pending_count > 0:
+                    self.logger.info(f"{pending_count} 个待处理文件将在下次启动时继续处理")
+            else:
+                # 取消待处理的文件
+                pending_files = self.processing_queue.get_files_by_status(ProcessingStatus.PENDING)
+                cancelled_count = self.processing_queue.cancel_pending_files()
+                self._release_eta_jobs(pending_files)
+                if cancelled_count > 0:
+                    self.logger.info(f"取消了 {cancelled_count} 个待处理文件")
             
             self.logger.info("文件监控已停止")
             
@@ -133,70 +188,52 @@ class FileMonitor:
             self.logger.error(f"停止文件监控时出错: {str(e)}")
     
     def _on_new_file(self, file_path: str):
-        """新文件回调
+        """新文件回调（在watchdog观察者线程中调用，只登记不等待）
         
         Args:
             file_path: 新文件路径
         """
-        # 等待文件稳定
-        time.sleep(self.stability_check_delay)
-        
         resolved_path = str(Path(file_path).resolve())
+        self.stability_debouncer.add(resolved_path)
 
-        if self._is_file_stable(resolved_path):
-            if self.processing_queue.is_tracking(resolved_path):
-                self.logger.debug(f"文件已在处理队列中，跳过重复添加: {Path(file_path).name}")
-                return
-
-            metadata: Dict[str, Any] = {
-                'detected_time': time.time(),
-                'file_size': Path(resolved_path).stat().st_size if Path(resolved_path).exists() else 0,
-                'source': 'watch_folder'
-            }
-
-            extra_metadata = self.processing_queue.pending_metadata.pop(resolved_path, None)
-            if extra_metadata:
-                metadata.update(extra_metadata)
-
-            if self.processing_queue.add_file(resolved_path, metadata):
-                self.logger.info(f"文件已添加到处理队列: {Path(file_path).name}")
-            else:
-                self.logger.warning(f"文件无法添加到队列: {Path(file_path).name}")
-        else:
-            self.logger.warning(f"文件不稳定，跳过处理: {Path(file_path).name}")
-    
-    def _is_file_stable(self, file_path: str) -> bool:
-        """检查文件是否稳定（大小不再变化）
+        if not self.stability_debouncer.is_running:
+            # 未启动监控（直接调用）时在当前线程等待文件稳定并加入队列
+            self.stability_debouncer.process_until_settled(resolved_path)
 
+    def _on_file_changed(self, file_path: str, closed: bool):
+        """文件修改/写入关闭回调（在watchdog观察者线程中调用）
+        
         Args:
             file_path: 文件路径
-            
-        Returns:
-            文件是否稳定
+            closed: 是否为写入关闭事件
         """
-        try:
-            path = Path(file_path)
-            if not path.exists():
-                return False
-            
-            # 检查文件大小稳定性
-            initial_size = path.stat().st_size
-            time.sleep(self.stability_check_interval)
-            
-            if not path.exists():
-                return False
-            
-            final_size = path.stat().st_size
-            is_stable = (initial_size == final_size and final_size > 0)
-            
-            if not is_stable:
-                self.logger.debug(f"文件大小变化: {initial_size} -> {final_size}")
-            
-            return is_stable
-            
-        except Exception as e:
-            self.logger.error(f"检查文件稳定性失败: {file_path}, 错误: {str(e)}")
-            return False
+        self.stability_debouncer.notify_modified(str(Path(file_path).resolve()), closed)
+
+    def _on_file_stable(self, resolved_path: str):
+        """文件写入完成回调（在稳定性检测线程中调用）：加入处理队列
+        
+        Args:
+            resolved_path: 文件绝对路径
+        """
+        if self.processing_queue.is_tracking(resolved_path):
+            self.logger.debug(f"文件已在处理队列中，跳过重复添加: {Path(resolved_path).name}")
+            return
+
+        metadata: Dict[str, Any] = {
+            'detected_time': time.time(),
+            'file_size': Path(resolved_path).stat().st_size if Path(resolved_path).exists() else 0,
+            'source': 'watch_folder'
+        }
+
+        extra_metadata = self.processing_queue.take_pending_metadata(resolved_path)
+        if extra_metadata:
+            metadata.update(extra_metadata)
+
+        # 检查与加入之间文件可能已被直接入队（甚至已处理完成），不重新加入已结束的文件
+        if self.processing_queue.add_file(resolved_path, metadata, allow_requeue=False):
+            self.logger.info(f"文件已添加到处理队列: {Path(resolved_path).name}")
+        else:
+            self.logger.warning(f"文件无法添加到队列: {Path(resolved_path).name}")
 
     def _load_upload_metadata(self, file_path: Path) -> Tuple[Dict[str, Any], Optional[Path]]:
         """Load sidecar metadata persisted during upload, if present."""
@@ -240,18 +277,30 @@ class FileMonitor:
             # 回调可能不接受扩展参数，退回单参调用
             return self.file_processor_callback(file_path)
 
-    def enqueue_file_for_processing(self, file_path: str, metadata: Dict[str, Any]) -> bool:
-        """外部直接将文件加入处理队列"""
+    def enqueue_file_for_processing(self, file_path: str, metadata: Dict[str, Any],
+                                    priority: Optional[str] = None) -> bool:
+        """外部直接将文件加入处理队列
+
+        Args:
+            file_path: 文件路径
+            metadata: 队列元数据
+            priority: 优先级类别（urgent/high/normal/low），None表示按来源确定
+        """
         path = Path(file_path)
         if not path.exists():
             self.logger.error(f"无法加入队列，文件不存在: {file_path}")
             return False
 
         metadata = metadata or {}
+        if priority:
+            metadata['priority'] = priority
         metadata.setdefault('detected_time', time.time())
         metadata.setdefault('file_size', path.stat().st_size)
         metadata.setdefault('source', 'direct_enqueue')
 
+        # 调用方已确认文件写入完成，监控文件夹不再单独检测并加入该文件
+        self.stability_debouncer.discard(str(path.resolve()))
+
         if self.processing_queue.is_tracking(file_path):
             updated = self.processing_queue.update_file_metadata(file_path, metadata)
             if updated:
@@ -259,16 +308,21 @@ class FileMonitor:
                 return True
             # 如果更新失败，继续尝试重新入队
 
-        added = self.processing_queue.add_file(file_path, metadata)
+        added = self.processing_queue.add_file(file_path, metadata, allow_requeue=False)
         if added:
             self.logger.info(f"文件已通过enqueue加入处理队列: {path.name}")
+        elif self.processing_queue.update_file_metadata(file_path, metadata):
+            # 检查之后监控文件夹同时加入了该文件（可能已处理完成），与已在队列中时一样只更新元数据
+            self.logger.info(f"文件已由监控文件夹加入队列，更新元数据: {path.name}")
+            return True
         else:
             self.logger.warning(f"enqueue加入处理队列失败（可能已存在）: {path.name}")
         return added
     
     def _processing_worker(self):
-        """处理队列工作线程"""
-        self.logger.info("处理工作线程已启动")
+        """处理队列工作线程（可启动多个实例并行消费队列）"""
+        worker_name = threading.current_thread().name
+        self.logger.info(f"处理工作线程已启动: {worker_name}")
         
         while not self._shutdown_event.is_set():
             try:
@@ -285,6 +339,9 @@ class FileMonitor:
                     self.logger.info(f"开始处理文件: {Path(file_path).name}")
                     start_time = time.time()
 
+                    with self._active_lock:
+                        self._active_workers += 1
+
                     try:
                         success = self._invoke_processor(
                             file_path,
@@ -305,27 +362,51 @@ class FileMonitor:
                                 f"(耗时: {processing_time:.2f}秒)"
                             )
                         else:
-                            self.processing_queue.mark_failed(
-                                file_path,
-                                "处理回调返回失败",
-                                retry=True
-                            )
+                            failure = self._get_processor_failure(file_path)
+                            error_message = "处理回调返回失败"
+                            error_class = None
+                            if failure:
+                                error_message = f"阶段 {failure.get('stage')} 失败: {failure.get('error')}"
+                                error_class = failure.get('error_class')
+                            self._handle_failure(file_path, error_message, error_class)
 
                     except Exception as e:
-                        self.processing_queue.mark_failed(
-                            file_path,
-                            f"处理异常: {str(e)}",
-                            retry=True
-                        )
+                        self._handle_failure(file_path, f"处理异常: {str(e)}", classify_exception(e))
                         self.logger.error(f"文件处理异常: {Path(file_path).name}, 错误: {str(e)}")
+
+                    finally:
+                        with self._active_lock:
+                            self._active_workers -= 1
                 
             except Exception as e:
                 if not self._shutdown_event.is_set():
                     self.logger.error(f"处理工作线程异常: {str(e)}")
                     time.sleep(1.0)  # 避免快速循环
         
-        self.logger.info("处理工作线程已停止")
+        self.logger.info(f"处理工作线程已停止: {worker_name}")
     
+    def _get_processor_failure(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """获取音频处理器记录的失败阶段与错误（回调模式下没有该信息）"""
+        get_failure = getattr(self.audio_processor, 'get_failure', None)
+        if get_failure is None:
+            return None
+        failure = get_failure(file_path)
+        return failure if isinstance(failure, dict) else None
+
+    def _handle_failure(self, file_path: str, error_message: str, error_class: Optional[str] = None):
+        """标记失败并按重试策略安排重试；不再重试时丢弃处理器保留的断点
+
+        Args:
+            file_path: 文件路径
+            error_message: 错误消息
+            error_class: 按异常类型判断的错误类别（None表示根据错误消息判断）
+        """
+        if self.processing_queue.mark_failed(file_path, error_message, retry=True, error_class=error_class):
+            return
+        discard_failure = getattr(self.audio_processor, 'discard_failure', None)
+        if discard_failure is not None:
+            discard_failure(file_path)
+
     def get_queue_status(self) -> Dict[str, Any]:
         """获取处理队列状态
         
@@ -336,13 +417,34 @@ class FileMonitor:
             return {"status": "monitoring_not_started"}
         
         stats = self.processing_queue.get_processing_stats()
+
+        with self._active_lock:
+            active_workers = self._active_workers
         
-        return {
+        status = {
             "is_running": self.is_running,
             "watch_folder": str(self.watch_folder),
             "queue_stats": stats,
-            "processing_files": self.processing_queue.get_files_by_status(ProcessingStatus.PROCESSING)
+            "processing_files": self.processing_queue.get_files_by_status(ProcessingStatus.PROCESSING),
+            "retry_schedule": self.processing_queue.get_retry_schedule(),
+            "dead_letters": self.processing_queue.get_dead_letters(),
+            "awaiting_stability": self.stability_debouncer.pending_count(),
+            "workers": {
+                "max_workers": self.max_workers,
+                "active": active_workers,
+                "alive": sum(1 for worker in self.processing_threads if worker.is_alive())
+            }
         }
+
+        resource_limiter = getattr(self.audio_processor, 'resource_limiter', None)
+        if resource_limiter is not None:
+            status["resources"] = resource_limiter.get_status()
+
+        stage_pipeline = getattr(self.audio_processor, 'stage_pipeline', None)
+        if stage_pipeline is not None:
+            status["pipeline"] = stage_pipeline.get_status()
+
+        return status
     
     def add_supported_format(self, extension: str):
         """添加支持的音频格式
@@ -418,12 +520,12 @@ class FileMonitor:
         Returns:
             是否成功取消
         """
-        current_status = self.processing_queue.get_status(file_path)
-        
-        if current_status == ProcessingStatus.PENDING:
-            self.processing_queue.mark_cancelled(file_path)
+        if self.processing_queue.cancel_if_pending(file_path):
+            self._release_eta_jobs([file_path])
             return True
-        elif current_status == ProcessingStatus.PROCESSING:
+
+        current_status = self.processing_queue.get_status(file_path)
+        if current_status == ProcessingStatus.PROCESSING:
             # 注意：无法中断正在处理的文件，只能标记为取消
             self.logger.warning(f"无法中断正在处理的文件: {file_path}")
             return False
@@ -432,6 +534,20 @@ class FileMonitor:
             return False
 
 
+    def _release_eta_jobs(self, file_paths: List[str]):
+        """移除已取消文件在处理时间预估中的排队登记（与AudioProcessor使用相同的任务标识）
+
+        Args:
+            file_paths: 文件路径列表
+        """
+        estimator = getattr(self.audio_processor, 'eta_estimator', None)
+        if estimator is None:
+            return
+        for file_path in file_paths:
+            metadata = self.processing_queue.get_file_metadata(file_path)
+            estimator.finish_job(metadata.get('processing_id') or file_path)
+
+
 def setup_signal_handlers(monitor: FileMonitor):
     """设置信号处理器以优雅关闭监控
     
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3.11
+"""
+处理任务调度
+按优先级类别、预计时长（短任务优先）和等待时间（老化）排序待处理任务，
+并在内容类型之间公平分配处理机会
+"""
+
+import heapq
+import itertools
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# 优先级类别对应的排序偏移（秒，越小越先处理）
+# 偏移远大于常见录音时长，类别间基本按优先级排序，仅等待足够久的任务会被老化提前
+DEFAULT_PRIORITY_OFFSETS = {
+    'urgent': 0,
+    'high': 14400,
+    'normal': 28800,
+    'low': 57600,
+}
+
+# 未显式指定优先级时按来源确定：网页上传 > 监控文件夹 > 批量
+SOURCE_PRIORITY = {
+    'web_upload': 'high',
+    'watch_folder': 'normal',
+    'direct_enqueue': 'normal',
+    'batch': 'low',
+}
+
+DEFAULT_PRIORITY = 'normal'
+
+# 时长未知时按10分钟音频估算
+DEFAULT_EXPECTED_SECONDS = 600
+
+
+def resolve_priority(metadata: Optional[Dict[str, Any]]) -> str:
+    """根据任务元数据确定优先级类别
+
+    优先使用metadata或processing_config中的priority，其次按来源（source）确定。
+
+    Args:
+        metadata: 队列元数据
+
+    Returns:
+        优先级类别名称
+    """
+    metadata = metadata or {}
+    processing_config = metadata.get('processing_config')
+    candidates = [metadata.get('priority')]
+    if isinstance(processing_config, dict):
+        candidates.append(processing_config.get('priority'))
+
+    for candidate in candidates:
+        if isinstance(candidate, str) and candidate.strip().lower() in DEFAULT_PRIORITY_OFFSETS:
+            return candidate.strip().lower()
+    return SOURCE_PRIORITY.get(metadata.get('source'), DEFAULT_PRIORITY)
+
+
+def resolve_content_type(metadata: Optional[Dict[str, Any]]) -> str:
+    """获取任务的内容类型（用于公平分配），未知时返回'default'"""
+    metadata = metadata or {}
+    processing_config = metadata.get('processing_config')
+    if isinstance(processing_config, dict) and processing_config.get('content_type'):
+        return str(processing_config['content_type'])
+    return str(metadata.get('content_type') or 'default')
+
+
+class JobScheduler:
+    """优先级 + 短任务优先 + 老化 + 内容类型公平分配的任务调度器
+
+    任务排序键 = 优先级偏移 + 预计时长 - aging_rate × 已等待时间。
+    由于所有任务的"当前时间"项相同，排序键可化为入队时确定的静态值
+    （偏移 + 预计时长 + aging_rate × 入队时间），因此每个内容类型使用一个普通小顶堆即可。
+    出队时比较各内容类型堆顶，并对最近被调度较多的内容类型加上fair_share_seconds惩罚。
+
+    本类不加锁，由ProcessingQueue在自身锁内调用。
+    """
+
+    def __init__(self, priority_offsets: Optional[Dict[str, float]] = None, aging_rate: float = 1.0,
+                 fair_share_seconds: float = 600, fair_share_window: int = 8):
+        """初始化调度器
+
+        Args:
+            priority_offsets: 各优先级类别的排序偏移（秒）
+            aging_rate: 每等待1秒抵消的排序秒数（防止长任务/低优先级任务饿死）
+            fair_share_seconds: 内容类型在最近窗口内每被调度一次增加的排序惩罚（秒）
+            fair_share_window: 公平分配统计的最近调度次数
+        """
+        self.priority_offsets = {**DEFAULT_PRIORITY_OFFSETS, **(priority_offsets or {})}
+        self.aging_rate = aging_rate
+        self.fair_share_seconds = fair_share_seconds
+        self._heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._counter = itertools.count()
+        self._recent: deque = deque(maxlen=max(int(fair_share_window), 1))
+
+    def sort_key(self, priority: str, expected_seconds: Optional[float], enqueued_at: float) -> float:
+        """计算任务的静态排序键"""
+        offset = self.priority_offsets.get(priority, self.priority_offsets[DEFAULT_PRIORITY])
+        expected = expected_seconds if expected_seconds and expected_seconds > 0 else DEFAULT_EXPECTED_SECONDS
+        return offset + expected + self.aging_rate * enqueued_at
+
+    def push(self, job_id: str, priority: str, content_type: str,
+             expected_seconds: Optional[float], enqueued_at: float):
+        """加入任务
+
+        Args:
+            job_id: 任务标识（文件路径）
+            priority: 优先级类别
+            content_type: 内容类型
+            expected_seconds: 预计时长（秒，通常为音频时长）
+            enqueued_at: 入队时间戳（time.time()）
+        """
+        entry = (self.sort_key(priority, expected_seconds, enqueued_at), next(self._counter), job_id)
+        heapq.heappush(self._heaps.setdefault(content_type, []), entry)
+
+    def pop(self, is_live: Callable[[str], bool]) -> Optional[str]:
+        """取出下一个应处理的任务
+
+        Args:
+            is_live: 判断任务是否仍待处理（已取消/移除的残留条目会被丢弃）
+
+        Returns:
+            任务标识，没有待处理任务时返回None
+        """
+        recent = Counter(self._recent)
+        best_type, best_score = None, None
+
+        for content_type, heap in list(self._heaps.items()):
+            while heap and not is_live(heap[0][2]):
+                heapq.heappop(heap)
+            if not heap:
+                del self._heaps[content_type]
+                continue
+            score = heap[0][0] + self.fair_share_seconds * recent[content_type]
+            if best_score is None or score < best_score:
+                best_type, best_score = content_type, score
+
+        if best_type is None:
+            return None
+
+        _, _, job_id = heapq.heappop(self._heaps[best_type])
+        if not self._heaps[best_type]:
+            del self._heaps[best_type]
+        self._recent.append(best_type)
+        return job_id
+
+    def clear(self):
+        """清空所有任务"""
+        self._heaps.clear()
+
+    def __len__(self) -> int:
+        """堆中条目数（含尚未清理的残留条目）"""
+        return sum(len(heap) for heap in self._heaps.values())
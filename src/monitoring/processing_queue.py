@@ -4,15 +4,29 @@
 负责管理文件处理队列和状态跟踪
 """
 
-import queue
+import heapq
 import threading
 import logging
-from typing import Dict, Optional, List, Set
+from typing import Dict, Optional, List, Set, TYPE_CHECKING
 from enum import Enum
 from datetime import datetime
 import time
 from pathlib import Path
 
+from .job_scheduler import JobScheduler, resolve_content_type, resolve_priority
+from .retry_policy import RetryPolicy, classify_error
+try:
+    from ..utils.audio_probe import probe_duration
+except ImportError:
+    # 兼容性处理：当作为顶级模块运行时
+    from utils.audio_probe import probe_duration
+
+if TYPE_CHECKING:
+    from ..storage.queue_store import QueueStore
+
+# 处理被进程中断后最多处理的次数（处理失败的重试次数由RetryPolicy决定）
+MAX_ATTEMPTS = 3
+
 
 class ProcessingStatus(Enum):
     """处理状态枚举"""
@@ -26,18 +40,151 @@ class ProcessingStatus(Enum):
 class ProcessingQueue:
     """处理队列管理器"""
 
-    def __init__(self, max_size: int = 100):
+    def __init__(self, max_size: int = 100, store: Optional['QueueStore'] = None,
+                 scheduler: Optional[JobScheduler] = None, retry_policy: Optional[RetryPolicy] = None):
         """初始化处理队列
 
         Args:
-            max_size: 队列最大大小
+            max_size: 队列最大大小（待处理文件数，0表示不限制）
+            store: 持久化存储（可选）。提供时所有状态变化写入存储，启动时恢复未完成的任务
+            scheduler: 任务调度器（默认按优先级/短任务优先/老化/内容类型公平分配）
+            retry_policy: 失败重试策略（默认按错误类别指数退避）
         """
-        self.queue = queue.Queue(maxsize=max_size)
+        self.max_size = max_size
         self.processing_status: Dict[str, ProcessingStatus] = {}
         self.processing_metadata: Dict[str, Dict] = {}
         self.pending_metadata: Dict[str, Dict] = {}
         self.lock = threading.Lock()
+        self._available = threading.Condition(self.lock)
         self.logger = logging.getLogger('project_bach.processing_queue')
+        self.store = store
+        self.scheduler = scheduler or JobScheduler()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 等待重试的任务：(下次尝试时间戳, 文件路径) 小顶堆，到期后交给调度器
+        self._delayed: List = []
+
+        if store is not None:
+            # 恢复的任务数可能超过max_size，全部重新入队
+            with self.lock:
+                for file_path in self._restore():
+                    self._schedule(file_path)
+
+    @property
+    def is_persistent(self) -> bool:
+        """队列状态是否持久化"""
+        return self.store is not None
+
+    def _restore(self) -> List[str]:
+        """从存储恢复任务状态，返回需要重新入队的文件（按原入队顺序）"""
+        interrupted = set(self.store.recover_interrupted())
+        restored = []
+
+        for job in self.store.load():
+            file_path = job['file_path']
+            status = ProcessingStatus(job['status'])
+            retry_count = job['retry_count']
+            entry = {
+                'added_time': datetime.fromtimestamp(job['added_at']),
+                'metadata': job['metadata'],
+                'retry_count': retry_count,
+                'enqueued_at': job['added_at'],
+            }
+            if job['last_error']:
+                entry['last_error'] = job['last_error']
+            if job['error_class']:
+                entry['error_class'] = job['error_class']
+            if job['dead_letter']:
+                entry['dead_letter'] = True
+            if status == ProcessingStatus.PENDING and job['next_attempt_at'] and file_path not in interrupted:
+                entry['next_attempt_time'] = job['next_attempt_at']
+
+            if status == ProcessingStatus.PENDING:
+                if not Path(file_path).exists():
+                    status = ProcessingStatus.FAILED
+                    entry['last_error'] = '恢复时文件已不存在'
+                    self.store.set_status(file_path, status.value, last_error=entry['last_error'])
+                elif file_path in interrupted and retry_count >= MAX_ATTEMPTS:
+                    # 反复在处理中导致进程退出的任务不再自动重试
+                    status = ProcessingStatus.FAILED
+                    self.store.set_status(file_path, status.value)
+                else:
+                    if file_path in interrupted:
+                        entry['recovered'] = True
+                    entry.update(self._scheduling_info(file_path, job['metadata']))
+                    restored.append(file_path)
+
+            self.processing_status[file_path] = status
+            self.processing_metadata[file_path] = entry
+
+        if restored:
+            self.logger.info(
+                f"从持久化队列恢复 {len(restored)} 个待处理任务"
+                f"（其中 {len(interrupted & set(restored))} 个处理被中断）"
+            )
+        return restored
+
+    @staticmethod
+    def _scheduling_info(file_path: str, metadata: Dict, probe: bool = True) -> Dict:
+        """确定任务的优先级、内容类型和预计时长（音频时长）
+
+        Args:
+            file_path: 文件路径
+            metadata: 任务元数据
+            probe: 元数据中没有有效时长时是否探测音频（调用方已在锁外探测过时传False）
+        """
+        expected_seconds = metadata.get('audio_duration')
+        if not isinstance(expected_seconds, (int, float)) or expected_seconds <= 0:
+            expected_seconds = probe_duration(Path(file_path)) if probe else None
+        return {
+            'priority': resolve_priority(metadata),
+            'content_type': resolve_content_type(metadata),
+            'expected_seconds': expected_seconds,
+        }
+
+    def _schedule(self, file_path: str):
+        """将待处理文件交给调度器并唤醒等待的worker（调用方需持有锁）
+
+        等待重试的文件先放入延迟堆，到期后再交给调度器。
+        """
+        entry = self.processing_metadata[file_path]
+        next_attempt_time = entry.get('next_attempt_time')
+        if next_attempt_time and next_attempt_time > time.time():
+            heapq.heappush(self._delayed, (next_attempt_time, file_path))
+            self._available.notify()
+            return
+
+        entry.pop('next_attempt_time', None)
+        self.scheduler.push(
+            file_path,
+            entry['priority'],
+            entry['content_type'],
+            entry['expected_seconds'],
+            entry['enqueued_at'],
+        )
+        self._available.notify()
+
+    def _promote_due_retries(self) -> Optional[float]:
+        """将到期的重试任务交给调度器（调用方需持有锁）
+
+        Returns:
+            下一个重试任务到期前的秒数，没有等待中的重试时返回None
+        """
+        now = time.time()
+        while self._delayed and self._delayed[0][0] <= now:
+            attempt_time, file_path = heapq.heappop(self._delayed)
+            entry = self.processing_metadata.get(file_path)
+            # 等待期间被取消/移除的任务直接丢弃
+            if entry is None or self.processing_status.get(file_path) != ProcessingStatus.PENDING:
+                continue
+            # 过期的堆条目：任务已被重新加入或重新安排了重试时间，以当前条目为准
+            if entry.get('next_attempt_time') != attempt_time:
+                continue
+            entry.pop('next_attempt_time', None)
+            self._schedule(file_path)
+        return self._delayed[0][0] - now if self._delayed else None
+
+    def _pending_count(self) -> int:
+        return sum(1 for status in self.processing_status.values() if status == ProcessingStatus.PENDING)
 
     def register_metadata(self, file_path: str, metadata: Dict) -> None:
         """预注册文件的处理元数据，当文件稍后入队时合并使用。"""
@@ -45,16 +192,32 @@ class ProcessingQueue:
             normalized_path = str(Path(file_path).resolve())
             self.pending_metadata[normalized_path] = dict(metadata)
 
-    def add_file(self, file_path: str, metadata: Dict = None) -> bool:
+    def take_pending_metadata(self, file_path: str) -> Optional[Dict]:
+        """取出并移除文件预注册的处理元数据（加锁，避免与register_metadata/add_file竞争）
+
+        Args:
+            file_path: 文件绝对路径
+
+        Returns:
+            预注册的元数据，没有时返回None
+        """
+        with self.lock:
+            return self.pending_metadata.pop(file_path, None)
+
+    def add_file(self, file_path: str, metadata: Dict = None, allow_requeue: bool = True) -> bool:
         """添加文件到队列
 
         Args:
             file_path: 文件路径
             metadata: 可选的元数据
+            allow_requeue: 是否允许重新加入已结束（完成/失败/取消）的文件
 
         Returns:
             是否成功添加
         """
+        # 探测音频时长只读文件头/调用ffprobe，在锁外完成
+        expected_seconds = probe_duration(Path(file_path))
+
         with self.lock:
             # 防止重复处理
             if file_path in self.processing_status:
@@ -62,27 +225,40 @@ class ProcessingQueue:
                 if current_status in [ProcessingStatus.PENDING, ProcessingStatus.PROCESSING]:
                     self.logger.warning(f"文件已在队列中或正在处理: {file_path}")
                     return False
+                if not allow_requeue:
+                    self.logger.debug(f"文件已处理过，不重新加入队列: {file_path}")
+                    return False
 
-            try:
-                self.queue.put(file_path, block=False)
-                merged_metadata = dict(metadata or {})
-                if file_path in self.pending_metadata:
-                    merged_metadata = {**self.pending_metadata.pop(file_path), **merged_metadata}
-
-                self.processing_status[file_path] = ProcessingStatus.PENDING
-                self.processing_metadata[file_path] = {
-                    'added_time': datetime.now(),
-                    'metadata': merged_metadata,
-                    'retry_count': 0
-                }
-
-                self.logger.info(f"文件已添加到处理队列: {file_path}")
-                return True
-
-            except queue.Full:
+            if self.max_size > 0 and self._pending_count() >= self.max_size:
                 self.logger.error(f"队列已满，无法添加文件: {file_path}")
                 return False
 
+            merged_metadata = dict(metadata or {})
+            if file_path in self.pending_metadata:
+                merged_metadata = {**self.pending_metadata.pop(file_path), **merged_metadata}
+            if expected_seconds:
+                merged_metadata.setdefault('audio_duration', expected_seconds)
+
+            self.processing_status[file_path] = ProcessingStatus.PENDING
+            self.processing_metadata[file_path] = {
+                'added_time': datetime.now(),
+                'metadata': merged_metadata,
+                'retry_count': 0,
+                'enqueued_at': time.time(),
+                # 时长已在锁外探测，探测失败时不在持锁期间再次调用ffprobe
+                **self._scheduling_info(file_path, merged_metadata, probe=False),
+            }
+            if self.store is not None:
+                self.store.enqueue(file_path, merged_metadata)
+            self._schedule(file_path)
+
+            entry = self.processing_metadata[file_path]
+            self.logger.info(
+                f"文件已添加到处理队列: {file_path} "
+                f"(优先级: {entry['priority']}, 类型: {entry['content_type']})"
+            )
+            return True
+
     def get_file(self, timeout: float = 1.0) -> Optional[str]:
         """从队列获取文件
 
@@ -92,18 +268,36 @@ class ProcessingQueue:
         Returns:
             文件路径或None
         """
-        try:
-            file_path = self.queue.get(timeout=timeout)
-            with self.lock:
+        deadline = time.monotonic() + timeout
+
+        def is_live(path: str) -> bool:
+            # 调度器中可能残留已取消/已移除/已被其他worker领取的条目，直接跳过
+            return self.processing_status.get(path) == ProcessingStatus.PENDING
+
+        with self._available:
+            while True:
+                next_retry_in = self._promote_due_retries()
+                file_path = self.scheduler.pop(is_live)
+                if file_path is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    if next_retry_in is not None:
+                        remaining = min(remaining, next_retry_in)
+                    self._available.wait(remaining)
+                    continue
+
+                if self.store is not None and not self.store.claim(file_path):
+                    self.logger.debug(f"任务已被其他进程领取或取消，跳过: {file_path}")
+                    continue
+
                 self.processing_status[file_path] = ProcessingStatus.PROCESSING
                 if file_path in self.processing_metadata:
                     self.processing_metadata[file_path]['start_time'] = datetime.now()
+                break
 
-            self.logger.debug(f"从队列获取文件: {file_path}")
-            return file_path
-
-        except queue.Empty:
-            return None
+        self.logger.debug(f"从队列获取文件: {file_path}")
+        return file_path
 
     def get_file_metadata(self, file_path: str) -> Dict:
         """获取队列中文件的元数据"""
@@ -132,6 +326,8 @@ class ProcessingQueue:
                 metadata.update(extra_metadata)
             else:
                 entry['metadata'] = extra_metadata.copy()
+            if self.store is not None:
+                self.store.update_metadata(file_path, entry['metadata'])
             return True
 
     def mark_completed(self, file_path: str, result_data: Dict = None):
@@ -148,37 +344,97 @@ class ProcessingQueue:
                     'completed_time': datetime.now(),
                     'result_data': result_data or {}
                 })
+            if self.store is not None:
+                self.store.set_status(file_path, ProcessingStatus.COMPLETED.value)
 
         self.logger.info(f"文件处理完成: {file_path}")
 
-    def mark_failed(self, file_path: str, error_message: str = None, retry: bool = False):
+    def mark_failed(self, file_path: str, error_message: str = None, retry: bool = False,
+                    error_class: Optional[str] = None) -> bool:
         """标记文件处理失败
 
         Args:
             file_path: 文件路径
             error_message: 错误消息
-            retry: 是否重新加入队列重试
+            retry: 是否按重试策略延迟后重新加入队列
+            error_class: 错误类别（None表示根据错误消息判断）
+
+        Returns:
+            是否已安排重试（False表示任务最终失败，重试用尽时进入死信列表）
         """
+        error_class = error_class or classify_error(error_message)
+
         with self.lock:
-            if file_path in self.processing_metadata:
-                metadata = self.processing_metadata[file_path]
+            metadata = self.processing_metadata.get(file_path)
+            if metadata is not None:
                 metadata['retry_count'] = metadata.get('retry_count', 0) + 1
                 metadata['last_error'] = error_message
+                metadata['error_class'] = error_class
                 metadata['failed_time'] = datetime.now()
 
-                # 检查是否应该重试
-                if retry and metadata['retry_count'] < 3:
-                    try:
-                        self.queue.put(file_path, block=False)
-                        self.processing_status[file_path] = ProcessingStatus.PENDING
-                        self.logger.warning(f"文件处理失败，重新加入队列 (重试 {metadata['retry_count']}/3): {file_path}")
-                        return
-                    except queue.Full:
-                        self.logger.error(f"队列已满，无法重试: {file_path}")
+                delay = self.retry_policy.next_delay(error_class, metadata['retry_count']) if retry else None
+                if delay is not None:
+                    metadata['next_attempt_time'] = time.time() + delay
+                    self.processing_status[file_path] = ProcessingStatus.PENDING
+                    if self.store is not None:
+                        self.store.set_status(
+                            file_path, ProcessingStatus.PENDING.value,
+                            retry_count=metadata['retry_count'], last_error=error_message,
+                            error_class=error_class, next_attempt_at=metadata['next_attempt_time']
+                        )
+                    self._schedule(file_path)
+                    self.logger.warning(
+                        f"文件处理失败 [{error_class}]，{delay:.0f}秒后重试 "
+                        f"({metadata['retry_count']}/{self.retry_policy.max_attempts(error_class)}): {file_path}"
+                    )
+                    return True
+
+                # 请求了重试但已用尽（或错误不可重试）的任务进入死信列表
+                if retry:
+                    metadata['dead_letter'] = True
 
             self.processing_status[file_path] = ProcessingStatus.FAILED
+            if self.store is not None and metadata is not None:
+                self.store.set_status(
+                    file_path, ProcessingStatus.FAILED.value,
+                    retry_count=metadata['retry_count'], last_error=error_message,
+                    error_class=error_class, dead_letter=int(bool(metadata.get('dead_letter')))
+                )
 
-        self.logger.error(f"文件处理失败: {file_path}, 错误: {error_message}")
+        self.logger.error(f"文件处理失败 [{error_class}]: {file_path}, 错误: {error_message}")
+        return False
+
+    def get_dead_letters(self) -> List[Dict]:
+        """获取重试用尽（或错误不可重试）的失败任务
+
+        Returns:
+            死信任务列表
+        """
+        with self.lock:
+            return [
+                {
+                    'file_path': file_path,
+                    'attempts': entry.get('retry_count', 0),
+                    'error_class': entry.get('error_class'),
+                    'last_error': entry.get('last_error'),
+                    'failed_time': entry['failed_time'].isoformat() if entry.get('failed_time') else None,
+                }
+                for file_path, entry in self.processing_metadata.items()
+                if entry.get('dead_letter') and self.processing_status.get(file_path) == ProcessingStatus.FAILED
+            ]
+
+    def get_retry_schedule(self) -> List[Dict]:
+        """获取等待重试的任务及其下次尝试时间"""
+        with self.lock:
+            return [
+                {
+                    'file_path': file_path,
+                    'attempts': self.processing_metadata.get(file_path, {}).get('retry_count', 0),
+                    'next_attempt_in': round(max(ready_at - time.time(), 0.0), 1),
+                }
+                for ready_at, file_path in sorted(self._delayed)
+                if self.processing_status.get(file_path) == ProcessingStatus.PENDING
+            ]
 
     def mark_cancelled(self, file_path: str):
         """标记文件处理被取消
@@ -190,9 +446,33 @@ class ProcessingQueue:
             self.processing_status[file_path] = ProcessingStatus.CANCELLED
             if file_path in self.processing_metadata:
                 self.processing_metadata[file_path]['cancelled_time'] = datetime.now()
+            if self.store is not None:
+                self.store.set_status(file_path, ProcessingStatus.CANCELLED.value)
 
         self.logger.info(f"文件处理被取消: {file_path}")
 
+    def cancel_if_pending(self, file_path: str) -> bool:
+        """仅当文件仍处于待处理状态时取消（原子操作，避免与worker领取竞争）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            是否成功取消
+        """
+        with self.lock:
+            if self.processing_status.get(file_path) != ProcessingStatus.PENDING:
+                return False
+            if self.store is not None and not self.store.set_status(
+                    file_path, ProcessingStatus.CANCELLED.value, expected_status=ProcessingStatus.PENDING.value):
+                return False
+            self.processing_status[file_path] = ProcessingStatus.CANCELLED
+            if file_path in self.processing_metadata:
+                self.processing_metadata[file_path]['cancelled_time'] = datetime.now()
+
+        self.logger.info(f"文件处理被取消: {file_path}")
+        return True
+
     def get_status(self, file_path: str) -> ProcessingStatus:
         """获取文件处理状态
 
@@ -223,7 +503,7 @@ class ProcessingQueue:
         Returns:
             队列是否为空
         """
-        return self.queue.empty()
+        return self.get_queue_size() == 0
 
     def get_queue_size(self) -> int:
         """获取队列大小
@@ -231,7 +511,8 @@ class ProcessingQueue:
         Returns:
             队列中待处理的文件数量
         """
-        return self.queue.qsize()
+        with self.lock:
+            return self._pending_count()
 
     def get_all_status(self) -> Dict[str, str]:
         """获取所有文件的处理状态
@@ -271,6 +552,8 @@ class ProcessingQueue:
                 del self.processing_status[file_path]
                 if file_path in self.processing_metadata:
                     del self.processing_metadata[file_path]
+            if self.store is not None:
+                self.store.delete(completed_files)
 
             self.logger.info(f"清理了 {len(completed_files)} 个已完成的文件记录")
             return len(completed_files)
@@ -283,17 +566,10 @@ class ProcessingQueue:
         """
         cancelled_count = 0
 
-        # 清空队列
-        try:
-            while not self.queue.empty():
-                file_path = self.queue.get_nowait()
-                self.mark_cancelled(file_path)
-                cancelled_count += 1
-        except queue.Empty:
-            pass
-
-        # 标记所有待处理状态的文件为取消
+        # 清空调度器并标记所有待处理状态的文件为取消
         with self.lock:
+            self.scheduler.clear()
+            self._delayed.clear()
             pending_files = [
                 path for path, status in self.processing_status.items()
                 if status == ProcessingStatus.PENDING
@@ -304,6 +580,8 @@ class ProcessingQueue:
                 if file_path in self.processing_metadata:
                     self.processing_metadata[file_path]['cancelled_time'] = datetime.now()
                 cancelled_count += 1
+            if self.store is not None:
+                self.store.cancel_all_pending()
 
         if cancelled_count > 0:
             self.logger.info(f"取消了 {cancelled_count} 个待处理文件")
@@ -329,7 +607,11 @@ class ProcessingQueue:
             for status in self.processing_status.values():
                 stats[status.value] += 1
 
-            stats['queue_size'] = self.queue.qsize()
+            stats['queue_size'] = stats['pending']
+            stats['retry_waiting'] = sum(
+                1 for _, file_path in self._delayed
+                if self.processing_status.get(file_path) == ProcessingStatus.PENDING
+            )
 
             return stats
 
@@ -353,8 +635,10 @@ class ProcessingQueue:
                 del self.processing_metadata[file_path]
                 removed = True
 
-            # 注意：无法直接从queue.Queue中移除特定项目
-            # 如果需要这个功能，可能需要使用不同的数据结构
+            if self.store is not None:
+                self.store.delete([file_path])
+
+            # 调度器中的残留条目会在get_file时因状态缺失被跳过
 
             if removed:
                 self.logger.info(f"文件已从队列状态中移除: {file_path}")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3.11
+"""
+失败重试策略
+按错误类别（限流/网络/资源/永久性错误）决定是否重试、最多尝试次数和指数退避延迟
+"""
+
+import random
+import re
+from typing import Any, Dict, Optional
+
+
+# 错误类别识别规则（按顺序匹配错误消息，不区分大小写；ASCII模式下\b不把中文当作单词字符，
+# 因此"git推送失败"中的git也能匹配）
+# 临时性错误优先：消息同时含有超时/限流等提示和"invalid"等字样时按可重试处理
+ERROR_PATTERNS = (
+    ('rate_limit', re.compile(r'\b429\b|rate.?limit|too many requests|\bquota\b|限流', re.IGNORECASE | re.ASCII)),
+    ('network', re.compile(
+        r'timed? ?out|timeout|超时|\bconnection\b|连接|\bnetwork\b|网络|\btemporar|\bunavailable\b|'
+        r'\b50[234]\b|\bgit\b|\bpush\b|\bremote\b|\bssl\b',
+        re.IGNORECASE | re.ASCII)),
+    ('resource', re.compile(r'\bmemory\b|内存|\bresources?\b|资源|\bbusy\b|\blocked\b', re.IGNORECASE | re.ASCII)),
+    ('permanent', re.compile(
+        r'no such file|\bnot found\b|不存在|\bunsupported\b|不支持|\binvalid\b|无效|permission denied|'
+        r'转录失败或结果为空',
+        re.IGNORECASE | re.ASCII)),
+)
+
+# 按异常类型识别错误类别（匹配异常类及其基类的名称，覆盖处理流水线实际会抛出的异常）
+# OpenRouter调用抛出的APIException按HTTP状态码判断（见_classify_exception_type）
+EXCEPTION_TYPES = (
+    ('network', frozenset({
+        'Timeout', 'ConnectionError',                                   # requests（OpenRouter请求）
+        'TimeoutExpired', 'CalledProcessError',                         # subprocess（git发布）
+        'TimeoutError',
+    })),
+    ('resource', frozenset({'MemoryError'})),
+    ('permanent', frozenset({'FileNotFoundError', 'PermissionError', 'IsADirectoryError', 'NotADirectoryError'})),
+)
+
+DEFAULT_ERROR_CLASS = 'default'
+
+# 各错误类别的默认策略：max_attempts为总处理次数（含首次），0表示不重试
+DEFAULT_POLICIES: Dict[str, Dict[str, float]] = {
+    'permanent': {'max_attempts': 1, 'base_seconds': 0, 'max_seconds': 0},
+    'rate_limit': {'max_attempts': 6, 'base_seconds': 60, 'max_seconds': 1800},
+    'network': {'max_attempts': 5, 'base_seconds': 30, 'max_seconds': 900},
+    'resource': {'max_attempts': 3, 'base_seconds': 120, 'max_seconds': 1800},
+    DEFAULT_ERROR_CLASS: {'max_attempts': 3, 'base_seconds': 30, 'max_seconds': 600},
+}
+
+
+def classify_error(error_message: Optional[str]) -> str:
+    """根据错误消息判断错误类别
+
+    Args:
+        error_message: 错误消息
+
+    Returns:
+        错误类别名称
+    """
+    if not error_message:
+        return DEFAULT_ERROR_CLASS
+    for error_class, pattern in ERROR_PATTERNS:
+        if pattern.search(error_message):
+            return error_class
+    return DEFAULT_ERROR_CLASS
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP状态码（APIException的status_code或requests异常的response.status_code）"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def _classify_exception_type(error: BaseException) -> Optional[str]:
+    status_code = _status_code(error)
+    if status_code == 429:
+        return 'rate_limit'
+    if status_code is not None and (status_code == 408 or status_code >= 500):
+        return 'network'
+
+    type_names = {cls.__name__ for cls in type(error).__mro__}
+    for error_class, names in EXCEPTION_TYPES:
+        if type_names & names:
+            return error_class
+
+    if status_code is not None and 400 <= status_code < 500:
+        return 'permanent'
+    return None
+
+
+def classify_exception(error: Optional[BaseException]) -> str:
+    """根据异常类型判断错误类别，无法识别时回退到按错误消息判断
+
+    处理阶段常把底层异常包装成普通Exception重新抛出，因此沿__cause__/__context__链
+    依次检查被包装的原始异常。
+
+    Args:
+        error: 异常对象
+
+    Returns:
+        错误类别名称
+    """
+    if error is None:
+        return DEFAULT_ERROR_CLASS
+
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        error_class = _classify_exception_type(current)
+        if error_class is not None:
+            return error_class
+        current = current.__cause__ or current.__context__
+
+    return classify_error(str(error))
+
+
+class RetryPolicy:
+    """按错误类别计算重试延迟的指数退避策略"""
+
+    def __init__(self, policies: Optional[Dict[str, Dict[str, Any]]] = None, jitter: float = 0.1):
+        """初始化重试策略
+
+        Args:
+            policies: 各错误类别的策略覆盖（max_attempts / base_seconds / max_seconds）
+            jitter: 延迟随机抖动比例（避免多个任务同时重试）
+        """
+        self.policies = {name: dict(policy) for name, policy in DEFAULT_POLICIES.items()}
+        for name, policy in (policies or {}).items():
+            if isinstance(policy, dict):
+                self.policies.setdefault(name, dict(DEFAULT_POLICIES[DEFAULT_ERROR_CLASS])).update(policy)
+        self.jitter = jitter
+
+    def _policy(self, error_class: str) -> Dict[str, float]:
+        return self.policies.get(error_class, self.policies[DEFAULT_ERROR_CLASS])
+
+    def max_attempts(self, error_class: str) -> int:
+        """错误类别允许的最多处理次数（含首次）"""
+        return int(self._policy(error_class)['max_attempts'])
+
+    def next_delay(self, error_class: str, attempts: int) -> Optional[float]:
+        """计算下一次重试前的等待时间
+
+        Args:
+            error_class: 错误类别
+            attempts: 已失败的处理次数（≥1）
+
+        Returns:
+            等待秒数；超过最多处理次数或错误不可重试时返回None
+        """
+        policy = self._policy(error_class)
+        if attempts >= int(policy['max_attempts']):
+            return None
+        delay = min(policy['base_seconds'] * (2 ** max(attempts - 1, 0)), policy['max_seconds'])
+        if self.jitter and delay > 0:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3.11
+"""
+文件稳定性检测
+在独立线程中按定时器堆检查新文件是否写入完成，watchdog观察者线程只登记事件、不等待
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class FileStabilityDebouncer:
+    """新文件稳定性检测器
+
+    文件被创建后等待quiet_seconds内没有新的修改事件，再按check_interval检查大小和修改时间，
+    连续两次一致（且非空）即认为写入完成；收到写入关闭事件（close-write）且之后没有新的修改时
+    立即检查并视为完成。所有待检查文件共用一个按到期时间排序的小顶堆，
+    修改事件只更新时间戳，不向堆中重复加入条目。
+    """
+
+    def __init__(self, on_stable: Callable[[str], None], quiet_seconds: float = 2.0,
+                 check_interval: float = 1.0):
+        """初始化检测器
+
+        Args:
+            on_stable: 文件稳定后的回调（在检测线程中调用）
+            quiet_seconds: 最后一次修改事件后等待的静默时间（秒）
+            check_interval: 两次大小检查之间的间隔（秒）
+        """
+        self.on_stable = on_stable
+        self.quiet_seconds = quiet_seconds
+        self.check_interval = check_interval
+        self.logger = logging.getLogger('project_bach.stability_debouncer')
+
+        self._condition = threading.Condition()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """启动检测线程"""
+        with self._condition:
+            if self.is_running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='FileStabilityDebouncer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """停止检测线程（尚未稳定的文件被丢弃）"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                self.logger.warning("稳定性检测线程未能及时停止")
+        with self._condition:
+            self._pending.clear()
+            self._heap.clear()
+        self._thread = None
+
+    def add(self, file_path: str):
+        """登记新文件（创建/移入事件）"""
+        with self._condition:
+            now = time.monotonic()
+            entry = self._pending.get(file_path)
+            if entry is None:
+                entry = {'last_event': now, 'closed': False, 'signature': None, 'due': None}
+                self._pending[file_path] = entry
+                self._schedule(file_path, entry, now + self.quiet_seconds)
+            else:
+                entry['last_event'] = now
+                entry['closed'] = False
+
+    def notify_modified(self, file_path: str, closed: bool = False):
+        """登记已跟踪文件的修改或写入关闭事件（未跟踪的文件忽略）
+
+        Args:
+            file_path: 文件路径
+            closed: 是否为写入关闭事件
+        """
+        with self._condition:
+            entry = self._pending.get(file_path)
+            if entry is None:
+                return
+            entry['last_event'] = time.monotonic()
+            entry['closed'] = closed
+            if closed:
+                self._schedule(file_path, entry, entry['last_event'])
+
+    def discard(self, file_path: str) -> bool:
+        """停止等待文件稳定（文件已由其他途径加入处理队列）
+
+        Returns:
+            文件此前是否正在等待稳定
+        """
+        with self._condition:
+            return self._pending.pop(file_path, None) is not None
+
+    def pending_count(self) -> int:
+        """尚未稳定的文件数"""
+        with self._condition:
+            return len(self._pending)
+
+    def is_pending(self, file_path: str) -> bool:
+        """文件是否正在等待稳定"""
+        with self._condition:
+            return file_path in self._pending
+
+    def _schedule(self, file_path: str, entry: Dict[str, Any], due: float):
+        """安排检查时间（调用方持有锁）；同一文件只有最新安排的堆条目有效"""
+        entry['due'] = due
+        heapq.heappush(self._heap, (due, next(self._counter), file_path))
+        self._condition.notify()
+
+    def _pop_due(self, now: float) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """取出一个已到期且有效的检查（调用方持有锁）"""
+        while self._heap and self._heap[0][0] <= now:
+            due, _, file_path = heapq.heappop(self._heap)
+            entry = self._pending.get(file_path)
+            if entry is None or entry['due'] != due:
+                continue
+            quiet_until = entry['last_event'] + self.quiet_seconds
+            if not entry['closed'] and quiet_until > now:
+                # 等待期间又有修改事件，推迟到静默期结束
+                self._schedule(file_path, entry, quiet_until)
+                continue
+            return file_path, entry, due
+        return None
+
+    def _check(self, file_path: str, entry: Dict[str, Any], due: float) -> bool:
+        """检查文件大小与修改时间，返回文件是否已稳定并从跟踪中移除"""
+        try:
+            stat = Path(file_path).stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            signature = None
+
+        with self._condition:
+            if self._pending.get(file_path) is not entry or entry['due'] != due:
+                # 检查期间收到了新事件，以新的安排为准
+                return False
+            if signature is None:
+                self._pending.pop(file_path)
+                self.logger.warning(f"文件已不存在，停止等待: {Path(file_path).name}")
+                return False
+            if signature[0] > 0 and (entry['closed'] or signature == entry['signature']):
+                self._pending.pop(file_path)
+                return True
+            if signature[0] == 0 and entry['signature'] == signature:
+                self._pending.pop(file_path)
+                self.logger.warning(f"文件不稳定（大小为0），跳过处理: {Path(file_path).name}")
+                return False
+            if entry['signature'] is not None and signature != entry['signature']:
+                self.logger.debug(f"文件大小变化: {entry['signature'][0]} -> {signature[0]}")
+            entry['signature'] = signature
+            entry['closed'] = False
+            self._schedule(file_path, entry, time.monotonic() + self.check_interval)
+            return False
+
+    def _dispatch(self, file_path: str):
+        try:
+            self.on_stable(file_path)
+        except Exception as e:
+            self.logger.error(f"处理稳定文件回调时出错: {Path(file_path).name}, 错误: {str(e)}")
+
+    def process_due(self) -> int:
+        """在当前线程处理所有已到期的检查（检测线程未启动时使用）
+
+        Returns:
+            本次判定为稳定的文件数
+        """
+        stable_count = 0
+        while True:
+            with self._condition:
+                due_check = self._pop_due(time.monotonic())
+            if due_check is None:
+                return stable_count
+            if self._check(*due_check):
+                stable_count += 1
+                self._dispatch(due_check[0])
+
+    def process_until_settled(self, file_path: str):
+        """在当前线程处理检查，直到文件判定稳定或被放弃（检测线程未启动时使用，会阻塞等待）
+
+        Args:
+            file_path: 文件路径
+        """
+        while True:
+            self.process_due()
+            with self._condition:
+                if file_path not in self._pending or not self._heap:
+                    return
+                wait_seconds = self._heap[0][0] - time.monotonic()
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+
+    def _run(self):
+        """检测线程：等待堆顶到期后检查文件"""
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopping:
+                        return
+                    due_check = self._pop_due(time.monotonic())
+                    if due_check is not None:
+                        break
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+
+            if self._check(*due_check):
+                self._dispatch(due_check[0])
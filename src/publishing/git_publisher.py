@@ -27,6 +27,8 @@ class GitPublisher:
         self.public_dir = self.project_root / "public"
         self.output_dir = self.project_root / "data" / "output"
         self.output_public_dir = self.output_dir / "public"
+        # 最近一次发布失败的原因（供调用方按异常类型判断是否重试）
+        self.last_error: Optional[BaseException] = None
         
         # 初始化模板引擎
         if config_manager:
@@ -47,8 +49,9 @@ class GitPublisher:
             privacy_level: 隐私级别 ('public' 或 'private')
             
         Returns:
-            是否发布成功
+            是否发布成功（失败原因见last_error）
         """
+        self.last_error = None
         try:
             self.logger.info(f"开始发布结果文件: {result_filename}")
             
@@ -72,6 +75,7 @@ class GitPublisher:
                         source_file = self.output_dir / f"{result_filename}.html"
                         if not source_file.exists():
                             self.logger.error(f"结果文件不存在: {result_filename}")
+                            self.last_error = FileNotFoundError(f"结果文件不存在: {result_filename}")
                             return False
             
             # 复制文件到public目录
@@ -97,6 +101,7 @@ class GitPublisher:
             
         except Exception as e:
             self.logger.error(f"发布结果文件失败: {result_filename}, 错误: {str(e)}")
+            self.last_error = e
             return False
     
     def _sync_static_resources(self):
@@ -274,6 +279,7 @@ class GitPublisher:
             )
             if result.returncode != 0:
                 self.logger.error(f"git add失败: {result.stderr}")
+                self._record_git_failure(result)
                 return False
             
             # 检查是否有变更
@@ -297,6 +303,7 @@ class GitPublisher:
             )
             if result.returncode != 0:
                 self.logger.error(f"git commit失败: {result.stderr}")
+                self._record_git_failure(result)
                 return False
             
             self.logger.info(f"Git commit成功: {commit_message}")
@@ -310,17 +317,26 @@ class GitPublisher:
             )
             if result.returncode != 0:
                 self.logger.error(f"git push失败: {result.stderr}")
+                self._record_git_failure(result)
                 return False
             
             self.logger.info("Git push成功，GitHub Actions将自动部署")
             return True
             
-        except subprocess.TimeoutExpired:
+        except subprocess.TimeoutExpired as e:
             self.logger.error("Git操作超时")
+            self.last_error = e
             return False
         except Exception as e:
             self.logger.error(f"Git操作异常: {str(e)}")
+            self.last_error = e
             return False
+
+    def _record_git_failure(self, result: subprocess.CompletedProcess):
+        """记录失败的git命令（与check=True时抛出的异常相同）"""
+        self.last_error = subprocess.CalledProcessError(
+            result.returncode, result.args, output=result.stdout, stderr=result.stderr
+        )
     
     def check_git_status(self) -> Dict[str, Any]:
         """检查Git仓库状态
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3.11
+"""
+处理阶段断点存储
+每个任务一个目录，manifest.json记录各阶段的输入/配置指纹与输出位置，
+失败后重试时跳过输入和配置均未变化的已完成阶段；任务处理成功后删除其断点
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def compute_hash(value: Any) -> str:
+    """计算可JSON序列化数据的稳定哈希（键排序，无法序列化的值按str处理）"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """阶段断点存储
+
+    阶段输出写入{job}/{stage}.json；已由TranscriptStorage写入磁盘的文本（原始/匿名化转录）
+    不重复保存，manifest中只记录文件路径与内容哈希，读取时校验文件未被修改。
+    """
+
+    def __init__(self, checkpoint_dir: str = './data/output/private/checkpoints', retention_days: Optional[float] = 7):
+        """初始化断点存储
+
+        Args:
+            checkpoint_dir: 断点根目录
+            retention_days: 断点保留天数（按最后更新时间），None表示永久保留
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.logger = logging.getLogger('project_bach.checkpoint_store')
+        self._lock = threading.Lock()
+
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        if retention_days is not None:
+            self.purge_expired(retention_days * 86400)
+
+    @staticmethod
+    def job_key(audio_path: Path) -> str:
+        """任务断点目录名：文件名 + 完整路径哈希（不同目录下的同名文件互不干扰）"""
+        path_hash = hashlib.sha1(str(Path(audio_path).resolve()).encode('utf-8')).hexdigest()[:8]
+        return f"{Path(audio_path).stem}-{path_hash}"
+
+    def _job_dir(self, job_key: str) -> Path:
+        return self.checkpoint_dir / job_key
+
+    @staticmethod
+    def _write_json(path: Path, data: Any):
+        """先写临时文件再替换，进程中途退出不会留下半个文件"""
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def load_manifest(self, job_key: str) -> Dict[str, Any]:
+        """读取任务manifest（不存在或损坏时返回空manifest）"""
+        manifest_path = self._job_dir(job_key) / MANIFEST_NAME
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"断点manifest损坏，已忽略: {manifest_path} ({e})")
+            manifest = None
+
+        if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+            return {'version': MANIFEST_VERSION, 'stages': {}}
+        return manifest
+
+    def save_stage(self, job_key: str, stage: str, input_hash: str, config_hash: str,
+                   outputs: Dict[str, Any], files: Optional[Dict[str, str]] = None):
+        """保存阶段输出
+
+        Args:
+            job_key: 任务标识（job_key()的返回值）
+            stage: 阶段名称
+            input_hash: 阶段输入指纹
+            config_hash: 阶段配置指纹
+            outputs: 阶段输出（output key -> 值）
+            files: 可复用的已有文本文件（output key -> 路径），文件内容与输出一致时只记录路径
+        """
+        reused = {}
+        for key, path in (files or {}).items():
+            value = outputs.get(key)
+            if not isinstance(value, str):
+                continue
+            try:
+                content = Path(path).read_text(encoding='utf-8')
+            except OSError:
+                continue
+            if content == value:
+                reused[key] = {'path': str(path), 'sha256': _text_hash(content)}
+
+        stored = {key: value for key, value in outputs.items() if key not in reused}
+        job_dir = self._job_dir(job_key)
+
+        with self._lock:
+            job_dir.mkdir(parents=True, exist_ok=True)
+            self._write_json(job_dir / f"{stage}.json", stored)
+
+            manifest = self.load_manifest(job_key)
+            manifest['updated_at'] = time.time()
+            manifest['stages'][stage] = {
+                'input_hash': input_hash,
+                'config_hash': config_hash,
+                'completed_at': time.time(),
+                'outputs_file': f"{stage}.json",
+                'files': reused,
+            }
+            self._write_json(job_dir / MANIFEST_NAME, manifest)
+
+        self.logger.debug(f"已保存阶段断点: {job_key}/{stage}")
+
+    def load_stage(self, job_key: str, stage: str, input_hash: str, config_hash: str) -> Optional[Dict[str, Any]]:
+        """读取阶段输出
+
+        Args:
+            job_key: 任务标识
+            stage: 阶段名称
+            input_hash: 当前阶段输入指纹
+            config_hash: 当前阶段配置指纹
+
+        Returns:
+            阶段输出；没有断点、指纹不一致或输出文件缺失/被修改时返回None
+        """
+        entry = self.load_manifest(job_key)['stages'].get(stage)
+        if entry is None:
+            return None
+        if entry.get('input_hash') != input_hash:
+            self.logger.info(f"阶段输入已变化，不使用断点: {job_key}/{stage}")
+            return None
+        if entry.get('config_hash') != config_hash:
+            self.logger.info(f"阶段配置已变化，不使用断点: {job_key}/{stage}")
+            return None
+
+        try:
+            with open(self._job_dir(job_key) / entry['outputs_file'], 'r', encoding='utf-8') as f:
+                outputs = json.load(f)
+            for key, file_info in entry.get('files', {}).items():
+                content = Path(file_info['path']).read_text(encoding='utf-8')
+                if _text_hash(content) != file_info['sha256']:
+                    self.logger.info(f"断点引用的文件已被修改，不使用断点: {file_info['path']}")
+                    return None
+                outputs[key] = content
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"读取阶段断点失败: {job_key}/{stage} ({e})")
+            return None
+
+        return outputs
+
+    def delete(self, job_key: str):
+        """删除任务的全部断点"""
+        with self._lock:
+            shutil.rmtree(self._job_dir(job_key), ignore_errors=True)
+
+    def purge_expired(self, older_than_seconds: float) -> int:
+        """删除最后更新时间早于指定秒数的任务断点
+
+        Returns:
+            删除的任务数
+        """
+        cutoff = time.time() - older_than_seconds
+        removed = 0
+        for job_dir in self.checkpoint_dir.iterdir():
+            if not job_dir.is_dir():
+                continue
+            manifest_path = job_dir / MANIFEST_NAME
+            try:
+                updated_at = manifest_path.stat().st_mtime
+            except OSError:
+                updated_at = job_dir.stat().st_mtime
+            if updated_at < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                removed += 1
+        if removed:
+            self.logger.info(f"已清理过期阶段断点: {removed} 个任务")
+        return removed
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3.11
+"""
+人名映射持久化存储
+基于SQLite（WAL模式）保存全局人名映射与按文档的映射，
+多线程/多进程可同时访问，全局映射在内存中只保留有界的LRU缓存
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS global_mappings (
+    original TEXT PRIMARY KEY,
+    fake TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS document_mappings (
+    document_id TEXT NOT NULL,
+    original TEXT NOT NULL,
+    fake TEXT NOT NULL,
+    PRIMARY KEY (document_id, original)
+);
+CREATE INDEX IF NOT EXISTS idx_document_mappings_fake ON document_mappings (document_id, fake);
+"""
+
+
+class NameMappingStore:
+    """人名映射存储
+
+    全局映射保证同一真实人名在所有文档中对应同一虚拟人名，且虚拟人名互不重复；
+    文档映射记录每个文档实际出现的人名，用于按文档还原。
+    """
+
+    def __init__(self, db_path: str = './data/name_mappings.db', cache_size: int = 10000,
+                 busy_timeout_ms: int = 5000):
+        """初始化存储
+
+        Args:
+            db_path: SQLite数据库路径
+            cache_size: 全局映射内存缓存条目上限
+            busy_timeout_ms: 其他进程持有写锁时的等待时间（毫秒）
+        """
+        self.db_path = Path(db_path)
+        self.cache_size = cache_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.logger = logging.getLogger('project_bach.name_mapping_store')
+
+        self._local = threading.local()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程的连接（SQLite连接不能跨线程共享）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _cache_get(self, original: str) -> Optional[str]:
+        with self._cache_lock:
+            fake = self._cache.get(original)
+            if fake is not None:
+                self._cache.move_to_end(original)
+            return fake
+
+    def _cache_put(self, original: str, fake: str):
+        with self._cache_lock:
+            self._cache[original] = fake
+            self._cache.move_to_end(original)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_global(self, original: str) -> Optional[str]:
+        """查询真实人名的全局虚拟人名"""
+        fake = self._cache_get(original)
+        if fake is not None:
+            return fake
+        row = self._connection().execute(
+            'SELECT fake FROM global_mappings WHERE original = ?', (original,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._cache_put(original, row[0])
+        return row[0]
+
+    def get_or_create(self, original: str, generate: Callable[[], str], max_attempts: int = 20) -> str:
+        """获取真实人名的全局虚拟人名，不存在时生成并保存
+
+        多个线程/进程同时为同一人名生成时以先写入者为准；生成的虚拟人名已被占用时重新生成。
+
+        Args:
+            original: 真实人名
+            generate: 虚拟人名生成函数
+            max_attempts: 虚拟人名冲突时的最大重试次数
+
+        Returns:
+            虚拟人名
+
+        Raises:
+            RuntimeError: 多次生成的虚拟人名均已被占用
+        """
+        fake = self.get_global(original)
+        if fake is not None:
+            return fake
+
+        conn = self._connection()
+        for _ in range(max_attempts):
+            candidate = generate()
+            try:
+                with conn:
+                    conn.execute(
+                        'INSERT INTO global_mappings (original, fake, created_at) VALUES (?, ?, ?)',
+                        (original, candidate, time.time())
+                    )
+                self._cache_put(original, candidate)
+                return candidate
+            except sqlite3.IntegrityError:
+                # 人名已被其他线程/进程写入，或虚拟人名已被占用
+                fake = self.get_global(original)
+                if fake is not None:
+                    return fake
+        raise RuntimeError(f"无法为人名生成不重复的虚拟人名: {original}")
+
+    def global_mapping(self) -> Dict[str, str]:
+        """获取全部全局映射"""
+        return dict(self._connection().execute('SELECT original, fake FROM global_mappings').fetchall())
+
+    def clear_global(self):
+        """清除全局映射（文档映射保留）"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM global_mappings')
+        with self._cache_lock:
+            self._cache.clear()
+
+    def store_document(self, document_id: str, mapping: Dict[str, str]):
+        """保存（覆盖）文档的人名映射"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM document_mappings WHERE document_id = ?', (document_id,))
+            conn.executemany(
+                'INSERT INTO document_mappings (document_id, original, fake) VALUES (?, ?, ?)',
+                [(document_id, original, fake) for original, fake in mapping.items()]
+            )
+
+    def get_document(self, document_id: str) -> Dict[str, str]:
+        """获取文档的人名映射（原始人名 -> 虚拟人名）"""
+        return dict(self._connection().execute(
+            'SELECT original, fake FROM document_mappings WHERE document_id = ?', (document_id,)
+        ).fetchall())
+
+    def reverse_document(self, document_id: str) -> Dict[str, str]:
+        """获取文档的反向映射（虚拟人名 -> 原始人名），走(document_id, fake)索引"""
+        return dict(self._connection().execute(
+            'SELECT fake, original FROM document_mappings WHERE document_id = ? ORDER BY fake', (document_id,)
+        ).fetchall())
+
+    def list_documents(self) -> List[str]:
+        """列出有映射记录的文档"""
+        return [row[0] for row in self._connection().execute(
+            'SELECT DISTINCT document_id FROM document_mappings ORDER BY document_id'
+        )]
+
+    def delete_document(self, document_id: str):
+        """删除文档的人名映射"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM document_mappings WHERE document_id = ?', (document_id,))
+
+    def clear_documents(self):
+        """删除所有文档映射"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM document_mappings')
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
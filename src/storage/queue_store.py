@@ -0,0 +1,216 @@
+#!/usr/bin/env python3.11
+"""
+处理队列持久化存储
+基于SQLite（WAL模式）记录队列中每个文件的状态与处理元数据（含processing_config），
+进程重启或崩溃后可恢复待处理和处理中断的任务
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    file_path TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    started_at REAL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL,
+    error_class TEXT,
+    dead_letter INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, added_at);
+"""
+
+# 旧版本数据库缺少的列
+_MIGRATIONS = {
+    'next_attempt_at': 'ALTER TABLE jobs ADD COLUMN next_attempt_at REAL',
+    'error_class': 'ALTER TABLE jobs ADD COLUMN error_class TEXT',
+    'dead_letter': 'ALTER TABLE jobs ADD COLUMN dead_letter INTEGER NOT NULL DEFAULT 0',
+}
+
+# set_status可同时更新的列
+_STATUS_FIELDS = ('retry_count', 'last_error', 'next_attempt_at', 'error_class', 'dead_letter')
+
+
+class QueueStore:
+    """处理队列存储
+
+    状态值与ProcessingStatus的取值一致（pending/processing/completed/failed/cancelled）。
+    领取任务通过带状态条件的UPDATE完成，多个worker/进程同时领取同一任务时只有一个成功。
+    """
+
+    def __init__(self, db_path: str = './data/processing_queue.db', busy_timeout_ms: int = 5000,
+                 retention_days: Optional[float] = 7):
+        """初始化存储
+
+        Args:
+            db_path: SQLite数据库路径
+            busy_timeout_ms: 其他进程持有写锁时的等待时间（毫秒）
+            retention_days: 已结束任务（完成/失败/取消）的保留天数，None表示永久保留
+        """
+        self.db_path = Path(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.logger = logging.getLogger('project_bach.queue_store')
+        self._local = threading.local()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            for column, statement in _MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+        if retention_days is not None:
+            self.purge_finished(retention_days * 86400)
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程的连接（SQLite连接不能跨线程共享）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=self.busy_timeout_ms / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _dumps(metadata: Optional[Dict[str, Any]]) -> str:
+        return json.dumps(metadata or {}, ensure_ascii=False, default=str)
+
+    def enqueue(self, file_path: str, metadata: Optional[Dict[str, Any]] = None, retry_count: int = 0):
+        """写入（或覆盖已结束的）待处理任务"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO jobs (file_path, status, metadata, retry_count, last_error, '
+                'added_at, started_at, updated_at, next_attempt_at, error_class, dead_letter) '
+                'VALUES (?, ?, ?, ?, NULL, ?, NULL, ?, NULL, NULL, 0)',
+                (file_path, 'pending', self._dumps(metadata), retry_count, now, now)
+            )
+
+    def claim(self, file_path: str) -> bool:
+        """原子领取待处理任务（pending -> processing）
+
+        Returns:
+            是否领取成功（任务已被领取、取消或删除时返回False）
+        """
+        now = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'processing', started_at = ?, updated_at = ? "
+                "WHERE file_path = ? AND status = 'pending'",
+                (now, now, file_path)
+            )
+        return cursor.rowcount == 1
+
+    def set_status(self, file_path: str, status: str, expected_status: Optional[str] = None,
+                   **fields: Any) -> bool:
+        """更新任务状态
+
+        Args:
+            file_path: 文件路径
+            status: 新状态
+            expected_status: 仅当当前状态为该值时更新
+            **fields: 同时更新的列（retry_count / last_error / next_attempt_at / error_class / dead_letter）
+
+        Returns:
+            是否更新了记录
+        """
+        unknown = set(fields) - set(_STATUS_FIELDS)
+        if unknown:
+            raise ValueError(f"不支持更新的列: {', '.join(sorted(unknown))}")
+
+        sql = 'UPDATE jobs SET status = ?, updated_at = ?'
+        params: List[Any] = [status, time.time()]
+        for column, value in fields.items():
+            sql += f', {column} = ?'
+            params.append(value)
+        sql += ' WHERE file_path = ?'
+        params.append(file_path)
+        if expected_status is not None:
+            sql += ' AND status = ?'
+            params.append(expected_status)
+
+        with self._connection() as conn:
+            cursor = conn.execute(sql, params)
+        return cursor.rowcount == 1
+
+    def cancel_all_pending(self) -> int:
+        """取消所有待处理任务"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE status = 'pending'",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def update_metadata(self, file_path: str, metadata: Dict[str, Any]):
+        """覆盖任务的处理元数据"""
+        with self._connection() as conn:
+            conn.execute(
+                'UPDATE jobs SET metadata = ?, updated_at = ? WHERE file_path = ?',
+                (self._dumps(metadata), time.time(), file_path)
+            )
+
+    def delete(self, file_paths: Iterable[str]):
+        """删除任务记录"""
+        with self._connection() as conn:
+            conn.executemany('DELETE FROM jobs WHERE file_path = ?', [(path,) for path in file_paths])
+
+    def purge_finished(self, older_than_seconds: float) -> int:
+        """删除结束时间早于指定秒数的已结束任务"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed', 'cancelled') AND updated_at < ?",
+                (time.time() - older_than_seconds,)
+            )
+        return cursor.rowcount
+
+    def recover_interrupted(self) -> List[str]:
+        """将上次运行中断时处于处理中的任务放回待处理（重试次数加一）
+
+        只应在没有其他进程正在消费同一数据库时于启动阶段调用。
+
+        Returns:
+            被恢复的文件路径列表
+        """
+        conn = self._connection()
+        with conn:
+            rows = conn.execute("SELECT file_path FROM jobs WHERE status = 'processing'").fetchall()
+            conn.execute(
+                "UPDATE jobs SET status = 'pending', retry_count = retry_count + 1, started_at = NULL, "
+                "last_error = '处理被中断（进程重启）', updated_at = ? WHERE status = 'processing'",
+                (time.time(),)
+            )
+        return [row['file_path'] for row in rows]
+
+    def load(self) -> List[Dict[str, Any]]:
+        """按入队时间读取全部任务"""
+        jobs = []
+        for row in self._connection().execute('SELECT * FROM jobs ORDER BY added_at'):
+            job = dict(row)
+            try:
+                job['metadata'] = json.loads(job['metadata'] or '{}')
+            except ValueError:
+                self.logger.warning(f"任务元数据损坏，已忽略: {job['file_path']}")
+                job['metadata'] = {}
+            jobs.append(job)
+        return jobs
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -54,6 +54,23 @@ class TranscriptStorage:
         """
         return self._save_transcript(filename, content, "anonymized", privacy_level)
     
+    def get_transcript_path(self, filename: str, suffix: str, privacy_level: str = 'public') -> Path:
+        """获取转录文本文件路径
+        
+        Args:
+            filename: 文件名（不包含扩展名）
+            suffix: 后缀标识 ('raw' 或 'anonymized')
+            privacy_level: 隐私级别 ('public' 或 'private')
+            
+        Returns:
+            转录文件路径（文件不一定存在）
+        """
+        if privacy_level == 'private':
+            target_folder = self.private_transcripts_folder
+        else:
+            target_folder = self.public_transcripts_folder
+        return target_folder / f"{filename}_{suffix}.txt"
+    
     def _save_transcript(self, filename: str, content: str, suffix: str, privacy_level: str = 'public') -> str:
         """内部方法：保存转录文本
         
@@ -70,12 +87,7 @@ class TranscriptStorage:
             OSError: 文件保存失败
         """
         # 根据隐私级别选择存储文件夹
-        if privacy_level == 'private':
-            target_folder = self.private_transcripts_folder
-        else:
-            target_folder = self.public_transcripts_folder
-            
-        file_path = target_folder / f"{filename}_{suffix}.txt"
+        file_path = self.get_transcript_path(filename, suffix, privacy_level)
         
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
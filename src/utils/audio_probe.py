@@ -0,0 +1,159 @@
+#!/usr/bin/env python3.11
+"""
+音频信息探测
+WAV/FLAC直接读取文件头计算时长，其他格式通过ffprobe获取，均不解码音频数据；
+结果按路径+大小+修改时间缓存
+"""
+
+import logging
+import struct
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+logger = logging.getLogger('project_bach.audio_probe')
+
+_CACHE_SIZE = 1024
+_duration_cache: "OrderedDict[tuple, float]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _wav_duration(f) -> Optional[float]:
+    """解析RIFF/WAVE文件头：data块大小 / fmt块中的字节率"""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] not in (b'RIFF', b'RF64') or header[8:12] != b'WAVE':
+        return None
+
+    byte_rate = None
+    data_size_64 = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'ds64':
+            # RF64: 真实的data块大小保存在ds64块中
+            ds64 = f.read(chunk_size)
+            data_size_64 = struct.unpack('<Q', ds64[8:16])[0]
+            chunk_size = 0
+        elif chunk_id == b'fmt ':
+            fmt = f.read(chunk_size)
+            byte_rate = struct.unpack('<I', fmt[8:12])[0]
+            chunk_size = 0
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            size = data_size_64 if chunk_size == 0xFFFFFFFF and data_size_64 else chunk_size
+            return size / byte_rate
+        f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def _flac_duration(f) -> Optional[float]:
+    """解析FLAC STREAMINFO块：总采样数 / 采样率"""
+    if f.read(4) != b'fLaC':
+        return None
+    block_header = f.read(4)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        return None
+    info = f.read(34)
+    if len(info) < 34:
+        return None
+    packed = int.from_bytes(info[10:18], 'big')
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def read_header_duration(audio_path: Path) -> Optional[float]:
+    """只读取文件头获取时长（支持WAV/RF64/FLAC）
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        时长（秒），格式不支持或文件头无法解析时返回None
+    """
+    parser = {'.wav': _wav_duration, '.wave': _wav_duration, '.flac': _flac_duration}.get(audio_path.suffix.lower())
+    if parser is None:
+        return None
+    try:
+        with open(audio_path, 'rb') as f:
+            duration = parser(f)
+    except (OSError, struct.error, IndexError) as e:
+        logger.debug(f"解析音频文件头失败: {audio_path.name} - {e}")
+        return None
+    return duration if duration and duration > 0 else None
+
+
+def _ffprobe_duration(audio_path: Path, timeout: float) -> Optional[float]:
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        str(audio_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except FileNotFoundError:
+        logger.debug("ffprobe未安装，无法获取音频时长")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.warning(f"ffprobe超时: {audio_path}")
+        return None
+
+    if result.returncode != 0:
+        logger.debug(f"ffprobe失败: {result.stderr.strip()}")
+        return None
+
+    try:
+        duration = float(result.stdout.strip())
+    except ValueError:
+        return None
+    return duration if duration > 0 else None
+
+
+def probe_duration(audio_path: Path, timeout: float = 15) -> Optional[float]:
+    """获取音频时长（秒）
+
+    优先解析文件头，失败时调用ffprobe；同一文件（路径+大小+修改时间不变）只探测一次。
+
+    Args:
+        audio_path: 音频文件路径
+        timeout: ffprobe超时时间（秒）
+
+    Returns:
+        时长（秒），无法获取时返回None
+    """
+    audio_path = Path(audio_path)
+    try:
+        stat = audio_path.stat()
+    except OSError:
+        return None
+    identity = (str(audio_path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    with _cache_lock:
+        if identity in _duration_cache:
+            _duration_cache.move_to_end(identity)
+            return _duration_cache[identity]
+
+    duration = read_header_duration(audio_path)
+    if duration is None:
+        duration = _ffprobe_duration(audio_path, timeout)
+
+    if duration is not None:
+        with _cache_lock:
+            _duration_cache[identity] = duration
+            while len(_duration_cache) > _CACHE_SIZE:
+                _duration_cache.popitem(last=False)
+    return duration
+
+
+def clear_duration_cache():
+    """清空时长缓存"""
+    with _cache_lock:
+        _duration_cache.clear()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3.11
+"""
+内容寻址磁盘缓存
+以内容哈希为键将JSON可序列化的结果持久化到磁盘，支持按总大小和存活时间淘汰
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """基于JSON文件的磁盘缓存
+
+    每个条目存为 <目录>/<键前两位>/<键>.json，命中时刷新文件修改时间，
+    淘汰时按修改时间从旧到新删除（近似LRU）。
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 100, max_age_days: float = 30,
+                 name: str = 'cache'):
+        """初始化磁盘缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_size_mb: 缓存总大小上限（MB），<=0表示不限制
+            max_age_days: 条目最长存活天数，<=0表示不过期
+            name: 缓存名称（用于日志）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb and max_size_mb > 0 else 0
+        self.max_age_seconds = max_age_days * 86400 if max_age_days and max_age_days > 0 else 0
+        self.name = name
+        self.logger = logging.getLogger('project_bach.disk_cache')
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._size_bytes: Optional[int] = None  # 首次写入时扫描目录得到
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """根据任意JSON可序列化的组成部分计算缓存键
+
+        Args:
+            *parts: 参与哈希的字段（模型名、prompt、参数等）
+
+        Returns:
+            sha256十六进制字符串
+        """
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的值，未命中或已过期时返回None
+        """
+        path = self._path_for(key)
+        try:
+            stat = path.stat()
+            if self.max_age_seconds and time.time() - stat.st_mtime > self.max_age_seconds:
+                self._remove(path, stat.st_size)
+                self._record(hit=False)
+                return None
+
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+
+            # 刷新访问时间，供淘汰时近似LRU排序
+            os.utime(path, None)
+            self._record(hit=True)
+            return entry.get('value')
+
+        except FileNotFoundError:
+            self._record(hit=False)
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"[{self.name}] 缓存条目损坏，已忽略: {path.name} ({e})")
+            self._remove(path)
+            self._record(hit=False)
+            return None
+
+    def set(self, key: str, value: Any):
+        """写入缓存（原子替换），必要时淘汰旧条目
+
+        Args:
+            key: 缓存键
+            value: JSON可序列化的值
+        """
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            data = json.dumps({'created': time.time(), 'value': value}, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            self.logger.warning(f"[{self.name}] 值无法序列化，跳过缓存: {e}")
+            return
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"[{self.name}] 写入缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            else:
+                self._size_bytes += len(data.encode('utf-8')) - old_size
+            over_budget = self.max_size_bytes and self._size_bytes > self.max_size_bytes
+
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """淘汰过期条目，并在超出大小上限时从最旧条目开始删除
+
+        Returns:
+            删除的条目数
+        """
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob('*/*.json'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            entries.sort()
+            now = time.time()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+
+            for mtime, size, path in entries:
+                expired = self.max_age_seconds and now - mtime > self.max_age_seconds
+                over_budget = self.max_size_bytes and total > self.max_size_bytes
+                if not expired and not over_budget:
+                    continue
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            self._size_bytes = total
+            self._evictions += removed
+
+        if removed:
+            self.logger.info(f"[{self.name}] 缓存淘汰 {removed} 个条目，当前大小 {total / 1024 / 1024:.1f}MB")
+        return removed
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for path in self.cache_dir.glob('*/*.json'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._size_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            命中/未命中/淘汰次数、命中率与当前大小
+        """
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else None,
+                'evictions': self._evictions,
+                'size_mb': round(self._size_bytes / 1024 / 1024, 2),
+                'max_size_mb': round(self.max_size_bytes / 1024 / 1024, 2) if self.max_size_bytes else None,
+            }
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _remove(self, path: Path, size: int = None):
+        try:
+            if size is None:
+                size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._size_bytes is not None:
+                self._size_bytes = max(self._size_bytes - size, 0)
+
+    def _scan_size(self) -> int:
+        total = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
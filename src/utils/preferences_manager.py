@@ -21,6 +21,7 @@ class PreferencesManager:
 
     负责管理用户的处理偏好，包括：
     - Post-processing选项（匿名化、摘要、思维导图、说话人分离）
+    - 转录选项（enable_vad：语音活动检测，只转录语音区间）
     - Subcategory的创建和配置
     - 差异化存储（只保存与默认值不同的部分）
     - 继承机制（系统默认 → content_type默认 → subcategory覆盖）
@@ -327,6 +327,8 @@ class RateLimitedAPIClient:
         self.api_client = api_client
         self.rate_limiter = rate_limiter
         self.logger = logging.getLogger('project_bach.rate_limited_client')
+        # 检查-等待-记录需串行执行，否则并发请求可能同时通过检查后一起超限
+        self._admission_lock = Lock()
     
     def generate_content(self, model_type: str, *args, **kwargs):
         """生成内容（带限流）
@@ -338,13 +340,14 @@ class RateLimitedAPIClient:
         # 获取实际的模型名称（从API客户端配置中）
         model_name = self.api_client.models.get(model_type, '')
         
-        # 检查并等待
-        can_request, reason = self.rate_limiter.can_make_request('free', model_name)
-        if not can_request:
-            self.rate_limiter.wait_if_needed('free')
-        
-        # 记录请求
-        self.rate_limiter.record_request('free', model_name)
+        with self._admission_lock:
+            # 检查并等待
+            can_request, reason = self.rate_limiter.can_make_request('free', model_name)
+            if not can_request:
+                self.rate_limiter.wait_if_needed('free')
+            
+            # 记录请求
+            self.rate_limiter.record_request('free', model_name)
         
         try:
             # 调用原始API
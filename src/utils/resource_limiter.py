@@ -0,0 +1,122 @@
+#!/usr/bin/env python3.11
+"""
+重型资源并发限制器
+为转录模型、pyannote pipeline和LLM调用分别提供独立的并发上限
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator
+
+
+class ResourceLimiter:
+    """按资源名称限制并发的信号量集合
+
+    多个处理线程并行时，每类重型资源（模型显存、pipeline、外部API）
+    各自有独立的并发上限，互不阻塞。
+    """
+
+    DEFAULT_LIMITS = {
+        'transcription': 1,  # Whisper模型（共享GPU/统一内存）
+        'diarization': 1,    # pyannote pipeline
+        'llm': 2,            # OpenRouter并发请求
+    }
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        """初始化资源限制器
+
+        Args:
+            limits: 资源名称到并发上限的映射，未配置的资源使用默认值
+        """
+        self.logger = logging.getLogger('project_bach.resource_limiter')
+        self._lock = threading.Lock()
+        self._limits: Dict[str, int] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._in_use: Dict[str, int] = {}
+        self._waiting: Dict[str, int] = {}
+
+        merged = dict(self.DEFAULT_LIMITS)
+        merged.update(limits or {})
+        for resource, limit in merged.items():
+            self._register(resource, limit)
+
+    def _register(self, resource: str, limit: int):
+        """注册资源（上限至少为1）"""
+        limit = max(int(limit), 1)
+        self._limits[resource] = limit
+        self._semaphores[resource] = threading.BoundedSemaphore(limit)
+        self._in_use[resource] = 0
+        self._waiting[resource] = 0
+
+    @contextmanager
+    def slot(self, resource: str) -> Iterator[None]:
+        """占用一个资源槽位，未注册的资源不做限制
+
+        Args:
+            resource: 资源名称 ('transcription', 'diarization', 'llm')
+        """
+        semaphore = self._semaphores.get(resource)
+        if semaphore is None:
+            yield
+            return
+
+        with self._lock:
+            self._waiting[resource] += 1
+        try:
+            semaphore.acquire()
+        finally:
+            with self._lock:
+                self._waiting[resource] -= 1
+
+        with self._lock:
+            self._in_use[resource] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_use[resource] -= 1
+            semaphore.release()
+
+    def get_limit(self, resource: str) -> Optional[int]:
+        """获取资源并发上限"""
+        return self._limits.get(resource)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """获取各资源的占用情况
+
+        Returns:
+            资源名称到 {limit, in_use, waiting} 的映射
+        """
+        with self._lock:
+            return {
+                resource: {
+                    'limit': self._limits[resource],
+                    'in_use': self._in_use[resource],
+                    'waiting': self._waiting[resource],
+                }
+                for resource in self._limits
+            }
+
+
+# 全局单例实例（同一进程内的FileMonitor和YouTube后台线程共享资源上限）
+_resource_limiter: Optional[ResourceLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_resource_limiter(limits: Optional[Dict[str, int]] = None) -> ResourceLimiter:
+    """获取资源限制器的全局单例
+
+    Args:
+        limits: 首次创建时使用的并发上限配置
+
+    Returns:
+        ResourceLimiter实例
+    """
+    global _resource_limiter
+
+    with _limiter_lock:
+        if _resource_limiter is None:
+            _resource_limiter = ResourceLimiter(limits)
+
+    return _resource_limiter
@@ -302,6 +302,9 @@ def create_app(config=None):
             whisper_model = request.form.get('whisper_model', 'whisper-tiny')
             # MLX模型使用简单的模型名称，无需前缀
 
+            # 队列优先级（留空时网页上传默认high）
+            priority = request.form.get('priority', '').strip().lower()
+
             # 解析Post-Processing选项（复用偏好默认值作为fallback）
             def _checkbox_to_bool(field_name: str, default: bool = False) -> bool:
                 raw_value = request.form.get(field_name)
@@ -338,6 +341,7 @@ def create_app(config=None):
                 'enable_summary': _checkbox_to_bool('enable_summary'),
                 'enable_mindmap': _checkbox_to_bool('enable_mindmap'),
                 'enable_diarization': _checkbox_to_bool('enable_diarization'),
+                'enable_vad': _checkbox_to_bool('enable_vad'),
             }
 
             # 处理上传 - 使用清晰的参数分离
@@ -351,6 +355,7 @@ def create_app(config=None):
                     'audio_language': audio_language,
                     'description': request.form.get('description', ''),
                     'whisper_model': whisper_model,
+                    **({'priority': priority} if priority else {}),
                     **post_processing_overrides,
                 }
             )
@@ -397,7 +402,8 @@ def create_app(config=None):
                 metadata={
                     'tags': request.form.get('tags', ''),
                     'description': request.form.get('description', ''),
-                    'force_whisper': force_whisper
+                    'force_whisper': force_whisper,
+                    'duration': request.form.get('video_duration', '')
                 },
                 privacy_level=privacy_level,
                 force_whisper=force_whisper
@@ -436,8 +442,11 @@ def create_app(config=None):
         """获取所有活跃处理状态API"""
         try:
             service = app.config['PROCESSING_SERVICE']
-            active_sessions = service.list_active_sessions()
-            return jsonify(create_api_response(success=True, data={'active_sessions': active_sessions}))
+            data = {'active_sessions': service.list_active_sessions()}
+            global_container = get_global_container()
+            if global_container is not None:
+                data['eta'] = global_container.get_eta_estimator().get_stats()
+            return jsonify(create_api_response(success=True, data=data))
         except Exception as e:
             logger.error(f"Processing status API error: {e}")
             return jsonify(create_api_response(success=False, error='Failed to get status')), 500
@@ -457,6 +466,20 @@ def create_app(config=None):
             logger.error(f"Single status API error: {e}")
             return jsonify(create_api_response(success=False, error='Failed to get status')), 500
 
+    @app.route('/api/health/ready')
+    def api_health_ready():
+        """模型预热就绪状态API（预热未结束时返回503）"""
+        try:
+            global_container = get_global_container()
+            if global_container is None:
+                status = {'enabled': False, 'ready': True, 'warm': [], 'models': {}}
+            else:
+                status = global_container.get_warmup_status()
+            return jsonify(create_api_response(success=True, data=status)), 200 if status['ready'] else 503
+        except Exception as e:
+            logger.error(f"Readiness API error: {e}")
+            return jsonify(create_api_response(success=False, error='Failed to get readiness')), 500
+
     @app.route('/api/categories')
     def api_categories():
         """内容分类API"""
@@ -13,11 +13,13 @@ from typing import Optional, Dict, Any
 
 from werkzeug.utils import secure_filename
 
+from ..core.eta_estimator import get_eta_estimator
 from ..core.processing_service import (
     ProcessingTracker,
     ProcessingStage,
     get_processing_service,
 )
+from ..utils.audio_probe import probe_duration
 from ..utils.content_type_service import ContentTypeService
 
 logger = logging.getLogger(__name__)
@@ -66,6 +68,7 @@ class AudioUploadHandler:
             'enable_summary': False,
             'enable_mindmap': False,
             'enable_diarization': False,
+            'enable_vad': False,
         }
 
         if not self.content_type_service:
@@ -97,6 +100,9 @@ class AudioUploadHandler:
         defaults['enable_diarization'] = self._to_bool(
             effective.get('diarization', defaults['enable_diarization'])
         )
+        defaults['enable_vad'] = self._to_bool(
+            effective.get('enable_vad', defaults['enable_vad'])
+        )
         return defaults
 
     def _normalize_metadata(self, metadata: Optional[dict]) -> dict:
@@ -116,6 +122,7 @@ class AudioUploadHandler:
             'enable_summary',
             'enable_mindmap',
             'enable_diarization',
+            'enable_vad',
         ):
             if key in normalized:
                 normalized[key] = self._to_bool(normalized[key])
@@ -245,24 +252,28 @@ class AudioUploadHandler:
                     target_file = target_folder / f"{name_stem}{Path(safe_filename).suffix}"
                     counter += 1
 
-                # 直接保存文件到最终位置
-                file.save(str(target_file))
-                tracker.update_stage(ProcessingStage.UPLOADED, 15, f"File saved to organized directory: {target_file}")
-
                 normalized_path = str(target_file.resolve())
+                file_monitor = self.container.get_file_monitor() if self.container else None
 
-                if self.container:
-                    # CLI整合模式：将处理委托给已运行的FileMonitor
-                    file_monitor = self.container.get_file_monitor()
-
-                    file_monitor.register_metadata(normalized_path, {
+                if file_monitor:
+                    # 先登记处理元数据再写入文件：监控文件夹可能在文件写完后立即将其加入队列
+                    upload_metadata = {
                         'processing_config': processing_config,
                         'privacy_level': privacy_level,
                         'processing_id': tracker.processing_id,
                         'source': 'web_upload',
                         'uploaded_time': datetime.utcnow().isoformat() + 'Z'
-                    })
+                    }
+                    if processing_config.get('priority'):
+                        upload_metadata['priority'] = processing_config['priority']
+                    file_monitor.register_metadata(normalized_path, upload_metadata)
+
+                # 直接保存文件到最终位置
+                file.save(str(target_file))
+                tracker.update_stage(ProcessingStage.UPLOADED, 15, f"File saved to organized directory: {target_file}")
 
+                if file_monitor:
+                    # CLI整合模式：将处理委托给已运行的FileMonitor
                     queue_metadata = {
                         'processing_id': tracker.processing_id,
                         'privacy_level': privacy_level,
@@ -270,7 +281,11 @@ class AudioUploadHandler:
                         'uploaded_time': datetime.utcnow().isoformat() + 'Z'
                     }
 
-                    if file_monitor.enqueue_file_for_processing(normalized_path, queue_metadata):
+                    if file_monitor.enqueue_file_for_processing(
+                        normalized_path,
+                        queue_metadata,
+                        priority=processing_config.get('priority'),
+                    ):
                         processing_service.add_log(
                             tracker.processing_id,
                             f"Queued for FileMonitor processing: {target_filename}",
@@ -287,7 +302,7 @@ class AudioUploadHandler:
                             'status': 'success',
                             'processing_id': tracker.processing_id,
                             'message': 'Audio file queued for background processing by FileMonitor.',
-                            'estimated_time': '15-25 seconds'
+                            **self._estimate_times(target_file, processing_config, tracker.processing_id)
                         }
 
                     logger.warning(
@@ -306,7 +321,7 @@ class AudioUploadHandler:
                     'status': 'success',
                     'processing_id': tracker.processing_id,
                     'message': 'Audio file uploaded successfully. Awaiting watch-folder processing...',
-                    'estimated_time': '15-25 seconds'
+                    **self._estimate_times(target_file, processing_config)
                 }
 
             except Exception as e:
@@ -326,6 +341,31 @@ class AudioUploadHandler:
                     'message': error_msg
                 }
 
+    def _estimate_times(self, audio_path: Path, processing_config: dict,
+                        queued_id: Optional[str] = None) -> Dict[str, Any]:
+        """按音频时长和历史处理速度预估处理时间
+
+        Args:
+            audio_path: 已保存的音频文件
+            processing_config: 处理配置（可指定whisper_model）
+            queued_id: 已加入处理队列的processing_id（登记后计算排队完成时间）
+
+        Returns:
+            dict: estimated_time（本文件处理秒数），排队时另含queue_eta（含前序任务的秒数）
+        """
+        try:
+            eta = self.container.get_eta_estimator() if self.container else get_eta_estimator()
+            duration = probe_duration(audio_path)
+            model = processing_config.get('whisper_model')
+            result = {'estimated_time': int(round(eta.estimate(duration, model)))}
+            if queued_id:
+                eta.track_job(queued_id, duration, model)
+                result['queue_eta'] = int(round(eta.queue_eta(queued_id)))
+            return result
+        except Exception as e:
+            logger.warning("Failed to estimate processing time for %s: %s", audio_path, e)
+            return {'estimated_time': None}
+
     def validate_file(self, file, allowed_extensions):
         """
         验证上传文件
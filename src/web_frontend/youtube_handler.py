@@ -10,6 +10,7 @@ import logging
 from urllib.parse import urlparse, parse_qs
 from ..core.processing_service import ProcessingTracker, ProcessingStage
 from ..core.audio_processor import AudioProcessor
+from ..core.eta_estimator import get_eta_estimator
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +89,11 @@ class YouTubeHandler:
                 if processing_service:
                     processing_service.add_log(tracker.processing_id, f"Processing YouTube video: {url} (Privacy level: {privacy_level})", 'info')
                 
+                # 登记到处理时间预估队列（后台处理结束时移除）
+                video_duration = self._metadata_duration(metadata)
+                estimated_time = self.estimate_processing_time(video_duration)
+                self._get_eta_estimator().track_job(tracker.processing_id, video_duration)
+
                 # 启动后台异步处理
                 import threading
                 def background_process():
@@ -167,6 +173,8 @@ class YouTubeHandler:
                             processing_service.add_log(tracker.processing_id, error_msg, 'error')
                         tracker.set_error(error_msg)
                         logger.error(f"Background YouTube processing error: {proc_e}")
+                    finally:
+                        self._get_eta_estimator().finish_job(tracker.processing_id)
                 
                 # 启动后台线程
                 thread = threading.Thread(target=background_process, daemon=True)
@@ -177,7 +185,7 @@ class YouTubeHandler:
                     'status': 'success',
                     'processing_id': tracker.processing_id,
                     'video_id': video_id,
-                    'estimated_time': 30,
+                    'estimated_time': estimated_time,
                     'privacy_level': privacy_level,
                     'message': f'YouTube video added to processing queue ({"Private" if privacy_level == "private" else "Public"})'
                 }
@@ -388,27 +396,37 @@ class YouTubeHandler:
                 }
             }
     
-    def estimate_processing_time(self, duration_seconds):
+    def _get_eta_estimator(self):
+        """获取处理时间预估器（与上传处理、音频处理器共享的全局实例）"""
+        from ..core.dependency_container import get_global_container
+        container = get_global_container()
+        return container.get_eta_estimator() if container else get_eta_estimator()
+
+    @staticmethod
+    def _metadata_duration(metadata):
+        """从提交的元数据中读取视频时长（秒），未提供或无效时返回None"""
+        try:
+            duration = float((metadata or {}).get('duration'))
+        except (TypeError, ValueError):
+            return None
+        return duration if duration > 0 else None
+
+    def estimate_processing_time(self, duration_seconds, model=None):
         """
-        根据视频时长估算处理时间
+        根据视频时长和历史处理速度估算处理时间
         
         Args:
-            duration_seconds: 视频时长（秒）
+            duration_seconds: 视频时长（秒），未知时按默认时长估算
+            model: Whisper模型名（可选）
             
         Returns:
-            int: 估算的处理时间（秒）
+            int: 估算的处理时间（秒），预估失败时返回None
         """
-        if not duration_seconds:
-            return 600  # 默认10分钟
-        
-        # 估算：下载时间 + 音频提取时间 + 转录时间
-        # 假设转录速度约为实时的5倍
-        base_time = 60  # 基础开销
-        download_time = duration_seconds * 0.1  # 下载时间约为视频时长的10%
-        transcription_time = duration_seconds * 0.2  # 转录时间约为视频时长的20%
-        
-        total_time = base_time + download_time + transcription_time
-        return max(int(total_time), 120)  # 最少2分钟
+        try:
+            return int(round(self._get_eta_estimator().estimate(duration_seconds, model)))
+        except Exception as e:
+            logger.warning(f"Failed to estimate YouTube processing time: {e}")
+            return None
     
     def subtitle_detection(self, video_info):
         """超快速字幕检测 - 直接从video_info提取，无额外API调用
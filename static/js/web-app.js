@@ -460,6 +460,7 @@ class WebApp {
             setChecked('enable_summary', config.enable_summary);
             setChecked('enable_mindmap', config.enable_mindmap);
             setChecked('enable_diarization', config.diarization);
+            setChecked('enable_vad', config.enable_vad);
 
         } catch (error) {
             console.error('Error loading post-processing defaults:', error);
@@ -29,9 +29,17 @@ class TestPostProcessingEndToEnd:
         pytest.skip("Test audio file 'feynman_lecture_2min.mp4' not found in audio directory")
 
     @pytest.fixture
-    def audio_processor_with_config(self):
+    def audio_processor_with_config(self, tmp_path):
         """创建配置完整的AudioProcessor，mock转录服务避免外部依赖"""
         config_manager = ConfigManager()
+
+        # 持久化存储（队列、人名映射、阶段断点）写入临时目录，避免在data/下生成文件
+        config = config_manager.config
+        config.setdefault('spacy', {}).setdefault('mapping_store', {})['db_path'] = str(tmp_path / 'name_mappings.db')
+        processing_config = config.setdefault('processing', {})
+        processing_config.setdefault('queue', {})['db_path'] = str(tmp_path / 'processing_queue.db')
+        processing_config.setdefault('checkpoints', {})['dir'] = str(tmp_path / 'checkpoints')
+
         container = DependencyContainer(config_manager)
 
         # 获取真实的AudioProcessor
@@ -39,6 +47,7 @@ class TestPostProcessingEndToEnd:
 
         # Mock转录服务返回固定结果，专注测试post-processing逻辑
         with patch.object(audio_processor, 'transcription_service') as mock_transcription:
+            mock_transcription.get_cached_transcription.return_value = None
             mock_transcription.transcribe_audio.return_value = {
                 'text': 'This is a test transcript with names like John Smith and Alice Johnson discussing quantum physics.',
                 'chunks': [
@@ -155,6 +155,82 @@ class TestAIContentGenerator(unittest.TestCase):
             max_tokens=100
         )
     
+    def test_generate_batch_runs_tasks_concurrently(self):
+        """测试批量生成时摘要和思维导图同时请求"""
+        import threading
+        barrier = threading.Barrier(2, timeout=5)
+
+        def generate_content(model_type, prompt, **kwargs):
+            # 两个请求都到达后才返回，串行执行会超时
+            barrier.wait()
+            return f"{model_type} result"
+
+        mock_client = Mock()
+        mock_client.generate_content.side_effect = generate_content
+
+        generator = AIContentGenerator(self.api_config, enable_rate_limiting=False)
+        generator.client = mock_client
+
+        result = generator.generate_batch("test text", ['summary', 'mindmap'])
+
+        self.assertEqual(result, {'summary': 'summary result', 'mindmap': 'mindmap result'})
+
+    def test_generate_batch_single_task_and_unknown_task(self):
+        """测试批量生成的单任务和未知任务"""
+        mock_client = Mock()
+        mock_client.generate_content.return_value = "Summary result"
+
+        generator = AIContentGenerator(self.api_config, enable_rate_limiting=False)
+        generator.client = mock_client
+
+        self.assertEqual(generator.generate_batch("test text", ['summary']), {'summary': 'Summary result'})
+        with self.assertRaises(ValueError):
+            generator.generate_batch("test text", ['unknown'])
+
+    def test_generate_batch_raises_when_a_task_fails(self):
+        """测试批量生成中任一任务失败时抛出原始异常（不返回错误信息作为内容）"""
+        def generate_content(model_type, prompt, **kwargs):
+            if model_type == 'mindmap':
+                raise APIException("API调用失败，状态码: 429", status_code=429)
+            return "Summary result"
+
+        mock_client = Mock()
+        mock_client.generate_content.side_effect = generate_content
+
+        generator = AIContentGenerator(self.api_config, enable_rate_limiting=False)
+        generator.client = mock_client
+
+        with self.assertRaises(APIException) as raised:
+            generator.generate_batch("test text", ['summary', 'mindmap'])
+        self.assertEqual(raised.exception.status_code, 429)
+
+        mock_client.generate_content.side_effect = None
+        mock_client.generate_content.return_value = "   "
+        with self.assertRaises(APIException):
+            generator.generate_batch("test text", ['summary'])
+
+    def test_result_cache_skips_repeated_api_calls(self):
+        """测试相同请求命中LLM结果缓存"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = {'openrouter': {**self.api_config['openrouter'],
+                                     'cache': {'enabled': True, 'directory': cache_dir}}}
+            mock_client = Mock()
+            mock_client.models = {'summary': 'test-model', 'mindmap': 'test-model'}
+            mock_client.generate_content.return_value = "Summary result"
+
+            generator = AIContentGenerator(config, enable_rate_limiting=False)
+            generator.client = mock_client
+
+            self.assertEqual(generator.generate_summary("test text"), "Summary result")
+            self.assertEqual(generator.generate_summary("test text"), "Summary result")
+            generator.generate_summary("other text")
+
+            self.assertEqual(mock_client.generate_content.call_count, 2)
+            cache_stats = generator.get_rate_limit_status()['cache']
+            self.assertEqual(cache_stats['hits'], 1)
+            self.assertEqual(cache_stats['misses'], 2)
+
     def test_get_rate_limit_status_with_limiter(self):
         """测试获取限流状态（有限流器）"""
         mock_rate_limiter = Mock()
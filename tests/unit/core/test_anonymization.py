@@ -6,16 +6,11 @@
 import unittest
 import tempfile
 import shutil
-import os
 from unittest.mock import patch, MagicMock
 
-# 添加src目录到Python路径
-import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'src'))
-
-from core.anonymization import (
+from src.core.anonymization import (
     NameAnonymizer, VirtualNameGenerator, NameMappingManager,
-    is_chinese_text, extract_person_names
+    is_chinese_text, extract_person_names, split_for_ner, replace_names
 )
 
 
@@ -57,6 +52,31 @@ class TestNameAnonymizer(unittest.TestCase):
         with self.assertRaises(OSError):
             NameAnonymizer(self.spacy_config)
     
+    @patch('spacy.load')
+    @patch('logging.getLogger')
+    def test_configured_models_used_by_pool_workers(self, mock_logger, mock_spacy_load):
+        """测试配置的模型名称同时用于本进程和NER进程池worker"""
+        from src.core import anonymization
+
+        config = {'model': 'zh_core_web_trf', 'en_model': 'en_core_web_lg', 'workers': 2}
+        anonymizer = NameAnonymizer(config)
+        loaded = [call.args[0] for call in mock_spacy_load.call_args_list]
+        self.assertEqual(loaded, ['zh_core_web_trf', 'en_core_web_lg'])
+
+        with patch('src.core.anonymization.ProcessPoolExecutor') as mock_pool:
+            mock_pool.return_value.map.return_value = []
+            anonymizer._pipe_in_pool('en', ['a.', 'b.'])
+        kwargs = mock_pool.call_args.kwargs
+        self.assertIs(kwargs['initializer'], anonymization._init_ner_worker)
+
+        # worker进程中：initializer记录配置的模型，首次NER时加载
+        with patch.dict(anonymization._worker_model_names), patch.dict(anonymization._worker_models, clear=True):
+            kwargs['initializer'](*kwargs['initargs'])
+            mock_spacy_load.reset_mock()
+            mock_spacy_load.return_value.pipe.return_value = []
+            anonymization._ner_worker('en', ['a.'], 8)
+            mock_spacy_load.assert_called_once_with('en_core_web_lg')
+
     def test_select_nlp_model_auto_chinese(self):
         """测试自动选择中文模型"""
         chinese_text = "这是一段包含很多中文字符的文本，用于测试语言检测功能。"
@@ -105,7 +125,7 @@ class TestNameAnonymizer(unittest.TestCase):
         
         mock_doc = MagicMock()
         mock_doc.ents = [mock_ent1, mock_ent2]
-        self.mock_nlp_zh.return_value = mock_doc
+        self.mock_nlp_zh.pipe.return_value = [mock_doc]
         
         # Mock虚拟人名生成
         with patch.object(self.anonymizer.name_generator, 'generate_name') as mock_generate:
@@ -128,13 +148,62 @@ class TestNameAnonymizer(unittest.TestCase):
         # Mock空的实体列表
         mock_doc = MagicMock()
         mock_doc.ents = []
-        self.mock_nlp_zh.return_value = mock_doc
+        self.mock_nlp_zh.pipe.return_value = [mock_doc]
         
         result_text, mapping = self.anonymizer.anonymize_names(text)
         
         self.assertEqual(result_text, text)
         self.assertEqual(mapping, {})
     
+    def test_anonymize_names_batches_long_text(self):
+        """长文本按句切片后通过nlp.pipe批量识别，并禁用NER以外的组件"""
+        self.anonymizer.chunk_chars = 20
+        self.mock_nlp_zh.pipe_names = ['tok2vec', 'tagger', 'parser', 'attribute_ruler', 'ner']
+        text = "张三在会议开始时发言。" * 5 + "随后李四做了总结。"
+
+        mock_ent1 = MagicMock(text="张三", label_="PERSON")
+        mock_ent2 = MagicMock(text="李四", label_="PERSON")
+        mock_ent3 = MagicMock(text="会议", label_="EVENT")
+        self.mock_nlp_zh.pipe.return_value = [MagicMock(ents=[mock_ent1, mock_ent3]), MagicMock(ents=[mock_ent2])]
+
+        with patch.object(self.anonymizer.name_generator, 'generate_name', side_effect=['赵云', '钱伟']):
+            result_text, mapping = self.anonymizer.anonymize_names(text, language='zh')
+
+        chunks = self.mock_nlp_zh.pipe.call_args.args[0]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), text)
+        self.assertEqual(self.mock_nlp_zh.pipe.call_args.kwargs['disable'], ['tagger', 'parser', 'attribute_ruler'])
+        self.assertEqual(mapping, {'张三': '赵云', '李四': '钱伟'})
+        self.assertNotIn('张三', result_text)
+
+    def test_split_for_ner(self):
+        """切片不丢失文本，且每片不超过上限"""
+        text = "Hello Mr. Smith. How are you? " * 10 + "x" * 50
+        chunks = split_for_ner(text, 40)
+
+        self.assertEqual(''.join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 40 for chunk in chunks))
+        self.assertEqual(split_for_ner("短文本。", 40), ["短文本。"])
+
+    def test_apply_mapping_longest_name_first(self):
+        """长名优先，短名不会截断长名；纯ASCII人名按词边界匹配"""
+        mapping = {'Li': 'Wu', 'Li Ming': 'Zhang Wei', '张三': '赵云', '张三丰': '钱伟'}
+        text = "Li Ming met Li and Lisa. 张三丰和张三见面。"
+
+        result = self.anonymizer.apply_mapping(text, mapping)
+
+        self.assertEqual(result, "Zhang Wei met Wu and Lisa. 钱伟和赵云见面。")
+
+    def test_replace_names_single_pass(self):
+        """替换结果不会被后续映射再次替换，且与映射顺序无关"""
+        text = "Anna thanked Bob."
+        forward = replace_names(text, {'Anna': 'Bob', 'Bob': 'Carl'})
+        backward = replace_names(text, {'Bob': 'Carl', 'Anna': 'Bob'})
+
+        self.assertEqual(forward, "Bob thanked Carl.")
+        self.assertEqual(forward, backward)
+        self.assertEqual(replace_names(text, {}), text)
+
     def test_get_name_mapping(self):
         """测试获取人名映射"""
         self.anonymizer.name_mapping = {'张三': '赵云', '李四': '钱伟'}
@@ -319,27 +388,12 @@ class TestUtilityFunctions(unittest.TestCase):
         for text in english_texts:
             self.assertFalse(is_chinese_text(text), f"Should not detect Chinese: {text}")
     
-    @patch('core.anonymization.NameAnonymizer')
+    @patch('src.core.anonymization.NameAnonymizer')
     def test_extract_person_names(self, mock_anonymizer_class):
         """测试提取人名功能"""
         # Mock NameAnonymizer
         mock_anonymizer = MagicMock()
-        mock_nlp = MagicMock()
-        
-        # Mock实体
-        mock_ent1 = MagicMock()
-        mock_ent1.text.strip.return_value = "张三"
-        mock_ent1.label_ = "PERSON"
-        
-        mock_ent2 = MagicMock()
-        mock_ent2.text.strip.return_value = "李四"
-        mock_ent2.label_ = "PERSON"
-        
-        mock_doc = MagicMock()
-        mock_doc.ents = [mock_ent1, mock_ent2]
-        mock_nlp.return_value = mock_doc
-        
-        mock_anonymizer._select_nlp_model.return_value = mock_nlp
+        mock_anonymizer._extract_person_entities.return_value = ["张三", "李四"]
         mock_anonymizer._is_invalid_name.return_value = False
         mock_anonymizer_class.return_value = mock_anonymizer
         
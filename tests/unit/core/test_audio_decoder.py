@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Tests for the shared one-pass audio decode."""
+
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+
+from src.core.audio_decoder import AudioDecoder, decode_timeout
+from src.core.mlx_transcription import MLXTranscriptionService
+from src.core.speaker_diarization import SpeakerDiarization
+
+
+SAMPLES = np.linspace(-1, 1, 32000, dtype=np.float32)
+
+
+def _fake_ffmpeg(cmd, **kwargs):
+    with open(cmd[-1], 'wb') as f:
+        f.write(SAMPLES.tobytes())
+    return Mock(returncode=0, stderr='')
+
+
+def _decoder(tmp_path):
+    return AudioDecoder(cache_dir=str(tmp_path / 'pcm'))
+
+
+class TestAudioDecoder:
+
+    def test_decodes_once_and_maps_samples(self, tmp_path):
+        audio_path = tmp_path / 'meeting.m4a'
+        audio_path.write_bytes(b'fake audio')
+
+        with patch('src.core.audio_decoder.subprocess.run', side_effect=_fake_ffmpeg) as mock_run, \
+                patch('src.core.audio_decoder.probe_duration', return_value=2.0):
+            decoder = _decoder(tmp_path)
+            first = decoder.decode(audio_path)
+            second = decoder.decode(audio_path)
+
+        mock_run.assert_called_once()
+        assert first.path == second.path
+        assert first.duration == 2.0
+        np.testing.assert_array_equal(np.asarray(second.samples), SAMPLES)
+
+        decoder.release(first)
+        assert not first.path.exists()
+        assert np.asarray(first.samples)[-1] == SAMPLES[-1]
+
+    def test_timeout_scales_with_duration(self, tmp_path):
+        audio_path = tmp_path / 'lecture.mp3'
+        audio_path.write_bytes(b'fake audio')
+
+        with patch('src.core.audio_decoder.subprocess.run', side_effect=_fake_ffmpeg) as mock_run, \
+                patch('src.core.audio_decoder.probe_duration', return_value=3 * 3600):
+            _decoder(tmp_path).decode(audio_path)
+
+        assert mock_run.call_args.kwargs['timeout'] == decode_timeout(3 * 3600)
+        assert decode_timeout(3 * 3600) > decode_timeout(60) > 60
+
+
+class TestDecodedAudioConsumers:
+
+    def _decoded(self, tmp_path):
+        audio_path = tmp_path / 'meeting.m4a'
+        audio_path.write_bytes(b'fake audio')
+        with patch('src.core.audio_decoder.subprocess.run', side_effect=_fake_ffmpeg), \
+                patch('src.core.audio_decoder.probe_duration', return_value=2.0):
+            return audio_path, _decoder(tmp_path).decode(audio_path)
+
+    def test_whisper_receives_pcm_array(self, tmp_path):
+        audio_path, decoded = self._decoded(tmp_path)
+        service = MLXTranscriptionService({'default_model': 'whisper-tiny-mlx'})
+
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.return_value = {'text': 'hello'}
+            assert service.transcribe_audio(audio_path, decoded_audio=decoded) == 'hello'
+
+        audio_input = mock_whisper.transcribe.call_args.args[0]
+        assert isinstance(audio_input, np.ndarray)
+        assert len(audio_input) == len(SAMPLES)
+
+    def test_pyannote_receives_waveform_without_temp_wav(self, tmp_path):
+        audio_path, decoded = self._decoded(tmp_path)
+        service = SpeakerDiarization({}, {})
+        pipeline = MagicMock()
+        pipeline.return_value.itertracks.return_value = []
+
+        with patch.object(service, '_get_pipeline', return_value=pipeline), \
+                patch.object(service, '_prepare_audio_for_diarization') as mock_prepare, \
+                patch('src.core.speaker_diarization.torch') as mock_torch:
+            service.diarize_audio(audio_path, decoded_audio=decoded)
+
+        mock_prepare.assert_not_called()
+        audio_input = pipeline.call_args.args[0]
+        assert audio_input['sample_rate'] == 16000
+        assert audio_input['waveform'] is mock_torch.from_numpy.return_value.unsqueeze.return_value
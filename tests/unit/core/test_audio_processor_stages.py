@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Tests for the AudioProcessor stage methods."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.audio_processor import AudioProcessor
+
+
+@pytest.fixture
+def processor(tmp_path):
+    audio_path = tmp_path / 'meeting.wav'
+    audio_path.write_bytes(b'fake audio data')
+
+    processor = AudioProcessor(None)
+    processor.transcription_service = Mock()
+    processor.transcription_service.get_cached_transcription.return_value = None
+    processor.anonymization_service = Mock()
+    processor.anonymization_service.anonymize_names.return_value = ('text', {})
+    processor.ai_generation_service = Mock()
+    processor.ai_generation_service.generate_batch.side_effect = (
+        lambda text, tasks, **_kwargs: {task: f'{task} result' for task in tasks}
+    )
+    processor.speaker_diarization_service = Mock()
+    processor.speaker_diarization_service.merge_with_transcription.return_value = [{'speaker': 'SPEAKER_00'}]
+    processor.speaker_diarization_service.get_speaker_statistics.return_value = {}
+    processor.transcript_storage = Mock()
+    processor.result_storage = Mock()
+    processor.audio_path = audio_path
+    return processor
+
+
+def _saved_results(processor):
+    return processor.result_storage.save_json_result.call_args[0][1]
+
+
+class TestConcurrentDiarization:
+    """Diarization runs while transcription is still in progress."""
+
+    def test_diarization_overlaps_transcription(self, processor):
+        diarization_started = threading.Event()
+
+        def transcribe(*_args, **_kwargs):
+            # only returns once diarization has started on another thread
+            assert diarization_started.wait(timeout=5)
+            return {'text': 'text', 'chunks': []}
+
+        def diarize(_path):
+            diarization_started.set()
+            return [{'start': 0.0, 'end': 1.0, 'speaker': 'SPEAKER_00'}]
+
+        processor.transcription_service.transcribe_audio.side_effect = transcribe
+        processor.speaker_diarization_service.diarize_audio.side_effect = diarize
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+
+        results = _saved_results(processor)
+        assert results['diarization_result']['has_diarization'] is True
+        assert results['transcription_with_speakers'] == [{'speaker': 'SPEAKER_00'}]
+
+    def test_diarization_failure_degrades_gracefully(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text', 'chunks': []}
+        processor.speaker_diarization_service.diarize_audio.side_effect = RuntimeError('pyannote failed')
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+        assert _saved_results(processor)['diarization_result'] is None
+
+    def test_transcription_failure_fails_processing(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = None
+        processor.speaker_diarization_service.diarize_audio.return_value = []
+
+        assert not processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+        processor.result_storage.save_json_result.assert_not_called()
+
+    def test_failed_transcription_releases_diarization_slot(self, processor):
+        from src.utils.resource_limiter import ResourceLimiter
+
+        processor.set_resource_limiter(ResourceLimiter())
+        diarization_started = threading.Event()
+
+        def diarize(_path):
+            diarization_started.set()
+            time.sleep(0.3)
+            return []
+
+        def transcribe(*_args, **_kwargs):
+            assert diarization_started.wait(timeout=5)
+            raise RuntimeError('model crashed')
+
+        processor.speaker_diarization_service.diarize_audio.side_effect = diarize
+        processor.transcription_service.transcribe_audio.side_effect = transcribe
+
+        assert not processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+        # 任务失败返回时分离已结束，槽位不再被占用
+        assert processor.resource_limiter.get_status()['diarization']['in_use'] == 0
+
+    def test_shared_decode_feeds_both_consumers(self, processor):
+        decoded = Mock()
+        processor.audio_decoder = Mock()
+        processor.audio_decoder.decode.return_value = decoded
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text', 'chunks': []}
+        processor.speaker_diarization_service.diarize_audio.return_value = []
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+
+        processor.audio_decoder.decode.assert_called_once_with(processor.audio_path)
+        assert processor.transcription_service.transcribe_audio.call_args.kwargs['decoded_audio'] is decoded
+        assert processor.speaker_diarization_service.diarize_audio.call_args.kwargs['decoded_audio'] is decoded
+        processor.audio_decoder.release.assert_called_once_with(decoded)
+
+    def test_vad_timeline_feeds_both_consumers(self, processor):
+        decoded = Mock(samples=[], sample_rate=16000)
+        timeline = Mock()
+        processor.audio_decoder = Mock()
+        processor.audio_decoder.decode.return_value = decoded
+        processor.voice_activity_detector = Mock(apply_to_diarization=True)
+        processor.voice_activity_detector.detect.return_value = timeline
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text', 'chunks': []}
+        processor.speaker_diarization_service.diarize_audio.return_value = []
+
+        assert processor.process_audio_file(str(processor.audio_path),
+                                            metadata={'enable_diarization': True, 'enable_vad': True})
+
+        assert processor.transcription_service.transcribe_audio.call_args.kwargs['speech_timeline'] is timeline
+        assert processor.speaker_diarization_service.diarize_audio.call_args.kwargs['speech_timeline'] is timeline
+
+    def test_cache_hit_skips_decode_and_transcription(self, processor):
+        processor.audio_decoder = Mock()
+        processor.voice_activity_detector = Mock()
+        processor.voice_activity_detector.cache_signature.return_value = {'padding_seconds': 0.3}
+        processor.transcription_service.get_cached_transcription.return_value = 'cached text'
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_vad': True})
+
+        # 缓存按VAD参数查询，命中后不再解码、检测或转录
+        assert processor.transcription_service.get_cached_transcription.call_args.kwargs['vad_signature'] == \
+            {'padding_seconds': 0.3}
+        processor.audio_decoder.decode.assert_not_called()
+        processor.voice_activity_detector.detect.assert_not_called()
+        processor.transcription_service.transcribe_audio.assert_not_called()
+        processor.transcript_storage.save_raw_transcript.assert_called_once_with('meeting', 'cached text', 'private')
+
+    def test_cache_hit_still_decodes_for_diarization(self, processor):
+        decoded = Mock(samples=[], sample_rate=16000)
+        processor.audio_decoder = Mock()
+        processor.audio_decoder.decode.return_value = decoded
+        processor.transcription_service.get_cached_transcription.return_value = {'text': 'text', 'chunks': []}
+        processor.speaker_diarization_service.diarize_audio.return_value = []
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': True})
+
+        processor.transcription_service.transcribe_audio.assert_not_called()
+        assert processor.speaker_diarization_service.diarize_audio.call_args.kwargs['decoded_audio'] is decoded
+
+    def test_vad_miss_caches_by_signature(self, processor):
+        decoded = Mock(samples=[], sample_rate=16000)
+        processor.audio_decoder = Mock()
+        processor.audio_decoder.decode.return_value = decoded
+        processor.voice_activity_detector = Mock()
+        processor.voice_activity_detector.cache_signature.return_value = {'padding_seconds': 0.3}
+        processor.voice_activity_detector.detect.return_value = None
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text'}
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_vad': True})
+
+        kwargs = processor.transcription_service.transcribe_audio.call_args.kwargs
+        assert kwargs['vad_signature'] == {'padding_seconds': 0.3}
+        assert 'speech_timeline' not in kwargs
+
+    def test_vad_disabled_by_preference(self, processor):
+        processor.audio_decoder = Mock()
+        processor.voice_activity_detector = Mock()
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text'}
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_vad': False})
+
+        processor.voice_activity_detector.detect.assert_not_called()
+        processor.audio_decoder.decode.assert_not_called()
+        assert 'speech_timeline' not in processor.transcription_service.transcribe_audio.call_args.kwargs
+
+    def test_diarization_skipped_when_disabled(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text'}
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': False})
+        processor.speaker_diarization_service.diarize_audio.assert_not_called()
+
+
+class TestAnonymizedSegments:
+    """Segments handed to the AI stage carry the same name mapping as the text."""
+
+    def test_mapping_is_applied_to_segments(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = {
+            'text': 'Alice spoke. Bob replied.',
+            'chunks': [{'text': 'Alice spoke.'}, {'text': 'Bob replied.'}],
+        }
+        processor.anonymization_service.anonymize_names.return_value = (
+            'Carol spoke. Bob replied.', {'Alice': 'Carol'}
+        )
+        processor.anonymization_service.apply_mapping.side_effect = (
+            lambda text, mapping: text.replace('Alice', mapping['Alice'])
+        )
+
+        assert processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': False})
+
+        kwargs = processor.ai_generation_service.generate_batch.call_args.kwargs
+        assert kwargs['segments'] == ['Carol spoke.', 'Bob replied.']
+
+    def test_stopping_shuts_down_ner_pool(self, processor):
+        processor.stop_file_monitoring()
+
+        processor.anonymization_service.shutdown.assert_called_once()
+
+
+class TestResumeFromFailedStage:
+    """A retry picks up at the stage that failed instead of re-transcribing."""
+
+    def test_retry_skips_completed_stages(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text'}
+        processor.ai_generation_service.generate_batch.side_effect = RuntimeError('429 rate limited')
+        metadata = {'enable_diarization': False}
+
+        assert not processor.process_audio_file(str(processor.audio_path), metadata=metadata)
+        assert processor.get_failure(str(processor.audio_path)) == {
+            'stage': 'ai_generation', 'error': '429 rate limited', 'error_class': 'rate_limit'
+        }
+
+        processor.ai_generation_service.generate_batch.side_effect = None
+        processor.ai_generation_service.generate_batch.return_value = {'summary': 's', 'mindmap': 'm'}
+        assert processor.process_audio_file(str(processor.audio_path), metadata=metadata)
+
+        processor.transcription_service.transcribe_audio.assert_called_once()
+        processor.anonymization_service.anonymize_names.assert_called_once()
+        assert _saved_results(processor)['summary'] == 's'
+        assert processor.get_failure(str(processor.audio_path)) is None
+
+    def test_changed_metadata_restarts_from_transcription(self, processor):
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'text'}
+        processor.ai_generation_service.generate_batch.side_effect = RuntimeError('timeout')
+
+        assert not processor.process_audio_file(str(processor.audio_path), metadata={'enable_diarization': False})
+        processor.ai_generation_service.generate_batch.side_effect = None
+        processor.ai_generation_service.generate_batch.return_value = {'summary': 's', 'mindmap': 'm'}
+        assert processor.process_audio_file(str(processor.audio_path),
+                                            metadata={'enable_diarization': False, 'whisper_model': 'large'})
+
+        assert processor.transcription_service.transcribe_audio.call_count == 2
+
+
+class TestPersistentCheckpoints:
+    """Stage outputs survive a restart and are reused while inputs and config are unchanged."""
+
+    @pytest.fixture
+    def checkpointed(self, processor, tmp_path):
+        from src.storage.checkpoint_store import CheckpointStore
+        from src.storage.transcript_storage import TranscriptStorage
+
+        processor.transcript_storage = TranscriptStorage(str(tmp_path / 'data'))
+        processor.set_checkpoint_store(CheckpointStore(str(tmp_path / 'checkpoints')))
+        processor.transcription_service.transcribe_audio.return_value = {'text': 'Alice spoke.'}
+        processor.anonymization_service.anonymize_names.return_value = ('Person spoke.', {'Alice': 'Person'})
+        # 人名映射存储中该文件的映射
+        processor.anonymization_service.get_document_mapping.return_value = {'Alice': 'Person'}
+        return processor
+
+    def _simulate_restart(self, processor):
+        # 进程重启后内存中的失败断点丢失，只剩持久化断点
+        processor.discard_failure(str(processor.audio_path))
+
+    def _fail_publishing(self, processor, metadata):
+        processor.result_storage.save_json_result.side_effect = OSError('disk full')
+        assert not processor.process_audio_file(str(processor.audio_path), metadata=metadata)
+        self._simulate_restart(processor)
+        processor.result_storage.save_json_result.side_effect = None
+
+    def _job_dir(self, processor):
+        from src.storage.checkpoint_store import CheckpointStore
+
+        return processor.checkpoint_store.checkpoint_dir / CheckpointStore.job_key(processor.audio_path)
+
+    def test_success_deletes_checkpoints(self, checkpointed):
+        metadata = {'enable_diarization': False}
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata=metadata)
+        assert not self._job_dir(checkpointed).exists()
+
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata=metadata)
+        assert checkpointed.transcription_service.transcribe_audio.call_count == 2
+
+    def test_failed_publish_resumes_after_restart(self, checkpointed):
+        self._fail_publishing(checkpointed, {})
+
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+        checkpointed.transcription_service.transcribe_audio.assert_called_once()
+        checkpointed.anonymization_service.anonymize_names.assert_called_once()
+        checkpointed.ai_generation_service.generate_batch.assert_called_once()
+        results = _saved_results(checkpointed)
+        assert results['anonymized_transcript'] == 'Person spoke.'
+        assert results['anonymization_mapping'] == {'Alice': 'Person'}
+
+    def test_failed_ai_generation_is_not_checkpointed(self, checkpointed):
+        from src.core.ai_generation import APIException
+
+        checkpointed.ai_generation_service.generate_batch.side_effect = APIException('API调用失败', status_code=503)
+        assert not checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+        self._simulate_restart(checkpointed)
+
+        stages = {path.name for path in self._job_dir(checkpointed).iterdir()}
+        assert {'transcription.json', 'anonymization.json'} <= stages
+        assert 'ai_generation.json' not in stages
+
+        checkpointed.ai_generation_service.generate_batch.side_effect = None
+        checkpointed.ai_generation_service.generate_batch.return_value = {'summary': 's', 'mindmap': ''}
+        assert not checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+        self._simulate_restart(checkpointed)
+
+        # 之后的成功生成被保存，转录与匿名化从断点恢复
+        checkpointed.ai_generation_service.generate_batch.return_value = {'summary': 's', 'mindmap': 'm'}
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+        checkpointed.transcription_service.transcribe_audio.assert_called_once()
+        assert checkpointed.ai_generation_service.generate_batch.call_count == 3
+        assert _saved_results(checkpointed)['summary'] == 's'
+
+    def test_name_mapping_is_not_persisted(self, checkpointed):
+        checkpointed.result_storage.save_json_result.side_effect = OSError('disk full')
+        assert not checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+
+        job_dir = self._job_dir(checkpointed)
+        assert job_dir.exists()
+        for path in job_dir.iterdir():
+            assert 'Person' not in path.read_text(encoding='utf-8')
+
+    def test_missing_name_mapping_reruns_anonymization(self, checkpointed):
+        self._fail_publishing(checkpointed, {})
+        checkpointed.anonymization_service.get_document_mapping.return_value = None
+
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+        checkpointed.transcription_service.transcribe_audio.assert_called_once()
+        assert checkpointed.anonymization_service.anonymize_names.call_count == 2
+
+    def test_changed_config_reruns_from_that_stage(self, checkpointed):
+        self._fail_publishing(checkpointed, {'enable_mindmap': True})
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={'enable_mindmap': False})
+
+        checkpointed.transcription_service.transcribe_audio.assert_called_once()
+        checkpointed.anonymization_service.anonymize_names.assert_called_once()
+        assert checkpointed.ai_generation_service.generate_batch.call_count == 2
+
+    def test_edited_transcript_invalidates_checkpoint(self, checkpointed):
+        self._fail_publishing(checkpointed, {})
+        raw_path = checkpointed.transcript_storage.get_transcript_path(
+            checkpointed.audio_path.stem, 'raw', 'private'
+        )
+        raw_path.write_text('edited', encoding='utf-8')
+        assert checkpointed.process_audio_file(str(checkpointed.audio_path), metadata={})
+
+        assert checkpointed.transcription_service.transcribe_audio.call_count == 2
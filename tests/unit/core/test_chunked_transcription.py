@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Tests for chunked, streaming transcription."""
+
+import io
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.core.chunked_transcription import (
+    find_quietest_cut,
+    iter_audio_chunks,
+    stitch_segments,
+)
+from src.core.mlx_transcription import MLXTranscriptionService
+
+
+SR = 16000
+
+
+def _tone(seconds):
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class TestAudioChunking:
+
+    def test_cut_lands_in_silence(self):
+        samples = np.concatenate([_tone(4), _silence(0.5), _tone(4)])
+        cut = find_quietest_cut(samples, int(3 * SR), int(6 * SR))
+        assert 4 * SR <= cut <= 4.5 * SR
+
+    def test_chunks_cover_stream_with_overlap(self):
+        samples = np.concatenate([_tone(9), _silence(1), _tone(9), _silence(1), _tone(5)])
+        stream = io.BytesIO(samples.tobytes())
+
+        chunks = list(iter_audio_chunks(stream, chunk_seconds=10, overlap_seconds=1, search_seconds=2))
+
+        assert len(chunks) == 3
+        starts = [start for start, _ in chunks]
+        assert starts[0] == 0
+        # every chunk after the first starts one overlap before the previous cut
+        for (prev_start, prev), start in zip(chunks, starts[1:]):
+            prev_end = prev_start + len(prev) / SR
+            assert abs((prev_end - start) - 1.0) < 0.05
+        last_start, last = chunks[-1]
+        assert abs(last_start + len(last) / SR - len(samples) / SR) < 1e-6
+        # no chunk grows beyond chunk + search window
+        assert max(len(chunk) for _, chunk in chunks) <= 12 * SR
+
+    def test_short_stream_is_single_chunk(self):
+        stream = io.BytesIO(_tone(3).tobytes())
+        chunks = list(iter_audio_chunks(stream, chunk_seconds=10, overlap_seconds=1, search_seconds=2))
+        assert len(chunks) == 1
+        assert len(chunks[0][1]) == 3 * SR
+
+
+class TestSegmentStitching:
+
+    def test_offsets_and_removes_overlap_duplicates(self):
+        first, covered = stitch_segments(
+            [{'start': 0.0, 'end': 5.0, 'text': ' a'}, {'start': 5.0, 'end': 9.5, 'text': ' b'}],
+            offset=0.0, covered_until=0.0,
+        )
+        second, covered = stitch_segments(
+            [{'start': 0.0, 'end': 1.0, 'text': ' b-dup'},
+             {'start': 1.2, 'end': 4.0, 'text': ' c',
+              'words': [{'start': 1.2, 'end': 1.5, 'word': 'c'}]}],
+            offset=9.0, covered_until=covered,
+        )
+
+        assert [s['text'] for s in first + second] == [' a', ' b', ' c']
+        assert second[0]['start'] == 10.2
+        assert second[0]['words'][0]['start'] == 10.2
+        assert covered == 13.0
+
+
+class TestChunkedService:
+
+    def _service(self):
+        return MLXTranscriptionService({
+            'default_model': 'whisper-tiny-mlx',
+            'chunked': {'enabled': True, 'min_duration_seconds': 10,
+                        'chunk_seconds': 10, 'overlap_seconds': 1, 'silence_search_seconds': 2},
+        })
+
+    def test_long_audio_is_transcribed_in_chunks_with_progress(self, tmp_path):
+        audio_path = tmp_path / 'lecture.wav'
+        audio_path.write_bytes(b'fake audio data')
+        samples = np.concatenate([_tone(9), _silence(1), _tone(9), _silence(1), _tone(5)])
+        process = Mock()
+        process.stdout = io.BytesIO(samples.tobytes())
+        process.stderr = io.BytesIO(b'')
+        process.poll.return_value = 0
+        process.returncode = 0
+
+        def transcribe(audio, **kwargs):
+            length = len(audio) / SR
+            return {'segments': [{'start': 0.0, 'end': length, 'text': f' {length:.0f}s'}]}
+
+        progress = []
+        service = self._service()
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper, \
+                patch('src.core.mlx_transcription.probe_duration', return_value=25.0), \
+                patch('src.core.mlx_transcription.open_pcm_stream', return_value=process):
+            mock_whisper.transcribe.side_effect = transcribe
+            result = service.transcribe_audio(
+                audio_path, word_timestamps=True,
+                progress_callback=lambda fraction, message: progress.append(fraction),
+            )
+
+        assert mock_whisper.transcribe.call_count == 3
+        starts = [chunk['timestamp'][0] for chunk in result['chunks']]
+        assert starts == sorted(starts)
+        assert [chunk['id'] for chunk in result['chunks']] == [0, 1, 2]
+        assert progress[-1] == 1.0 and progress == sorted(progress)
+
+    def test_decoder_failure_midway_raises(self, tmp_path):
+        audio_path = tmp_path / 'truncated.wav'
+        audio_path.write_bytes(b'fake audio data')
+        process = Mock()
+        process.stdout = io.BytesIO(np.concatenate([_tone(9), _silence(1), _tone(9)]).tobytes())
+        process.stderr = io.BytesIO(b'Invalid data found when processing input')
+        process.poll.return_value = 1
+        process.returncode = 1
+
+        service = self._service()
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper, \
+                patch('src.core.mlx_transcription.probe_duration', return_value=60.0), \
+                patch('src.core.mlx_transcription.open_pcm_stream', return_value=process):
+            mock_whisper.transcribe.return_value = {'segments': [{'start': 0.0, 'end': 1.0, 'text': ' partial'}]}
+            with pytest.raises(Exception, match='Invalid data'):
+                service.transcribe_audio(audio_path)
+
+        assert mock_whisper.transcribe.called
+
+    def test_short_audio_uses_whole_file(self, tmp_path):
+        audio_path = tmp_path / 'clip.wav'
+        audio_path.write_bytes(b'fake audio data')
+
+        service = self._service()
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper, \
+                patch('src.core.mlx_transcription.probe_duration', return_value=5.0), \
+                patch('src.core.mlx_transcription.open_pcm_stream') as mock_stream:
+            mock_whisper.transcribe.return_value = {'text': 'short'}
+            assert service.transcribe_audio(audio_path) == 'short'
+
+        mock_stream.assert_not_called()
+        mock_whisper.transcribe.assert_called_once()
@@ -9,6 +9,7 @@ import unittest
 from unittest.mock import Mock, patch, MagicMock
 import tempfile
 import os
+import shutil
 from pathlib import Path
 
 # 添加项目根目录到路径
@@ -61,6 +62,16 @@ logging:
         
         # 创建配置管理器和容器
         self.config_manager = ConfigManager(self.temp_config_file.name)
+
+        # 持久化存储（队列、人名映射、阶段断点）写入临时目录，避免在data/下生成文件
+        self.data_dir = tempfile.mkdtemp()
+        config = self.config_manager.config
+        config.setdefault('spacy', {}).setdefault('mapping_store', {})['db_path'] = \
+            os.path.join(self.data_dir, 'name_mappings.db')
+        processing_config = config.setdefault('processing', {})
+        processing_config.setdefault('queue', {})['db_path'] = os.path.join(self.data_dir, 'processing_queue.db')
+        processing_config.setdefault('checkpoints', {})['dir'] = os.path.join(self.data_dir, 'checkpoints')
+
         self.container = DependencyContainer(self.config_manager)
     
     def tearDown(self):
@@ -69,6 +80,7 @@ logging:
         os.unlink(self.temp_config_file.name)
         if hasattr(self, 'container'):
             self.container.clear_cache()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
     
     def test_container_initialization(self):
         """测试容器初始化"""
@@ -229,7 +241,7 @@ logging:
              patch('src.core.dependency_container.NameAnonymizer'):
             
             self.container.get_transcription_service()
-            self.container.get_anonymization_service()
+            anonymizer = self.container.get_anonymization_service()
             
             # 验证服务已缓存
             self.assertEqual(len(self.container._services), 2)
@@ -239,6 +251,8 @@ logging:
             
             # 验证缓存已清空
             self.assertEqual(len(self.container._services), 0)
+            # NER进程池随缓存一起关闭
+            anonymizer.shutdown.assert_called_once()
     
     def test_validate_dependencies_success(self):
         """测试依赖验证成功情况"""
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for the duration-based processing time estimator."""
+
+import pytest
+
+from src.core.eta_estimator import DEFAULT_RTF, PIPELINE_STAGES, EtaEstimator
+
+
+class TestEtaEstimator:
+
+    def test_defaults_scale_with_duration(self):
+        eta = EtaEstimator()
+        expected = sum(DEFAULT_RTF[stage] for stage in PIPELINE_STAGES) * 600
+        assert eta.estimate(600) == pytest.approx(expected)
+        assert eta.estimate(1200) == pytest.approx(2 * expected)
+
+    def test_ewma_per_model(self):
+        eta = EtaEstimator(smoothing=0.5)
+        eta.record('transcription', 60, 600, model='whisper-large-v3')
+        eta.record('transcription', 120, 600, model='whisper-large-v3')
+        eta.record('transcription', 6, 600, model='whisper-tiny')
+
+        assert eta.get_rtf('transcription', 'whisper-large-v3') == pytest.approx(0.15)
+        assert eta.get_rtf('transcription', 'whisper-tiny') == pytest.approx(0.01)
+        # 未见过的模型使用阶段整体RTF
+        assert eta.get_rtf('transcription', 'whisper-medium') == eta.get_rtf('transcription')
+
+    def test_unknown_duration_is_not_recorded(self):
+        eta = EtaEstimator()
+        eta.record('anonymization', 5, None)
+        assert eta.get_rtf('anonymization') == DEFAULT_RTF['anonymization']
+
+    def test_stats_persist(self, tmp_path):
+        stats_file = tmp_path / 'eta_stats.json'
+        EtaEstimator(str(stats_file)).record('publishing', 30, 600)
+
+        reloaded = EtaEstimator(str(stats_file))
+        assert reloaded.get_rtf('publishing') == pytest.approx(0.05)
+        assert reloaded.get_stats()['rtf']['publishing']['samples'] == 1
+
+    def test_queue_eta_counts_transcription_of_jobs_ahead(self):
+        eta = EtaEstimator(default_rtf={'transcription': 0.1, 'anonymization': 0,
+                                        'ai_generation': 0.05, 'publishing': 0})
+        eta.track_job('first', 600)
+        eta.track_job('second', 1200)
+
+        assert eta.queue_eta('first') == pytest.approx(90)
+        assert eta.queue_eta('second') == pytest.approx(60 + 180)
+        assert eta.queue_eta() == eta.queue_eta('second')
+
+        eta.finish_job('first')
+        assert eta.queue_eta('second') == pytest.approx(180)
+        eta.finish_job('second')
+        assert eta.queue_eta() == 0
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Tests for background model warm-up at startup."""
+
+import threading
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from src.core.anonymization import NameAnonymizer
+from src.core.model_warmup import ModelWarmup
+from src.core.speaker_diarization import SpeakerDiarization
+
+
+class TestModelWarmup:
+
+    def test_reports_state_per_model(self):
+        release = threading.Event()
+
+        def slow_loader():
+            release.wait(5)
+
+        warmup = ModelWarmup()
+        warmup.register('spacy', slow_loader)
+        warmup.register('whisper', lambda: False)
+        warmup.register('pyannote', Mock(side_effect=RuntimeError('no token')))
+
+        assert warmup.get_status()['models']['spacy']['state'] == 'pending'
+        warmup.start()
+        assert warmup.get_status()['ready'] is False
+
+        release.set()
+        assert warmup.wait(5)
+
+        status = warmup.get_status()
+        assert status['ready'] is True
+        assert status['warm'] == ['spacy']
+        assert status['models']['whisper']['state'] == 'skipped'
+        assert status['models']['pyannote']['state'] == 'failed'
+        assert 'no token' in status['models']['pyannote']['error']
+
+    def test_start_is_idempotent(self):
+        loader = Mock()
+        warmup = ModelWarmup()
+        warmup.register('spacy', loader)
+
+        assert warmup.start() is warmup.start()
+        warmup.wait(5)
+        loader.assert_called_once()
+
+
+class TestLazyServices:
+
+    def test_anonymizer_defers_spacy_until_first_use(self):
+        with patch('src.core.anonymization.spacy.load') as mock_load:
+            anonymizer = NameAnonymizer({}, lazy_load=True)
+            mock_load.assert_not_called()
+            assert not anonymizer.is_ready()
+
+            mock_load.return_value = MagicMock(return_value=Mock(ents=[]))
+            anonymizer.anonymize_names('plain text')
+
+        assert mock_load.call_count == 2
+        assert anonymizer.is_ready()
+
+    def test_lazy_anonymizer_raises_when_models_missing(self):
+        with patch('src.core.anonymization.spacy.load', side_effect=OSError('missing')):
+            anonymizer = NameAnonymizer({}, lazy_load=True)
+            with pytest.raises(OSError):
+                anonymizer.anonymize_names('Alice met Bob')
+
+    def test_diarization_warm_up_loads_pipeline_once(self):
+        service = SpeakerDiarization({}, {})
+        with patch('src.core.speaker_diarization.Pipeline') as mock_pipeline, \
+                patch('src.core.speaker_diarization.torch', None):
+            service.warm_up()
+            service._get_pipeline()
+
+        mock_pipeline.from_pretrained.assert_called_once()
+        assert service.is_ready()
@@ -25,7 +25,7 @@ import numpy as np
 # 添加src目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / 'src'))
 
-from core.speaker_diarization import SpeakerDiarization
+from core.speaker_diarization import SpeakerDiarization, speaker_overlap_matrix
 
 
 class TestSpeakerDiarizationAlignment(unittest.TestCase):
@@ -469,5 +469,128 @@ class TestSpeakerDiarizationAlignment(unittest.TestCase):
         print(f"性能测试: {num_chunks}个chunks + {num_segments}个segments = {processing_time:.3f}秒")
 
 
+    # ============= 场景6: 索引对齐与逐一遍历结果一致 =============
+
+    @staticmethod
+    def brute_force_align(chunks: List[Dict], speaker_segments: List[Dict]) -> List[str]:
+        """逐一遍历所有segments的参考实现（O(chunks × segments)）"""
+        speakers = []
+        for chunk in chunks:
+            chunk_start, chunk_end = chunk['timestamp']
+            best_speaker, best_iou = None, 0.4
+            for seg in speaker_segments:
+                inter = min(chunk_end, seg['end']) - max(chunk_start, seg['start'])
+                if max(chunk_start, seg['start']) < min(chunk_end, seg['end']):
+                    union = (chunk_end - chunk_start) + (seg['end'] - seg['start']) - inter
+                    iou = inter / union if union > 0 else 0
+                    if iou > best_iou:
+                        best_iou, best_speaker = iou, seg['speaker']
+            if best_speaker is None:
+                max_overlap, best_speaker = 0, 'Unknown'
+                for seg in speaker_segments:
+                    if max(chunk_start, seg['start']) < min(chunk_end, seg['end']):
+                        overlap = min(chunk_end, seg['end']) - max(chunk_start, seg['start'])
+                        if overlap > max_overlap:
+                            max_overlap, best_speaker = overlap, seg['speaker']
+                if best_speaker == 'Unknown':
+                    center = (chunk_start + chunk_end) / 2
+                    min_distance = float('inf')
+                    for seg in speaker_segments:
+                        distance = abs(center - (seg['start'] + seg['end']) / 2)
+                        if distance < min_distance:
+                            min_distance, best_speaker = distance, seg['speaker']
+            speakers.append(best_speaker)
+        return speakers
+
+    def test_indexed_alignment_matches_brute_force(self):
+        """随机场景下索引对齐与逐一遍历的结果完全一致"""
+        rng = np.random.default_rng(42)
+        for _ in range(30):
+            segments = []
+            for i in range(int(rng.integers(1, 40))):
+                start = round(float(rng.uniform(0, 120)), 1)
+                segments.append({
+                    'speaker': f'SPEAKER_{i % 4}',
+                    'start': start,
+                    'end': round(start + float(rng.choice([0.0, rng.uniform(0.1, 30)])), 1),
+                })
+            chunks = []
+            for i in range(int(rng.integers(1, 80))):
+                start = round(float(rng.uniform(0, 130)), 1)
+                chunks.append({'text': f'c{i}', 'timestamp': [start, round(start + float(rng.uniform(0, 8)), 1)]})
+
+            aligned = self.diarization_service._align_timestamps_with_speakers(chunks, segments)
+
+            self.assertEqual([chunk['speaker'] for chunk in aligned],
+                             self.brute_force_align(chunks, segments))
+
+    # ============= 场景7: 词级对齐 =============
+
+    def test_word_mode_splits_chunk_at_speaker_change(self):
+        """词级模式在说话人切换处拆分chunk"""
+        self.diarization_service.alignment_mode = 'word'
+        chunks = [{
+            'text': ' Hello there. Hi Bob.',
+            'timestamp': [0.0, 4.0], 'start': 0.0, 'end': 4.0,
+            'words': [
+                {'word': ' Hello', 'start': 0.0, 'end': 0.8},
+                {'word': ' there.', 'start': 0.8, 'end': 1.9},
+                {'word': ' Hi', 'start': 2.1, 'end': 2.6},
+                {'word': ' Bob.', 'start': 2.6, 'end': 4.0},
+            ],
+        }]
+        segments = [
+            {'speaker': 'SPEAKER_00', 'start': 0.0, 'end': 2.0},
+            {'speaker': 'SPEAKER_01', 'start': 2.0, 'end': 4.0},
+        ]
+
+        result = self.diarization_service.merge_with_transcription(
+            self.create_test_transcription(chunks), segments, group_by_speaker=False
+        )
+
+        self.assertEqual([(c['speaker'], c['text']) for c in result],
+                         [('SPEAKER_00', 'Hello there.'), ('SPEAKER_01', 'Hi Bob.')])
+        self.assertEqual(result[1]['timestamp'], [2.1, 4.0])
+
+    def test_word_mode_uses_nearest_speaker_and_segment_fallback(self):
+        """无重叠的词取最近说话人；没有words的chunk使用段落级对齐"""
+        self.diarization_service.alignment_mode = 'word'
+        chunks = [
+            {'text': ' late', 'timestamp': [9.0, 9.5],
+             'words': [{'word': ' late', 'start': 9.0, 'end': 9.5}]},
+            {'text': ' no words', 'timestamp': [0.0, 1.0]},
+        ]
+        segments = [
+            {'speaker': 'SPEAKER_00', 'start': 0.0, 'end': 2.0},
+            {'speaker': 'SPEAKER_01', 'start': 5.0, 'end': 8.0},
+        ]
+
+        aligned = self.diarization_service._align_words_with_speakers(chunks, segments)
+
+        self.assertEqual([c['speaker'] for c in aligned], ['SPEAKER_01', 'SPEAKER_00'])
+
+    def test_overlap_matrix_matches_pairwise_sum(self):
+        """向量化重叠矩阵与逐对计算一致（同一说话人的重叠段落只计一次）"""
+        rng = np.random.default_rng(7)
+        segments = []
+        for i in range(40):
+            start = float(rng.uniform(0, 100))
+            segments.append({'speaker': f'S{i % 3}', 'start': start, 'end': start + float(rng.uniform(0, 6))})
+        starts = rng.uniform(0, 100, 200)
+        ends = starts + rng.uniform(0, 2, 200)
+
+        speakers, overlap = speaker_overlap_matrix(starts, ends, segments)
+
+        grid = np.linspace(0, 110, 110001)
+        for column, speaker in enumerate(speakers):
+            covered = np.zeros_like(grid, dtype=bool)
+            for seg in segments:
+                if seg['speaker'] == speaker:
+                    covered |= (grid >= seg['start']) & (grid < seg['end'])
+            for row in range(0, 200, 17):
+                mask = (grid >= starts[row]) & (grid < ends[row])
+                expected = covered[mask].sum() * (grid[1] - grid[0])
+                self.assertAlmostEqual(overlap[row, column], expected, delta=0.01)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests for the cross-recording speaker identity index."""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from src.core.speaker_diarization import SpeakerDiarization
+from src.core.speaker_identity import SpeakerIdentityIndex, speaker_series_key
+
+
+ALICE = np.array([1.0, 0.1, 0.0, 0.0], dtype=np.float32)
+BOB = np.array([0.0, 0.0, 1.0, 0.2], dtype=np.float32)
+CAROL = np.array([0.0, 1.0, 0.0, -1.0], dtype=np.float32)
+
+
+class TestSpeakerIdentityIndex:
+
+    def test_names_are_stable_across_recordings(self, tmp_path):
+        index = SpeakerIdentityIndex(str(tmp_path))
+        first = index.identify('meeting/standup', ['SPEAKER_00', 'SPEAKER_01'], np.vstack([ALICE, BOB]))
+
+        # 第二次录音中pyannote标签顺序相反，并多了一位新说话人
+        reloaded = SpeakerIdentityIndex(str(tmp_path))
+        second = reloaded.identify(
+            'meeting/standup', ['SPEAKER_00', 'SPEAKER_01', 'SPEAKER_02'],
+            np.vstack([BOB * 1.1 + 0.02, CAROL, ALICE + 0.05])
+        )
+
+        assert second['SPEAKER_00'] == first['SPEAKER_01']
+        assert second['SPEAKER_02'] == first['SPEAKER_00']
+        assert second['SPEAKER_01'] not in first.values()
+        assert reloaded.get_speakers('meeting/standup') == {
+            first['SPEAKER_00']: 2, first['SPEAKER_01']: 2, second['SPEAKER_01']: 1
+        }
+
+    def test_one_to_one_assignment_and_nan_rows(self, tmp_path):
+        index = SpeakerIdentityIndex(str(tmp_path))
+        index.identify('s', ['A'], ALICE[None, :])
+
+        mapping = index.identify('s', ['X', 'Y', 'Z'], np.vstack([ALICE, ALICE + [0, 0, 0.3, 0], np.full(4, np.nan)]))
+
+        assert mapping['X'] == 'SPEAKER_00'
+        assert mapping['Y'] == 'SPEAKER_01'
+        assert 'Z' not in mapping
+
+    def test_series_are_isolated_and_renamable(self, tmp_path):
+        index = SpeakerIdentityIndex(str(tmp_path))
+        index.identify('lecture/CS101', ['SPEAKER_00'], ALICE[None, :])
+        assert index.rename_speaker('lecture/CS101', 'SPEAKER_00', 'Prof. Smith')
+
+        assert SpeakerIdentityIndex(str(tmp_path)).identify('lecture/CS101', ['SPEAKER_03'], ALICE[None, :]) == {
+            'SPEAKER_03': 'Prof. Smith'
+        }
+        assert index.identify('lecture/MATH', ['SPEAKER_00'], ALICE[None, :]) == {'SPEAKER_00': 'SPEAKER_00'}
+
+    def test_series_key(self):
+        assert speaker_series_key('meeting', 'standup') == 'meeting/standup'
+        assert speaker_series_key('meeting', None) is None
+        assert speaker_series_key('meeting', 'other') is None
+
+
+def test_diarization_relabels_speakers_from_index(tmp_path):
+    audio_path = tmp_path / 'standup.wav'
+    audio_path.write_bytes(b'fake audio')
+    service = SpeakerDiarization({'identity': {'enabled': True, 'index_dir': str(tmp_path / 'index')}}, {})
+    service.identity_index.identify('meeting/standup', ['SPEAKER_00'], BOB[None, :])
+
+    annotation = MagicMock()
+    annotation.labels.return_value = ['SPEAKER_00', 'SPEAKER_01']
+    annotation.itertracks.return_value = [
+        (MagicMock(start=0.0, end=2.0), None, 'SPEAKER_00'),
+        (MagicMock(start=2.0, end=4.0), None, 'SPEAKER_01'),
+    ]
+    pipeline = MagicMock(return_value=(annotation, np.vstack([CAROL, BOB])))
+
+    with patch.object(service, '_get_pipeline', return_value=pipeline), \
+            patch.object(service, '_prepare_audio_for_diarization', return_value=Path(audio_path)):
+        segments = service.diarize_audio(audio_path, speaker_series='meeting/standup')
+
+    assert pipeline.call_args.kwargs == {'return_embeddings': True}
+    assert [segment['speaker'] for segment in segments] == ['SPEAKER_01', 'SPEAKER_00']
+
+
+def test_unmatched_speakers_get_distinct_prefix(tmp_path):
+    audio_path = tmp_path / 'standup.wav'
+    audio_path.write_bytes(b'fake audio')
+    service = SpeakerDiarization({'identity': {'enabled': True, 'index_dir': str(tmp_path / 'index')}}, {})
+    service.identity_index.identify('meeting/standup', ['SPEAKER_00'], BOB[None, :])
+
+    annotation = MagicMock()
+    annotation.labels.return_value = ['SPEAKER_00', 'SPEAKER_01']
+    annotation.itertracks.return_value = [
+        (MagicMock(start=0.0, end=2.0), None, 'SPEAKER_00'),
+        (MagicMock(start=2.0, end=4.0), None, 'SPEAKER_01'),
+    ]
+    # SPEAKER_00的嵌入无效，无法参与匹配，不能沿用与已知说话人重名的原始标签
+    pipeline = MagicMock(return_value=(annotation, np.vstack([np.full_like(BOB, np.nan), BOB])))
+
+    with patch.object(service, '_get_pipeline', return_value=pipeline), \
+            patch.object(service, '_prepare_audio_for_diarization', return_value=Path(audio_path)):
+        segments = service.diarize_audio(audio_path, speaker_series='meeting/standup')
+
+    assert [segment['speaker'] for segment in segments] == ['UNKNOWN_00', 'SPEAKER_00']
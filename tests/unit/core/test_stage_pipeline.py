@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Tests for the stage pipeline used by AudioProcessor."""
+
+import threading
+import time
+
+import pytest
+
+from src.core.stage_pipeline import StagePipeline
+
+
+class TestStagePipeline:
+    """Stages run on their own threads and overlap across jobs."""
+
+    def test_jobs_pass_through_all_stages_in_order(self):
+        def first(context):
+            context['trail'].append('first')
+
+        def second(context):
+            context['trail'].append('second')
+
+        pipeline = StagePipeline([('first', first, 1), ('second', second, 1)])
+        try:
+            job = pipeline.submit('job-1', {'trail': []})
+            assert job.wait(timeout=5)
+            assert job.success
+            assert job.context['trail'] == ['first', 'second']
+            assert set(job.stage_timings) == {'first', 'second'}
+        finally:
+            pipeline.stop()
+
+    def test_next_job_starts_first_stage_while_previous_is_in_second(self):
+        release_second = threading.Event()
+        first_started = []
+
+        def first(context):
+            first_started.append(context['name'])
+
+        def second(context):
+            release_second.wait(timeout=5)
+
+        pipeline = StagePipeline([('first', first, 1), ('second', second, 1)])
+        try:
+            job_a = pipeline.submit('a', {'name': 'a'})
+            job_b = pipeline.submit('b', {'name': 'b'})
+
+            deadline = time.time() + 5
+            while len(first_started) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+
+            # job b finished the first stage while job a is still blocked in the second
+            assert first_started == ['a', 'b']
+            assert not job_a.done
+
+            status = pipeline.get_status()
+            assert status['in_flight'] == 2
+            assert status['stages']['second']['busy'] == 1
+
+            release_second.set()
+            assert job_a.wait(timeout=5) and job_b.wait(timeout=5)
+            assert job_a.success and job_b.success
+        finally:
+            release_second.set()
+            pipeline.stop()
+
+    def test_failed_stage_stops_job_and_reports_stage(self):
+        reached = []
+
+        def boom(context):
+            raise RuntimeError('stage failed')
+
+        def after(context):
+            reached.append(True)
+
+        callbacks = []
+        pipeline = StagePipeline(
+            [('boom', boom, 1), ('after', after, 1)],
+            on_stage_complete=lambda job, stage, elapsed: callbacks.append(stage),
+        )
+        try:
+            job = pipeline.submit('job-1', {})
+            assert job.wait(timeout=5)
+            assert not job.success
+            assert job.failed_stage == 'boom'
+            assert isinstance(job.error, RuntimeError)
+            assert reached == []
+            assert callbacks == ['boom']
+        finally:
+            pipeline.stop()
+
+    def test_stop_fails_unfinished_jobs(self):
+        release = threading.Event()
+
+        def slow(context):
+            release.wait(timeout=5)
+
+        pipeline = StagePipeline([('slow', slow, 1), ('after', lambda context: None, 1)], queue_size=1)
+        running = pipeline.submit('running', {})
+        queued = pipeline.submit('queued', {})
+
+        pipeline.stop(timeout=0.1)
+        try:
+            assert running.wait(timeout=1) and queued.wait(timeout=1)
+            assert not running.success and not queued.success
+            assert pipeline.get_status()['in_flight'] == 0
+        finally:
+            release.set()
+
+    def test_empty_stages_rejected(self):
+        with pytest.raises(ValueError):
+            StagePipeline([])
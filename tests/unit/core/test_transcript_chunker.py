@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Tests for transcript chunking and map-reduce summarization."""
+
+import threading
+from unittest.mock import Mock
+
+from src.core.ai_generation import AIContentGenerator
+from src.core.transcript_chunker import (
+    chunk_segments,
+    chunk_transcript,
+    estimate_tokens,
+    split_sentences,
+)
+
+
+class TestTranscriptChunker:
+
+    def test_estimate_tokens_counts_cjk_per_character(self):
+        assert estimate_tokens('') == 0
+        assert estimate_tokens('你好世界') == 4
+        assert estimate_tokens('abcdefgh') == 2
+
+    def test_split_sentences_handles_mixed_punctuation(self):
+        assert split_sentences('One. Two! 三。四？\nfive') == ['One.', 'Two!', '三。', '四？', 'five']
+
+    def test_segments_are_packed_without_being_split(self):
+        segments = ['aaaa bbbb', 'cccc', 'dddd eeee', 'ffff']
+        chunks = chunk_segments(segments, max_tokens=5)
+
+        assert chunks == ['aaaa bbbb cccc', 'dddd eeee ffff']
+        assert all(estimate_tokens(chunk) <= 5 for chunk in chunks)
+
+    def test_oversized_segment_falls_back_to_sentences(self):
+        chunks = chunk_segments(['First sentence. Second sentence.'], max_tokens=5)
+        assert chunks == ['First sentence.', 'Second sentence.']
+
+    def test_plain_text_is_chunked_on_sentences(self):
+        chunks = chunk_transcript('第一句话。第二句话。第三句话。', max_tokens=10)
+        assert chunks == ['第一句话。第二句话。', '第三句话。']
+
+
+    def test_unpunctuated_text_is_hard_split(self):
+        text = '中' * 60000 + 'abcd' * 10
+        chunks = chunk_transcript(text, max_tokens=1000)
+
+        assert ''.join(chunks) == text
+        assert all(estimate_tokens(chunk) <= 1000 for chunk in chunks)
+        assert len(chunks) == 61
+
+class TestMapReduceGeneration:
+
+    def _generator(self, **map_reduce):
+        generator = AIContentGenerator(
+            {'openrouter': {'map_reduce': {'enabled': True, **map_reduce}}},
+            enable_rate_limiting=False,
+        )
+        generator.client = Mock()
+        return generator
+
+    def test_long_text_is_summarized_per_chunk_then_reduced(self):
+        generator = self._generator(threshold_tokens=10, chunk_tokens=10, max_parallel=3)
+        prompts = []
+        lock = threading.Lock()
+
+        def generate_content(model_type, prompt, **kwargs):
+            with lock:
+                prompts.append((model_type, prompt))
+            return f'notes-{len(prompts)}'
+
+        generator.client.generate_content.side_effect = generate_content
+        segments = ['alpha ' * 6, 'beta ' * 6, 'gamma ' * 6]
+
+        result = generator.generate_batch(''.join(segments), ['summary', 'mindmap'], segments=segments)
+
+        map_prompts = [prompt for _, prompt in prompts if 'part ' in prompt]
+        reduce_prompts = [prompt for _, prompt in prompts if 'part ' not in prompt]
+        assert len(map_prompts) == 3
+        assert len(reduce_prompts) == 2
+        assert all('[Part 1/3]' in prompt and 'alpha' not in prompt for prompt in reduce_prompts)
+        assert set(result) == {'summary', 'mindmap'}
+
+    def test_short_text_skips_map_step(self):
+        generator = self._generator(threshold_tokens=1000)
+        generator.client.generate_content.return_value = 'result'
+
+        generator.generate_batch('short transcript', ['summary'])
+
+        generator.client.generate_content.assert_called_once()
+
+    def test_map_failure_falls_back_to_full_text(self):
+        generator = self._generator(threshold_tokens=1, chunk_tokens=2)
+
+        def generate_content(model_type, prompt, **kwargs):
+            if 'part ' in prompt:
+                raise RuntimeError('chunk failed')
+            return prompt
+
+        generator.client.generate_content.side_effect = generate_content
+
+        result = generator.generate_batch('some long transcript text', ['summary'])
+
+        assert 'some long transcript text' in result['summary']
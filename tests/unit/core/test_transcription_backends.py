@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Tests for pluggable transcription backends."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.mlx_transcription import MLXTranscriptionService
+from src.core.transcription_backends import FasterWhisperBackend, TranscriptionBackend, faster_whisper_model_name
+
+
+def _segment(start, end, text, words=None):
+    return SimpleNamespace(start=start, end=end, text=text, words=words)
+
+
+class TestModelNames:
+
+    @pytest.mark.parametrize('repo, expected', [
+        ('mlx-community/whisper-large-v3-mlx', 'large-v3'),
+        ('mlx-community/whisper-large-v3-turbo', 'large-v3-turbo'),
+        ('mlx-community/whisper-tiny-mlx-4bit', 'tiny'),
+        ('mlx-community/whisper-small.en-mlx', 'small.en'),
+    ])
+    def test_mlx_repo_maps_to_faster_whisper_name(self, repo, expected):
+        assert faster_whisper_model_name(repo) == expected
+
+    def test_explicit_map_wins(self):
+        assert faster_whisper_model_name('mlx-community/whisper-medium-mlx',
+                                         {'whisper-medium-mlx': '/models/medium-int8'}) == '/models/medium-int8'
+
+
+class TestFasterWhisperBackend:
+
+    def test_batched_transcription_returns_mlx_shaped_result(self):
+        model_cls = MagicMock()
+        batched_cls = MagicMock()
+        word = SimpleNamespace(word=' Hi', start=0.0, end=0.4, probability=0.9)
+        batched_cls.return_value.transcribe.return_value = (
+            iter([_segment(0.0, 1.0, ' Hi', [word]), _segment(1.0, 2.0, ' there')]),
+            SimpleNamespace(language='en'),
+        )
+
+        with patch('src.core.transcription_backends.WhisperModel', model_cls), \
+                patch('src.core.transcription_backends.BatchedInferencePipeline', batched_cls):
+            backend = FasterWhisperBackend({'cpu_threads': 4, 'batch_size': 16, 'beam_size': 2})
+            result = backend.transcribe('audio.wav', {
+                'path_or_hf_repo': 'mlx-community/whisper-small-mlx',
+                'language': 'en', 'word_timestamps': True,
+            })
+            backend.transcribe('audio.wav', {'path_or_hf_repo': 'mlx-community/whisper-small-mlx'})
+
+        model_cls.assert_called_once_with('small', device='cpu', compute_type='int8', cpu_threads=4,
+                                          num_workers=1, download_root=None)
+        kwargs = batched_cls.return_value.transcribe.call_args_list[0].kwargs
+        assert kwargs['batch_size'] == 16 and kwargs['beam_size'] == 2 and kwargs['language'] == 'en'
+        assert result['text'] == ' Hi there'
+        assert result['segments'][0]['words'] == [{'word': ' Hi', 'start': 0.0, 'end': 0.4, 'probability': 0.9}]
+        assert 'words' not in result['segments'][1]
+
+
+class TestServiceBackendSelection:
+
+    def test_auto_falls_back_to_faster_whisper_without_mlx(self, tmp_path):
+        audio_path = tmp_path / 'clip.wav'
+        audio_path.write_bytes(b'fake audio data')
+        model_cls = MagicMock()
+        model_cls.return_value.transcribe.return_value = (iter([_segment(0.0, 1.0, ' hello')]), None)
+
+        service = MLXTranscriptionService({'default_model': 'whisper-base-mlx',
+                                           'faster_whisper': {'batch_size': 1}})
+        with patch('src.core.mlx_transcription.mlx_whisper', None), \
+                patch('src.core.transcription_backends.WhisperModel', model_cls):
+            assert service.transcribe_audio(audio_path) == 'hello'
+
+        model_cls.return_value.transcribe.assert_called_once()
+        assert service.get_model_info()['backend']['name'] == 'faster_whisper'
+
+    def test_missing_backend_dependency_raises(self, tmp_path):
+        audio_path = tmp_path / 'clip.wav'
+        audio_path.write_bytes(b'fake audio data')
+
+        service = MLXTranscriptionService({'backend': 'faster_whisper'})
+        with patch('src.core.transcription_backends.WhisperModel', None), pytest.raises(Exception, match='faster-whisper'):
+            service.transcribe_audio(audio_path)
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TranscriptionBackend()
+
+    class IncompleteBackend(TranscriptionBackend):
+        def is_available(self):
+            return True
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Tests for the transcription result cache."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.core.mlx_transcription import MLXTranscriptionService
+from src.core.voice_activity import SpeechTimeline
+
+
+@pytest.fixture
+def service(tmp_path):
+    return MLXTranscriptionService({
+        'default_model': 'whisper-tiny-mlx',
+        'available_models': ['mlx-community/whisper-tiny-mlx'],
+        'cache': {'enabled': True, 'directory': str(tmp_path / 'cache')},
+    })
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / 'lecture.wav'
+    path.write_bytes(b'fake audio data')
+    return path
+
+
+class TestTranscriptionCache:
+
+    def test_same_audio_is_transcribed_once(self, service, audio_file, tmp_path):
+        copy = tmp_path / 'lecture_copy.wav'
+        copy.write_bytes(audio_file.read_bytes())
+
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.return_value = {'text': 'hello world'}
+
+            assert service.transcribe_audio(audio_file) == 'hello world'
+            # a re-upload under another name hits the cache by content hash
+            assert service.transcribe_audio(copy) == 'hello world'
+
+        assert mock_whisper.transcribe.call_count == 1
+        assert service.get_cache_stats()['hits'] == 1
+
+    @pytest.mark.parametrize('changed', [
+        {'prompt': 'technical terms'},
+        {'language_preference': 'multilingual'},
+        {'custom_model': 'whisper-base-mlx'},
+        {'word_timestamps': True},
+    ])
+    def test_key_includes_transcription_parameters(self, service, audio_file, changed):
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.return_value = {'text': 'hello world', 'segments': []}
+
+            service.transcribe_audio(audio_file)
+            service.transcribe_audio(audio_file, **changed)
+
+        assert mock_whisper.transcribe.call_count == 2
+
+    def test_key_includes_vad_signature(self, service, audio_file):
+        base = service._build_cache_key(audio_file, '', 'english', None, False)
+        narrow = {'padding_seconds': 0.3, 'margin_db': 12.0}
+        padded = {'padding_seconds': 0.5, 'margin_db': 12.0}
+
+        keys = {
+            base,
+            service._build_cache_key(audio_file, '', 'english', None, False, vad_signature=narrow),
+            service._build_cache_key(audio_file, '', 'english', None, False, vad_signature=padded),
+        }
+        assert len(keys) == 3
+        assert service._build_cache_key(audio_file, '', 'english', None, False,
+                                        vad_signature={'margin_db': 12.0, 'padding_seconds': 0.3}) in keys
+
+    def test_lookup_before_decoding(self, service, audio_file):
+        signature = {'padding_seconds': 0.3}
+        decoded = object()
+        timeline = SpeechTimeline([(1.0, 5.0)], 10.0)
+        assert service.get_cached_transcription(audio_file, vad_signature=signature) is None
+
+        with patch.object(service, '_transcribe_uncached', return_value='speech only') as transcribe:
+            service.transcribe_audio(audio_file, decoded_audio=decoded, speech_timeline=timeline,
+                                     vad_signature=signature)
+            # 没有VAD参数时只转录语音区间的结果不写入缓存
+            service.transcribe_audio(audio_file, decoded_audio=decoded, speech_timeline=timeline)
+
+        assert transcribe.call_count == 2
+        assert service.get_cached_transcription(audio_file, vad_signature=signature) == 'speech only'
+        assert service.get_cached_transcription(audio_file) is None
+
+    def test_empty_result_is_not_cached(self, service, audio_file):
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.return_value = {'text': '  '}
+
+            service.transcribe_audio(audio_file)
+            service.transcribe_audio(audio_file)
+
+        assert mock_whisper.transcribe.call_count == 2
+
+    def test_cache_disabled_by_default(self):
+        service = MLXTranscriptionService({'default_model': 'whisper-tiny-mlx'})
+        assert service.transcription_cache is None
+        assert service.get_cache_stats() is None
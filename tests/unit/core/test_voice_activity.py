@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Tests for the energy VAD pre-pass and timestamp remapping."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.core.audio_decoder import DecodedAudio
+from src.core.mlx_transcription import MLXTranscriptionService
+from src.core.voice_activity import SpeechTimeline, VoiceActivityDetector, detect_speech_regions
+
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds, noise=1e-4):
+    rng = np.random.default_rng(0)
+    return (noise * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _speech_with_gaps():
+    # 静音10秒 → 语音5秒 → 静音20秒 → 语音5秒 → 静音10秒
+    return np.concatenate([_silence(10), _tone(5), _silence(20), _tone(5), _silence(10)])
+
+
+class TestDetectSpeechRegions:
+
+    def test_finds_speech_between_silences(self):
+        regions = detect_speech_regions(_speech_with_gaps(), padding_seconds=0.3)
+
+        assert len(regions) == 2
+        assert regions[0] == pytest.approx((9.7, 15.3), abs=0.05)
+        assert regions[1] == pytest.approx((34.7, 40.3), abs=0.05)
+
+    def test_short_pauses_are_kept(self):
+        samples = np.concatenate([_tone(3), _silence(0.5), _tone(3), _silence(5)])
+        regions = detect_speech_regions(samples, min_silence_seconds=1.0, padding_seconds=0)
+        assert len(regions) == 1
+
+    def test_digital_silence_has_no_speech(self):
+        assert detect_speech_regions(np.zeros(SAMPLE_RATE * 5, dtype=np.float32)) == []
+
+    def test_detector_skips_mostly_speech_audio(self):
+        detector = VoiceActivityDetector({'max_speech_ratio': 0.9})
+        assert detector.detect(np.concatenate([_tone(30), _silence(1)])) is None
+        assert detector.detect(_speech_with_gaps()).regions
+
+
+class TestSpeechTimeline:
+
+    def test_compact_and_map_back(self):
+        timeline = SpeechTimeline([(10.0, 15.0), (35.0, 40.0)], total_duration=50.0)
+        samples = np.arange(50 * SAMPLE_RATE, dtype=np.float32)
+
+        compact = timeline.compact(samples)
+        assert len(compact) == 10 * SAMPLE_RATE
+        assert compact[5 * SAMPLE_RATE] == samples[35 * SAMPLE_RATE]
+        assert timeline.speech_ratio == pytest.approx(0.2)
+
+        assert timeline.to_original(2.0) == pytest.approx(12.0)
+        assert timeline.to_original(7.0) == pytest.approx(37.0)
+        # 区间交界：起点归后一个区间，终点归前一个区间
+        assert timeline.to_original(5.0) == pytest.approx(35.0)
+        assert timeline.to_original(5.0, is_end=True) == pytest.approx(15.0)
+
+    def test_remap_segment_and_words(self):
+        timeline = SpeechTimeline([(10.0, 15.0), (35.0, 40.0)], total_duration=50.0)
+        segment = {'start': 4.0, 'end': 6.0, 'text': 'hi',
+                   'words': [{'word': 'a', 'start': 4.0, 'end': 4.5}, {'word': 'b', 'start': 5.5, 'end': 6.0}]}
+
+        remapped = timeline.remap_segment(segment)
+
+        assert (remapped['start'], remapped['end']) == pytest.approx((14.0, 36.0))
+        assert [(w['start'], w['end']) for w in remapped['words']] == [pytest.approx((14.0, 14.5)),
+                                                                      pytest.approx((35.5, 36.0))]
+        assert segment['start'] == 4.0
+
+    def test_remap_span_splits_across_removed_silence(self):
+        timeline = SpeechTimeline([(10.0, 15.0), (35.0, 40.0)], total_duration=50.0)
+        assert timeline.remap_span(4.0, 6.0) == [pytest.approx((14.0, 15.0)), pytest.approx((35.0, 36.0))]
+        assert timeline.remap_span(1.0, 2.0) == [pytest.approx((11.0, 12.0))]
+
+
+class TestSpeechOnlyTranscription:
+
+    def test_whisper_sees_compact_audio_and_returns_original_times(self, tmp_path):
+        audio_path = tmp_path / 'lecture.wav'
+        audio_path.write_bytes(b'fake audio')
+        samples = _speech_with_gaps()
+        decoded = DecodedAudio(source=audio_path, path=Path(tmp_path / 'pcm.f32'), samples=samples)
+        timeline = SpeechTimeline([(10.0, 15.0), (35.0, 40.0)], total_duration=len(samples) / SAMPLE_RATE)
+        service = MLXTranscriptionService({'default_model': 'whisper-tiny-mlx', 'backend': 'mlx'})
+
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.return_value = {
+                'text': ' one two',
+                'segments': [{'start': 0.5, 'end': 4.0, 'text': ' one'}, {'start': 5.5, 'end': 9.0, 'text': ' two'}],
+            }
+            result = service.transcribe_audio(audio_path, word_timestamps=True, decoded_audio=decoded,
+                                              speech_timeline=timeline)
+
+        assert len(mock_whisper.transcribe.call_args.args[0]) == 10 * SAMPLE_RATE
+        assert [chunk['timestamp'] for chunk in result['chunks']] == [
+            pytest.approx([10.5, 14.0]), pytest.approx([35.5, 39.0])
+        ]
+
+    def test_no_speech_returns_empty_transcription(self, tmp_path):
+        audio_path = tmp_path / 'silence.wav'
+        audio_path.write_bytes(b'fake audio')
+        samples = np.zeros(SAMPLE_RATE * 5, dtype=np.float32)
+        decoded = DecodedAudio(source=audio_path, path=Path(tmp_path / 'pcm.f32'), samples=samples)
+        service = MLXTranscriptionService({'default_model': 'whisper-tiny-mlx', 'backend': 'mlx'})
+
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            result = service.transcribe_audio(audio_path, decoded_audio=decoded,
+                                              speech_timeline=SpeechTimeline([], total_duration=5.0))
+
+        mock_whisper.transcribe.assert_not_called()
+        assert result == '转录结果为空。'
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Tests for the warm Whisper model pool."""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.core.mlx_transcription import MLXTranscriptionService
+from src.core.whisper_model_pool import WhisperModelPool
+
+
+SIZES = {'repo/whisper-tiny': 100, 'repo/whisper-small': 500, 'repo/whisper-medium': 1500}
+
+
+def _pool(max_memory_mb, loaded):
+    holder = SimpleNamespace(model=None, model_path=None)
+
+    def loader(repo):
+        loaded.append(repo)
+        return SimpleNamespace(repo=repo)
+
+    pool = WhisperModelPool(max_memory_mb, loader=loader, holder=holder)
+    pool._model_size_mb = lambda model, repo: SIZES[repo]
+    return pool, holder
+
+
+class TestWhisperModelPool:
+
+    def test_model_loaded_once_and_placed_in_holder(self):
+        loaded = []
+        pool, holder = _pool(2000, loaded)
+
+        for _ in range(3):
+            with pool.use('repo/whisper-tiny') as model:
+                assert holder.model is model
+                assert holder.model_path == 'repo/whisper-tiny'
+
+        assert loaded == ['repo/whisper-tiny']
+        stats = pool.get_stats()
+        assert stats['loads'] == 1 and stats['hits'] == 2
+
+    def test_least_recently_used_model_evicted_over_budget(self):
+        loaded = []
+        pool, _ = _pool(1700, loaded)
+
+        pool.get('repo/whisper-tiny')
+        pool.get('repo/whisper-small')
+        pool.get('repo/whisper-tiny')       # tiny becomes most recently used
+        pool.get('repo/whisper-medium')     # 2100MB > budget: evict small first
+
+        assert pool.is_loaded('repo/whisper-tiny')
+        assert not pool.is_loaded('repo/whisper-small')
+        assert pool.is_loaded('repo/whisper-medium')
+        assert pool.get_stats()['evictions'] == 1
+
+    def test_model_larger_than_budget_is_still_kept(self):
+        loaded = []
+        pool, _ = _pool(200, loaded)
+
+        pool.get('repo/whisper-tiny')
+        pool.get('repo/whisper-medium')
+
+        assert list(pool.get_stats()['models']) == ['repo/whisper-medium']
+
+    def test_clear_releases_models_and_holder(self):
+        loaded = []
+        pool, holder = _pool(2000, loaded)
+        with pool.use('repo/whisper-tiny'):
+            pass
+
+        assert pool.clear() == 1
+        assert holder.model is None
+        assert pool.get_stats()['models'] == {}
+
+    def test_stats_available_during_transcription(self):
+        loaded = []
+        pool, holder = _pool(1600, loaded)
+        in_use = threading.Event()
+        done = threading.Event()
+
+        def transcribe():
+            with pool.use('repo/whisper-small'):
+                in_use.set()
+                done.wait(timeout=5)
+
+        worker = threading.Thread(target=transcribe)
+        worker.start()
+        try:
+            assert in_use.wait(timeout=5)
+            # 转录期间查询、预加载不被阻塞，也不会淘汰正在使用的模型
+            result = {}
+            reader = threading.Thread(target=lambda: result.update(
+                stats=pool.get_stats(), preloaded=pool.preload('repo/whisper-medium')))
+            reader.start()
+            reader.join(timeout=2)
+            assert not reader.is_alive()
+            assert result['preloaded']
+            assert 'repo/whisper-small' in result['stats']['models']
+            assert pool.is_loaded('repo/whisper-small')
+        finally:
+            done.set()
+            worker.join(timeout=5)
+        assert holder.model_path == 'repo/whisper-small'
+
+
+class TestServiceUsesPool:
+
+    def test_transcription_uses_pooled_model_and_cleanup_evicts(self, tmp_path):
+        audio_path = tmp_path / 'clip.wav'
+        audio_path.write_bytes(b'fake audio data')
+        loaded = []
+        pool, holder = _pool(2000, loaded)
+
+        service = MLXTranscriptionService({'default_model': 'whisper-tiny', 'available_models': ['repo/whisper-tiny'],
+                                          'backend': 'mlx'})
+        service.model_pool = pool
+
+        assert service.preload_default_model()
+        with patch('src.core.mlx_transcription.mlx_whisper') as mock_whisper:
+            mock_whisper.transcribe.side_effect = lambda *args, **kwargs: {'text': holder.model_path}
+            assert service.transcribe_audio(audio_path) == 'repo/whisper-tiny'
+
+        assert loaded == ['repo/whisper-tiny']
+        assert service.get_model_info()['model_pool']['hits'] == 1
+
+        service.cleanup_model_cache()
+        assert not pool.is_loaded('repo/whisper-tiny')
@@ -289,5 +289,31 @@ class TestYouTubeHandlerErrorHandling(unittest.TestCase):
             )
 
 
+
+class TestYouTubeHandlerEta(unittest.TestCase):
+    """处理时间预估使用共享的EtaEstimator"""
+
+    def setUp(self):
+        from src.core.eta_estimator import EtaEstimator
+        from src.web_frontend.youtube_handler import YouTubeHandler
+
+        self.estimator = EtaEstimator()
+        self.handler = YouTubeHandler(None)
+        patcher = patch.object(YouTubeHandler, '_get_eta_estimator', return_value=self.estimator)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_estimate_uses_learned_rates(self):
+        self.assertEqual(self.handler.estimate_processing_time(3600), int(round(self.estimator.estimate(3600))))
+
+    def test_process_url_returns_estimate_and_tracks_job(self):
+        result = self.handler.process_url(
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ', metadata={'duration': '1200'}
+        )
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['estimated_time'], int(round(self.estimator.estimate(1200))))
+        self.assertEqual(self.estimator.get_stats()['tracked_jobs'], 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -54,3 +54,79 @@ class TestFileMonitorMetadata:
         assert metadata_arg['processing_config']['content_type'] == 'lecture'
         assert metadata_arg['processing_config']['enable_summary'] is False
         assert str(audio_path) not in monitor.processing_queue.pending_metadata
+
+    def test_direct_call_waits_for_stability(self):
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=MagicMock(),
+            supported_formats={'.mp3'},
+        )
+        monitor.stability_check_delay = 0.2
+        monitor.stability_check_interval = 0.05
+
+        audio_path = self._create_audio_file()
+        monitor._on_new_file(str(audio_path))
+
+        assert monitor.processing_queue.is_tracking(str(audio_path.resolve()))
+
+    def test_watch_folder_does_not_requeue_enqueued_file(self):
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=MagicMock(),
+            supported_formats={'.mp3'},
+        )
+        audio_path = str(self._create_audio_file().resolve())
+
+        assert monitor.enqueue_file_for_processing(audio_path, {'source': 'web_upload'})
+        assert monitor.processing_queue.get_file(timeout=0.1) == audio_path
+        monitor.processing_queue.mark_completed(audio_path)
+
+        # 稳定性检测在直接入队之前已开始，完成后才回调
+        monitor._on_file_stable(audio_path)
+        assert monitor.processing_queue.get_queue_size() == 0
+
+    def test_enqueue_after_watch_folder_updates_metadata(self):
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=MagicMock(),
+            supported_formats={'.mp3'},
+        )
+        audio_path = str(self._create_audio_file().resolve())
+        monitor._on_file_stable(audio_path)
+        assert monitor.processing_queue.get_file(timeout=0.1) == audio_path
+        monitor.processing_queue.mark_completed(audio_path)
+
+        assert monitor.enqueue_file_for_processing(audio_path, {'processing_id': 'abc-123'})
+        assert monitor.processing_queue.get_queue_size() == 0
+        assert monitor.processing_queue.get_file_metadata(audio_path)['processing_id'] == 'abc-123'
+
+    def test_pending_metadata_is_taken_under_queue_lock(self):
+        import threading
+
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=MagicMock(),
+            supported_formats={'.mp3'},
+        )
+        processing_queue = monitor.processing_queue
+        audio_path = str(self._create_audio_file().resolve())
+        monitor.register_metadata(audio_path, {'processing_id': 'abc-123'})
+
+        taken = []
+        with processing_queue.lock:
+            worker = threading.Thread(target=lambda: taken.append(processing_queue.take_pending_metadata(audio_path)))
+            worker.start()
+            worker.join(timeout=0.2)
+            # 上传线程持有队列锁时不会读取预注册的元数据
+            assert worker.is_alive()
+        worker.join(timeout=5)
+        assert taken == [{'processing_id': 'abc-123'}]
+        assert processing_queue.take_pending_metadata(audio_path) is None
+
+        # 稳定性回调通过加锁的方法取出元数据
+        monitor.register_metadata(audio_path, {'processing_id': 'abc-123'})
+        with patch.object(processing_queue, 'take_pending_metadata',
+                          wraps=processing_queue.take_pending_metadata) as take:
+            monitor._on_file_stable(audio_path)
+        take.assert_called_once_with(audio_path)
+        assert processing_queue.get_file_metadata(audio_path)['processing_id'] == 'abc-123'
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Tests for the FileMonitor worker pool and queue semantics under concurrency."""
+
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.monitoring.file_monitor import FileMonitor
+from src.monitoring.processing_queue import ProcessingQueue, ProcessingStatus
+from src.utils.resource_limiter import ResourceLimiter
+
+
+class TestFileMonitorWorkerPool:
+    """Several files should be processed at the same time."""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.watch_dir = Path(self.temp_dir.name) / 'uploads'
+        self.watch_dir.mkdir(parents=True, exist_ok=True)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _create_audio_file(self, name: str) -> Path:
+        path = self.watch_dir / name
+        path.write_bytes(b'fake audio data')
+        return path
+
+    def test_long_job_does_not_block_short_jobs(self):
+        release_long = threading.Event()
+        finished = []
+
+        def processor(file_path, **_kwargs):
+            if file_path.endswith('long.mp3'):
+                release_long.wait(timeout=5)
+            finished.append(Path(file_path).name)
+            return True
+
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=processor,
+            supported_formats={'.mp3'},
+            max_workers=2,
+        )
+        monitor.start_monitoring()
+        try:
+            for name in ('long.mp3', 'short1.mp3', 'short2.mp3'):
+                assert monitor.enqueue_file_for_processing(str(self._create_audio_file(name)), {})
+
+            deadline = time.time() + 5
+            while len(finished) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+
+            assert finished == ['short1.mp3', 'short2.mp3']
+            status = monitor.get_queue_status()
+            assert status['workers']['max_workers'] == 2
+            assert status['queue_stats']['processing'] == 1
+
+            release_long.set()
+            deadline = time.time() + 5
+            while len(finished) < 3 and time.time() < deadline:
+                time.sleep(0.05)
+            assert 'long.mp3' in finished
+        finally:
+            release_long.set()
+            monitor.stop_monitoring()
+
+
+    def test_cancelled_upload_leaves_eta_queue(self):
+        from unittest.mock import Mock
+        from src.core.eta_estimator import EtaEstimator
+
+        audio_processor = Mock()
+        audio_processor.eta_estimator = EtaEstimator()
+        monitor = FileMonitor(
+            watch_folder=str(self.watch_dir),
+            file_processor_callback=Mock(),
+            supported_formats={'.mp3'},
+            audio_processor=audio_processor,
+        )
+        path = str(self._create_audio_file('queued.mp3'))
+        assert monitor.enqueue_file_for_processing(path, {'processing_id': 'upload-1'})
+        audio_processor.eta_estimator.track_job('upload-1', 600)
+
+        assert monitor.cancel_file_processing(path)
+        assert audio_processor.eta_estimator.get_stats()['tracked_jobs'] == 0
+
+class TestProcessingQueueConcurrency:
+    """Cancelled or removed entries must never be handed to a worker."""
+
+    def test_cancelled_file_is_skipped(self):
+        processing_queue = ProcessingQueue()
+        processing_queue.add_file('/tmp/a.mp3')
+        processing_queue.add_file('/tmp/b.mp3')
+
+        assert processing_queue.cancel_if_pending('/tmp/a.mp3')
+
+        assert processing_queue.get_file(timeout=0.1) == '/tmp/b.mp3'
+        assert processing_queue.get_file(timeout=0.1) is None
+        assert processing_queue.get_status('/tmp/a.mp3') == ProcessingStatus.CANCELLED
+
+    def test_cancel_if_pending_refuses_processing_file(self):
+        processing_queue = ProcessingQueue()
+        processing_queue.add_file('/tmp/a.mp3')
+        assert processing_queue.get_file(timeout=0.1) == '/tmp/a.mp3'
+
+        assert not processing_queue.cancel_if_pending('/tmp/a.mp3')
+        assert processing_queue.get_status('/tmp/a.mp3') == ProcessingStatus.PROCESSING
+
+    def test_removed_file_is_skipped(self):
+        processing_queue = ProcessingQueue()
+        processing_queue.add_file('/tmp/a.mp3')
+        processing_queue.remove_file('/tmp/a.mp3')
+
+        assert processing_queue.get_file(timeout=0.1) is None
+
+
+class TestResourceLimiter:
+    """Each resource has its own concurrency limit."""
+
+    def test_slot_limits_concurrency_per_resource(self):
+        limiter = ResourceLimiter({'transcription': 1, 'llm': 2})
+        active = {'transcription': 0, 'llm': 0}
+        peak = {'transcription': 0, 'llm': 0}
+        lock = threading.Lock()
+
+        def use(resource):
+            with limiter.slot(resource):
+                with lock:
+                    active[resource] += 1
+                    peak[resource] = max(peak[resource], active[resource])
+                time.sleep(0.05)
+                with lock:
+                    active[resource] -= 1
+
+        threads = [threading.Thread(target=use, args=(resource,))
+                   for resource in ['transcription'] * 3 + ['llm'] * 4]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak['transcription'] == 1
+        assert peak['llm'] == 2
+        assert limiter.get_status()['llm'] == {'limit': 2, 'in_use': 0, 'waiting': 0}
+
+    def test_unknown_resource_is_unlimited(self):
+        limiter = ResourceLimiter()
+        with limiter.slot('unknown'):
+            pass
+        assert 'unknown' not in limiter.get_status()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Tests for priority, shortest-job-first, aging and fair-share scheduling."""
+
+from unittest.mock import patch
+
+from src.monitoring.job_scheduler import JobScheduler, resolve_content_type, resolve_priority
+from src.monitoring.processing_queue import ProcessingQueue
+
+
+def _drain(scheduler):
+    order = []
+    while True:
+        job_id = scheduler.pop(lambda _job_id: True)
+        if job_id is None:
+            return order
+        order.append(job_id)
+
+
+def test_priority_class_beats_duration():
+    scheduler = JobScheduler(fair_share_seconds=0)
+    scheduler.push('batch_short', 'low', 'lecture', 60, enqueued_at=1000)
+    scheduler.push('upload_long', 'high', 'lecture', 3600, enqueued_at=1000)
+    scheduler.push('watch', 'normal', 'lecture', 600, enqueued_at=1000)
+
+    assert _drain(scheduler) == ['upload_long', 'watch', 'batch_short']
+
+
+def test_shortest_job_first_within_class():
+    scheduler = JobScheduler(fair_share_seconds=0)
+    for job_id, duration in (('long', 3600), ('short', 300), ('medium', 1200)):
+        scheduler.push(job_id, 'normal', 'lecture', duration, enqueued_at=1000)
+
+    assert _drain(scheduler) == ['short', 'medium', 'long']
+
+
+def test_aging_prevents_starvation():
+    scheduler = JobScheduler(fair_share_seconds=0, aging_rate=1.0)
+    scheduler.push('old_long', 'normal', 'lecture', 3600, enqueued_at=0)
+    # 等待时间超过两者时长差的长任务排在新到的短任务之前
+    scheduler.push('new_short', 'normal', 'lecture', 300, enqueued_at=4000)
+
+    assert _drain(scheduler) == ['old_long', 'new_short']
+
+
+def test_fair_share_interleaves_content_types():
+    scheduler = JobScheduler(fair_share_seconds=600, aging_rate=0)
+    for index in range(3):
+        scheduler.push(f"lecture{index}", 'normal', 'lecture', 600, enqueued_at=0)
+        scheduler.push(f"meeting{index}", 'normal', 'meeting', 900, enqueued_at=0)
+
+    order = _drain(scheduler)
+    assert [job_id[:-1] for job_id in order] == ['lecture', 'meeting'] * 3
+
+
+def test_stale_entries_are_skipped():
+    scheduler = JobScheduler()
+    scheduler.push('cancelled', 'urgent', 'lecture', 60, enqueued_at=0)
+    scheduler.push('live', 'low', 'lecture', 60, enqueued_at=0)
+
+    assert scheduler.pop(lambda job_id: job_id != 'cancelled') == 'live'
+    assert scheduler.pop(lambda job_id: True) is None
+
+
+def test_resolve_priority_and_content_type():
+    assert resolve_priority({'source': 'web_upload'}) == 'high'
+    assert resolve_priority({'source': 'watch_folder'}) == 'normal'
+    assert resolve_priority({'source': 'web_upload', 'priority': 'LOW'}) == 'low'
+    assert resolve_priority({'processing_config': {'priority': 'urgent'}}) == 'urgent'
+    assert resolve_priority({'priority': 'bogus'}) == 'normal'
+    assert resolve_content_type({'processing_config': {'content_type': 'meeting'}}) == 'meeting'
+    assert resolve_content_type({}) == 'default'
+
+
+def test_processing_queue_serves_urgent_upload_before_batch(tmp_path):
+    processing_queue = ProcessingQueue(max_size=0)
+    for index in range(5):
+        path = tmp_path / f"lecture{index}.mp3"
+        path.write_bytes(b'fake audio data')
+        processing_queue.add_file(str(path), {'source': 'watch_folder', 'audio_duration': 3600})
+
+    meeting = tmp_path / 'meeting.mp3'
+    meeting.write_bytes(b'fake audio data')
+    processing_queue.add_file(str(meeting), {'source': 'web_upload', 'audio_duration': 300})
+
+    assert processing_queue.get_file(timeout=0.1) == str(meeting)
+    assert processing_queue.get_queue_size() == 5
+
+
+def test_add_file_probes_duration_once(tmp_path):
+    processing_queue = ProcessingQueue(max_size=0)
+    path = tmp_path / 'unknown.mp3'
+    path.write_bytes(b'fake audio data')
+
+    # 探测失败时不在持锁期间再次探测
+    with patch('src.monitoring.processing_queue.probe_duration', return_value=None) as mock_probe:
+        assert processing_queue.add_file(str(path))
+
+    assert mock_probe.call_count == 1
+    assert processing_queue.processing_metadata[str(path)]['expected_seconds'] is None
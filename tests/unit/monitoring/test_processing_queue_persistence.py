@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests for the SQLite-backed processing queue surviving restarts."""
+
+from pathlib import Path
+
+import pytest
+
+from src.monitoring.processing_queue import ProcessingQueue, ProcessingStatus
+from src.storage.queue_store import QueueStore
+
+
+@pytest.fixture
+def audio_files(tmp_path):
+    files = []
+    for name in ('a.mp3', 'b.mp3', 'c.mp3'):
+        path = tmp_path / name
+        path.write_bytes(b'fake audio data')
+        files.append(str(path))
+    return files
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'queue.db')
+
+
+def test_pending_jobs_and_config_survive_restart(db_path, audio_files):
+    first = ProcessingQueue(store=QueueStore(db_path))
+    first.add_file(audio_files[0], {'processing_config': {'content_type': 'lecture'}})
+    first.add_file(audio_files[1])
+
+    restarted = ProcessingQueue(store=QueueStore(db_path))
+    assert restarted.get_file(timeout=0.1) == audio_files[0]
+    assert restarted.get_file_metadata(audio_files[0])['processing_config'] == {'content_type': 'lecture'}
+    assert restarted.get_file(timeout=0.1) == audio_files[1]
+
+
+def test_interrupted_job_is_recovered(db_path, audio_files):
+    first = ProcessingQueue(store=QueueStore(db_path))
+    first.add_file(audio_files[0])
+    assert first.get_file(timeout=0.1) == audio_files[0]
+    # 进程在处理过程中退出，未调用mark_completed/mark_failed
+
+    restarted = ProcessingQueue(store=QueueStore(db_path))
+    assert restarted.get_status(audio_files[0]) == ProcessingStatus.PENDING
+    assert restarted.get_metadata(audio_files[0])['retry_count'] == 1
+    assert restarted.get_file(timeout=0.1) == audio_files[0]
+
+
+def test_finished_jobs_are_not_requeued(db_path, audio_files):
+    first = ProcessingQueue(store=QueueStore(db_path))
+    for path in audio_files:
+        first.add_file(path)
+    first.get_file(timeout=0.1)
+    first.mark_completed(audio_files[0])
+    first.cancel_if_pending(audio_files[1])
+
+    restarted = ProcessingQueue(store=QueueStore(db_path))
+    assert restarted.get_status(audio_files[0]) == ProcessingStatus.COMPLETED
+    assert restarted.get_status(audio_files[1]) == ProcessingStatus.CANCELLED
+    assert restarted.get_file(timeout=0.1) == audio_files[2]
+    assert restarted.get_file(timeout=0.1) is None
+
+
+def test_missing_file_fails_on_recovery(db_path, audio_files):
+    first = ProcessingQueue(store=QueueStore(db_path))
+    first.add_file(audio_files[0])
+    Path(audio_files[0]).unlink()
+
+    restarted = ProcessingQueue(store=QueueStore(db_path))
+    assert restarted.get_status(audio_files[0]) == ProcessingStatus.FAILED
+    assert restarted.get_file(timeout=0.1) is None
+
+
+def test_claim_is_atomic_across_queues(db_path, audio_files):
+    first = ProcessingQueue(store=QueueStore(db_path))
+    first.add_file(audio_files[0])
+    second = ProcessingQueue(store=QueueStore(db_path))
+
+    assert second.get_file(timeout=0.1) == audio_files[0]
+    # 另一进程已领取，本进程队列中的残留条目被跳过
+    assert first.get_file(timeout=0.1) is None
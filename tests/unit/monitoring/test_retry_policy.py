@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Tests for delayed retries with per-error-class backoff and dead letters."""
+
+import time
+
+import pytest
+
+from src.monitoring.file_monitor import FileMonitor
+from src.monitoring.processing_queue import ProcessingQueue, ProcessingStatus
+from src.monitoring.retry_policy import RetryPolicy, classify_error, classify_exception
+from src.storage.queue_store import QueueStore
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    path = tmp_path / 'a.mp3'
+    path.write_bytes(b'fake audio data')
+    return str(path)
+
+
+def test_classify_error():
+    assert classify_error('OpenRouter returned 429 Too Many Requests') == 'rate_limit'
+    assert classify_error('git push failed: connection reset') == 'network'
+    assert classify_error('处理异常: 文件不存在') == 'permanent'
+    assert classify_error('something odd') == 'default'
+    assert classify_error(None) == 'default'
+    # 关键字按单词边界匹配，临时性提示优先于"invalid"等永久性字样
+    assert classify_error('digit parse') == 'default'
+    assert classify_error('git推送失败') == 'network'
+    assert classify_error('Invalid JSON from upstream (timeout)') == 'network'
+
+
+def test_classify_exception_by_type():
+    import subprocess
+
+    import requests
+
+    from src.core.ai_generation import APIException
+
+    assert classify_exception(requests.exceptions.ReadTimeout('read timed out')) == 'network'
+    assert classify_exception(requests.ConnectionError('reset')) == 'network'
+    assert classify_exception(FileNotFoundError('missing.mp3')) == 'permanent'
+    assert classify_exception(MemoryError()) == 'resource'
+
+    response = requests.Response()
+    response.status_code = 429
+    assert classify_exception(requests.HTTPError('error', response=response)) == 'rate_limit'
+
+    # OpenRouter客户端的APIException按状态码判断
+    assert classify_exception(APIException('API调用失败', status_code=429)) == 'rate_limit'
+    assert classify_exception(APIException('API调用失败', status_code=503)) == 'network'
+    assert classify_exception(APIException('API调用失败', status_code=401)) == 'permanent'
+
+    # git发布通过subprocess执行
+    assert classify_exception(subprocess.TimeoutExpired(['git', 'push'], 60)) == 'network'
+    assert classify_exception(subprocess.CalledProcessError(1, ['git', 'push'], stderr='rejected')) == 'network'
+
+    # 阶段包装后的异常按原始异常判断，消息中的"invalid"不影响结果
+    try:
+        try:
+            raise requests.exceptions.ConnectTimeout('connect timeout')
+        except Exception as error:
+            raise Exception(f"invalid response: {error}")
+    except Exception as wrapped:
+        assert classify_exception(wrapped) == 'network'
+
+    assert classify_exception(ValueError('unsupported format')) == 'permanent'
+    assert classify_exception(None) == 'default'
+
+
+def test_worker_classifies_callback_exception_by_type(tmp_path):
+    def processor(file_path, **_kwargs):
+        raise FileNotFoundError('gone')
+
+    monitor = FileMonitor(watch_folder=str(tmp_path), file_processor_callback=processor, supported_formats={'.mp3'})
+    audio_path = tmp_path / 'a.mp3'
+    audio_path.write_bytes(b'fake audio data')
+    monitor.start_monitoring()
+    try:
+        assert monitor.enqueue_file_for_processing(str(audio_path), {})
+        deadline = time.time() + 5
+        while not monitor.processing_queue.get_dead_letters() and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        monitor.stop_monitoring()
+
+    # 消息"处理异常: gone"本身无法识别，按异常类型判为永久性错误，不重试
+    assert monitor.processing_queue.get_dead_letters()[0]['error_class'] == 'permanent'
+
+
+def test_exponential_backoff_is_capped():
+    policy = RetryPolicy({'network': {'max_attempts': 10, 'base_seconds': 10, 'max_seconds': 50}}, jitter=0)
+
+    assert [policy.next_delay('network', attempt) for attempt in range(1, 5)] == [10, 20, 40, 50]
+    assert policy.next_delay('network', 10) is None
+    assert policy.next_delay('permanent', 1) is None
+
+
+def test_failed_job_is_retried_after_delay(audio_file):
+    policy = RetryPolicy({'default': {'max_attempts': 3, 'base_seconds': 0.3, 'max_seconds': 1}}, jitter=0)
+    processing_queue = ProcessingQueue(retry_policy=policy)
+    processing_queue.add_file(audio_file)
+    assert processing_queue.get_file(timeout=0.1) == audio_file
+
+    assert processing_queue.mark_failed(audio_file, 'something odd', retry=True)
+    assert processing_queue.get_processing_stats()['retry_waiting'] == 1
+    # 退避期间不会被立即领取
+    assert processing_queue.get_file(timeout=0.05) is None
+
+    started = time.monotonic()
+    assert processing_queue.get_file(timeout=2) == audio_file
+    assert time.monotonic() - started > 0.15
+
+
+def test_stale_retry_entry_does_not_dispatch_early(audio_file):
+    policy = RetryPolicy({
+        'network': {'max_attempts': 3, 'base_seconds': 0.2, 'max_seconds': 1},
+        'resource': {'max_attempts': 3, 'base_seconds': 30, 'max_seconds': 30},
+    }, jitter=0)
+    processing_queue = ProcessingQueue(retry_policy=policy)
+    processing_queue.add_file(audio_file)
+    processing_queue.get_file(timeout=0.1)
+    assert processing_queue.mark_failed(audio_file, 'timeout', retry=True, error_class='network')
+
+    # 等待重试期间取消并重新上传，新任务失败后安排了更晚的重试
+    assert processing_queue.cancel_if_pending(audio_file)
+    assert processing_queue.add_file(audio_file)
+    assert processing_queue.get_file(timeout=0.1) == audio_file
+    assert processing_queue.mark_failed(audio_file, 'out of memory', retry=True, error_class='resource')
+
+    # 旧的0.2秒堆条目到期时不会提前派发新任务
+    assert processing_queue.get_file(timeout=0.6) is None
+    assert processing_queue.get_processing_stats()['retry_waiting'] == 1
+
+
+def test_exhausted_job_goes_to_dead_letters(audio_file):
+    policy = RetryPolicy({'default': {'max_attempts': 2, 'base_seconds': 0, 'max_seconds': 0}}, jitter=0)
+    processing_queue = ProcessingQueue(retry_policy=policy)
+    processing_queue.add_file(audio_file)
+
+    processing_queue.get_file(timeout=0.1)
+    assert processing_queue.mark_failed(audio_file, 'boom', retry=True)
+    processing_queue.get_file(timeout=0.1)
+    assert not processing_queue.mark_failed(audio_file, 'boom again', retry=True)
+
+    assert processing_queue.get_status(audio_file) == ProcessingStatus.FAILED
+    dead_letters = processing_queue.get_dead_letters()
+    assert [(entry['file_path'], entry['attempts'], entry['last_error']) for entry in dead_letters] == [
+        (audio_file, 2, 'boom again')
+    ]
+
+
+def test_permanent_error_is_not_retried(audio_file):
+    processing_queue = ProcessingQueue()
+    processing_queue.add_file(audio_file)
+    processing_queue.get_file(timeout=0.1)
+
+    assert not processing_queue.mark_failed(audio_file, 'unsupported format', retry=True)
+    assert processing_queue.get_dead_letters()[0]['error_class'] == 'permanent'
+
+
+def test_retry_schedule_survives_restart(tmp_path, audio_file):
+    db_path = str(tmp_path / 'queue.db')
+    policy = RetryPolicy({'network': {'max_attempts': 5, 'base_seconds': 3600, 'max_seconds': 3600}}, jitter=0)
+    processing_queue = ProcessingQueue(store=QueueStore(db_path), retry_policy=policy)
+    processing_queue.add_file(audio_file)
+    processing_queue.get_file(timeout=0.1)
+    processing_queue.mark_failed(audio_file, 'connection timeout', retry=True)
+
+    restarted = ProcessingQueue(store=QueueStore(db_path), retry_policy=policy)
+    assert restarted.get_file(timeout=0.05) is None
+    schedule = restarted.get_retry_schedule()
+    assert schedule[0]['file_path'] == audio_file
+    assert schedule[0]['next_attempt_in'] > 3000
+
+
+def _failing_pipeline(audio_file):
+    """除失败的服务外其余依赖均为Mock的音频处理器"""
+    from unittest.mock import Mock
+
+    from src.core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor(None)
+    processor.transcription_service = Mock()
+    processor.transcription_service.get_cached_transcription.return_value = None
+    processor.transcription_service.transcribe_audio.return_value = 'text'
+    processor.anonymization_service = Mock()
+    processor.anonymization_service.anonymize_names.return_value = ('text', {})
+    processor.ai_generation_service = Mock()
+    processor.ai_generation_service.generate_batch.return_value = {'summary': 's', 'mindmap': 'm'}
+    processor.transcript_storage = Mock()
+    processor.result_storage = Mock()
+    return processor
+
+
+def _process_and_handle_failure(tmp_path, processor, audio_file, privacy_level='private'):
+    """按worker的方式处理失败：读取处理器记录的错误类别后交给_handle_failure"""
+    monitor = FileMonitor(watch_folder=str(tmp_path), file_processor_callback=processor.process_audio_file,
+                          supported_formats={'.mp3'}, audio_processor=processor,
+                          retry_policy=RetryPolicy(jitter=0))
+    monitor.processing_queue.add_file(audio_file)
+    assert monitor.processing_queue.get_file(timeout=0.1) == audio_file
+
+    assert not processor.process_audio_file(audio_file, privacy_level=privacy_level)
+    failure = monitor._get_processor_failure(audio_file)
+    monitor._handle_failure(audio_file, failure['error'], failure['error_class'])
+    return monitor.processing_queue
+
+
+def test_api_rate_limit_is_retried_as_rate_limit(tmp_path, audio_file):
+    from unittest.mock import Mock
+
+    import requests
+
+    from src.core.ai_generation import AIContentGenerator
+
+    response = requests.Response()
+    response.status_code = 429
+    response._content = b'{"error": {"message": "Rate limit exceeded"}}'
+
+    generator = AIContentGenerator({'openrouter': {'models': {'summary': 'm', 'mindmap': 'm'}}},
+                                   enable_rate_limiting=False)
+    generator.client.session = Mock()
+    generator.client.session.post.return_value = response
+
+    processor = _failing_pipeline(audio_file)
+    processor.ai_generation_service = generator
+    processing_queue = _process_and_handle_failure(tmp_path, processor, audio_file)
+
+    # 失败的生成不会被当作摘要保存
+    processor.result_storage.save_json_result.assert_not_called()
+    assert processing_queue.get_metadata(audio_file)['error_class'] == 'rate_limit'
+    assert processing_queue.get_retry_schedule()[0]['file_path'] == audio_file
+
+
+def test_git_push_failure_is_retried_as_network(tmp_path, audio_file):
+    import subprocess
+    from unittest.mock import patch
+
+    from src.publishing.git_publisher import GitPublisher
+
+    publisher = GitPublisher()
+    publisher.public_dir = tmp_path / 'public'
+    publisher.output_public_dir = tmp_path / 'output'
+    publisher.output_public_dir.mkdir()
+    (publisher.output_public_dir / 'a_result.html').write_text('<html></html>')
+
+    def git(args, **_kwargs):
+        # add成功、有待提交变更、commit成功，push被远端拒绝
+        returncode = 1 if args[:2] in (['git', 'diff'], ['git', 'push']) else 0
+        return subprocess.CompletedProcess(args, returncode, '', 'fatal: unable to access remote')
+
+    processor = _failing_pipeline(audio_file)
+    processor.git_publisher = publisher
+    with patch.object(publisher, '_sync_static_resources'), patch.object(publisher, '_update_index_html'), \
+            patch('src.publishing.git_publisher.subprocess.run', side_effect=git), \
+            patch('src.publishing.git_publisher.os.chdir'):
+        processing_queue = _process_and_handle_failure(tmp_path, processor, audio_file, privacy_level='public')
+
+    assert isinstance(publisher.last_error, subprocess.CalledProcessError)
+    assert processing_queue.get_metadata(audio_file)['error_class'] == 'network'
+    assert processing_queue.get_retry_schedule()[0]['file_path'] == audio_file
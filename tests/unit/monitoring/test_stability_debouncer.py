@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Tests for event-driven file stability detection."""
+
+import threading
+import time
+
+import pytest
+
+from src.monitoring.stability_debouncer import FileStabilityDebouncer
+
+
+class _Collector:
+    def __init__(self, expected=1):
+        self.paths = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.expected = expected
+
+    def __call__(self, file_path):
+        with self._lock:
+            self.paths.append(file_path)
+            if len(self.paths) >= self.expected:
+                self._done.set()
+
+    def wait(self, timeout=5.0):
+        return self._done.wait(timeout)
+
+
+@pytest.fixture
+def make_debouncer():
+    debouncers = []
+
+    def factory(on_stable, **kwargs):
+        debouncer = FileStabilityDebouncer(on_stable, **kwargs)
+        debouncers.append(debouncer)
+        return debouncer
+
+    yield factory
+    for debouncer in debouncers:
+        debouncer.stop()
+
+
+def test_burst_of_arrivals_is_detected_concurrently(tmp_path, make_debouncer):
+    count = 2000
+    collector = _Collector(expected=count)
+    debouncer = make_debouncer(collector, quiet_seconds=0.2, check_interval=0.05)
+    debouncer.start()
+
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"recording{index}.mp3"
+        path.write_bytes(b'fake audio data')
+        paths.append(str(path))
+        debouncer.add(str(path))
+
+    # 全部文件共用同一静默期，而不是逐个等待
+    assert collector.wait(timeout=10.0)
+    assert sorted(collector.paths) == sorted(paths)
+    assert debouncer.pending_count() == 0
+
+
+def test_modifications_postpone_detection(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0.3, check_interval=0.05)
+    debouncer.start()
+    path = tmp_path / 'growing.mp3'
+    path.write_bytes(b'part')
+    debouncer.add(str(path))
+
+    for _ in range(5):
+        time.sleep(0.1)
+        with open(path, 'ab') as f:
+            f.write(b'more')
+        debouncer.notify_modified(str(path))
+        assert collector.paths == []
+
+    assert collector.wait(timeout=5.0)
+    assert collector.paths == [str(path)]
+
+
+def test_close_write_skips_quiet_period(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=60, check_interval=60)
+    debouncer.start()
+    path = tmp_path / 'copied.mp3'
+    path.write_bytes(b'fake audio data')
+
+    debouncer.add(str(path))
+    debouncer.notify_modified(str(path), closed=True)
+
+    assert collector.wait(timeout=2.0)
+
+
+def test_untracked_modifications_are_ignored(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0, check_interval=0)
+    path = tmp_path / 'processed.mp3'
+    path.write_bytes(b'fake audio data')
+
+    debouncer.notify_modified(str(path), closed=True)
+
+    assert debouncer.process_due() == 0
+    assert not debouncer.is_pending(str(path))
+
+
+def test_empty_and_missing_files_are_dropped(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0, check_interval=0)
+    empty = tmp_path / 'empty.mp3'
+    empty.write_bytes(b'')
+    debouncer.add(str(empty))
+    debouncer.add(str(tmp_path / 'missing.mp3'))
+
+    assert debouncer.process_due() == 0
+    assert debouncer.pending_count() == 0
+    assert collector.paths == []
+
+
+def test_process_due_runs_checks_synchronously(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0, check_interval=0)
+    path = tmp_path / 'ready.mp3'
+    path.write_bytes(b'fake audio data')
+
+    debouncer.add(str(path))
+
+    assert debouncer.process_due() == 1
+    assert collector.paths == [str(path)]
+
+
+def test_process_until_settled_waits_for_quiet_period(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0.2, check_interval=0.05)
+    path = tmp_path / 'direct.mp3'
+    path.write_bytes(b'fake audio data')
+
+    debouncer.add(str(path))
+    # 静默期未结束时process_due不会判定稳定，需阻塞等待
+    assert debouncer.process_due() == 0
+    debouncer.process_until_settled(str(path))
+
+    assert collector.paths == [str(path)]
+
+
+def test_discarded_file_is_not_dispatched(tmp_path, make_debouncer):
+    collector = _Collector()
+    debouncer = make_debouncer(collector, quiet_seconds=0, check_interval=0)
+    path = tmp_path / 'claimed.mp3'
+    path.write_bytes(b'fake audio data')
+
+    debouncer.add(str(path))
+    assert debouncer.discard(str(path))
+
+    assert debouncer.process_due() == 0
+    assert collector.paths == []
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3.11
+"""
+阶段断点存储的单元测试
+"""
+
+import pytest
+
+from src.storage.checkpoint_store import CheckpointStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / 'checkpoints'))
+
+
+def test_stage_outputs_round_trip(store):
+    outputs = {'summary': '摘要', 'mindmap': '# 导图'}
+    store.save_stage('job', 'ai_generation', 'in', 'cfg', outputs)
+
+    assert store.load_stage('job', 'ai_generation', 'in', 'cfg') == outputs
+
+
+def test_changed_input_or_config_invalidates(store):
+    store.save_stage('job', 'ai_generation', 'in', 'cfg', {'summary': 's'})
+
+    assert store.load_stage('job', 'ai_generation', 'other', 'cfg') is None
+    assert store.load_stage('job', 'ai_generation', 'in', 'other') is None
+    assert store.load_stage('job', 'anonymization', 'in', 'cfg') is None
+
+
+def test_existing_transcript_file_is_referenced(store, tmp_path):
+    transcript_file = tmp_path / 'meeting_raw.txt'
+    transcript_file.write_text('原始转录', encoding='utf-8')
+    outputs = {'transcript': '原始转录', 'transcription_result': {'text': '原始转录'}}
+
+    store.save_stage('job', 'transcription', 'in', 'cfg', outputs, files={'transcript': str(transcript_file)})
+
+    entry = store.load_manifest('job')['stages']['transcription']
+    assert entry['files']['transcript']['path'] == str(transcript_file)
+    assert store.load_stage('job', 'transcription', 'in', 'cfg') == outputs
+
+    # 被修改的文件不能作为断点
+    transcript_file.write_text('人工修改', encoding='utf-8')
+    assert store.load_stage('job', 'transcription', 'in', 'cfg') is None
+
+
+def test_mismatched_file_content_is_stored_inline(store, tmp_path):
+    stale_file = tmp_path / 'meeting_anonymized.txt'
+    stale_file.write_text('旧内容', encoding='utf-8')
+
+    store.save_stage('job', 'anonymization', 'in', 'cfg', {'anonymized_text': '新内容'},
+                     files={'anonymized_text': str(stale_file)})
+
+    assert store.load_manifest('job')['stages']['anonymization']['files'] == {}
+    assert store.load_stage('job', 'anonymization', 'in', 'cfg') == {'anonymized_text': '新内容'}
+
+
+def test_job_key_distinguishes_directories(tmp_path):
+    first = CheckpointStore.job_key(tmp_path / 'a' / 'meeting.mp3')
+    second = CheckpointStore.job_key(tmp_path / 'b' / 'meeting.mp3')
+
+    assert first.startswith('meeting-')
+    assert first != second
+
+
+def test_expired_checkpoints_are_purged(store):
+    store.save_stage('job', 'ai_generation', 'in', 'cfg', {'summary': 's'})
+
+    assert store.purge_expired(-1) == 1
+    assert store.load_stage('job', 'ai_generation', 'in', 'cfg') is None
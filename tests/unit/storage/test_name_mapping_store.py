@@ -0,0 +1,82 @@
+#!/usr/bin/env python3.11
+"""
+人名映射持久化存储的单元测试
+"""
+
+import itertools
+import threading
+
+import pytest
+
+from src.storage.name_mapping_store import NameMappingStore
+from src.core.anonymization import NameMappingManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'name_mappings.db')
+
+
+def test_global_mapping_persists_across_instances(db_path):
+    store = NameMappingStore(db_path)
+    assert store.get_or_create('张三', lambda: '李四') == '李四'
+    store.close()
+
+    reopened = NameMappingStore(db_path)
+    assert reopened.get_or_create('张三', lambda: '王五') == '李四'
+    assert reopened.global_mapping() == {'张三': '李四'}
+
+
+def test_fake_name_collision_is_regenerated(db_path):
+    store = NameMappingStore(db_path)
+    store.get_or_create('Alice', lambda: 'Emma')
+    candidates = iter(['Emma', 'Olivia'])
+
+    assert store.get_or_create('Bob', lambda: next(candidates)) == 'Olivia'
+
+
+def test_collision_exhaustion_raises(db_path):
+    store = NameMappingStore(db_path)
+    store.get_or_create('Alice', lambda: 'Emma')
+
+    with pytest.raises(RuntimeError):
+        store.get_or_create('Bob', lambda: 'Emma', max_attempts=3)
+
+
+def test_concurrent_threads_agree_on_mapping(db_path):
+    store = NameMappingStore(db_path)
+    counter = itertools.count()
+    results = []
+
+    def worker():
+        results.append(store.get_or_create('张三', lambda: f"虚拟{next(counter)}"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(results)) == 1
+    assert store.global_mapping() == {'张三': results[0]}
+
+
+def test_cache_is_bounded(db_path):
+    store = NameMappingStore(db_path, cache_size=2)
+    for index in range(5):
+        store.get_or_create(f"name{index}", lambda index=index: f"fake{index}")
+
+    assert len(store._cache) == 2
+    assert store.get_global('name0') == 'fake0'
+
+
+def test_manager_reverse_mapping_uses_store(db_path):
+    store = NameMappingStore(db_path)
+    NameMappingManager(store).store_mapping('meeting_01', {'张三': '李四', 'Alice': 'Emma'})
+
+    manager = NameMappingManager(NameMappingStore(db_path))
+    assert manager.get_mapping('meeting_01') == {'张三': '李四', 'Alice': 'Emma'}
+    assert manager.reverse_mapping('meeting_01', '李四和Emma开会') == '张三和Alice开会'
+
+    manager.clear_mapping('meeting_01')
+    assert manager.get_all_mappings() == {}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests for header-based audio duration probing."""
+
+import struct
+import wave
+from unittest.mock import patch
+
+import pytest
+
+from src.utils import audio_probe
+from src.utils.audio_probe import clear_duration_cache, probe_duration, read_header_duration
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    clear_duration_cache()
+    yield
+    clear_duration_cache()
+
+
+def _write_wav(path, seconds, sample_rate=16000, channels=2):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * channels * int(sample_rate * seconds))
+
+
+def _write_flac_header(path, total_samples, sample_rate):
+    # STREAMINFO: 20位采样率 | 3位声道数-1 | 5位位深-1 | 36位总采样数
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = struct.pack('>HH', 4096, 4096) + b'\x00' * 6 + packed.to_bytes(8, 'big') + b'\x00' * 16
+    path.write_bytes(b'fLaC' + bytes([0x80, 0, 0, 34]) + streaminfo)
+
+
+class TestHeaderDuration:
+
+    def test_wav_duration_from_header(self, tmp_path):
+        audio_path = tmp_path / 'meeting.wav'
+        _write_wav(audio_path, 2.5)
+        assert read_header_duration(audio_path) == pytest.approx(2.5)
+
+    def test_flac_duration_from_streaminfo(self, tmp_path):
+        audio_path = tmp_path / 'lecture.flac'
+        _write_flac_header(audio_path, 44100 * 90, 44100)
+        assert read_header_duration(audio_path) == pytest.approx(90.0)
+
+    def test_unsupported_or_corrupt_header(self, tmp_path):
+        corrupt = tmp_path / 'broken.wav'
+        corrupt.write_bytes(b'not a wav file')
+        mp3 = tmp_path / 'song.mp3'
+        mp3.write_bytes(b'ID3')
+
+        assert read_header_duration(corrupt) is None
+        assert read_header_duration(mp3) is None
+
+
+class TestProbeDuration:
+
+    def test_header_formats_skip_ffprobe(self, tmp_path):
+        audio_path = tmp_path / 'meeting.wav'
+        _write_wav(audio_path, 1.0)
+
+        with patch.object(audio_probe.subprocess, 'run') as mock_run:
+            assert probe_duration(audio_path) == pytest.approx(1.0)
+        mock_run.assert_not_called()
+
+    def test_ffprobe_result_is_cached_until_file_changes(self, tmp_path):
+        audio_path = tmp_path / 'podcast.m4a'
+        audio_path.write_bytes(b'fake audio')
+
+        with patch.object(audio_probe, '_ffprobe_duration', return_value=321.0) as mock_probe:
+            assert probe_duration(audio_path) == 321.0
+            assert probe_duration(audio_path) == 321.0
+            assert mock_probe.call_count == 1
+
+            audio_path.write_bytes(b'different fake audio')
+            probe_duration(audio_path)
+            assert mock_probe.call_count == 2
+
+    def test_missing_file(self, tmp_path):
+        assert probe_duration(tmp_path / 'missing.wav') is None
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Tests for the content-addressed disk cache."""
+
+import os
+import time
+
+from src.utils.disk_cache import DiskCache
+
+
+class TestDiskCache:
+
+    def test_round_trip_and_stats(self, tmp_path):
+        cache = DiskCache(str(tmp_path), name='test')
+        key = DiskCache.make_key('model', 'prompt', {'max_tokens': 500})
+
+        assert cache.get(key) is None
+        cache.set(key, {'text': 'hello'})
+        assert cache.get(key) == {'text': 'hello'}
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_make_key_is_stable_and_order_insensitive_for_dicts(self):
+        assert DiskCache.make_key('m', {'a': 1, 'b': 2}) == DiskCache.make_key('m', {'b': 2, 'a': 1})
+        assert DiskCache.make_key('m', 'p1') != DiskCache.make_key('m', 'p2')
+
+    def test_expired_entry_is_a_miss(self, tmp_path):
+        cache = DiskCache(str(tmp_path), max_age_days=1)
+        key = DiskCache.make_key('old')
+        cache.set(key, 'value')
+
+        path = cache._path_for(key)
+        two_days_ago = time.time() - 2 * 86400
+        os.utime(path, (two_days_ago, two_days_ago))
+
+        assert cache.get(key) is None
+        assert not path.exists()
+
+    def test_oldest_entries_evicted_when_over_size_budget(self, tmp_path):
+        cache = DiskCache(str(tmp_path), max_size_mb=0.002, max_age_days=0)  # ~2KB
+        keys = [DiskCache.make_key(i) for i in range(4)]
+        for index, key in enumerate(keys):
+            cache.set(key, 'x' * 700)
+            # distinct mtimes so eviction order is deterministic
+            stamp = time.time() - (10 - index)
+            os.utime(cache._path_for(key), (stamp, stamp))
+
+        cache.evict()
+
+        assert cache.get(keys[0]) is None
+        assert cache.get(keys[-1]) == 'x' * 700
+        assert cache.get_stats()['evictions'] >= 1
+
+    def test_corrupt_entry_is_ignored(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        key = DiskCache.make_key('broken')
+        cache.set(key, 'value')
+        cache._path_for(key).write_text('{not json', encoding='utf-8')
+
+        assert cache.get(key) is None
@@ -78,6 +78,11 @@ class TestAudioUploadPostProcessing(unittest.TestCase):
 
         mock_file_monitor = MagicMock()
         mock_file_monitor.enqueue_file_for_processing.return_value = True
+        # 元数据须在文件写入监控目录之前登记
+        file_existed = []
+        mock_file_monitor.register_metadata.side_effect = (
+            lambda path, _metadata: file_existed.append(Path(path).exists())
+        )
 
         mock_container = MagicMock()
         mock_container.get_file_monitor.return_value = mock_file_monitor
@@ -108,6 +113,7 @@ class TestAudioUploadPostProcessing(unittest.TestCase):
 
         self.assertEqual(result['status'], 'success')
         mock_file_monitor.register_metadata.assert_called_once()
+        self.assertEqual(file_existed, [False])
         register_args, register_kwargs = mock_file_monitor.register_metadata.call_args
         registered_path = register_args[0] if register_args else register_kwargs['file_path']
         registered_payload = register_args[1] if len(register_args) > 1 else register_kwargs['metadata']